@@ -0,0 +1,7 @@
+"""Benchmarks for the SAGE pipeline.
+
+- ``python -m sage.bench``: end-to-end replay of the testing/examples corpus
+  through ``/test-concept`` on the offline fake providers (see e2e.py)
+- ``python -m sage.bench.micro``: ops/sec and allocations of the SSR, scoring,
+  filtering and report hot paths at realistic sizes (see micro.py)
+"""
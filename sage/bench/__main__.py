@@ -0,0 +1,18 @@
+"""Run the end-to-end benchmark: ``python -m sage.bench --help``."""
+
+import os
+import sys
+
+
+def _run() -> int:
+    # Keep benchmark runs and panels out of the working directory. Settings are
+    # read when sage.config is first imported, so set these before importing e2e.
+    os.environ.setdefault("RESULT_STORE", "memory")
+    os.environ.setdefault("PANEL_STORE", "memory")
+
+    from .e2e import main
+
+    return main()
+
+
+sys.exit(_run())
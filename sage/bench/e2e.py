@@ -0,0 +1,322 @@
+"""End-to-end benchmark replaying the testing/examples corpus.
+
+Each example input is sent to ``POST /test-concept`` in process (through the
+ASGI app, so parsing, validation, serialization and compression are
+included) with its providers switched to the offline fake providers. Provider
+latency, error and throttle rates are set per run, so throughput and tail
+latency can be measured on a laptop at realistic provider speeds.
+
+Reported per run: requests/sec, latency percentiles, CPU time per request,
+peak RSS and the per-stage time, queue wait and retries recorded by
+sage.utils.timing.
+Results can be saved as JSON and compared against a saved baseline::
+
+    python -m sage.bench --requests 40 --concurrency 4 --latency-ms 800 \\
+        --output bench/$(git rev-parse --short HEAD).json --compare bench/main.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+import numpy as np
+
+from ..services.fake_provider import FakeBehaviour
+from ..services.llm_provider import ProviderFactory
+from ..utils.timing import StageTimer, start_stage_timing
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "testing" / "examples"
+
+FAKE_OPTIONS = {
+    "generation_provider": "fake",
+    "generation_model": "fake-chat",
+    "embedding_provider": "fake",
+    "embedding_model": "fake-embedding",
+    "vision_provider": "fake",
+    "vision_model": "fake-vision",
+    "video_provider": "fake",
+    "video_model": "fake-video",
+}
+
+
+def load_examples(directory: Path = EXAMPLES_DIR) -> tuple[list[tuple[str, bytes]], list[str]]:
+    """
+    Load example inputs, switched to the fake providers.
+
+    Examples with video are skipped: resolving video URLs needs the network.
+
+    Args:
+        directory: Directory of ``*_input.json`` request bodies
+
+    Returns:
+        (name, encoded request body) per example, and the names of skipped examples
+    """
+    examples = []
+    skipped = []
+    for path in sorted(directory.glob("*_input.json")):
+        name = path.name.removesuffix("_input.json")
+        payload = json.loads(path.read_text())
+        if any(item.get("type") == "video" for item in payload["concept"]["content"]):
+            skipped.append(name)
+            continue
+        payload["options"] = {**payload.get("options", {}), **FAKE_OPTIONS}
+        examples.append((name, json.dumps(payload).encode("utf-8")))
+    return examples, skipped
+
+
+def configure_fake_providers(behaviour: FakeBehaviour, embedding_behaviour: FakeBehaviour) -> None:
+    """Set the latency and failure injection of the shared fake providers."""
+    ProviderFactory.create_generation_provider("fake", "fake-chat").behaviour = behaviour
+    ProviderFactory.create_vision_provider("fake", "fake-vision").behaviour = behaviour
+    ProviderFactory.create_vision_provider("fake", "fake-video").behaviour = behaviour
+    ProviderFactory.create_embedding_provider(
+        "fake", "fake-embedding"
+    ).behaviour = embedding_behaviour
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    examples: list[tuple[str, bytes]],
+    requests: int,
+    concurrency: int,
+    warmup: int = 1,
+) -> dict[str, Any]:
+    """
+    Replay examples against the app and measure the run.
+
+    Args:
+        examples: (name, request body) pairs, cycled until ``requests`` are sent
+        requests: Measured requests
+        concurrency: Requests in flight at once
+        warmup: Unmeasured requests sent first (anchor caches, image decoding)
+
+    Returns:
+        Throughput, latency, CPU, memory and per-stage results
+    """
+    from ..main import app
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+    async with client:
+
+        async def send(body: bytes) -> tuple[float, int, StageTimer]:
+            timer = start_stage_timing()
+            start = time.perf_counter()
+            response = await client.post("/test-concept", content=body, headers=headers)
+            latency = (time.perf_counter() - start) * 1000
+            if response.status_code == 200:
+                # Encoding ends after meta.timings is captured, so the body reports it
+                meta = response.json().get("meta") or {}
+                if meta.get("serialization_ms") is not None:
+                    timer.add("serialize", meta["serialization_ms"])
+            return latency, response.status_code, timer
+
+        for i in range(warmup):
+            await send(examples[i % len(examples)][1])
+
+        next_index = 0
+        results: list[tuple[float, int, StageTimer]] = []
+
+        async def worker() -> None:
+            nonlocal next_index
+            while next_index < requests:
+                body = examples[next_index % len(examples)][1]
+                next_index += 1
+                results.append(await send(body))
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(min(concurrency, requests))])
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+    latencies = np.array([latency for latency, _, _ in results])
+    ok = [timer for _, status, timer in results if status == 200]
+    status_codes: dict[str, int] = {}
+    for _, status, _ in results:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+
+    # Stage totals, call counts, queue waits and retries per successful request
+    stage_totals: dict[str, float] = {}
+    stage_calls: dict[str, int] = {}
+    stage_waits: dict[str, float] = {}
+    retries = 0
+    for timer in ok:
+        for name, values in timer.durations.items():
+            stage_totals[name] = stage_totals.get(name, 0.0) + sum(values)
+            stage_calls[name] = stage_calls.get(name, 0) + len(values)
+        for name, values in timer.waits.items():
+            stage_waits[name] = stage_waits.get(name, 0.0) + sum(values)
+        retries += sum(timer.retries.values())
+    per_request = max(len(ok), 1)
+
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "status_codes": status_codes,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(results) / wall, 3),
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 1),
+            "p50": round(float(np.percentile(latencies, 50)), 1),
+            "p95": round(float(np.percentile(latencies, 95)), 1),
+            "p99": round(float(np.percentile(latencies, 99)), 1),
+            "max": round(float(latencies.max()), 1),
+        },
+        "cpu_ms_per_request": round(cpu * 1000 / len(results), 2),
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages_ms_per_request": {
+            name: round(total / per_request, 2) for name, total in stage_totals.items()
+        },
+        "stage_calls_per_request": {
+            name: round(count / per_request, 1) for name, count in stage_calls.items()
+        },
+        "queue_wait_ms_per_request": {
+            name: round(total / per_request, 2) for name, total in stage_waits.items()
+        },
+        "retries_per_request": round(retries / per_request, 2),
+    }
+
+
+def print_summary(results: dict[str, Any], baseline: dict[str, Any] | None = None) -> None:
+    """Print a results table, with relative changes against a baseline if given."""
+
+    def change(value: float, path: tuple[str, ...]) -> str:
+        if baseline is None:
+            return ""
+        old: Any = baseline.get("results", {})
+        for key in path:
+            old = old.get(key) if isinstance(old, dict) else None
+        if not old:
+            return ""
+        return f"  ({(value - old) / old:+.1%} vs {baseline.get('commit') or 'baseline'})"
+
+    latency = results["latency_ms"]
+    lines = [
+        f"requests      {results['requests']} ({results['errors']} errors)",
+        f"throughput    {results['throughput_rps']:.2f} req/s"
+        + change(results["throughput_rps"], ("throughput_rps",)),
+    ]
+    for key in ("p50", "p95", "p99"):
+        lines.append(
+            f"latency {key:<5} {latency[key]:.1f} ms" + change(latency[key], ("latency_ms", key))
+        )
+    lines.append(
+        f"cpu/request   {results['cpu_ms_per_request']:.1f} ms"
+        + change(results["cpu_ms_per_request"], ("cpu_ms_per_request",))
+    )
+    if results["peak_rss_mb"] is not None:
+        lines.append(f"peak rss      {results['peak_rss_mb']:.1f} MB")
+    lines.append("")
+    lines.append(f"{'stage':<14} {'ms/request':>11} {'calls/request':>14}")
+    for name, ms in sorted(results["stages_ms_per_request"].items(), key=lambda item: -item[1]):
+        calls = results["stage_calls_per_request"][name]
+        lines.append(f"{name:<14} {ms:>11.2f} {calls:>14.1f}")
+    for name, ms in results.get("queue_wait_ms_per_request", {}).items():
+        lines.append(f"queue wait    {name} {ms:.2f} ms/request")
+    if results.get("retries_per_request"):
+        lines.append(f"retries       {results['retries_per_request']:.2f}/request")
+    print("\n".join(lines))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m sage.bench",
+        description="Replay testing/examples through /test-concept on the fake providers.",
+    )
+    parser.add_argument("--examples", type=Path, default=EXAMPLES_DIR)
+    parser.add_argument("--requests", type=int, default=20, help="measured requests")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured requests sent first")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="median generation latency")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--latency-sigma", type=float, default=0.5, help="lognormal shape (0 = constant)"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0, help="seed of latency and failure draws")
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="JSON results of a baseline run")
+    parser.add_argument("--log-level", default="CRITICAL", help="level of sage loggers")
+    args = parser.parse_args(argv)
+
+    examples, skipped = load_examples(args.examples)
+    if not examples:
+        parser.error(f"no replayable *_input.json examples in {args.examples}")
+
+    from ..main import app  # noqa: F401 - configures sage logging
+
+    logging.getLogger("sage").setLevel(args.log_level)
+
+    behaviour = dict(
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    configure_fake_providers(
+        FakeBehaviour(latency_ms=args.latency_ms, seed=args.seed, **behaviour),
+        FakeBehaviour(latency_ms=args.embedding_latency_ms, seed=args.seed + 1, **behaviour),
+    )
+
+    results = asyncio.run(run_benchmark(examples, args.requests, args.concurrency, args.warmup))
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "examples": [name for name, _ in examples],
+            "skipped": skipped,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "latency_ms": args.latency_ms,
+            "embedding_latency_ms": args.embedding_latency_ms,
+            "latency_sigma": args.latency_sigma,
+            "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_summary(results, baseline)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
@@ -0,0 +1,322 @@
+"""Micro-benchmarks for the CPU-bound hot paths.
+
+Each case times one operation at realistic sizes and reports operations per
+second and the peak memory allocated by one operation (tracemalloc):
+
+- cosine_similarity: one response/anchor pair (1024/1536/3072 dims)
+- ssr.pmf_for_set: SSREngine._compute_pmf_for_set with cached anchors
+- scoring.metrics: ScoringEngine.calculate_metrics (90-10,000 personas, 1-20 questions)
+- scoring.bootstrap: ScoringEngine.add_confidence_intervals
+- filter.apply: FilterEngine.apply_filters on inline personas
+- report.generate: ReportGenerator.generate_report with a dataset
+
+Results can be saved as JSON and compared against a saved baseline::
+
+    python -m sage.bench.micro --output bench/micro-$(git rev-parse --short HEAD).json \\
+        --compare bench/micro-main.json
+"""
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable, Coroutine, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..models.request import Concept, ContentItem, Question
+from ..models.response import Meta
+from ..services.dataset_export import build_dataset_rows
+from ..services.filter_engine import FilterEngine
+from ..services.report_generator import ReportGenerator
+from ..services.scoring_engine import ScoringEngine
+from ..services.ssr_engine import SSREngine
+from ..utils.embeddings import cosine_similarity
+from .e2e import _git_commit
+
+DIMENSIONS = (1024, 1536, 3072)
+PERSONAS = (90, 1000, 10_000)
+QUESTIONS = (1, 5, 20)
+FILTERS = ["age>=30", "gender=F and region in [North,South]"]
+REGIONS = ["North", "South", "East", "West"]
+INCOMES = ["low", "medium", "high"]
+
+
+@dataclass
+class Case:
+    """One benchmarked operation at one size."""
+
+    name: str
+    params: dict[str, int]
+    op: Callable[[], Any]
+
+    @property
+    def key(self) -> str:
+        """Name and sizes, e.g. "scoring.metrics[personas=90,questions=5]"."""
+        sizes = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{sizes}]"
+
+
+def _run_sync(coro: Coroutine) -> Any:
+    """Run a coroutine that never suspends, without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("Coroutine suspended; the benchmark expects cached inputs")
+
+
+def _unit_vectors(rng: np.random.Generator, count: int, dimensions: int) -> list[list[float]]:
+    vectors = rng.standard_normal((count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).tolist()
+
+
+def _questions(count: int) -> list[Question]:
+    return [
+        Question(
+            id=f"q{i + 1}",
+            text=f"Question {i + 1}?",
+            weight=1 / count,
+            ssr_reference_sets=[["a", "b", "c", "d", "e"]] * 6,
+        )
+        for i in range(count)
+    ]
+
+
+def _personas(rng: np.random.Generator, count: int) -> list[dict[str, Any]]:
+    ages = rng.integers(18, 80, count)
+    genders = rng.choice(["F", "M"], count)
+    regions = rng.choice(REGIONS, count)
+    incomes = rng.choice(INCOMES, count)
+    return [
+        {
+            "persona_id": f"p{i}",
+            "age": int(ages[i]),
+            "gender": str(genders[i]),
+            "region": str(regions[i]),
+            "income": str(incomes[i]),
+        }
+        for i in range(count)
+    ]
+
+
+def _responses(
+    rng: np.random.Generator, personas: list[dict[str, Any]], questions: list[Question]
+) -> list[dict[str, Any]]:
+    pmfs = rng.dirichlet(np.ones(5), (len(personas), len(questions))).astype(np.float32)
+    means = pmfs @ np.arange(1, 6, dtype=np.float32)
+    return [
+        {
+            "persona_id": persona["persona_id"],
+            "responses": {
+                q.id: {
+                    "raw_text": "I would probably buy this. It looks useful.",
+                    "pmf": pmfs[i, j],
+                    "mean": float(means[i, j]),
+                }
+                for j, q in enumerate(questions)
+            },
+        }
+        for i, persona in enumerate(personas)
+    ]
+
+
+def build_cases(quick: bool = False) -> Iterator[Case]:
+    """
+    Build the benchmark cases (inputs are generated once per case).
+
+    Args:
+        quick: Only the smallest sizes (for smoke runs)
+    """
+    rng = np.random.default_rng(0)
+    dimensions = DIMENSIONS[:1] if quick else DIMENSIONS
+    personas_sizes = PERSONAS[:1] if quick else PERSONAS
+    question_sizes = QUESTIONS[:2] if quick else QUESTIONS
+
+    for dims in dimensions:
+        response, anchor = _unit_vectors(rng, 2, dims)
+        yield Case(
+            "cosine_similarity",
+            {"dims": dims},
+            lambda r=response, a=anchor: cosine_similarity(r, a),
+        )
+
+    for dims in dimensions:
+        engine = SSREngine(llm_service=None)
+        anchors = ["a", "b", "c", "d", "e"]
+        engine._anchor_cache[tuple(anchors)] = _unit_vectors(rng, 5, dims)
+        response = _unit_vectors(rng, 1, dims)[0]
+        yield Case(
+            "ssr.pmf_for_set",
+            {"dims": dims},
+            lambda e=engine, r=response, a=anchors: _run_sync(e._compute_pmf_for_set(r, a)),
+        )
+
+    scoring = ScoringEngine()
+    for n in personas_sizes:
+        personas = _personas(rng, n)
+        for q in question_sizes:
+            questions = _questions(q)
+            responses = _responses(rng, personas, questions)
+            flags = [True] * n
+            yield Case(
+                "scoring.metrics",
+                {"personas": n, "questions": q},
+                lambda r=responses, qs=questions, f=flags: scoring.calculate_metrics(r, qs, f),
+            )
+
+            means = scoring.response_means(responses, questions)
+            metrics = scoring.metrics_from_means(means, questions)
+            composite, _ = scoring.calculate_composite_score(metrics, questions)
+            result = scoring.evaluate_threshold(composite, 0.6)
+            yield Case(
+                "scoring.bootstrap",
+                {"personas": n, "questions": q},
+                lambda m=means, qs=questions, mt=metrics, rs=result: (
+                    scoring.add_confidence_intervals(m, qs, mt, rs)
+                ),
+            )
+
+    filter_engine = FilterEngine()
+    for n in personas_sizes:
+        personas = _personas(rng, n)
+        yield Case(
+            "filter.apply",
+            {"personas": n},
+            lambda p=personas: filter_engine.apply_filters(p, FILTERS),
+        )
+
+    report_generator = ReportGenerator()
+    concept = Concept(name="Widget", content=[ContentItem(type="text", data="A widget.")])
+    for n in personas_sizes[:2]:
+        personas = _personas(rng, n)
+        for q in question_sizes:
+            questions = _questions(q)
+            responses = _responses(rng, personas, questions)
+            metrics = scoring.calculate_metrics(responses, questions, [True] * n)
+            composite, breakdown = scoring.calculate_composite_score(metrics, questions)
+            report_args = {
+                "result": scoring.evaluate_threshold(composite, 0.6),
+                "concept_name": concept.name,
+                "personas_total": n,
+                "personas_matched": n,
+                "criteria_breakdown": breakdown,
+                "metrics": metrics,
+                "meta": Meta(request_id="bench", concept_name=concept.name, processing_time_ms=0),
+                "dataset": build_dataset_rows(personas, responses, [True] * n, questions),
+                "questions": questions,
+                "concept": concept,
+            }
+            yield Case(
+                "report.generate",
+                {"personas": n, "questions": q},
+                lambda kw=report_args: report_generator.generate_report(**kw),
+            )
+
+
+def measure(case: Case, min_time: float = 0.2, repeats: int = 5) -> dict[str, Any]:
+    """
+    Time an operation and measure its allocations.
+
+    The loop size is grown until one repeat takes at least min_time; the best
+    repeat gives ops/sec. Peak allocation is measured on one separate call.
+
+    Args:
+        case: Operation to measure
+        min_time: Minimum seconds per repeat
+        repeats: Timed repeats
+
+    Returns:
+        ops_per_sec, mean_us and peak_alloc_kb of the case
+    """
+    case.op()  # warm up caches and lazy imports
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.op()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        case.op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ops_per_sec": round(loops / best, 1),
+        "mean_us": round(best / loops * 1e6, 2),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m sage.bench.micro",
+        description="Micro-benchmarks for SSR, scoring, filtering and report generation.",
+    )
+    parser.add_argument("--select", default="", help="only cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="only the smallest sizes")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="JSON results of a baseline run")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        saved = json.loads(args.compare.read_text())
+        baseline = {row["case"]: row for row in saved["results"]}
+
+    results = []
+    print(f"{'case':<52} {'ops/sec':>12} {'mean us':>12} {'peak KB':>10}")
+    for case in build_cases(args.quick):
+        if args.select not in case.name:
+            continue
+        row = {"case": case.key, "name": case.name, "params": case.params}
+        row.update(measure(case, args.min_time, args.repeats))
+        results.append(row)
+
+        line = (
+            f"{case.key:<52} {row['ops_per_sec']:>12,.1f} {row['mean_us']:>12,.2f} "
+            f"{row['peak_alloc_kb']:>10,.1f}"
+        )
+        old = baseline.get(case.key)
+        if old:
+            line += f"  ({row['ops_per_sec'] / old['ops_per_sec'] - 1:+.1%} ops/sec)"
+        print(line, flush=True)
+
+    if args.output:
+        report = {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "results": results,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
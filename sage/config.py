@@ -30,7 +30,7 @@ class Settings(BaseSettings):
     ]
 
     # Authentication (both empty = auth disabled)
-    api_keys: str = os.getenv("SAGE_API_KEYS", "")        # Inline JSON: {"key": "client-name"}
+    api_keys: str = os.getenv("SAGE_API_KEYS", "")  # Inline JSON: {"key": "client-name"}
     api_keys_file: str = os.getenv("SAGE_API_KEYS_FILE", "")  # Path to JSON keys file
 
     # Default LLM Settings
@@ -41,19 +41,115 @@ class Settings(BaseSettings):
     default_vision_provider: str = os.getenv("DEFAULT_VISION_PROVIDER", "openai")
     default_vision_model: str = os.getenv("DEFAULT_VISION_MODEL", "gpt-4o")
     default_video_provider: str = os.getenv("DEFAULT_VIDEO_PROVIDER", "bedrock")
-    default_video_model: str = os.getenv(
-        "DEFAULT_VIDEO_MODEL", "eu.twelvelabs.pegasus-1-2-v1:0"
-    )
+    default_video_model: str = os.getenv("DEFAULT_VIDEO_MODEL", "eu.twelvelabs.pegasus-1-2-v1:0")
     default_temperature: float = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
 
+    # Video Analysis
+    # "direct": every persona x question sends the video to Pegasus.
+    # "describe": Pegasus describes each video once (cached), then persona prompts
+    # run on the text generation provider against that description.
+    video_analysis_mode: str = os.getenv("VIDEO_ANALYSIS_MODE", "direct")
+    video_description_cache_size: int = int(os.getenv("VIDEO_DESCRIPTION_CACHE_SIZE", "64"))
+
+    # Image Preprocessing (requires Pillow: pip install sage[images])
+    # Resize concept images to the vision model's effective resolution and recompress.
+    image_preprocessing: bool = os.getenv("IMAGE_PREPROCESSING", "false").lower() == "true"
+    image_max_edge: int = int(os.getenv("IMAGE_MAX_EDGE", "0"))  # 0 = model family default
+    image_quality: int = int(os.getenv("IMAGE_QUALITY", "85"))
+    image_cache_size: int = int(os.getenv("IMAGE_CACHE_SIZE", "128"))
+
+    # Prompt Caching
+    # Mark the concept prefix as cacheable (Anthropic cache_control on Bedrock,
+    # prompt_cache_key on OpenAI). The first question of each persona runs
+    # before the rest so the remaining questions can read the cached prefix.
+    prompt_caching: bool = os.getenv("PROMPT_CACHING", "false").lower() == "true"
+
+    # Question Mode
+    # per_question   = one generation call per persona x question
+    # multi_question = one call per persona answering every question as JSON,
+    #                  with per-question calls for any answer that fails to parse
+    question_mode: str = os.getenv("QUESTION_MODE", "per_question")
+    # Completions drawn per persona x question; SSR averages their PMFs
+    samples_per_persona: int = int(os.getenv("SAMPLES_PER_PERSONA", "1"))
+
+    # Response Cache
+    # "" = disabled, "memory" = in-process LRU, "sqlite" = on-disk database.
+    # Caches generated responses and response embeddings across requests.
+    response_cache: str = os.getenv("RESPONSE_CACHE", "")
+    response_cache_path: str = os.getenv("RESPONSE_CACHE_PATH", ".sage_cache.sqlite3")
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "50000"))  # memory backend
+    response_cache_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL", "604800"))  # 0 = no expiry
+    response_cache_policy: str = os.getenv("RESPONSE_CACHE_POLICY", "use")
+
+    # Execution Mode
+    # sync  = generation calls are made as the request runs
+    # batch = all prompts are submitted as one offline batch job and polled
+    execution_mode: str = os.getenv("EXECUTION_MODE", "sync")
+    batch_backend: str = os.getenv("BATCH_BACKEND", "")  # "" = the model's provider; "local" = stub
+    batch_s3_uri: str = os.getenv("BATCH_S3_URI", "")  # s3://bucket/prefix for Bedrock jobs
+    batch_role_arn: str = os.getenv("BATCH_ROLE_ARN", "")  # Bedrock batch service role
+    batch_local_dir: str = os.getenv("BATCH_LOCAL_DIR", "")  # "" = system temp dir
+    batch_poll_interval: float = float(os.getenv("BATCH_POLL_INTERVAL", "60"))
+    batch_timeout: float = float(os.getenv("BATCH_TIMEOUT", "86400"))
+
+    # Result Store
+    # Completed runs are written off the request path for re-scoring and lookup.
+    # "sqlite" = on-disk database, "memory" = in-process LRU, "" = disabled
+    result_store: str = os.getenv("RESULT_STORE", "sqlite")
+    result_store_path: str = os.getenv("RESULT_STORE_PATH", ".sage_results.sqlite3")
+    result_store_size: int = int(os.getenv("RESULT_STORE_SIZE", "100"))  # memory backend
+    # sqlite retention, enforced by the writer thread (0 = keep forever)
+    result_store_max_age_days: float = float(os.getenv("RESULT_STORE_MAX_AGE_DAYS", "30"))
+    result_store_max_runs: int = int(os.getenv("RESULT_STORE_MAX_RUNS", "10000"))
+
+    # Media Store
+    # Content-addressed uploads referenced as media://<sha256> in concepts.
+    # "local" = bounded directory on disk, "s3" = objects under an S3 prefix, "" = disabled
+    media_store: str = os.getenv("MEDIA_STORE", "local")
+    media_store_dir: str = os.getenv("MEDIA_STORE_DIR", ".sage_media")
+    media_store_max_bytes: int = int(os.getenv("MEDIA_STORE_MAX_BYTES", str(2 * 1024**3)))
+    media_store_s3_uri: str = os.getenv("MEDIA_STORE_S3_URI", "")  # s3://bucket/prefix
+
+    # Persona Panels
+    # Panels uploaded once with POST /panels and referenced by panel_id.
+    # "sqlite" = on-disk database, "memory" = in-process only, "" = disabled
+    panel_store: str = os.getenv("PANEL_STORE", "sqlite")
+    panel_store_path: str = os.getenv("PANEL_STORE_PATH", ".sage_panels.sqlite3")
+    panel_cache_size: int = int(os.getenv("PANEL_CACHE_SIZE", "8"))  # indexed panels in memory
+    panel_max_personas: int = int(os.getenv("PANEL_MAX_PERSONAS", "1000000"))
+    # Personas generated per run (inline personas, or panel personas left after filtering)
+    max_personas: int = int(os.getenv("MAX_PERSONAS", "500"))
+
+    # Response Encoding
+    # Compress JSON responses (brotli or gzip, as the client accepts) at or above this size
+    response_compression: bool = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+    response_compression_min_bytes: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
     # SSR Configuration
     # Temperature for PMF sharpening: p(r,T) ∝ p(r)^(1/T)
     # Paper uses T=1 (no sharpening). Lower T = sharper distribution.
     ssr_softmax_temperature: float = float(os.getenv("SSR_SOFTMAX_TEMPERATURE", "1.0"))
 
+    # Scoring
+    # Bootstrap resamples for confidence intervals and pass probability (0 = disabled)
+    bootstrap_resamples: int = int(os.getenv("BOOTSTRAP_RESAMPLES", "2000"))
+    confidence_level: float = float(os.getenv("CONFIDENCE_LEVEL", "0.95"))
+
+    # Fake Providers (provider "fake": offline, deterministic, no API calls)
+    # Call latency is lognormal with the given median and shape (sigma 0 = constant)
+    fake_latency_ms: float = float(os.getenv("FAKE_LATENCY_MS", "0"))
+    fake_embedding_latency_ms: float = float(os.getenv("FAKE_EMBEDDING_LATENCY_MS", "0"))
+    fake_latency_sigma: float = float(os.getenv("FAKE_LATENCY_SIGMA", "0.5"))
+    fake_error_rate: float = float(os.getenv("FAKE_ERROR_RATE", "0"))  # fraction of calls
+    fake_throttle_rate: float = float(os.getenv("FAKE_THROTTLE_RATE", "0"))  # fraction of calls
+    fake_embedding_dimensions: int = int(os.getenv("FAKE_EMBEDDING_DIMENSIONS", "256"))
+    fake_seed: int = int(os.getenv("FAKE_SEED", "0"))  # seeds latency and failure draws
+
     # Processing Configuration
     batch_size: int = int(os.getenv("BATCH_SIZE", "10"))
     concurrency_limit: int = int(os.getenv("CONCURRENCY_LIMIT", "20"))
+    # Per-stage timing of each run in meta.timings and the logs
+    stage_timings: bool = os.getenv("STAGE_TIMINGS", "true").lower() == "true"
     max_tokens: int = 500  # Max tokens for LLM responses
 
     class Config:
@@ -142,4 +238,11 @@ SUPPORTED_MODELS = {
             "eu.twelvelabs.pegasus-1-2-v1:0",
         ],
     },
+    # Offline providers for load testing (see sage/services/fake_provider.py)
+    "fake": {
+        "generation": ["fake-chat"],
+        "embedding": ["fake-embedding"],
+        "vision": ["fake-vision"],
+        "video": ["fake-video"],
+    },
 }
@@ -19,3 +19,18 @@ class ValidationError(SageError):
 
 class ConfigurationError(SageError):
     """Raised for misconfiguration errors (maps to HTTP 500)."""
+
+
+class NotFoundError(SageError):
+    """Raised when a referenced resource does not exist (maps to HTTP 404)."""
+
+
+class FilterSyntaxError(ValidationError, ValueError):
+    """Raised when a filter expression cannot be compiled (maps to HTTP 400)."""
+
+    def __init__(self, expression: str, position: int, message: str):
+        self.expression = expression
+        self.position = position
+        super().__init__(
+            f"Invalid filter expression {expression!r}: {message} at position {position}"
+        )
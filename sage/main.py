@@ -6,15 +6,34 @@ Based on the methodology from "LLMs Reproduce Human Purchase Intent via Semantic
 Elicitation of Likert Ratings" (Maier et al., 2025).
 """
 
+import asyncio
+import base64
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.utils import get_openapi
+from pydantic import ValidationError as PydanticValidationError
 
 from .auth import get_api_keys, verify_api_key
 from .config import SUPPORTED_MODELS, get_settings
-from .exceptions import ConfigurationError, ProviderError, ValidationError
+from .exceptions import ConfigurationError, NotFoundError, ProviderError, ValidationError
+from .models.request import (
+    MAX_TEXT_LENGTH,
+    PANEL_ID_PATTERN,
+    RescoreRequest,
+    TestConceptRequest,
+)
+from .models.response import FullResponse, MediaInfo, MinimalResponse, PanelInfo, RunSummary
+from .services.dataset_export import FILE_EXTENSIONS, MEDIA_TYPES, encode_dataset
+from .services.orchestrator import Orchestrator
+from .services.panel_store import parse_panel, validate_panel
+from .services.prepared_concept import detect_image_media_type
+from .utils.serialization import compress, serialize_response
+from .utils.timing import stage
 
 # Configure logging - set up sage loggers explicitly so they work alongside uvicorn
 _log_formatter = logging.Formatter(
@@ -29,15 +48,41 @@ _sage_logger.setLevel(logging.INFO)
 _sage_logger.addHandler(_log_handler)
 logger = logging.getLogger(__name__)
 
-from .models.request import TestConceptRequest
-from .models.response import FullResponse, MinimalResponse
-from .services.orchestrator import Orchestrator
+# Largest media part accepted by /test-concept/multipart and /media
+MAX_MEDIA_PART_BYTES = 100 * 1024 * 1024
+
+# Largest panel upload accepted by /panels, and the formats by Content-Type
+MAX_PANEL_BYTES = 512 * 1024 * 1024
+PANEL_CONTENT_TYPES = {
+    "application/json": "json",
+    "text/csv": "csv",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+}
 
 # Initialize settings and orchestrator
 settings = get_settings()
 orchestrator = Orchestrator()
 
 
+def _json_response(result: FullResponse | MinimalResponse, http_request: Request) -> Response:
+    """Encode a pre-validated response, compressing it if the client accepts it."""
+    body = serialize_response(result)  # timed in meta.serialization_ms
+    headers = {}
+    if settings.response_compression:
+        # Runs after meta is encoded, so only an enclosing timer (the benchmark's) sees it
+        with stage("compress"):
+            body, encoding = compress(
+                body,
+                http_request.headers.get("accept-encoding", ""),
+                settings.response_compression_min_bytes,
+            )
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
@@ -91,6 +136,29 @@ This API simulates how real consumers would respond to product concepts by:
     lifespan=lifespan,
 )
 
+
+def _openapi() -> dict:
+    """OpenAPI schema including request models parsed from the raw body."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes,
+    )
+    components = schema.setdefault("components", {}).setdefault("schemas", {})
+    request_schema = TestConceptRequest.model_json_schema(
+        ref_template="#/components/schemas/{model}"
+    )
+    components.update(request_schema.pop("$defs", {}))
+    components["TestConceptRequest"] = request_schema
+    app.openapi_schema = schema
+    return schema
+
+
+app.openapi = _openapi
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -101,6 +169,56 @@ app.add_middleware(
 )
 
 
+def _parse_concept_request(body: bytes | str) -> TestConceptRequest:
+    """
+    Validate a TestConceptRequest straight from raw JSON in one pass.
+
+    Parsing and validation both happen in pydantic-core, so the (possibly
+    multi-megabyte) body is never materialised as intermediate Python dicts.
+
+    Raises:
+        RequestValidationError: If the body is not a valid request (HTTP 422)
+    """
+    try:
+        return TestConceptRequest.model_validate_json(body)
+    except PydanticValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
+
+async def _run_concept_test(
+    request: TestConceptRequest,
+    http_request: Request,
+    client_name: str | None,
+) -> Response:
+    """Run a concept test and map domain errors to HTTP errors."""
+    try:
+        logger.info("Client: %s | Processing concept: %s", client_name, request.concept.name)
+        result = await orchestrator.process_request(request, client=client_name)
+        return _json_response(result, http_request)
+    except ProviderError as e:
+        logger.exception("Provider error during concept test")
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "error_type": "provider_error",
+                "provider": e.provider,
+                "message": str(e),
+            },
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConfigurationError as e:
+        logger.exception("Configuration error during concept test")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("Unexpected error during concept test")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @app.post(
     "/test-concept",
     response_model=FullResponse | MinimalResponse,
@@ -117,45 +235,447 @@ Test a product concept with synthetic consumer personas.
 
 **Returns PASS/FAIL based on composite score vs threshold.**
     """,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/TestConceptRequest"}}
+            },
+        }
+    },
 )
 async def test_concept(
-    request: TestConceptRequest,
+    http_request: Request,
     client_name: str | None = Depends(verify_api_key),
-) -> FullResponse | MinimalResponse:
+) -> Response:
     """
     Test a product concept with synthetic consumer personas.
 
     Args:
-        request: TestConceptRequest with personas, concept, and configuration
+        http_request: Request whose JSON body is a TestConceptRequest
+
+    Returns:
+        FullResponse if verbose=true, MinimalResponse otherwise
+    """
+    body = await http_request.body()
+    with stage("parse"):
+        request = _parse_concept_request(body)
+    return await _run_concept_test(request, http_request, client_name)
+
+
+@app.post(
+    "/test-concept/multipart",
+    response_model=FullResponse | MinimalResponse,
+    summary="Test a product concept with binary media parts",
+    description="""
+Same as `/test-concept`, but media is uploaded as binary multipart parts
+instead of base64 JSON strings (about 25% smaller uploads, no base64 decoding).
+
+**Form fields:**
+- `request`: the TestConceptRequest JSON. Content items reference a part with
+  `"data": "part:<field name>"`
+- one file field per referenced part (images, videos or UTF-8 text)
+
+Requires python-multipart on the server.
+    """,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["request"],
+                        "properties": {"request": {"type": "string"}},
+                        "additionalProperties": {"type": "string", "format": "binary"},
+                    }
+                }
+            },
+        }
+    },
+)
+async def test_concept_multipart(
+    http_request: Request,
+    client_name: str | None = Depends(verify_api_key),
+) -> Response:
+    """
+    Test a product concept whose media is uploaded as multipart parts.
+
+    Args:
+        http_request: multipart/form-data request with a "request" JSON field and media parts
 
     Returns:
         FullResponse if verbose=true, MinimalResponse otherwise
     """
     try:
-        logger.info("Client: %s | Processing concept: %s", client_name, request.concept.name)
-        result = await orchestrator.process_request(request)
-        # Thread client identity into response meta
-        if hasattr(result, "meta") and result.meta is not None:
-            result.meta.client = client_name
-        return result
-    except ProviderError as e:
-        logger.exception("Provider error during concept test")
+        form = await http_request.form(max_part_size=MAX_MEDIA_PART_BYTES)
+    except AssertionError as e:
+        # Starlette asserts python-multipart is installed when parsing forms
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        payload = form.get("request")
+        if payload is None:
+            raise HTTPException(status_code=400, detail='Missing "request" form field')
+        if not isinstance(payload, str):
+            payload = await payload.read()
+        request = _parse_concept_request(payload)
+
+        for item in request.concept.content:
+            name = item.part_name
+            if name is None:
+                continue
+            part = form.get(name)
+            if part is None or isinstance(part, str):
+                raise HTTPException(
+                    status_code=400, detail=f"Missing file part '{name}' for content item"
+                )
+            raw = await part.read()
+            if item.type == "image":
+                item.attach(raw)
+            elif item.type == "video":
+                item.data = base64.b64encode(raw).decode("ascii")
+            else:
+                try:
+                    item.data = raw.decode("utf-8")
+                except UnicodeDecodeError:
+                    raise HTTPException(
+                        status_code=400, detail=f"Text part '{name}' is not valid UTF-8"
+                    )
+                if len(item.data) > MAX_TEXT_LENGTH:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Text content exceeds maximum length of {MAX_TEXT_LENGTH}",
+                    )
+    finally:
+        await form.close()
+
+    return await _run_concept_test(request, http_request, client_name)
+
+
+@app.post(
+    "/rescore",
+    response_model=FullResponse,
+    summary="Re-score a completed run",
+    description="""
+Recompute metrics, composite score and pass/fail for a completed run with new
+weights, threshold or filters - no LLM or embedding calls are made.
+
+**Sources:**
+- `run_id`: the request id of a stored `/test-concept` run (see `GET /runs`)
+- `dataset`: the `dataset` returned by a run with `output_dataset=true`
+  (`weights` and `threshold` are then required)
+
+Filters can only narrow the personas that were generated for the run.
+    """,
+)
+async def rescore(
+    request: RescoreRequest,
+    http_request: Request,
+    client_name: str | None = Depends(verify_api_key),
+) -> Response:
+    """
+    Re-score a completed run without provider calls.
+
+    Args:
+        request: RescoreRequest with a run_id or dataset and new scoring inputs
+
+    Returns:
+        FullResponse for the re-scored run
+    """
+    try:
+        logger.info("Client: %s | Re-scoring: %s", client_name, request.run_id or "dataset")
+        result = await orchestrator.rescore(request, client=client_name)
+        return _json_response(result, http_request)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        logger.exception("Unexpected error during re-score")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@app.post(
+    "/media",
+    response_model=MediaInfo,
+    summary="Upload concept media",
+    description="""
+Store an image or video once and reference it from concepts as
+`{"type": "image", "data": "media://<sha256>"}`.
+
+The request body is the raw file (`Content-Type: image/*` or `video/*`).
+Media is content-addressed, so uploading the same file again is a no-op and
+returns the same hash.
+    """,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "image/*": {"schema": {"type": "string", "format": "binary"}},
+                "video/*": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def upload_media(
+    http_request: Request,
+    client_name: str | None = Depends(verify_api_key),
+) -> MediaInfo:
+    """Store uploaded media in the content-addressed media store."""
+    store = orchestrator.media_store
+    if store is None:
+        raise HTTPException(status_code=404, detail="Media store is disabled (MEDIA_STORE)")
+
+    declared = http_request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > MAX_MEDIA_PART_BYTES:
+        raise HTTPException(status_code=413, detail="Media exceeds the upload size limit")
+    raw = await http_request.body()
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty media upload")
+    if len(raw) > MAX_MEDIA_PART_BYTES:
+        raise HTTPException(status_code=413, detail="Media exceeds the upload size limit")
+
+    media_type = detect_image_media_type(raw)
+    if media_type is None and not http_request.headers.get("content-type", "").startswith("video/"):
         raise HTTPException(
-            status_code=502,
-            detail={
-                "error_type": "provider_error",
-                "provider": e.provider,
-                "message": str(e),
+            status_code=400,
+            detail="Unsupported media: expected JPEG, PNG, GIF or WebP image, or a video/* upload",
+        )
+
+    try:
+        sha256 = await asyncio.to_thread(store.put, raw)
+    except Exception:
+        logger.exception("Failed to store media")
+        raise HTTPException(status_code=500, detail="Failed to store media")
+    logger.info("Client: %s | Stored media %s (%d bytes)", client_name, sha256[:12], len(raw))
+    return MediaInfo(
+        sha256=sha256, uri=f"media://{sha256}", size_bytes=len(raw), media_type=media_type
+    )
+
+
+@app.get(
+    "/media/{sha256}",
+    response_model=MediaInfo,
+    summary="Check stored media",
+    description="Check whether media is stored before referencing it (404 if not).",
+)
+async def get_media(
+    sha256: str,
+    client_name: str | None = Depends(verify_api_key),
+) -> MediaInfo:
+    """Look up stored media by hash."""
+    store = orchestrator.media_store
+    raw = await asyncio.to_thread(store.get, sha256) if store is not None else None
+    if raw is None:
+        raise HTTPException(status_code=404, detail=f"Media not found: {sha256}")
+    return MediaInfo(
+        sha256=sha256,
+        uri=f"media://{sha256}",
+        size_bytes=len(raw),
+        media_type=detect_image_media_type(raw),
+    )
+
+
+@app.post(
+    "/panels",
+    response_model=PanelInfo,
+    summary="Upload a persona panel",
+    description="""
+Store a persona panel once and reference it from `/test-concept` with
+`"panel_id": "<panel_id>"` (latest version) or `"<panel_id>@<version>"`
+instead of sending `personas` inline. Request `filters` then select from the
+panel using its prebuilt attribute columns.
+
+The request body is the panel file, chosen by `Content-Type`:
+- `application/json`: a list of personas, or `{"personas": [...]}`
+- `text/csv`: a header row of attribute names, one persona per row
+- `application/vnd.apache.parquet`: one persona per row (requires pyarrow)
+
+Every persona needs a unique `persona_id`. Uploading to an existing
+`panel_id` creates a new version. When authentication is enabled panels are
+only visible to the client that uploaded them.
+    """,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+                "text/csv": {"schema": {"type": "string"}},
+                "application/vnd.apache.parquet": {
+                    "schema": {"type": "string", "format": "binary"}
+                },
             },
+        }
+    },
+)
+async def upload_panel(
+    http_request: Request,
+    panel_id: str = Query(pattern=PANEL_ID_PATTERN),
+    client_name: str | None = Depends(verify_api_key),
+) -> PanelInfo:
+    """Store an uploaded panel as the next version of panel_id."""
+    store = orchestrator.panel_store
+    if store is None:
+        raise HTTPException(status_code=404, detail="Panel store is disabled (PANEL_STORE)")
+
+    content_type = http_request.headers.get("content-type", "application/json")
+    fmt = PANEL_CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported panel Content-Type; expected one of {list(PANEL_CONTENT_TYPES)}",
         )
-    except (ValidationError, ValueError) as e:
+    declared = http_request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > MAX_PANEL_BYTES:
+        raise HTTPException(status_code=413, detail="Panel exceeds the upload size limit")
+    raw = await http_request.body()
+    if len(raw) > MAX_PANEL_BYTES:
+        raise HTTPException(status_code=413, detail="Panel exceeds the upload size limit")
+
+    try:
+        personas = await asyncio.to_thread(parse_panel, raw, fmt)
+        validate_panel(personas, settings.panel_max_personas)
+        panel = await asyncio.to_thread(store.save, panel_id, personas, client_name)
+    except ValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ConfigurationError as e:
-        logger.exception("Configuration error during concept test")
         raise HTTPException(status_code=500, detail=str(e))
-    except Exception:
-        logger.exception("Unexpected error during concept test")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    logger.info("Client: %s | Stored panel %s (%d personas)", client_name, panel.ref, panel.size)
+    return panel.info()
+
+
+@app.get(
+    "/panels",
+    response_model=list[PanelInfo],
+    summary="List persona panels",
+    description="List the latest version of every stored panel of the calling client.",
+)
+async def list_panels(
+    client_name: str | None = Depends(verify_api_key),
+) -> list[PanelInfo]:
+    """List stored panels."""
+    if orchestrator.panel_store is None:
+        return []
+    return orchestrator.panel_store.list_panels(client_name)
+
+
+@app.get(
+    "/panels/{panel_ref}",
+    response_model=PanelInfo,
+    summary="Get a persona panel",
+    description="Describe a stored panel by `<panel_id>` (latest) or `<panel_id>@<version>`.",
+)
+async def get_panel(
+    panel_ref: str,
+    client_name: str | None = Depends(verify_api_key),
+) -> PanelInfo:
+    """Describe a stored panel version."""
+    if orchestrator.panel_store is None:
+        raise HTTPException(status_code=404, detail="Panel store is disabled (PANEL_STORE)")
+    try:
+        panel = await asyncio.to_thread(orchestrator.get_panel, panel_ref, client_name)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return panel.info()
+
+
+@app.get(
+    "/runs",
+    response_model=list[RunSummary],
+    summary="List stored runs",
+    description="""
+List completed runs from the result store, newest first. Runs are indexed by
+concept name, client, generation model (`provider/model`) and completion time.
+When authentication is enabled only the calling client's runs are listed.
+    """,
+)
+async def list_runs(
+    concept_name: str | None = None,
+    client: str | None = None,
+    model: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    client_name: str | None = Depends(verify_api_key),
+) -> list[RunSummary]:
+    """List stored runs matching the index filters."""
+    if orchestrator.result_store is None:
+        return []
+    return await asyncio.to_thread(
+        orchestrator.result_store.list_runs,
+        concept_name=concept_name,
+        client=client_name if client_name is not None else client,
+        model=model,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None,
+        limit=limit,
+    )
+
+
+@app.get(
+    "/runs/{run_id}",
+    response_model=FullResponse,
+    summary="Get a stored run",
+    description="Get the result, metrics and meta of a completed run by its request id.",
+)
+async def get_run(
+    run_id: str,
+    client_name: str | None = Depends(verify_api_key),
+) -> FullResponse:
+    """Get a stored run."""
+    try:
+        run = await asyncio.to_thread(orchestrator.get_run, run_id, client_name)
+        return run.response
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get(
+    "/runs/{run_id}/dataset",
+    summary="Download a stored run's dataset",
+    description="""
+Download the per-persona dataset of a completed run.
+
+**Formats:**
+- `json`: list of row objects (as returned inline with `output_dataset=true`)
+- `arrow`: Arrow IPC stream with typed columns; PMFs are fixed-size float32[5] lists
+- `parquet`: Parquet file with the same schema (zstd compressed)
+- `ndjson`: one JSON row per line, gzip compressed (`Content-Encoding: gzip`)
+
+Arrow and Parquet require pyarrow on the server.
+    """,
+    response_class=Response,
+)
+async def get_run_dataset(
+    run_id: str,
+    format: str = Query(default="json", pattern="^(json|arrow|parquet|ndjson)$"),
+    client_name: str | None = Depends(verify_api_key),
+) -> Response:
+    """Encode a stored run's dataset in the requested format."""
+    try:
+        run = await asyncio.to_thread(orchestrator.get_run, run_id, client_name)
+        body = await asyncio.to_thread(
+            encode_dataset,
+            run.personas,
+            run.responses,
+            [True] * len(run.responses),
+            run.questions,
+            format,
+            include_generation_mode=run.response.meta.generation_modes is not None,
+            weights=run.weights,
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ConfigurationError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"Content-Disposition": f'attachment; filename="{run_id}.{FILE_EXTENSIONS[format]}"'}
+    if format == "ndjson":
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=MEDIA_TYPES[format], headers=headers)
 
 
 @app.get(
@@ -194,7 +714,10 @@ async def api_info(
         "version": "1.0.0",
         "description": "SAGE - Synthetic consumer survey responses using LLM + SSR",
         "methodology": "Semantic Similarity Rating (SSR)",
-        "paper": "LLMs Reproduce Human Purchase Intent via Semantic Similarity Elicitation of Likert Ratings",
+        "paper": (
+            "LLMs Reproduce Human Purchase Intent via Semantic Similarity "
+            "Elicitation of Likert Ratings"
+        ),
         "default_settings": {
             "generation_provider": settings.default_generation_provider,
             "generation_model": settings.default_generation_model,
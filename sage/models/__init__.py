@@ -1,18 +1,31 @@
 from .request import (
-    ContentItem,
     Concept,
+    ContentItem,
+    Options,
     Question,
+    RescoreRequest,
+    SamplingConfig,
     SurveyConfig,
-    Options,
     TestConceptRequest,
 )
 from .response import (
-    ResultSummary,
+    BatchJobInfo,
+    CallStats,
+    ConfidenceInterval,
     CriteriaBreakdown,
-    QuestionMetrics,
+    FullResponse,
+    ImagePreprocessingInfo,
+    MediaInfo,
     Meta,
     MinimalResponse,
-    FullResponse,
+    PanelInfo,
+    QuestionMetrics,
+    ResponseCacheInfo,
+    ResultSummary,
+    RunSummary,
+    SamplingInfo,
+    StratumInfo,
+    TokenUsage,
 )
 
 __all__ = [
@@ -22,10 +35,23 @@ __all__ = [
     "SurveyConfig",
     "Options",
     "TestConceptRequest",
+    "RescoreRequest",
+    "SamplingConfig",
+    "ConfidenceInterval",
     "ResultSummary",
     "CriteriaBreakdown",
     "QuestionMetrics",
+    "CallStats",
+    "ImagePreprocessingInfo",
+    "TokenUsage",
+    "ResponseCacheInfo",
+    "BatchJobInfo",
+    "StratumInfo",
+    "SamplingInfo",
     "Meta",
     "MinimalResponse",
     "FullResponse",
+    "RunSummary",
+    "MediaInfo",
+    "PanelInfo",
 ]
@@ -2,24 +2,59 @@
 
 from typing import Any
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 
 from ..config import SUPPORTED_MODELS, get_settings
 
-
-MAX_PERSONAS = 500
 MAX_QUESTIONS = 20
 MAX_CONTENT_ITEMS = 10
 MAX_TEXT_LENGTH = 50_000
+MAX_SAMPLES_PER_PERSONA = 10
+
+
+MULTIPART_PREFIX = "part:"
+MEDIA_PREFIX = "media://"
+
+# Panels uploaded with POST /panels are referenced as <panel_id> or <panel_id>@<version>
+PANEL_ID_PATTERN = r"^[A-Za-z0-9][\w.-]{0,63}$"
+PANEL_REF_PATTERN = r"^[A-Za-z0-9][\w.-]{0,63}(@[1-9][0-9]*)?$"
 
 
 class ContentItem(BaseModel):
     """Content item for a product concept (text or image)."""
 
     type: str  # "image", "text", or "video"
-    data: str  # base64 for image, string for text, URL/base64/S3 for video
+    # base64 for image, string for text, URL/base64/S3 for video,
+    # "part:<name>" (multipart upload) or "media://<sha256>" (POST /media)
+    data: str
     label: str | None = None
 
+    # Raw bytes of a media item uploaded as a multipart part (not serialised)
+    _raw: bytes | None = PrivateAttr(default=None)
+
+    @property
+    def raw(self) -> bytes | None:
+        """Raw media bytes if the item was uploaded as a binary part, else None."""
+        return self._raw
+
+    @property
+    def part_name(self) -> str | None:
+        """Multipart part this item references, or None for inline data."""
+        if self.data.startswith(MULTIPART_PREFIX):
+            return self.data[len(MULTIPART_PREFIX) :]
+        return None
+
+    @property
+    def media_ref(self) -> str | None:
+        """SHA-256 of the stored media this item references, or None."""
+        if self.data.startswith(MEDIA_PREFIX):
+            return self.data[len(MEDIA_PREFIX) :]
+        return None
+
+    def attach(self, raw: bytes) -> None:
+        """Attach the raw bytes of the multipart part or stored media this item references."""
+        self._raw = raw
+
     @field_validator("type")
     @classmethod
     def validate_type(cls, v: str) -> str:
@@ -100,9 +135,24 @@ class Options(BaseModel):
     """Configuration options for LLM providers and models."""
 
     # LLM Generation Settings
-    generation_provider: str = Field(default_factory=lambda: _settings().default_generation_provider)
+    generation_provider: str = Field(
+        default_factory=lambda: _settings().default_generation_provider
+    )
     generation_model: str = Field(default_factory=lambda: _settings().default_generation_model)
     generation_temperature: float = Field(default_factory=lambda: _settings().default_temperature)
+    prompt_caching: bool = Field(default_factory=lambda: _settings().prompt_caching)
+    question_mode: str = Field(default_factory=lambda: _settings().question_mode)
+    # Completions per persona x question; their PMFs are averaged per persona
+    samples_per_persona: int = Field(
+        default_factory=lambda: _settings().samples_per_persona, ge=1, le=MAX_SAMPLES_PER_PERSONA
+    )
+    # Seeds provider sampling where supported (OpenAI); random when sampling
+    # several completions without one. The seed used is returned in meta.
+    generation_seed: int | None = Field(default=None, ge=0)
+    execution_mode: str = Field(default_factory=lambda: _settings().execution_mode)
+    # use = read and write the response cache, refresh = regenerate and overwrite,
+    # bypass = neither (only applies when RESPONSE_CACHE is configured)
+    cache_policy: str = Field(default_factory=lambda: _settings().response_cache_policy)
 
     # Embedding Settings (for SSR)
     embedding_provider: str = Field(default_factory=lambda: _settings().default_embedding_provider)
@@ -111,19 +161,49 @@ class Options(BaseModel):
     # Vision Settings (for image processing)
     vision_provider: str = Field(default_factory=lambda: _settings().default_vision_provider)
     vision_model: str = Field(default_factory=lambda: _settings().default_vision_model)
+    image_preprocessing: bool = Field(default_factory=lambda: _settings().image_preprocessing)
 
     # Video Settings (for video processing via Twelve Labs Pegasus)
     video_provider: str = Field(default_factory=lambda: _settings().default_video_provider)
     video_model: str = Field(default_factory=lambda: _settings().default_video_model)
     s3_bucket_owner: str | None = None
+    video_analysis_mode: str = Field(default_factory=lambda: _settings().video_analysis_mode)
 
     @field_validator(
         "generation_provider", "embedding_provider", "vision_provider", "video_provider"
     )
     @classmethod
     def validate_provider(cls, v: str) -> str:
-        if v not in ("openai", "bedrock"):
-            raise ValueError('provider must be "openai" or "bedrock"')
+        if v not in ("openai", "bedrock", "fake"):
+            raise ValueError('provider must be "openai", "bedrock" or "fake"')
+        return v
+
+    @field_validator("video_analysis_mode")
+    @classmethod
+    def validate_video_analysis_mode(cls, v: str) -> str:
+        if v not in ("direct", "describe"):
+            raise ValueError('video_analysis_mode must be "direct" or "describe"')
+        return v
+
+    @field_validator("question_mode")
+    @classmethod
+    def validate_question_mode(cls, v: str) -> str:
+        if v not in ("per_question", "multi_question"):
+            raise ValueError('question_mode must be "per_question" or "multi_question"')
+        return v
+
+    @field_validator("execution_mode")
+    @classmethod
+    def validate_execution_mode(cls, v: str) -> str:
+        if v not in ("sync", "batch"):
+            raise ValueError('execution_mode must be "sync" or "batch"')
+        return v
+
+    @field_validator("cache_policy")
+    @classmethod
+    def validate_cache_policy(cls, v: str) -> str:
+        if v not in ("use", "refresh", "bypass"):
+            raise ValueError('cache_policy must be "use", "refresh" or "bypass"')
         return v
 
     @field_validator("generation_temperature")
@@ -164,30 +244,167 @@ class Options(BaseModel):
             raise ValueError("; ".join(errors))
         return self
 
+    @model_validator(mode="after")
+    def validate_samples(self) -> "Options":
+        if self.samples_per_persona > 1 and self.execution_mode == "batch":
+            raise ValueError('samples_per_persona > 1 is not supported with execution_mode "batch"')
+        return self
+
+
+class SamplingConfig(BaseModel):
+    """Draw a representative subset of the matched personas before generation."""
+
+    n: int = Field(ge=1)  # personas to sample
+    # stratified = proportional to the matched personas, quota = to the given shares,
+    # random = simple random sample
+    method: str = "stratified"
+    strata: list[str] = []  # attributes to stratify on, e.g. ["gender", "age", "country"]
+    # numeric attribute -> band edges, e.g. {"age": [18, 25, 35, 50, 65]} gives
+    # strata "<18", "18-25", "25-35", "35-50", "50-65" and "65+"
+    bands: dict[str, list[float]] = {}
+    # attribute -> value (or band label) -> target share (method="quota")
+    quotas: dict[str, dict[str, float]] = {}
+    seed: int | None = None  # random if omitted; the seed used is returned in meta
+
+    @field_validator("method")
+    @classmethod
+    def validate_method(cls, v: str) -> str:
+        if v not in ("stratified", "quota", "random"):
+            raise ValueError('method must be "stratified", "quota" or "random"')
+        return v
+
+    @field_validator("bands")
+    @classmethod
+    def validate_bands(cls, v: dict[str, list[float]]) -> dict[str, list[float]]:
+        for attribute, edges in v.items():
+            if not edges or any(a >= b for a, b in zip(edges, edges[1:])):
+                raise ValueError(f"Band edges for {attribute} must be strictly increasing")
+        return v
+
+    @field_validator("quotas")
+    @classmethod
+    def validate_quotas(cls, v: dict[str, dict[str, float]]) -> dict[str, dict[str, float]]:
+        for attribute, shares in v.items():
+            if not shares or any(share < 0 for share in shares.values()):
+                raise ValueError(f"Quota shares for {attribute} must be non-negative")
+            total = sum(shares.values())
+            if not (0.99 <= total <= 1.01):
+                raise ValueError(f"Quota shares for {attribute} must sum to 1.0, got {total}")
+        return v
+
+    @model_validator(mode="after")
+    def validate_strata(self) -> "SamplingConfig":
+        if self.method != "random" and not self.strata:
+            raise ValueError(f"{self.method} sampling requires strata")
+        if self.method == "quota" and not self.quotas:
+            raise ValueError("quota sampling requires quotas")
+        if self.method != "quota" and self.quotas:
+            raise ValueError('quotas are only used with method "quota"')
+        for attribute in (*self.bands, *self.quotas):
+            if attribute not in self.strata:
+                raise ValueError(f"{attribute} is not one of the strata")
+        return self
+
 
 class TestConceptRequest(BaseModel):
     """Request model for testing a product concept."""
 
-    personas: list[dict[str, Any]]  # Flexible schema, only persona_id required
+    personas: list[dict[str, Any]] = []  # Flexible schema, only persona_id required
+    panel_id: str | None = Field(default=None, pattern=PANEL_REF_PATTERN)  # or a stored panel
     concept: Concept
     survey_config: SurveyConfig
     threshold: float = Field(ge=0, le=1)
     filters: list[str] = []
+    sampling: SamplingConfig | None = None  # sample the matched personas before generation
     verbose: bool = True
     output_dataset: bool = False
+    output_format: str = "json"  # json (inline) | arrow | parquet | ndjson (via dataset_url)
     include_report: bool = False
     options: Options = Options()
 
+    @field_validator("output_format")
+    @classmethod
+    def validate_output_format(cls, v: str) -> str:
+        if v not in ("json", "arrow", "parquet", "ndjson"):
+            raise ValueError('output_format must be "json", "arrow", "parquet", or "ndjson"')
+        return v
+
     @field_validator("personas")
     @classmethod
     def validate_personas(cls, v: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        if len(v) == 0:
+        max_personas = _settings().max_personas
+        if len(v) > max_personas:
+            raise ValueError(f"Maximum {max_personas} personas allowed")
+        # Single pass: no intermediate id list for large panels
+        seen: set = set()
+        for persona in v:
+            persona_id = persona.get("persona_id")
+            if persona_id is None:
+                raise ValueError("All personas must have a persona_id")
+            if persona_id in seen:
+                raise ValueError("All persona_ids must be unique")
+            seen.add(persona_id)
+        return v
+
+    @model_validator(mode="after")
+    def validate_persona_source(self) -> "TestConceptRequest":
+        if self.panel_id is not None and self.personas:
+            raise ValueError("Provide either personas or panel_id, not both")
+        if self.panel_id is None and not self.personas:
             raise ValueError("At least one persona is required")
-        if len(v) > MAX_PERSONAS:
-            raise ValueError(f"Maximum {MAX_PERSONAS} personas allowed")
-        ids = [p.get("persona_id") for p in v]
-        if None in ids:
-            raise ValueError("All personas must have a persona_id")
-        if len(ids) != len(set(ids)):
-            raise ValueError("All persona_ids must be unique")
+        return self
+
+
+class RescoreRequest(BaseModel):
+    """Request model for re-scoring a completed run without provider calls."""
+
+    run_id: str | None = None  # request_id of a stored run (see RESULT_STORE)
+    dataset: list[dict[str, Any]] | None = None  # or a dataset from output_dataset=true
+    weights: dict[str, float] | None = None  # question_id -> weight
+    threshold: float | None = Field(default=None, ge=0, le=1)
+    filters: list[str] = []
+    concept_name: str | None = None  # label for dataset re-scores
+    output_dataset: bool = False
+    include_report: bool = False
+
+    @field_validator("dataset")
+    @classmethod
+    def validate_dataset(cls, v: list[dict[str, Any]] | None) -> list[dict[str, Any]] | None:
+        if v is None:
+            return v
+        if len(v) == 0:
+            raise ValueError("At least one dataset row is required")
+        max_personas = _settings().max_personas
+        if len(v) > max_personas:
+            raise ValueError(f"Maximum {max_personas} dataset rows allowed")
+        if any("persona_id" not in row for row in v):
+            raise ValueError("All dataset rows must have a persona_id")
         return v
+
+    @field_validator("weights")
+    @classmethod
+    def validate_weights(cls, v: dict[str, float] | None) -> dict[str, float] | None:
+        if v is None:
+            return v
+        if len(v) == 0:
+            raise ValueError("At least one question weight is required")
+        if len(v) > MAX_QUESTIONS:
+            raise ValueError(f"Maximum {MAX_QUESTIONS} questions allowed")
+        for q_id, weight in v.items():
+            if weight < 0 or weight > 1:
+                raise ValueError(f"Weight for {q_id} must be between 0 and 1")
+        total_weight = sum(v.values())
+        if not (0.99 <= total_weight <= 1.01):
+            raise ValueError(f"Question weights must sum to 1.0, got {total_weight}")
+        return v
+
+    @model_validator(mode="after")
+    def validate_source(self) -> "RescoreRequest":
+        if (self.run_id is None) == (self.dataset is None):
+            raise ValueError("Exactly one of run_id or dataset is required")
+        if self.dataset is not None:
+            if self.weights is None:
+                raise ValueError("weights are required when re-scoring a dataset")
+            if self.threshold is None:
+                raise ValueError("threshold is required when re-scoring a dataset")
+        return self
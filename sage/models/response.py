@@ -1,10 +1,18 @@
 """Pydantic models for API response validation."""
 
+from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, Field
 
 
+class ConfidenceInterval(BaseModel):
+    """Bootstrap percentile confidence interval."""
+
+    lower: float
+    upper: float
+
+
 class ResultSummary(BaseModel):
     """Summary of the concept test result."""
 
@@ -13,6 +21,9 @@ class ResultSummary(BaseModel):
     threshold: float = Field(ge=0, le=1)
     margin: float
     reason: str
+    confidence_level: float | None = None  # level of the intervals below and in metrics
+    composite_ci: ConfidenceInterval | None = None
+    pass_probability: float | None = Field(default=None, ge=0, le=1)  # P(composite >= threshold)
 
 
 class CriteriaBreakdown(BaseModel):
@@ -34,7 +45,13 @@ class QuestionMetrics(BaseModel):
     std_dev: float = Field(ge=0)
     top_2_box: float = Field(ge=0, le=1)
     bottom_2_box: float = Field(ge=0, le=1)
-    distribution: dict[str, int]
+    distribution: dict[str, int | float]  # weighted counts (floats) for sampled runs
+    mean_ci: ConfidenceInterval | None = None
+    top_2_box_ci: ConfidenceInterval | None = None
+    # From the personas' full SSR distributions (absent when re-scoring datasets without PMFs)
+    aggregate_pmf: list[float] | None = None  # mean PMF over personas, ratings 1-5
+    expected_top_2_box: float | None = Field(default=None, ge=0, le=1)  # mass on ratings 4-5
+    entropy: float | None = Field(default=None, ge=0)  # of aggregate_pmf, in bits (max log2 5)
 
 
 class ProviderInfo(BaseModel):
@@ -46,6 +63,91 @@ class ProviderInfo(BaseModel):
     video: str | None = None
 
 
+class CallStats(BaseModel):
+    """Call count and latency for one generation route (text, vision, video...)."""
+
+    calls: int = Field(ge=0)
+    total_ms: int = Field(ge=0)
+    mean_ms: float = Field(ge=0)
+
+
+class StageTiming(BaseModel):
+    """Time spent in one pipeline stage of a run."""
+
+    calls: int = Field(ge=0)
+    total_ms: float = Field(ge=0)  # summed over calls, so concurrent calls can exceed wall time
+    p50_ms: float = Field(ge=0)
+    p95_ms: float = Field(ge=0)
+    max_ms: float = Field(ge=0)
+    queue_wait_ms: float | None = None  # total wait for a concurrency slot, when limited
+    queue_wait_p95_ms: float | None = None
+    retries: int | None = None  # provider-side retries, where the provider reports them
+
+
+class ImagePreprocessingInfo(BaseModel):
+    """Image downscaling/recompression savings for a run."""
+
+    family: str
+    images: int = Field(ge=0)
+    original_bytes: int = Field(ge=0)  # per call, all images, base64-encoded as sent
+    processed_bytes: int = Field(ge=0)  # per call, all images, base64-encoded as sent
+    vision_calls: int = Field(ge=0)
+    bytes_saved: int  # over all vision calls in the run
+    estimated_tokens_original: int = Field(ge=0)  # per call
+    estimated_tokens_processed: int = Field(ge=0)  # per call
+    estimated_tokens_saved: int  # over all vision calls in the run
+
+
+class TokenUsage(BaseModel):
+    """Token counts summed over a run's generation calls."""
+
+    calls: int = Field(ge=0)
+    input_tokens: int = Field(ge=0)  # uncached input tokens
+    output_tokens: int = Field(ge=0)
+    cache_read_input_tokens: int = Field(ge=0)
+    cache_write_input_tokens: int = Field(ge=0)
+
+
+class ResponseCacheInfo(BaseModel):
+    """Response cache lookups for a run."""
+
+    policy: str
+    hits: int = Field(ge=0)  # generations served from cache
+    misses: int = Field(ge=0)
+    embedding_hits: int = Field(ge=0)
+    embedding_misses: int = Field(ge=0)
+
+
+class BatchJobInfo(BaseModel):
+    """Batch job that produced a run's responses (execution_mode="batch")."""
+
+    backend: str
+    job_id: str
+    records: int = Field(ge=0)
+    failed_records: int = Field(ge=0)  # regenerated with synchronous calls
+
+
+class StratumInfo(BaseModel):
+    """One sampling stratum (a combination of stratification attribute values)."""
+
+    label: str  # e.g. "gender=F, age=25-35"
+    population: int = Field(ge=0)  # personas in the stratum after filtering
+    target_share: float = Field(ge=0, le=1)
+    sampled: int = Field(ge=0)
+    weight: float | None = None  # post-stratification weight of its sampled personas
+
+
+class SamplingInfo(BaseModel):
+    """Persona sample drawn between filtering and generation."""
+
+    method: str
+    seed: int
+    population: int = Field(ge=0)  # personas that matched the filters
+    sampled: int = Field(ge=0)
+    effective_sample_size: float = Field(ge=0)  # Kish: (sum w)^2 / sum w^2
+    strata: list[StratumInfo] | None = None
+
+
 class Meta(BaseModel):
     """Metadata about the request processing."""
 
@@ -54,6 +156,22 @@ class Meta(BaseModel):
     processing_time_ms: int = Field(ge=0)
     providers: ProviderInfo | None = None
     client: str | None = None
+    video_analysis_mode: str | None = None  # set when the concept contains a video
+    question_mode: str | None = None  # set when questions are answered in one call
+    generation_modes: dict[str, int] | None = None  # answers per generation mode
+    batch_job: BatchJobInfo | None = None
+    response_cache: ResponseCacheInfo | None = None
+    call_stats: dict[str, CallStats] | None = None
+    image_preprocessing: ImagePreprocessingInfo | None = None
+    token_usage: TokenUsage | None = None
+    rescored_from: str | None = None  # request_id of the run a re-score was computed from
+    panel: str | None = None  # <panel_id>@<version> the personas were drawn from
+    sampling: SamplingInfo | None = None
+    samples_per_persona: int | None = None  # set when several answers are sampled per question
+    generation_seed: int | None = None  # seed of the generation calls, when seeded
+    serialization_ms: float | None = None  # JSON encoding time of this response
+    response_bytes: int | None = None  # uncompressed JSON body size
+    timings: dict[str, StageTiming] | None = None  # per pipeline stage (STAGE_TIMINGS)
 
 
 class MinimalResponse(BaseModel):
@@ -74,5 +192,42 @@ class FullResponse(BaseModel):
     criteria_breakdown: list[CriteriaBreakdown]
     metrics: dict[str, QuestionMetrics]
     dataset: list[dict[str, Any]] | None = None  # if output_dataset=true
+    dataset_url: str | None = None  # if output_dataset=true with a columnar output_format
     report: str | None = None  # if include_report=true
     meta: Meta
+
+
+class RunSummary(BaseModel):
+    """Indexed summary of a stored run."""
+
+    request_id: str
+    concept_name: str
+    client: str | None = None
+    model: str | None = None  # generation provider/model
+    created_at: datetime
+    passed: bool
+    composite_score: float = Field(ge=0, le=1)
+    threshold: float = Field(ge=0, le=1)
+    personas_total: int
+    personas_matched: int
+
+
+class MediaInfo(BaseModel):
+    """Stored media referenced by concepts as media://<sha256>."""
+
+    sha256: str
+    uri: str  # media://<sha256>
+    size_bytes: int = Field(ge=0)
+    media_type: str | None = None  # detected for images
+
+
+class PanelInfo(BaseModel):
+    """A stored persona panel version referenced by panel_id."""
+
+    panel_id: str
+    version: int = Field(ge=1)
+    ref: str  # <panel_id>@<version>
+    personas: int = Field(ge=0)
+    attributes: list[str]
+    client: str | None = None
+    created_at: datetime
@@ -1,26 +1,42 @@
+from .batch_backend import (
+    BatchBackend,
+    BedrockBatchBackend,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+)
+from .bedrock_provider import (
+    BedrockEmbeddingProvider,
+    BedrockGenerationProvider,
+    BedrockVisionProvider,
+)
+from .filter_engine import FilterEngine
 from .llm_provider import (
-    ProviderType,
-    GenerationProvider,
     EmbeddingProvider,
-    VisionProvider,
+    GenerationProvider,
     ProviderFactory,
+    ProviderType,
+    VisionProvider,
 )
+from .llm_service import LLMService
+from .media_store import LocalMediaStore, MediaStore, S3MediaStore
 from .openai_provider import (
-    OpenAIGenerationProvider,
     OpenAIEmbeddingProvider,
+    OpenAIGenerationProvider,
     OpenAIVisionProvider,
 )
-from .bedrock_provider import (
-    BedrockGenerationProvider,
-    BedrockEmbeddingProvider,
-    BedrockVisionProvider,
+from .orchestrator import Orchestrator
+from .panel_store import MemoryPanelStore, Panel, PanelStore, SQLitePanelStore
+from .prepared_concept import PreparedConcept
+from .report_generator import ReportGenerator
+from .result_store import (
+    MemoryResultStore,
+    ResultStore,
+    SQLiteResultStore,
+    StoredRun,
 )
-from .llm_service import LLMService
-from .ssr_engine import SSREngine
-from .filter_engine import FilterEngine
+from .sampler import PersonaSampler
 from .scoring_engine import ScoringEngine
-from .report_generator import ReportGenerator
-from .orchestrator import Orchestrator
+from .ssr_engine import SSREngine
 
 __all__ = [
     "ProviderType",
@@ -34,10 +50,27 @@ __all__ = [
     "BedrockGenerationProvider",
     "BedrockEmbeddingProvider",
     "BedrockVisionProvider",
+    "PreparedConcept",
+    "BatchBackend",
+    "BedrockBatchBackend",
+    "LocalBatchBackend",
+    "OpenAIBatchBackend",
     "LLMService",
     "SSREngine",
     "FilterEngine",
+    "PersonaSampler",
     "ScoringEngine",
     "ReportGenerator",
+    "MediaStore",
+    "LocalMediaStore",
+    "S3MediaStore",
+    "Panel",
+    "PanelStore",
+    "MemoryPanelStore",
+    "SQLitePanelStore",
+    "ResultStore",
+    "MemoryResultStore",
+    "SQLiteResultStore",
+    "StoredRun",
     "Orchestrator",
 ]
@@ -0,0 +1,665 @@
+"""Offline batch execution backends for generation calls.
+
+Batch inference trades latency for throughput and price: every persona x
+question prompt of a run is written to one JSONL job, the job is submitted and
+polled until it finishes, and the outputs are mapped back to their records by
+custom_id. Results then go through SSR and scoring exactly as in sync mode.
+
+Backends:
+- bedrock: Bedrock batch inference (CreateModelInvocationJob) via S3
+- openai: OpenAI Batch API (chat completions, plus the SSR response embeddings
+  when the embedding model is also OpenAI)
+- local: simulates the job lifecycle on the filesystem, answering records with
+  the regular synchronous provider (for development and tests)
+"""
+
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from openai import APIError
+
+from ..config import get_settings
+from ..exceptions import ConfigurationError, ProviderError
+from .openai_provider import (
+    OpenAIEmbeddingProvider,
+    OpenAIGenerationProvider,
+    OpenAIVisionProvider,
+    _record_chat_usage_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchRecord:
+    """One generation request in a batch job."""
+
+    custom_id: str  # "<persona_id>/<question_id>", or "<persona_id>/*" for multi-question
+    system_prompt: str
+    user_prompt: str
+    cache_prefix: str | None = None
+    max_tokens: int = 500
+
+
+@dataclass
+class BatchResult:
+    """Outputs of a finished batch job."""
+
+    backend: str
+    job_id: str
+    outputs: dict[str, str] = field(default_factory=dict)  # custom_id -> response text
+    errors: dict[str, str] = field(default_factory=dict)  # custom_id -> error message
+
+
+class BatchBackend(ABC):
+    """Abstract base class for batch execution backends.
+
+    A backend runs every record against one provider (the text generation
+    provider, or the vision provider when the concept has images, in which
+    case the same image blocks are attached to every record).
+    """
+
+    name: str = ""
+
+    def __init__(
+        self,
+        provider: Any,
+        image_blocks: Sequence[dict] = (),
+        temperature: float = 0.7,
+        poll_interval: float | None = None,
+        timeout: float | None = None,
+        embedding_provider: Any = None,
+    ):
+        """
+        Initialize batch backend.
+
+        Args:
+            provider: GenerationProvider, or VisionProvider when image_blocks is set
+            image_blocks: Provider content blocks for the concept's images
+            temperature: Sampling temperature
+            poll_interval: Seconds between status checks (default from settings)
+            timeout: Seconds to wait for the job before giving up (default from settings)
+            embedding_provider: EmbeddingProvider used for SSR, for backends
+                                that can also batch the response embeddings
+        """
+        settings = get_settings()
+        self.provider = provider
+        self.embedding_provider = embedding_provider
+        self.image_blocks = tuple(image_blocks)
+        self.temperature = temperature
+        self.poll_interval = (
+            poll_interval if poll_interval is not None else settings.batch_poll_interval
+        )
+        self.timeout = timeout if timeout is not None else settings.batch_timeout
+
+    async def run(self, records: list[BatchRecord]) -> BatchResult:
+        """
+        Submit records as one job, wait for it to finish and collect the outputs.
+
+        Args:
+            records: Generation requests with unique custom_ids
+
+        Returns:
+            BatchResult with response text per custom_id and per-record errors
+
+        Raises:
+            ProviderError: If the job fails or does not finish within the timeout
+        """
+        job_id = await self.submit(records)
+        logger.info("Batch job %s submitted to %s (%d records)", job_id, self.name, len(records))
+        await self._wait(job_id)
+
+        result = await self.fetch_results(job_id, records)
+        logger.info(
+            "Batch job %s complete: %d outputs, %d errors",
+            job_id,
+            len(result.outputs),
+            len(result.errors),
+        )
+        return result
+
+    def supports_embeddings(self) -> bool:
+        """Whether embed() batches the SSR response embeddings."""
+        return False
+
+    async def embed(self, texts: dict[str, str]) -> dict[str, list[float]]:
+        """
+        Embed response texts as a batch job, if the backend supports it.
+
+        Args:
+            texts: Texts to embed keyed by custom_id
+
+        Returns:
+            Embeddings keyed by custom_id. Texts without an embedding (all of
+            them for backends without embedding support) are embedded
+            synchronously by SSR.
+        """
+        return {}
+
+    async def _wait(self, job_id: str, poll: Callable[[str], Awaitable[str]] | None = None) -> None:
+        """Poll a job until it completes, raising if it fails or times out."""
+        poll = poll or self.poll
+        deadline = time.monotonic() + self.timeout
+        while True:
+            status = await poll(job_id)
+            if status == "completed":
+                break
+            if status == "failed":
+                raise ProviderError(self.name, f"Batch job {job_id} failed")
+            if time.monotonic() > deadline:
+                await self.cancel(job_id)
+                raise ProviderError(
+                    self.name, f"Batch job {job_id} did not finish within {self.timeout:.0f}s"
+                )
+            logger.debug("Batch job %s: %s", job_id, status)
+            await asyncio.sleep(self.poll_interval)
+
+    @abstractmethod
+    async def submit(self, records: list[BatchRecord]) -> str:
+        """Upload the records and start a job. Returns the job id."""
+        pass
+
+    @abstractmethod
+    async def poll(self, job_id: str) -> str:
+        """Get job status: "in_progress", "completed" or "failed"."""
+        pass
+
+    @abstractmethod
+    async def fetch_results(self, job_id: str, records: list[BatchRecord]) -> BatchResult:
+        """Read the outputs of a completed job."""
+        pass
+
+    async def cancel(self, job_id: str) -> None:
+        """Stop a running job (best effort)."""
+        return None
+
+    def _request_body(self, record: BatchRecord) -> dict:
+        """Build a record's request body using the provider's own request format."""
+        if self.image_blocks:
+            return self.provider._build_request(
+                record.system_prompt,
+                record.user_prompt,
+                self.image_blocks,
+                self.temperature,
+                record.cache_prefix,
+                record.max_tokens,
+            )
+        return self.provider._build_request(
+            record.system_prompt,
+            record.user_prompt,
+            self.temperature,
+            record.cache_prefix,
+            record.max_tokens,
+        )
+
+
+class LocalBatchBackend(BatchBackend):
+    """Filesystem simulation of a batch job lifecycle.
+
+    Jobs move submitted -> in_progress -> completed on successive polls. When
+    a job completes, its records are answered with the synchronous provider
+    and written to an output JSONL next to the input.
+    """
+
+    name = "local"
+
+    def __init__(self, *args: Any, directory: str | None = None, **kwargs: Any):
+        """
+        Initialize local batch backend.
+
+        Args:
+            directory: Root directory for job files (default from settings, or
+                       a sage_batches directory under the system temp dir)
+        """
+        kwargs.setdefault("poll_interval", 0.0)
+        super().__init__(*args, **kwargs)
+        root = directory or get_settings().batch_local_dir
+        self.root = Path(root) if root else Path(tempfile.gettempdir()) / "sage_batches"
+
+    async def submit(self, records: list[BatchRecord]) -> str:
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        with open(job_dir / "input.jsonl", "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record.__dict__) + "\n")
+        self._write_status(job_id, "submitted")
+        return job_id
+
+    async def poll(self, job_id: str) -> str:
+        status = self._read_status(job_id)
+        if status == "submitted":
+            self._write_status(job_id, "in_progress")
+            return "in_progress"
+        if status == "in_progress":
+            try:
+                await self._execute(job_id)
+            except Exception:
+                logger.exception("Local batch job %s failed", job_id)
+                self._write_status(job_id, "failed")
+                return "failed"
+            self._write_status(job_id, "completed")
+            return "completed"
+        return status
+
+    async def fetch_results(self, job_id: str, records: list[BatchRecord]) -> BatchResult:
+        result = BatchResult(backend=self.name, job_id=job_id)
+        with open(self.root / job_id / "output.jsonl", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if "error" in row:
+                    result.errors[row["custom_id"]] = row["error"]
+                else:
+                    result.outputs[row["custom_id"]] = row["output"]
+        return result
+
+    async def _execute(self, job_id: str) -> None:
+        job_dir = self.root / job_id
+        with open(job_dir / "input.jsonl", encoding="utf-8") as f:
+            records = [BatchRecord(**json.loads(line)) for line in f]
+
+        async def _answer(record: BatchRecord) -> dict:
+            try:
+                if self.image_blocks:
+                    text = await self.provider.generate_with_images(
+                        system_prompt=record.system_prompt,
+                        user_prompt=record.user_prompt,
+                        images=[],
+                        temperature=self.temperature,
+                        image_blocks=self.image_blocks,
+                        cache_prefix=record.cache_prefix,
+                        max_tokens=record.max_tokens,
+                    )
+                else:
+                    text = await self.provider.generate(
+                        system_prompt=record.system_prompt,
+                        user_prompt=record.user_prompt,
+                        temperature=self.temperature,
+                        cache_prefix=record.cache_prefix,
+                        max_tokens=record.max_tokens,
+                    )
+            except ProviderError as e:
+                return {"custom_id": record.custom_id, "error": str(e)}
+            return {"custom_id": record.custom_id, "output": text}
+
+        rows = await asyncio.gather(*[_answer(r) for r in records])
+        with open(job_dir / "output.jsonl", "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    def _write_status(self, job_id: str, status: str) -> None:
+        (self.root / job_id / "status.json").write_text(json.dumps({"status": status}))
+
+    def _read_status(self, job_id: str) -> str:
+        return json.loads((self.root / job_id / "status.json").read_text())["status"]
+
+
+class BedrockBatchBackend(BatchBackend):
+    """Bedrock batch inference via CreateModelInvocationJob.
+
+    Records are written to S3 as JSONL in the model's native request format
+    (the same bodies the synchronous provider sends to InvokeModel). Bedrock
+    requires a service role with access to the bucket, and enforces a minimum
+    number of records per job (100 by default).
+    """
+
+    name = "bedrock"
+
+    # Bedrock job states mapped to backend statuses
+    _STATUS = {
+        "Completed": "completed",
+        "PartiallyCompleted": "completed",
+        "Failed": "failed",
+        "Stopped": "failed",
+        "Stopping": "failed",
+        "Expired": "failed",
+    }
+
+    def __init__(
+        self,
+        *args: Any,
+        s3_uri: str | None = None,
+        role_arn: str | None = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize Bedrock batch backend.
+
+        Args:
+            s3_uri: S3 prefix for job input and output (default BATCH_S3_URI)
+            role_arn: Service role Bedrock assumes to read/write S3 (default BATCH_ROLE_ARN)
+
+        Raises:
+            ConfigurationError: If the S3 prefix or role is not configured
+        """
+        super().__init__(*args, **kwargs)
+        import boto3
+
+        from .bedrock_provider import BedrockGenerationProvider, BedrockVisionProvider
+
+        if not isinstance(self.provider, (BedrockGenerationProvider, BedrockVisionProvider)):
+            raise ConfigurationError("Bedrock batch execution requires a Bedrock model")
+
+        settings = get_settings()
+        s3_uri = s3_uri or settings.batch_s3_uri
+        self.role_arn = role_arn or settings.batch_role_arn
+        if not s3_uri.startswith("s3://") or not self.role_arn:
+            raise ConfigurationError(
+                "Bedrock batch execution requires BATCH_S3_URI (s3://bucket/prefix) "
+                "and BATCH_ROLE_ARN"
+            )
+        bucket, _, prefix = s3_uri[len("s3://") :].partition("/")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.s3 = boto3.client("s3", region_name=settings.aws_region)
+        self.bedrock = boto3.client("bedrock", region_name=settings.aws_region)
+        # Bedrock recordIds are short alphanumeric strings: map them back per job
+        self._record_ids: dict[str, dict[str, str]] = {}
+        self._output_prefixes: dict[str, str] = {}
+
+    async def submit(self, records: list[BatchRecord]) -> str:
+        job_name = f"sage-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        base = f"{self.prefix}/{job_name}" if self.prefix else job_name
+
+        record_ids: dict[str, str] = {}
+        lines = []
+        for i, record in enumerate(records):
+            record_id = f"R{i:010d}"
+            record_ids[record_id] = record.custom_id
+            lines.append(
+                json.dumps({"recordId": record_id, "modelInput": self._request_body(record)})
+            )
+
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(
+                None,
+                partial(
+                    self.s3.put_object,
+                    Bucket=self.bucket,
+                    Key=f"{base}/input.jsonl",
+                    Body="\n".join(lines).encode("utf-8"),
+                ),
+            )
+            response = await loop.run_in_executor(
+                None,
+                partial(
+                    self.bedrock.create_model_invocation_job,
+                    jobName=job_name,
+                    roleArn=self.role_arn,
+                    modelId=self.provider.model,
+                    inputDataConfig={
+                        "s3InputDataConfig": {"s3Uri": f"s3://{self.bucket}/{base}/input.jsonl"}
+                    },
+                    outputDataConfig={
+                        "s3OutputDataConfig": {"s3Uri": f"s3://{self.bucket}/{base}/output/"}
+                    },
+                ),
+            )
+        except Exception as e:
+            raise ProviderError("bedrock", f"Failed to submit batch job: {e}") from e
+
+        job_id = response["jobArn"]
+        self._record_ids[job_id] = record_ids
+        self._output_prefixes[job_id] = f"{base}/output/"
+        return job_id
+
+    async def poll(self, job_id: str) -> str:
+        loop = asyncio.get_event_loop()
+        try:
+            response = await loop.run_in_executor(
+                None,
+                partial(self.bedrock.get_model_invocation_job, jobIdentifier=job_id),
+            )
+        except Exception as e:
+            raise ProviderError("bedrock", f"Failed to get batch job status: {e}") from e
+        status = response["status"]
+        if status in ("Failed", "Stopped", "Expired"):
+            logger.error("Bedrock batch job %s %s: %s", job_id, status, response.get("message"))
+        return self._STATUS.get(status, "in_progress")
+
+    async def fetch_results(self, job_id: str, records: list[BatchRecord]) -> BatchResult:
+        from .bedrock_provider import _record_response_usage
+
+        result = BatchResult(backend=self.name, job_id=job_id)
+        record_ids = self._record_ids[job_id]
+        loop = asyncio.get_event_loop()
+        try:
+            listing = await loop.run_in_executor(
+                None,
+                partial(
+                    self.s3.list_objects_v2,
+                    Bucket=self.bucket,
+                    Prefix=self._output_prefixes[job_id],
+                ),
+            )
+            keys = [
+                o["Key"] for o in listing.get("Contents", []) if o["Key"].endswith(".jsonl.out")
+            ]
+            for key in keys:
+                obj = await loop.run_in_executor(
+                    None, partial(self.s3.get_object, Bucket=self.bucket, Key=key)
+                )
+                for line in obj["Body"].read().decode("utf-8").splitlines():
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    custom_id = record_ids.get(row.get("recordId", ""))
+                    if custom_id is None:
+                        continue
+                    if "modelOutput" not in row:
+                        error = row.get("error", {})
+                        result.errors[custom_id] = error.get("errorMessage", str(error))
+                        continue
+                    try:
+                        result.outputs[custom_id] = self.provider._parse_response(
+                            row["modelOutput"]
+                        )
+                    except (KeyError, IndexError) as e:
+                        result.errors[custom_id] = f"Failed to parse output: {e}"
+                        continue
+                    _record_response_usage(self.provider.family, row["modelOutput"])
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError("bedrock", f"Failed to read batch output: {e}") from e
+        return result
+
+    async def cancel(self, job_id: str) -> None:
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(
+                None,
+                partial(self.bedrock.stop_model_invocation_job, jobIdentifier=job_id),
+            )
+        except Exception:
+            logger.warning("Failed to stop Bedrock batch job %s", job_id)
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API backend.
+
+    Chat completion requests are uploaded as a JSONL file, run as a batch on
+    /v1/chat/completions and mapped back by custom_id. When the SSR embedding
+    model is also OpenAI, the response texts are embedded with a second batch
+    on /v1/embeddings.
+    """
+
+    name = "openai"
+
+    # Batch states mapped to backend statuses. Expired batches still return the
+    # requests that finished; the rest are regenerated synchronously.
+    _STATUS = {
+        "completed": "completed",
+        "expired": "completed",
+        "failed": "failed",
+        "cancelling": "failed",
+        "cancelled": "failed",
+    }
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Initialize OpenAI batch backend (uses the provider's API client)."""
+        super().__init__(*args, **kwargs)
+        if not isinstance(self.provider, (OpenAIGenerationProvider, OpenAIVisionProvider)):
+            raise ConfigurationError("OpenAI batch execution requires an OpenAI model")
+
+    async def submit(self, records: list[BatchRecord]) -> str:
+        lines = []
+        for record in records:
+            body = self._request_body(record)
+            # extra_body fields are sent at the top level of the request
+            body.update(body.pop("extra_body", {}))
+            lines.append(
+                {
+                    "custom_id": record.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+            )
+        return await self._submit_jsonl(self.provider.client, lines, "/v1/chat/completions")
+
+    async def poll(self, job_id: str) -> str:
+        return await self._poll(self.provider.client, job_id)
+
+    async def fetch_results(self, job_id: str, records: list[BatchRecord]) -> BatchResult:
+        result = BatchResult(backend=self.name, job_id=job_id)
+        for custom_id, body, error in await self._read_results(self.provider.client, job_id):
+            if error is not None:
+                result.errors[custom_id] = error
+                continue
+            try:
+                result.outputs[custom_id] = self.provider._parse_response(body)
+            except (KeyError, IndexError, TypeError) as e:
+                result.errors[custom_id] = f"Failed to parse output: {e}"
+                continue
+            _record_chat_usage_dict(body.get("usage"))
+        return result
+
+    async def cancel(self, job_id: str) -> None:
+        try:
+            await self.provider.client.batches.cancel(job_id)
+        except APIError:
+            logger.warning("Failed to cancel OpenAI batch %s", job_id)
+
+    def supports_embeddings(self) -> bool:
+        # Only when the SSR embedding model is an OpenAI model too
+        return isinstance(self.embedding_provider, OpenAIEmbeddingProvider)
+
+    async def embed(self, texts: dict[str, str]) -> dict[str, list[float]]:
+        if not texts or not self.supports_embeddings():
+            return {}
+
+        embedding_provider = self.embedding_provider
+        client = embedding_provider.client
+        lines = [
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/embeddings",
+                "body": {"model": embedding_provider.model, "input": text},
+            }
+            for custom_id, text in texts.items()
+        ]
+        job_id = await self._submit_jsonl(client, lines, "/v1/embeddings")
+        logger.info("Embedding batch %s submitted (%d texts)", job_id, len(lines))
+        await self._wait(job_id, partial(self._poll, client))
+
+        embeddings = {}
+        for custom_id, body, error in await self._read_results(client, job_id):
+            if error is None:
+                embeddings[custom_id] = body["data"][0]["embedding"]
+        return embeddings
+
+    async def _submit_jsonl(self, client: Any, lines: list[dict], endpoint: str) -> str:
+        payload = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+        try:
+            batch_file = await client.files.create(
+                file=("sage_batch.jsonl", payload), purpose="batch"
+            )
+            batch = await client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=endpoint,
+                completion_window="24h",
+                metadata={"source": "sage"},
+            )
+        except APIError as e:
+            raise ProviderError("openai", f"Failed to submit batch: {e}") from e
+        return batch.id
+
+    async def _poll(self, client: Any, job_id: str) -> str:
+        try:
+            batch = await client.batches.retrieve(job_id)
+        except APIError as e:
+            raise ProviderError("openai", f"Failed to get batch status: {e}") from e
+        if batch.status in ("failed", "expired", "cancelled"):
+            logger.error("OpenAI batch %s %s: %s", job_id, batch.status, batch.errors)
+        return self._STATUS.get(batch.status, "in_progress")
+
+    async def _read_results(
+        self, client: Any, job_id: str
+    ) -> list[tuple[str, dict | None, str | None]]:
+        """Read (custom_id, response body, error) for every request in a batch."""
+        try:
+            batch = await client.batches.retrieve(job_id)
+            rows = []
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    content = await client.files.content(file_id)
+                    rows.extend(json.loads(line) for line in content.text.splitlines() if line)
+        except APIError as e:
+            raise ProviderError("openai", f"Failed to read batch output: {e}") from e
+
+        results = []
+        for row in rows:
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                error = row.get("error") or (response.get("body") or {}).get("error") or {}
+                message = error.get("message", str(error)) if isinstance(error, dict) else error
+                results.append((row["custom_id"], None, str(message)))
+            else:
+                results.append((row["custom_id"], response["body"], None))
+        return results
+
+
+def create_batch_backend(
+    name: str,
+    provider: Any,
+    image_blocks: Sequence[dict] = (),
+    temperature: float = 0.7,
+    embedding_provider: Any = None,
+) -> BatchBackend:
+    """
+    Create a batch backend by name.
+
+    Args:
+        name: "bedrock", "openai" or "local"
+        provider: Provider whose request format and model the records use
+        image_blocks: Provider content blocks for the concept's images
+        temperature: Sampling temperature
+        embedding_provider: SSR embedding provider (batched by the openai backend)
+
+    Returns:
+        BatchBackend instance
+
+    Raises:
+        ConfigurationError: If the backend is unknown
+    """
+    kwargs = {"embedding_provider": embedding_provider}
+    if name == "bedrock":
+        return BedrockBatchBackend(provider, image_blocks, temperature, **kwargs)
+    if name == "openai":
+        return OpenAIBatchBackend(provider, image_blocks, temperature, **kwargs)
+    if name == "local":
+        return LocalBatchBackend(provider, image_blocks, temperature, **kwargs)
+    raise ConfigurationError(f"Unknown batch backend: {name}")
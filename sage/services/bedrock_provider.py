@@ -2,12 +2,16 @@
 
 Supports multiple model families: Anthropic Claude, Amazon Nova, Mistral, Meta Llama.
 The model family is detected from the model ID and the appropriate API format is used.
+
+For Anthropic models, the stable concept prefix of the user message (images and
+concept text) is marked with cache_control so repeated calls read it from the
+prompt cache instead of reprocessing it.
 """
 
 import asyncio
-import base64
 import json
 from collections import OrderedDict
+from collections.abc import Sequence
 from functools import partial
 from typing import TYPE_CHECKING
 
@@ -17,7 +21,9 @@ from botocore.exceptions import BotoCoreError, ClientError
 
 from ..config import get_settings
 from ..exceptions import ConfigurationError, ProviderError
+from ..utils.timing import acquire, record_retries
 from .llm_provider import EmbeddingProvider, GenerationProvider, VisionProvider
+from .usage import record_usage
 
 if TYPE_CHECKING:
     from .video_downloader import VideoSource
@@ -43,6 +49,52 @@ def _detect_family(model_id: str) -> str:
     raise ConfigurationError(f"Unknown Bedrock model family: {model_id}")
 
 
+def _anthropic_text_blocks(user_prompt: str, cache_prefix: str | None) -> list[dict]:
+    """Split the user prompt into text blocks, marking the cacheable prefix."""
+    if cache_prefix and user_prompt.startswith(cache_prefix) and user_prompt != cache_prefix:
+        return [
+            {"type": "text", "text": cache_prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": user_prompt[len(cache_prefix) :]},
+        ]
+    return [{"type": "text", "text": user_prompt}]
+
+
+def _record_retries(response: dict) -> None:
+    """Record the retries botocore made for a call (standard retry mode)."""
+    attempts = response.get("ResponseMetadata", {}).get("RetryAttempts")
+    if isinstance(attempts, int):
+        record_retries(attempts)
+
+
+def _record_response_usage(family: str, response_body: dict) -> None:
+    """Record token usage from a Bedrock response body."""
+    usage = response_body.get("usage") or {}
+    if family == "anthropic":
+        record_usage(
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            cache_read_input_tokens=usage.get("cache_read_input_tokens", 0),
+            cache_write_input_tokens=usage.get("cache_creation_input_tokens", 0),
+        )
+    elif family == "nova":
+        record_usage(
+            input_tokens=usage.get("inputTokens", 0),
+            output_tokens=usage.get("outputTokens", 0),
+            cache_read_input_tokens=usage.get("cacheReadInputTokenCount", 0),
+            cache_write_input_tokens=usage.get("cacheWriteInputTokenCount", 0),
+        )
+    elif family == "mistral":
+        record_usage(
+            input_tokens=usage.get("prompt_tokens", 0),
+            output_tokens=usage.get("completion_tokens", 0),
+        )
+    elif family == "llama":
+        record_usage(
+            input_tokens=response_body.get("prompt_token_count", 0),
+            output_tokens=response_body.get("generation_token_count", 0),
+        )
+
+
 class BedrockGenerationProvider(GenerationProvider):
     """Amazon Bedrock provider for text generation.
 
@@ -64,9 +116,13 @@ class BedrockGenerationProvider(GenerationProvider):
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> str:
         """Generate text response using the appropriate API format for the model."""
-        body = self._build_request(system_prompt, user_prompt, temperature)
+        body = self._build_request(
+            system_prompt, user_prompt, temperature, cache_prefix, max_tokens
+        )
 
         try:
             loop = asyncio.get_event_loop()
@@ -78,32 +134,41 @@ class BedrockGenerationProvider(GenerationProvider):
                     body=json.dumps(body),
                 ),
             )
+            _record_retries(response)
             response_body = json.loads(response["body"].read())
-            return self._parse_response(response_body)
+            text = self._parse_response(response_body)
+            _record_response_usage(self.family, response_body)
+            return text
         except (ClientError, BotoCoreError) as e:
             raise ProviderError("bedrock", str(e)) from e
         except (KeyError, json.JSONDecodeError) as e:
             raise ProviderError("bedrock", f"Failed to parse response: {e}") from e
 
     def _build_request(
-        self, system_prompt: str, user_prompt: str, temperature: float
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> dict:
         if self.family == "anthropic":
+            content: str | list[dict] = user_prompt
+            if cache_prefix:
+                content = _anthropic_text_blocks(user_prompt, cache_prefix)
             return {
                 "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 500,
+                "max_tokens": max_tokens,
                 "temperature": temperature,
                 "system": system_prompt,
-                "messages": [{"role": "user", "content": user_prompt}],
+                "messages": [{"role": "user", "content": content}],
             }
         if self.family == "nova":
             return {
                 "system": [{"text": system_prompt}],
-                "messages": [
-                    {"role": "user", "content": [{"text": user_prompt}]}
-                ],
+                "messages": [{"role": "user", "content": [{"text": user_prompt}]}],
                 "inferenceConfig": {
-                    "max_new_tokens": 500,
+                    "max_new_tokens": max_tokens,
                     "temperature": temperature,
                 },
             }
@@ -113,7 +178,7 @@ class BedrockGenerationProvider(GenerationProvider):
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
-                "max_tokens": 500,
+                "max_tokens": max_tokens,
                 "temperature": temperature,
             }
         if self.family == "llama":
@@ -125,7 +190,7 @@ class BedrockGenerationProvider(GenerationProvider):
             )
             return {
                 "prompt": prompt,
-                "max_gen_len": 500,
+                "max_gen_len": max_tokens,
                 "temperature": temperature,
             }
         raise ConfigurationError(f"Unsupported generation family: {self.family}")
@@ -175,12 +240,10 @@ class BedrockEmbeddingProvider(EmbeddingProvider):
         sem = self._get_semaphore()
 
         async def _limited_embed(text: str) -> list[float]:
-            async with sem:
+            async with acquire(sem, "embedding"):
                 return await self.embed_single(text)
 
-        embeddings = await asyncio.gather(
-            *[_limited_embed(text) for text in texts]
-        )
+        embeddings = await asyncio.gather(*[_limited_embed(text) for text in texts])
         return list(embeddings)
 
     async def embed_single(self, text: str) -> list[float]:
@@ -209,6 +272,7 @@ class BedrockEmbeddingProvider(EmbeddingProvider):
                     body=json.dumps(payload),
                 ),
             )
+            _record_retries(response)
             response_body = json.loads(response["body"].read())
             return response_body["embedding"]
         except (ClientError, BotoCoreError) as e:
@@ -233,6 +297,7 @@ class BedrockEmbeddingProvider(EmbeddingProvider):
                     body=json.dumps(payload),
                 ),
             )
+            _record_retries(response)
             response_body = json.loads(response["body"].read())
             return response_body["embeddings"]
         except (ClientError, BotoCoreError) as e:
@@ -278,9 +343,16 @@ class BedrockVisionProvider(VisionProvider):
         user_prompt: str,
         images: list[dict],
         temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> str:
         """Generate text response with images."""
-        body = self._build_request(system_prompt, user_prompt, images, temperature)
+        if image_blocks is None:
+            image_blocks = self.format_images(images)
+        body = self._build_request(
+            system_prompt, user_prompt, image_blocks, temperature, cache_prefix, max_tokens
+        )
 
         try:
             loop = asyncio.get_event_loop()
@@ -292,50 +364,39 @@ class BedrockVisionProvider(VisionProvider):
                     body=json.dumps(body),
                 ),
             )
+            _record_retries(response)
             response_body = json.loads(response["body"].read())
-            return self._parse_response(response_body)
+            text = self._parse_response(response_body)
+            _record_response_usage(self.family, response_body)
+            return text
         except (ClientError, BotoCoreError) as e:
             raise ProviderError("bedrock", str(e)) from e
         except (KeyError, json.JSONDecodeError) as e:
             raise ProviderError("bedrock", f"Failed to parse response: {e}") from e
 
-    def _build_request(
-        self,
-        system_prompt: str,
-        user_prompt: str,
-        images: list[dict],
-        temperature: float,
-    ) -> dict:
+    def format_images(self, images: list[dict]) -> list[dict]:
+        """Build image content blocks in the model family's message format."""
         if self.family == "anthropic":
-            content: list[dict] = []
-            for img in images:
-                content.append(
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": img["media_type"],
-                            "data": img["data"],
-                        },
-                    }
-                )
-            content.append({"type": "text", "text": user_prompt})
-            return {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 500,
-                "temperature": temperature,
-                "system": system_prompt,
-                "messages": [{"role": "user", "content": content}],
-            }
+            return [
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": img["media_type"],
+                        "data": img["data"],
+                    },
+                }
+                for img in images
+            ]
 
         if self.family == "nova":
-            nova_content: list[dict] = []
+            nova_blocks: list[dict] = []
             for img in images:
                 # Derive format from media_type (e.g. "image/jpeg" -> "jpeg")
                 fmt = img["media_type"].split("/")[-1]
                 if fmt == "jpg":
                     fmt = "jpeg"
-                nova_content.append(
+                nova_blocks.append(
                     {
                         "image": {
                             "format": fmt,
@@ -343,39 +404,62 @@ class BedrockVisionProvider(VisionProvider):
                         }
                     }
                 )
-            nova_content.append({"text": user_prompt})
+            return nova_blocks
+
+        if self.family == "mistral":
+            return [
+                {
+                    "type": "image_url",
+                    "image_url": {"url": f"data:{img['media_type']};base64,{img['data']}"},
+                }
+                for img in images
+            ]
+
+        raise ConfigurationError(f"Vision not supported for model family: {self.family}")
+
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        image_blocks: Sequence[dict],
+        temperature: float,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+    ) -> dict:
+        if self.family == "anthropic":
+            # cache_control on the concept text also covers the images before it
+            content = [*image_blocks, *_anthropic_text_blocks(user_prompt, cache_prefix)]
+            return {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": content}],
+            }
+
+        if self.family == "nova":
+            nova_content = [*image_blocks, {"text": user_prompt}]
             return {
                 "system": [{"text": system_prompt}],
                 "messages": [{"role": "user", "content": nova_content}],
                 "inferenceConfig": {
-                    "max_new_tokens": 500,
+                    "max_new_tokens": max_tokens,
                     "temperature": temperature,
                 },
             }
 
         if self.family == "mistral":
-            mistral_content: list[dict] = []
-            for img in images:
-                data_uri = f"data:{img['media_type']};base64,{img['data']}"
-                mistral_content.append(
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": data_uri},
-                    }
-                )
-            mistral_content.append({"type": "text", "text": user_prompt})
+            mistral_content = [*image_blocks, {"type": "text", "text": user_prompt}]
             return {
                 "messages": [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": mistral_content},
                 ],
-                "max_tokens": 500,
+                "max_tokens": max_tokens,
                 "temperature": temperature,
             }
 
-        raise ConfigurationError(
-            f"Vision not supported for model family: {self.family}"
-        )
+        raise ConfigurationError(f"Vision not supported for model family: {self.family}")
 
     def _parse_response(self, response_body: dict) -> str:
         if self.family == "anthropic":
@@ -414,6 +498,7 @@ class BedrockVisionProvider(VisionProvider):
                     body=json.dumps(body),
                 ),
             )
+            _record_retries(response)
             response_body = json.loads(response["body"].read())
             return self._parse_video_response(response_body)
         except (ClientError, BotoCoreError) as e:
@@ -428,8 +513,6 @@ class BedrockVisionProvider(VisionProvider):
         temperature: float,
     ) -> dict:
         """Build a Pegasus video request body."""
-        from .video_downloader import VideoSource
-
         body: dict = {
             "inputPrompt": prompt,
             "temperature": temperature,
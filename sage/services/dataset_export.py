@@ -0,0 +1,229 @@
+"""Dataset construction and columnar encodings.
+
+The dataset is one row per persona with the persona attributes followed by
+``{q}_text``, ``{q}_pmf`` and ``{q}_mean`` columns per question. As JSON this
+is large and slow to encode for big runs, so it can also be encoded as:
+
+- arrow: Arrow IPC stream with typed columns (PMFs as fixed-size float32 lists)
+- parquet: Parquet file with the same schema (zstd compressed)
+- ndjson: newline-delimited JSON rows, gzip compressed
+
+Arrow and Parquet require pyarrow (``pip install sage[arrow]``).
+"""
+
+import gzip
+import io
+import json
+from typing import Any
+
+from ..exceptions import ConfigurationError
+from ..models.request import Question
+
+DATASET_FORMATS = ("json", "arrow", "parquet", "ndjson")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "ndjson": "application/x-ndjson",
+}
+
+FILE_EXTENSIONS = {"json": "json", "arrow": "arrows", "parquet": "parquet", "ndjson": "ndjson"}
+
+# Post-stratification weight column of sampled runs
+SAMPLE_WEIGHT_COLUMN = "sample_weight"
+
+# Decimal places of PMFs and means in JSON rows (Arrow/Parquet keep float32)
+PMF_DECIMALS = 3
+MEAN_DECIMALS = 2
+
+
+def require_pyarrow(fmt: str) -> None:
+    """
+    Check that pyarrow is available for a columnar format.
+
+    Args:
+        fmt: Dataset format
+
+    Raises:
+        ConfigurationError: If the format needs pyarrow and it is not installed
+    """
+    if fmt not in ("arrow", "parquet"):
+        return
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ConfigurationError(
+            f"pyarrow is required for {fmt} datasets (pip install sage[arrow])"
+        ) from e
+
+
+def build_dataset_rows(
+    personas: list[dict[str, Any]],
+    responses: list[dict[str, Any]],
+    match_flags: list[bool],
+    questions: list[Question],
+    include_generation_mode: bool = False,
+    weights: list[float] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Build flat dataset with personas + results.
+
+    PMFs and means are carried at full precision through the pipeline and
+    rounded here, for JSON output.
+
+    Args:
+        personas: List of persona dictionaries
+        responses: List of response dictionaries
+        match_flags: Boolean flags for filter matches
+        questions: Survey questions
+        include_generation_mode: Add a {q_id}_generation_mode column per question
+        weights: Post-stratification weights of a sampled run (sample_weight column)
+
+    Returns:
+        Flat dataset with persona attributes and response data
+    """
+    dataset = []
+
+    for i, (persona, response, matched) in enumerate(zip(personas, responses, match_flags)):
+        row = {**persona, "matched_filter": matched}
+        if weights is not None:
+            row[SAMPLE_WEIGHT_COLUMN] = weights[i]
+
+        for question in questions:
+            q_id = question.id
+            q_response = response["responses"][q_id]
+            row[f"{q_id}_text"] = q_response["raw_text"]
+            if "samples" in q_response:
+                row[f"{q_id}_samples"] = q_response["samples"]
+            row[f"{q_id}_pmf"] = [round(float(p), PMF_DECIMALS) for p in q_response["pmf"]]
+            row[f"{q_id}_mean"] = round(q_response["mean"], MEAN_DECIMALS)
+            if include_generation_mode:
+                row[f"{q_id}_generation_mode"] = q_response["generation_mode"]
+
+        dataset.append(row)
+
+    return dataset
+
+
+def build_dataset_table(
+    personas: list[dict[str, Any]],
+    responses: list[dict[str, Any]],
+    match_flags: list[bool],
+    questions: list[Question],
+    include_generation_mode: bool = False,
+    weights: list[float] | None = None,
+) -> Any:
+    """
+    Build the dataset as an Arrow table with typed columns.
+
+    Persona attributes keep their inferred Arrow type; attributes with mixed
+    types across personas are stored as strings. PMFs are fixed-size lists of
+    five float32 values and means are float32.
+
+    Args:
+        personas: List of persona dictionaries
+        responses: List of response dictionaries
+        match_flags: Boolean flags for filter matches
+        questions: Survey questions
+        include_generation_mode: Add a {q_id}_generation_mode column per question
+        weights: Post-stratification weights of a sampled run (sample_weight column)
+
+    Returns:
+        pyarrow.Table
+    """
+    require_pyarrow("arrow")
+    import pyarrow as pa
+
+    columns: dict[str, Any] = {}
+
+    attribute_names: dict[str, None] = {}
+    for persona in personas:
+        attribute_names.update(dict.fromkeys(persona))
+    for name in attribute_names:
+        values = [persona.get(name) for persona in personas]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[name] = pa.array(
+                [None if v is None else str(v) for v in values], type=pa.string()
+            )
+
+    columns["matched_filter"] = pa.array(match_flags, type=pa.bool_())
+    if weights is not None:
+        columns[SAMPLE_WEIGHT_COLUMN] = pa.array(weights, type=pa.float64())
+
+    pmf_type = pa.list_(pa.float32(), 5)
+    for question in questions:
+        q_id = question.id
+        q_responses = [response["responses"][q_id] for response in responses]
+        columns[f"{q_id}_text"] = pa.array([r["raw_text"] for r in q_responses], type=pa.string())
+        if any("samples" in r for r in q_responses):
+            columns[f"{q_id}_samples"] = pa.array(
+                [r.get("samples", [r["raw_text"]]) for r in q_responses],
+                type=pa.list_(pa.string()),
+            )
+        columns[f"{q_id}_pmf"] = pa.array([r["pmf"] for r in q_responses], type=pmf_type)
+        columns[f"{q_id}_mean"] = pa.array([r["mean"] for r in q_responses], type=pa.float32())
+        if include_generation_mode:
+            columns[f"{q_id}_generation_mode"] = pa.array(
+                [r["generation_mode"] for r in q_responses], type=pa.string()
+            )
+
+    return pa.table(columns)
+
+
+def encode_dataset(
+    personas: list[dict[str, Any]],
+    responses: list[dict[str, Any]],
+    match_flags: list[bool],
+    questions: list[Question],
+    fmt: str,
+    include_generation_mode: bool = False,
+    weights: list[float] | None = None,
+) -> bytes:
+    """
+    Encode the dataset in the requested format.
+
+    Args:
+        personas: List of persona dictionaries
+        responses: List of response dictionaries
+        match_flags: Boolean flags for filter matches
+        questions: Survey questions
+        fmt: One of DATASET_FORMATS
+        include_generation_mode: Add a {q_id}_generation_mode column per question
+        weights: Post-stratification weights of a sampled run (sample_weight column)
+
+    Returns:
+        Encoded dataset (ndjson is gzip compressed)
+
+    Raises:
+        ValueError: If the format is unknown
+        ConfigurationError: If the format needs pyarrow and it is not installed
+    """
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"Unknown dataset format: {fmt}")
+
+    if fmt in ("json", "ndjson"):
+        rows = build_dataset_rows(
+            personas, responses, match_flags, questions, include_generation_mode, weights
+        )
+        if fmt == "json":
+            return json.dumps(rows, default=float).encode("utf-8")
+        lines = "".join(json.dumps(row, default=float) + "\n" for row in rows)
+        return gzip.compress(lines.encode("utf-8"), compresslevel=6)
+
+    table = build_dataset_table(
+        personas, responses, match_flags, questions, include_generation_mode, weights
+    )
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink, compression="zstd")
+    return sink.getvalue()
@@ -0,0 +1,305 @@
+"""Offline fake providers for load testing and local development.
+
+Provider "fake" serves generation, embedding, vision and video without any
+API calls, so the full pipeline (orchestrator, concurrency limits, SSR and
+scoring) can be benchmarked on a laptop:
+
+- Text is deterministic: a Likert-style answer chosen by hashing the prompts
+  (multi-question prompts get a JSON object keyed by question id)
+- Embeddings are unit vectors from an RNG seeded with the text's hash
+- Each call waits a lognormal latency (median FAKE_LATENCY_MS, shape
+  FAKE_LATENCY_SIGMA) and fails with the configured error and throttle rates
+- Token usage is recorded at ~4 characters per token (the concept prefix
+  counts as cache reads when prompt caching is on)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from ..config import get_settings
+from ..exceptions import ProviderError
+from .llm_provider import EmbeddingProvider, GenerationProvider, VisionProvider
+from .usage import record_usage
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 765  # an OpenAI high-detail 1024px image
+
+ANSWERS = (
+    "I would definitely not buy this. It does not fit my needs at all.",
+    "I probably would not buy this. It is not really for me.",
+    "I might buy this, but I am not sure. It depends on the price.",
+    "I would probably buy this. It looks useful for someone like me.",
+    "I would definitely buy this. It is exactly what I have been looking for.",
+)
+
+# Question ids listed as "[q1] ..." in multi-question prompts
+_QUESTION_ID = re.compile(r"^\[([^\]\s]+)\] ", re.MULTILINE)
+
+
+def _tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()
+
+
+def fake_reply(system_prompt: str, user_prompt: str, salt: str = "", max_tokens: int = 500) -> str:
+    """
+    Deterministic reply to a prompt.
+
+    Args:
+        system_prompt: System instructions (the persona)
+        user_prompt: User message (concept and question(s))
+        salt: Distinguishes samples of the same prompt
+        max_tokens: Output budget; the reply is cut to fit
+
+    Returns:
+        Answer text, or a JSON object of answers for a multi-question prompt
+    """
+    question_ids = _QUESTION_ID.findall(user_prompt)
+    if len(question_ids) > 1:
+        reply = json.dumps(
+            {
+                q_id: ANSWERS[_digest(system_prompt, user_prompt, salt, q_id)[0] % len(ANSWERS)]
+                for q_id in question_ids
+            }
+        )
+    else:
+        reply = ANSWERS[_digest(system_prompt, user_prompt, salt)[0] % len(ANSWERS)]
+    return reply[: max_tokens * CHARS_PER_TOKEN]
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    """Unit vector drawn from an RNG seeded with the text's hash."""
+    rng = np.random.default_rng(int.from_bytes(_digest(text)[:8], "big"))
+    vector = rng.standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeBehaviour:
+    """Latency, error and throttle injection for fake provider calls."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_sigma: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        """
+        Initialize behaviour.
+
+        Args:
+            latency_ms: Median call latency
+            latency_sigma: Lognormal shape of the latency (0 = constant)
+            error_rate: Fraction of calls failing with a provider error
+            throttle_rate: Fraction of calls failing as throttled
+            seed: Seed of the latency and failure draws
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_settings(cls, embedding: bool = False) -> "FakeBehaviour":
+        """Behaviour configured by the FAKE_* settings."""
+        settings = get_settings()
+        latency_ms = settings.fake_embedding_latency_ms if embedding else settings.fake_latency_ms
+        return cls(
+            latency_ms=latency_ms,
+            latency_sigma=settings.fake_latency_sigma,
+            error_rate=settings.fake_error_rate,
+            throttle_rate=settings.fake_throttle_rate,
+            seed=settings.fake_seed,
+        )
+
+    async def call(self) -> None:
+        """
+        Wait one call's latency, then fail if the call drew an injected failure.
+
+        Raises:
+            ProviderError: For injected throttles and errors
+        """
+        draw = self._rng.random()
+        if self.latency_ms > 0:
+            latency = self.latency_ms
+            if self.latency_sigma > 0:
+                latency *= self._rng.lognormvariate(0.0, self.latency_sigma)
+            await asyncio.sleep(latency / 1000)
+        if draw < self.throttle_rate:
+            raise ProviderError("fake", "ThrottlingException (429): rate exceeded")
+        if draw < self.throttle_rate + self.error_rate:
+            raise ProviderError("fake", "InternalServerError (500): injected failure")
+
+
+def _record(
+    system_prompt: str,
+    user_prompt: str,
+    outputs: list[str],
+    cache_prefix: str | None,
+    images: int = 0,
+) -> None:
+    cached = _tokens(cache_prefix) if cache_prefix else 0
+    prompt_tokens = _tokens(system_prompt) + _tokens(user_prompt) + images * IMAGE_TOKENS
+    record_usage(
+        input_tokens=prompt_tokens - cached,
+        output_tokens=sum(_tokens(text) for text in outputs),
+        cache_read_input_tokens=cached,
+    )
+
+
+class FakeGenerationProvider(GenerationProvider):
+    """Deterministic offline text generation."""
+
+    def __init__(self, model: str = "fake-chat", behaviour: FakeBehaviour | None = None):
+        """
+        Initialize fake generation provider.
+
+        Args:
+            model: Fake model identifier
+            behaviour: Latency and failure injection (FAKE_* settings if omitted)
+        """
+        self.model = model
+        self.behaviour = behaviour or FakeBehaviour.from_settings()
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+    ) -> str:
+        """Generate a deterministic reply."""
+        await self.behaviour.call()
+        text = fake_reply(system_prompt, user_prompt, max_tokens=max_tokens)
+        _record(system_prompt, user_prompt, [text], cache_prefix)
+        return text
+
+    async def generate_samples(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        n: int,
+        temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+        seed: int | None = None,
+    ) -> list[str]:
+        """Generate n replies from one call (deterministic per seed and sample)."""
+        await self.behaviour.call()
+        texts = [
+            fake_reply(system_prompt, user_prompt, f"{seed}:{i}", max_tokens) for i in range(n)
+        ]
+        _record(system_prompt, user_prompt, texts, cache_prefix)
+        return texts
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """Hash-seeded offline embeddings."""
+
+    def __init__(self, model: str = "fake-embedding", behaviour: FakeBehaviour | None = None):
+        """
+        Initialize fake embedding provider.
+
+        Args:
+            model: Fake model identifier
+            behaviour: Latency and failure injection (FAKE_* settings if omitted)
+        """
+        self.model = model
+        self.dimensions = get_settings().fake_embedding_dimensions
+        self.behaviour = behaviour or FakeBehaviour.from_settings(embedding=True)
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed multiple texts in one call."""
+        await self.behaviour.call()
+        return [fake_embedding(text, self.dimensions) for text in texts]
+
+    async def embed_single(self, text: str) -> list[float]:
+        """Embed a single text."""
+        return (await self.embed([text]))[0]
+
+    async def embed_with_cache(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts (fake embeddings are cheap to recompute, so no cache)."""
+        return await self.embed(texts)
+
+
+class FakeVisionProvider(VisionProvider):
+    """Deterministic offline vision and video generation."""
+
+    family = "openai"  # image preprocessing targets
+
+    def __init__(self, model: str = "fake-vision", behaviour: FakeBehaviour | None = None):
+        """
+        Initialize fake vision provider.
+
+        Args:
+            model: Fake model identifier
+            behaviour: Latency and failure injection (FAKE_* settings if omitted)
+        """
+        self.model = model
+        self.behaviour = behaviour or FakeBehaviour.from_settings()
+
+    async def generate_with_images(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[dict],
+        temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+    ) -> str:
+        """Generate a deterministic reply (images count towards input tokens)."""
+        await self.behaviour.call()
+        text = fake_reply(system_prompt, user_prompt, max_tokens=max_tokens)
+        _record(system_prompt, user_prompt, [text], cache_prefix, images=len(images))
+        return text
+
+    async def generate_samples_with_images(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[dict],
+        n: int,
+        temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+        seed: int | None = None,
+    ) -> list[str]:
+        """Generate n replies from one call (deterministic per seed and sample)."""
+        await self.behaviour.call()
+        texts = [
+            fake_reply(system_prompt, user_prompt, f"{seed}:{i}", max_tokens) for i in range(n)
+        ]
+        _record(system_prompt, user_prompt, texts, cache_prefix, images=len(images))
+        return texts
+
+    def format_images(self, images: list[dict]) -> list[dict]:
+        """Placeholder blocks (the payload is never sent anywhere)."""
+        return [{"type": "image", "media_type": img["media_type"]} for img in images]
+
+    async def generate_with_video(
+        self,
+        prompt: str,
+        video_source: Any,
+        temperature: float = 0.2,
+    ) -> str:
+        """Generate a deterministic reply to a video prompt."""
+        await self.behaviour.call()
+        text = fake_reply("", prompt, getattr(video_source, "content_hash", ""))
+        _record("", prompt, [text], None)
+        return text
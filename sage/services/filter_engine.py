@@ -1,21 +1,424 @@
-"""Filter engine for subsetting personas based on filter expressions."""
+"""Filter engine for subsetting personas based on filter expressions.
 
+Filter expressions are compiled once into a small predicate tree and
+evaluated as NumPy boolean masks over per-attribute persona columns, so
+filtering large panels does not re-parse expressions per persona.
+
+Grammar (keywords are case-insensitive)::
+
+    expr       := term (OR term)*
+    term       := factor (AND factor)*
+    factor     := NOT factor | "(" expr ")" | condition
+    condition  := field op value                  # op: = != > >= < <=
+                | field [NOT] IN [value, ...]
+                | field BETWEEN value AND value   # inclusive range
+
+Field names may contain ``-`` and ``.`` (``income-band``). Values may be
+bare (``country=United Kingdom``) or quoted (``name="A, B"``). An expression
+the grammar rejects is read as one legacy condition, ``field op value`` or
+``field [NOT] IN [...]``, whose value runs to the end of the expression, so
+filters such as ``country=Trinidad and Tobago``, ``job=Engineer (Software)``
+and ``household size>=2`` keep working.
+Comparisons are numeric when both sides are numbers and string otherwise.
+A persona without the attribute never matches a comparison.
+"""
+
+import operator
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import compress
 from typing import Any, Callable
 
+import numpy as np
+
+from ..exceptions import FilterSyntaxError
+
+_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    "=": operator.eq,
+}
+
+_WHITESPACE = re.compile(r"\s*")
+_FIELD = re.compile(r"[\w.-]+")
+# Longer operators first so ">=" is not read as ">"
+_OPERATOR = re.compile(r">=|<=|!=|>|<|=")
+_KEYWORDS = {
+    keyword: re.compile(rf"{keyword}\b", re.IGNORECASE)
+    for keyword in ("and", "or", "not", "in", "between")
+}
+_QUOTED = re.compile(r"\"([^\"]*)\"|'([^']*)'")
+# Bare value: runs up to a parenthesis, bracket, comma or a following AND/OR
+_BARE_VALUE = re.compile(r"(?:(?!\s+(?:and|or)\b)[^()\[\],])+", re.IGNORECASE)
+# Single conditions as parsed before boolean logic was added
+_LEGACY_MEMBERSHIP = re.compile(r"\s*([\w.-]+)\s+(not\s+)?in\s+\[([^\]]+)\]\s*", re.IGNORECASE)
+# (field names may contain spaces there, e.g. "household size>=2")
+_LEGACY_COMPARISON = re.compile(r"\s*([^=<>!\[\]()]+?)\s*(>=|<=|!=|>|<|=)\s*([^=<>!\[\]]+?)\s*")
+
+
+class PersonaColumns:
+    """Persona attributes as per-field column arrays, built on first use."""
+
+    def __init__(self, personas: list[dict[str, Any]]):
+        """
+        Initialize columns.
+
+        Args:
+            personas: List of persona dictionaries
+        """
+        self.personas = personas
+        self.size = len(personas)
+        self._columns: dict[str, _Column] = {}
+
+    def column(self, field: str) -> "_Column":
+        """Get the column for an attribute."""
+        column = self._columns.get(field)
+        if column is None:
+            column = _Column([persona.get(field) for persona in self.personas])
+            self._columns[field] = column
+        return column
+
+    def build(self, fields: list[str]) -> None:
+        """Build the arrays of the given attributes now instead of on first use."""
+        for field in fields:
+            self.column(field).build()
+
+
+class _Column:
+    """One persona attribute: presence mask, string values and numeric values."""
+
+    def __init__(self, values: list[Any]):
+        self._values = values
+        self.present = np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+        self._strings: np.ndarray | None = None
+        self._numbers: np.ndarray | None = None
+
+    @property
+    def strings(self) -> np.ndarray:
+        """Values as strings ("" where missing)."""
+        if self._strings is None:
+            self._strings = np.array(["" if v is None else str(v) for v in self._values], dtype=str)
+        return self._strings
+
+    @property
+    def numbers(self) -> np.ndarray:
+        """Values as floats (NaN where missing or not numeric)."""
+        if self._numbers is None:
+            try:
+                self._numbers = np.array(
+                    [np.nan if v is None else v for v in self._values], dtype=np.float64
+                )
+            except (TypeError, ValueError):
+                # Mixed column: convert each distinct value once
+                uniques, inverse = np.unique(self.strings, return_inverse=True)
+                self._numbers = np.array([_to_number(u) for u in uniques], dtype=np.float64)[
+                    inverse
+                ]
+                self._numbers[~self.present] = np.nan
+        return self._numbers
+
+    def build(self) -> None:
+        """Build the string and numeric arrays."""
+        _ = self.strings, self.numbers
+
+
+def _to_number(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """``field op value``."""
+
+    field: str
+    op: str
+    value: str
+    number: float | None
+
+    def evaluate(self, columns: PersonaColumns) -> np.ndarray:
+        column = columns.column(self.field)
+        compare = _OPERATORS[self.op]
+        if self.number is None:
+            return column.present & compare(column.strings, self.value)
+
+        numbers = column.numbers
+        numeric = ~np.isnan(numbers)
+        result = np.zeros(columns.size, dtype=bool)
+        result[numeric] = compare(numbers[numeric], self.number)
+        # Non-numeric values fall back to string comparison
+        other = column.present & ~numeric
+        if other.any():
+            result[other] = compare(column.strings[other], self.value)
+        return result
+
+
+@dataclass(frozen=True)
+class Membership:
+    """``field [not] in [values]``."""
+
+    field: str
+    values: tuple[str, ...]
+    negate: bool
+
+    def evaluate(self, columns: PersonaColumns) -> np.ndarray:
+        column = columns.column(self.field)
+        mask = column.present & np.isin(column.strings, self.values)
+        return ~mask if self.negate else mask
+
+
+@dataclass(frozen=True)
+class Not:
+    """``NOT operand``."""
+
+    operand: Any
+
+    def evaluate(self, columns: PersonaColumns) -> np.ndarray:
+        return ~self.operand.evaluate(columns)
+
+
+@dataclass(frozen=True)
+class And:
+    """All operands match."""
+
+    operands: tuple[Any, ...]
+
+    def evaluate(self, columns: PersonaColumns) -> np.ndarray:
+        mask = self.operands[0].evaluate(columns)
+        for operand in self.operands[1:]:
+            mask &= operand.evaluate(columns)
+        return mask
+
+
+@dataclass(frozen=True)
+class Or:
+    """Any operand matches."""
+
+    operands: tuple[Any, ...]
+
+    def evaluate(self, columns: PersonaColumns) -> np.ndarray:
+        mask = self.operands[0].evaluate(columns)
+        for operand in self.operands[1:]:
+            mask |= operand.evaluate(columns)
+        return mask
+
+
+FilterNode = Comparison | Membership | Not | And | Or
+
+
+class _Parser:
+    """Recursive-descent parser for a single filter expression."""
+
+    def __init__(self, expression: str):
+        self.text = expression
+        self.pos = 0
+
+    def parse(self) -> FilterNode:
+        node = self._expr()
+        self._skip()
+        if self.pos < len(self.text):
+            self._fail(f"unexpected {self.text[self.pos]!r}")
+        return node
+
+    def _fail(self, message: str, position: int | None = None) -> None:
+        raise FilterSyntaxError(self.text, self.pos if position is None else position, message)
+
+    def _skip(self) -> None:
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()
+
+    def _match(self, pattern: re.Pattern) -> re.Match | None:
+        self._skip()
+        match = pattern.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+        return match
+
+    def _literal(self, char: str) -> bool:
+        self._skip()
+        if self.text.startswith(char, self.pos):
+            self.pos += 1
+            return True
+        return False
+
+    def _expr(self) -> FilterNode:
+        operands = [self._term()]
+        while self._match(_KEYWORDS["or"]):
+            operands.append(self._term())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def _term(self) -> FilterNode:
+        operands = [self._factor()]
+        while self._match(_KEYWORDS["and"]):
+            operands.append(self._factor())
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def _factor(self) -> FilterNode:
+        if self._match(_KEYWORDS["not"]):
+            return Not(self._factor())
+        if self._literal("("):
+            start = self.pos - 1
+            node = self._expr()
+            if not self._literal(")"):
+                self._fail("unclosed parenthesis", start)
+            return node
+        return self._condition()
+
+    def _condition(self) -> FilterNode:
+        field_match = self._match(_FIELD)
+        if field_match is None:
+            self._fail("expected an attribute name")
+        field = field_match.group()
+
+        if self._match(_KEYWORDS["between"]):
+            low = self._value()
+            if not self._match(_KEYWORDS["and"]):
+                self._fail("expected AND in BETWEEN range")
+            high = self._value()
+            return And((_comparison(field, ">=", low), _comparison(field, "<=", high)))
+
+        negate = self._match(_KEYWORDS["not"]) is not None
+        if self._match(_KEYWORDS["in"]):
+            return Membership(field, self._values(), negate)
+        if negate:
+            self._fail("expected IN after NOT")
+
+        op_match = self._match(_OPERATOR)
+        if op_match is None:
+            self._fail("expected a comparison operator, IN or BETWEEN")
+        return _comparison(field, op_match.group(), self._value())
+
+    def _value(self) -> str:
+        self._skip()
+        start = self.pos
+        match = self._match(_QUOTED)
+        if match:
+            return match.group(1) if match.group(1) is not None else match.group(2)
+        match = self._match(_BARE_VALUE)
+        value = match.group().strip() if match else ""
+        if not value:
+            self._fail("expected a value", start)
+        return value
+
+    def _values(self) -> tuple[str, ...]:
+        if not self._literal("["):
+            self._fail("expected '[' to start a list")
+        values = [self._value()]
+        while self._literal(","):
+            values.append(self._value())
+        if not self._literal("]"):
+            self._fail("expected ',' or ']' in list")
+        return tuple(values)
+
+
+def _legacy_condition(expression: str) -> FilterNode | None:
+    """Read an expression as one legacy condition (None if it is not one)."""
+    match = _LEGACY_MEMBERSHIP.fullmatch(expression)
+    if match:
+        values = tuple(v.strip() for v in match.group(3).split(","))
+        return Membership(match.group(1), values, match.group(2) is not None)
+    match = _LEGACY_COMPARISON.fullmatch(expression)
+    if match and _balanced(match.group(3)):
+        return _comparison(match.group(1), match.group(2), match.group(3))
+    return None
+
+
+def _balanced(value: str) -> bool:
+    depth = 0
+    for char in value:
+        if char in "()":
+            depth += 1 if char == "(" else -1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def _comparison(field: str, op: str, value: str) -> Comparison:
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    return Comparison(field, op, value, number)
+
+
+@lru_cache(maxsize=1024)
+def compile_filter(expression: str) -> FilterNode:
+    """
+    Compile a filter expression into a predicate tree.
+
+    Compiled filters are cached, so validating and then applying the same
+    expressions parses them once.
+
+    Args:
+        expression: Filter expression (see module docstring for the grammar)
+
+    Returns:
+        Predicate tree whose ``evaluate(columns)`` returns a boolean mask
+
+    Raises:
+        FilterSyntaxError: If the expression is invalid (with the error position)
+    """
+    try:
+        return _Parser(expression).parse()
+    except FilterSyntaxError:
+        node = _legacy_condition(expression)
+        if node is None:
+            raise
+        return node
+
 
 class FilterEngine:
     """Apply filters to subset personas."""
 
     # Comparison operators mapping
-    OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
-        ">=": lambda a, b: a >= b,
-        "<=": lambda a, b: a <= b,
-        "!=": lambda a, b: a != b,
-        ">": lambda a, b: a > b,
-        "<": lambda a, b: a < b,
-        "=": lambda a, b: a == b,
-    }
+    OPERATORS = _OPERATORS
+
+    def compile(self, filters: list[str]) -> FilterNode | None:
+        """
+        Compile filter expressions into one predicate (all must match).
+
+        Args:
+            filters: List of filter expressions
+
+        Returns:
+            Predicate tree, or None if there are no filters
+
+        Raises:
+            FilterSyntaxError: If an expression is invalid
+        """
+        nodes = [compile_filter(f) for f in filters]
+        if not nodes:
+            return None
+        return nodes[0] if len(nodes) == 1 else And(tuple(nodes))
+
+    def mask(
+        self,
+        personas: list[dict[str, Any]] | PersonaColumns,
+        filters: list[str],
+    ) -> np.ndarray:
+        """
+        Evaluate filters as a boolean mask over personas.
+
+        Args:
+            personas: Persona dictionaries, or columns built from them
+            filters: List of filter expressions
+
+        Returns:
+            Boolean array, True where the persona matches all filters
+
+        Raises:
+            FilterSyntaxError: If an expression is invalid
+        """
+        columns = personas if isinstance(personas, PersonaColumns) else PersonaColumns(personas)
+        predicate = self.compile(filters)
+        if predicate is None:
+            return np.ones(columns.size, dtype=bool)
+        return predicate.evaluate(columns)
 
     def apply_filters(
         self,
@@ -30,80 +433,25 @@ class FilterEngine:
         - "gender=F" - string equality
         - "income!=low" - string inequality
         - "region in [North,South,West]" - membership check
+        - "age between 25 and 40" - inclusive range
+        - "gender=F and (age<30 or region not in [North])" - boolean logic
 
         Args:
             personas: List of persona dictionaries
-            filters: List of filter expressions
+            filters: List of filter expressions (all must match)
 
         Returns:
             filtered_personas: List of personas matching all filters
             match_flags: Boolean list indicating which personas matched
+
+        Raises:
+            FilterSyntaxError: If an expression is invalid
         """
         if not filters:
             return personas, [True] * len(personas)
 
-        match_flags = []
-        filtered = []
-
-        for persona in personas:
-            matches = all(self._evaluate_filter(persona, f) for f in filters)
-            match_flags.append(matches)
-            if matches:
-                filtered.append(persona)
-
-        return filtered, match_flags
-
-    def _evaluate_filter(self, persona: dict[str, Any], filter_expr: str) -> bool:
-        """
-        Evaluate a single filter expression against a persona.
-
-        Args:
-            persona: Persona dictionary
-            filter_expr: Filter expression string
-
-        Returns:
-            True if persona matches the filter, False otherwise
-        """
-        # Handle 'in' operator: field in [val1,val2,val3]
-        in_match = re.match(r"(\w+)\s+in\s+\[([^\]]+)\]", filter_expr)
-        if in_match:
-            field = in_match.group(1)
-            values = [v.strip() for v in in_match.group(2).split(",")]
-            persona_value = persona.get(field)
-            return str(persona_value) in values
-
-        # Handle 'not in' operator: field not in [val1,val2,val3]
-        not_in_match = re.match(r"(\w+)\s+not\s+in\s+\[([^\]]+)\]", filter_expr)
-        if not_in_match:
-            field = not_in_match.group(1)
-            values = [v.strip() for v in not_in_match.group(2).split(",")]
-            persona_value = persona.get(field)
-            return str(persona_value) not in values
-
-        # Handle comparison operators (must check longer ones first)
-        for op in [">=", "<=", "!=", ">", "<", "="]:
-            if op in filter_expr:
-                parts = filter_expr.split(op, 1)
-                if len(parts) != 2:
-                    continue
-
-                field = parts[0].strip()
-                value = parts[1].strip()
-
-                persona_value = persona.get(field)
-                if persona_value is None:
-                    return False
-
-                # Try numeric comparison first
-                try:
-                    numeric_persona_value = float(persona_value)
-                    numeric_value = float(value)
-                    return self.OPERATORS[op](numeric_persona_value, numeric_value)
-                except (ValueError, TypeError):
-                    # Fall back to string comparison
-                    return self.OPERATORS[op](str(persona_value), value)
-
-        raise ValueError(f"Invalid filter expression: {filter_expr}")
+        match_flags = self.mask(personas, filters).tolist()
+        return list(compress(personas, match_flags)), match_flags
 
     def validate_filters(self, filters: list[str]) -> list[str]:
         """
@@ -118,27 +466,7 @@ class FilterEngine:
         errors = []
         for i, f in enumerate(filters):
             try:
-                # Try to parse the filter
-                # Check for 'in' operator
-                if " in [" in f or " not in [" in f:
-                    if not re.match(r"(\w+)\s+(not\s+)?in\s+\[([^\]]+)\]", f):
-                        errors.append(f"Filter {i}: Invalid 'in' expression: {f}")
-                    continue
-
-                # Check for comparison operators
-                has_operator = False
-                for op in [">=", "<=", "!=", ">", "<", "="]:
-                    if op in f:
-                        has_operator = True
-                        parts = f.split(op, 1)
-                        if len(parts) != 2 or not parts[0].strip() or not parts[1].strip():
-                            errors.append(f"Filter {i}: Invalid comparison: {f}")
-                        break
-
-                if not has_operator:
-                    errors.append(f"Filter {i}: No valid operator found: {f}")
-
-            except Exception as e:
-                errors.append(f"Filter {i}: {str(e)}")
-
+                compile_filter(f)
+            except FilterSyntaxError as e:
+                errors.append(f"Filter {i}: {e}")
         return errors
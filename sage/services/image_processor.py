@@ -0,0 +1,231 @@
+"""Server-side image downscaling and recompression for vision calls.
+
+Vision models downscale large images internally, so sending a full-resolution
+storyboard wastes upload bytes on every call. Images are resized to the model
+family's effective maximum resolution (or a lower configured edge), recompressed,
+and cached by content hash and target so each image is processed once.
+
+Requires Pillow (``pip install sage[images]``).
+"""
+
+import base64
+import io
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from ..config import get_settings
+from ..exceptions import ConfigurationError, ValidationError
+
+if TYPE_CHECKING:
+    from .prepared_concept import PreparedImage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ImageTarget:
+    """Effective input resolution limits for a vision model family."""
+
+    max_long_edge: int
+    max_short_edge: int | None = None
+    max_pixels: int | None = None
+
+
+# Resolution beyond these limits is discarded by the provider before tokenisation
+IMAGE_TARGETS: dict[str, ImageTarget] = {
+    "openai": ImageTarget(max_long_edge=2048, max_short_edge=768),
+    "anthropic": ImageTarget(max_long_edge=1568, max_pixels=1_150_000),
+    "nova": ImageTarget(max_long_edge=1568, max_pixels=1_150_000),
+    "mistral": ImageTarget(max_long_edge=1540),
+}
+
+DEFAULT_TARGET = ImageTarget(max_long_edge=1568)
+
+
+def fit_dimensions(width: int, height: int, target: ImageTarget) -> tuple[int, int]:
+    """Scale (width, height) down to fit the target, preserving aspect ratio."""
+    scale = min(1.0, target.max_long_edge / max(width, height))
+    if target.max_short_edge is not None:
+        scale = min(scale, target.max_short_edge / min(width, height))
+    if target.max_pixels is not None:
+        scale = min(scale, math.sqrt(target.max_pixels / (width * height)))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def estimate_image_tokens(width: int, height: int, family: str) -> int:
+    """
+    Estimate input tokens for one image after the provider's own downscaling.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        family: Vision model family
+
+    Returns:
+        Approximate token count
+    """
+    w, h = fit_dimensions(width, height, IMAGE_TARGETS.get(family, DEFAULT_TARGET))
+    if family == "openai":
+        # High detail: 170 tokens per 512px tile plus 85 base tokens
+        return 85 + 170 * math.ceil(w / 512) * math.ceil(h / 512)
+    if family == "mistral":
+        # Pixtral: one token per 16x16 patch
+        return math.ceil(w / 16) * math.ceil(h / 16)
+    # Anthropic (and approximately Nova): tokens ~= pixels / 750
+    return math.ceil(w * h / 750)
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    """Result of preprocessing one image for a model family."""
+
+    data: str  # base64
+    media_type: str
+    original_bytes: int  # base64-encoded, as sent to the provider
+    processed_bytes: int  # base64-encoded, as sent to the provider
+    original_size: tuple[int, int]
+    processed_size: tuple[int, int]
+    estimated_tokens_original: int
+    estimated_tokens_processed: int
+
+    def as_dict(self) -> dict:
+        """Image dict in the format accepted by VisionProvider.generate_with_images."""
+        return {"data": self.data, "media_type": self.media_type}
+
+
+class ImageProcessor:
+    """Resizes and recompresses images to a model family's effective resolution."""
+
+    # Shared across requests: keyed by (image sha256, family, max edge, quality)
+    _cache: OrderedDict[tuple[str, str, int, int], ProcessedImage] = OrderedDict()
+
+    def __init__(self, max_edge: int | None = None, quality: int | None = None):
+        """
+        Initialize image processor.
+
+        Args:
+            max_edge: Optional cap on the long edge below the family default
+            quality: JPEG quality target (1-95)
+
+        Raises:
+            ConfigurationError: If Pillow is not installed
+        """
+        try:
+            import PIL  # noqa: F401
+        except ImportError as e:
+            raise ConfigurationError(
+                "Pillow is required for image preprocessing (pip install sage[images])"
+            ) from e
+
+        settings = get_settings()
+        self.max_edge = max_edge if max_edge is not None else settings.image_max_edge
+        self.quality = quality if quality is not None else settings.image_quality
+
+    def target_for(self, family: str) -> ImageTarget:
+        """Get the resize target for a model family, applying the configured cap."""
+        target = IMAGE_TARGETS.get(family, DEFAULT_TARGET)
+        if self.max_edge and self.max_edge < target.max_long_edge:
+            target = ImageTarget(
+                max_long_edge=self.max_edge,
+                max_short_edge=target.max_short_edge,
+                max_pixels=target.max_pixels,
+            )
+        return target
+
+    def process(self, image: "PreparedImage", family: str) -> ProcessedImage:
+        """
+        Downscale and recompress an image for a model family (cached).
+
+        The original image is kept when it already fits the target and
+        recompression would not make it smaller.
+
+        Args:
+            image: Decoded concept image
+            family: Vision model family the image is for
+
+        Returns:
+            ProcessedImage with base64 data and size/token statistics
+        """
+        key = (image.sha256, family, self.max_edge, self.quality)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        result = self._process(image, family)
+        self._cache[key] = result
+        if len(self._cache) > get_settings().image_cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _process(self, image: "PreparedImage", family: str) -> ProcessedImage:
+        from PIL import Image, UnidentifiedImageError
+
+        raw = image.raw
+        try:
+            img = Image.open(io.BytesIO(raw))
+        except Image.DecompressionBombError as e:
+            raise ValidationError(f"Image is too large to process: {e}") from e
+        except (UnidentifiedImageError, OSError) as e:
+            raise ValidationError(f"Image could not be decoded: {e}") from e
+
+        with img:
+            original_size = img.size
+            new_size = fit_dimensions(*original_size, self.target_for(family))
+
+            # Animated GIFs would lose frames - send them unchanged
+            if getattr(img, "is_animated", False):
+                return self._unchanged(image, original_size, family)
+
+            has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+            work = img.convert("RGBA" if has_alpha else "RGB")
+            if new_size != original_size:
+                work = work.resize(new_size, Image.Resampling.LANCZOS)
+
+            buffer = io.BytesIO()
+            if has_alpha:
+                work.save(buffer, format="PNG", optimize=True)
+                out_type = "image/png"
+            else:
+                work.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+                out_type = "image/jpeg"
+            processed = buffer.getvalue()
+
+        if new_size == original_size and len(processed) >= len(raw):
+            return self._unchanged(image, original_size, family)
+
+        logger.info(
+            "Image preprocessed for %s: %dx%d %d bytes -> %dx%d %d bytes",
+            family,
+            *original_size,
+            len(raw),
+            *new_size,
+            len(processed),
+        )
+        data = base64.b64encode(processed).decode("ascii")
+        return ProcessedImage(
+            data=data,
+            media_type=out_type,
+            original_bytes=len(image.data),
+            processed_bytes=len(data),
+            original_size=original_size,
+            processed_size=new_size,
+            estimated_tokens_original=estimate_image_tokens(*original_size, family),
+            estimated_tokens_processed=estimate_image_tokens(*new_size, family),
+        )
+
+    @staticmethod
+    def _unchanged(image: "PreparedImage", size: tuple[int, int], family: str) -> ProcessedImage:
+        tokens = estimate_image_tokens(*size, family)
+        return ProcessedImage(
+            data=image.data,
+            media_type=image.media_type,
+            original_bytes=len(image.data),
+            processed_bytes=len(image.data),
+            original_size=size,
+            processed_size=size,
+            estimated_tokens_original=tokens,
+            estimated_tokens_processed=tokens,
+        )
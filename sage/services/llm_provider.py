@@ -1,6 +1,8 @@
 """Abstract interfaces and factory for LLM providers."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from enum import Enum
 from typing import TYPE_CHECKING, Any
 
@@ -22,6 +24,7 @@ class ProviderType(str, Enum):
 
     OPENAI = "openai"
     BEDROCK = "bedrock"
+    FAKE = "fake"
 
 
 class GenerationProvider(ABC):
@@ -33,6 +36,8 @@ class GenerationProvider(ABC):
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> str:
         """
         Generate text response.
@@ -41,12 +46,54 @@ class GenerationProvider(ABC):
             system_prompt: System instructions
             user_prompt: User message
             temperature: Sampling temperature
+            cache_prefix: Leading part of user_prompt that is identical across
+                          calls (the concept). Providers with explicit prompt
+                          caching mark it as cacheable.
+            max_tokens: Maximum tokens to generate
 
         Returns:
             Generated text response
         """
         pass
 
+    async def generate_samples(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        n: int,
+        temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+        seed: int | None = None,
+    ) -> list[str]:
+        """
+        Generate n independent responses to the same prompt.
+
+        The default makes n concurrent generate() calls and ignores the seed.
+        Providers that return several completions from one request, or accept
+        a sampling seed, override this.
+
+        Args:
+            system_prompt: System instructions
+            user_prompt: User message
+            n: Number of responses
+            temperature: Sampling temperature
+            cache_prefix: Cacheable leading part of user_prompt
+            max_tokens: Maximum tokens to generate per response
+            seed: Sampling seed, where the provider supports one
+
+        Returns:
+            Generated text responses
+        """
+        return list(
+            await asyncio.gather(
+                *[
+                    self.generate(system_prompt, user_prompt, temperature, cache_prefix, max_tokens)
+                    for _ in range(n)
+                ]
+            )
+        )
+
 
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
@@ -101,6 +148,9 @@ class VisionProvider(ABC):
         user_prompt: str,
         images: list[dict],  # [{"data": base64, "media_type": "image/jpeg"}]
         temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> str:
         """
         Generate text response with images.
@@ -110,12 +160,72 @@ class VisionProvider(ABC):
             user_prompt: User message
             images: List of image data dicts
             temperature: Sampling temperature
+            image_blocks: Pre-built content blocks from format_images(images).
+                          When given, they are used as-is instead of rebuilding
+                          the blocks from the base64 data.
+            cache_prefix: Leading part of user_prompt that is identical across
+                          calls. Together with the images it forms the
+                          cacheable prefix.
+            max_tokens: Maximum tokens to generate
 
         Returns:
             Generated text response
         """
         pass
 
+    async def generate_samples_with_images(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[dict],
+        n: int,
+        temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+        seed: int | None = None,
+    ) -> list[str]:
+        """
+        Generate n independent responses with images.
+
+        The default makes n concurrent generate_with_images() calls and
+        ignores the seed (see GenerationProvider.generate_samples).
+
+        Returns:
+            Generated text responses
+        """
+        if image_blocks is None:
+            image_blocks = self.format_images(images)
+        return list(
+            await asyncio.gather(
+                *[
+                    self.generate_with_images(
+                        system_prompt,
+                        user_prompt,
+                        images,
+                        temperature,
+                        image_blocks=image_blocks,
+                        cache_prefix=cache_prefix,
+                        max_tokens=max_tokens,
+                    )
+                    for _ in range(n)
+                ]
+            )
+        )
+
+    @abstractmethod
+    def format_images(self, images: list[dict]) -> list[dict]:
+        """
+        Build this provider's message content blocks for a list of images.
+
+        Args:
+            images: List of image data dicts
+
+        Returns:
+            Content blocks to place before the text prompt
+        """
+        pass
+
     async def generate_with_video(
         self,
         prompt: str,
@@ -152,6 +262,7 @@ class ProviderFactory:
     ) -> GenerationProvider:
         """Create or return cached generation provider."""
         from .bedrock_provider import BedrockGenerationProvider
+        from .fake_provider import FakeGenerationProvider
         from .openai_provider import OpenAIGenerationProvider
 
         key = (provider, "generation", model)
@@ -160,6 +271,8 @@ class ProviderFactory:
                 cls._cache[key] = OpenAIGenerationProvider(model=model)
             elif provider == ProviderType.BEDROCK or provider == "bedrock":
                 cls._cache[key] = BedrockGenerationProvider(model=model)
+            elif provider == ProviderType.FAKE or provider == "fake":
+                cls._cache[key] = FakeGenerationProvider(model=model)
             else:
                 raise ValueError(f"Unknown generation provider: {provider}")
         return cls._cache[key]  # type: ignore[return-value]
@@ -172,6 +285,7 @@ class ProviderFactory:
     ) -> EmbeddingProvider:
         """Create or return cached embedding provider."""
         from .bedrock_provider import BedrockEmbeddingProvider
+        from .fake_provider import FakeEmbeddingProvider
         from .openai_provider import OpenAIEmbeddingProvider
 
         key = (provider, "embedding", model)
@@ -180,6 +294,8 @@ class ProviderFactory:
                 cls._cache[key] = OpenAIEmbeddingProvider(model=model)
             elif provider == ProviderType.BEDROCK or provider == "bedrock":
                 cls._cache[key] = BedrockEmbeddingProvider(model=model)
+            elif provider == ProviderType.FAKE or provider == "fake":
+                cls._cache[key] = FakeEmbeddingProvider(model=model)
             else:
                 raise ValueError(f"Unknown embedding provider: {provider}")
         return cls._cache[key]  # type: ignore[return-value]
@@ -192,6 +308,7 @@ class ProviderFactory:
     ) -> VisionProvider:
         """Create or return cached vision provider."""
         from .bedrock_provider import BedrockVisionProvider
+        from .fake_provider import FakeVisionProvider
         from .openai_provider import OpenAIVisionProvider
 
         key = (provider, "vision", model)
@@ -200,6 +317,8 @@ class ProviderFactory:
                 cls._cache[key] = OpenAIVisionProvider(model=model)
             elif provider == ProviderType.BEDROCK or provider == "bedrock":
                 cls._cache[key] = BedrockVisionProvider(model=model)
+            elif provider == ProviderType.FAKE or provider == "fake":
+                cls._cache[key] = FakeVisionProvider(model=model)
             else:
                 raise ValueError(f"Unknown vision provider: {provider}")
         return cls._cache[key]  # type: ignore[return-value]
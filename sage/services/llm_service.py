@@ -1,18 +1,46 @@
 """Unified LLM service that uses the appropriate provider based on configuration."""
 
+import asyncio
+import hashlib
+import json
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from typing import Any
 
+from ..config import get_settings
+from ..exceptions import ValidationError
 from ..models.request import Concept, Options, Question
-
-logger = logging.getLogger(__name__)
+from ..models.response import CallStats, ResponseCacheInfo
+from ..utils.timing import stage
+from .batch_backend import BatchBackend, BatchRecord, BatchResult, create_batch_backend
+from .image_processor import ImageProcessor
 from .llm_provider import (
     EmbeddingProvider,
     GenerationProvider,
     ProviderFactory,
     VisionProvider,
 )
-from .video_downloader import VideoDownloader
+from .prepared_concept import PreparedConcept
+from .response_cache import get_response_cache, make_cache_key
+from .video_downloader import VideoDownloader, VideoSource
+
+logger = logging.getLogger(__name__)
+
+VIDEO_DESCRIPTION_PROMPT = """Describe this video in full detail for someone who cannot watch it.
+
+Include:
+1. A scene-by-scene account of what is shown: setting, people, products, actions and camera work.
+2. A verbatim transcript of all spoken dialogue, narration and lyrics, attributed to speakers.
+3. All on-screen text, logos, brand names, prices and calls to action.
+4. Music, sound effects, tone, pacing and overall mood.
+5. The main message the video is trying to communicate.
+
+Be factual and objective. Do not give an opinion on the video."""
+
+# Output budget per question when all questions are answered in one call
+MULTI_QUESTION_TOKENS_PER_ANSWER = 300
 
 
 class LLMService:
@@ -21,6 +49,9 @@ class LLMService:
     Handles both text-only and multimodal (vision) requests.
     """
 
+    # Video descriptions are shared across requests: keyed by (video hash, model)
+    _video_descriptions: OrderedDict[tuple[str, str], str] = OrderedDict()
+
     def __init__(self, options: Options):
         """
         Initialize LLM service with configured providers.
@@ -31,17 +62,13 @@ class LLMService:
         self.options = options
 
         # Create providers based on options
-        self.generation_provider: GenerationProvider = (
-            ProviderFactory.create_generation_provider(
-                options.generation_provider,
-                options.generation_model,
-            )
+        self.generation_provider: GenerationProvider = ProviderFactory.create_generation_provider(
+            options.generation_provider,
+            options.generation_model,
         )
-        self.embedding_provider: EmbeddingProvider = (
-            ProviderFactory.create_embedding_provider(
-                options.embedding_provider,
-                options.embedding_model,
-            )
+        self.embedding_provider: EmbeddingProvider = ProviderFactory.create_embedding_provider(
+            options.embedding_provider,
+            options.embedding_model,
         )
         self.vision_provider: VisionProvider = ProviderFactory.create_vision_provider(
             options.vision_provider,
@@ -53,11 +80,22 @@ class LLMService:
         )
         self.video_downloader = VideoDownloader()
 
+        # Per-run call accounting, keyed by route ("text", "vision", "video", ...)
+        self._call_counts: dict[str, int] = {}
+        self._call_ms: dict[str, float] = {}
+        self._description_locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+        # Cross-request response cache (None when disabled or bypassed)
+        self.response_cache = get_response_cache() if options.cache_policy != "bypass" else None
+        self._cache_counts = {"hits": 0, "misses": 0, "embedding_hits": 0, "embedding_misses": 0}
+
     async def generate_response(
         self,
         persona: dict[str, Any],
         concept: Concept,
         question: Question,
+        prepared: PreparedConcept | None = None,
+        sample_index: int = 0,
     ) -> str:
         """
         Generate a response, using vision if images are present.
@@ -66,12 +104,175 @@ class LLMService:
             persona: Consumer persona with demographic attributes
             concept: Product concept being tested
             question: Survey question to answer
+            prepared: Concept prepared once per run via prepare_concept().
+                      Prepared on the fly when omitted.
+            sample_index: Index of this sample for the persona/question. Part
+                          of the response cache key, so repeated samples are
+                          cached separately.
 
         Returns:
             Generated text response
         """
+        texts = await self._generate(
+            persona,
+            concept,
+            self._build_question_prompt(question),
+            question.id,
+            prepared,
+            first_sample=sample_index,
+        )
+        return texts[0]
+
+    async def generate_response_samples(
+        self,
+        persona: dict[str, Any],
+        concept: Concept,
+        question: Question,
+        prepared: PreparedConcept | None = None,
+        samples: int = 1,
+    ) -> list[str]:
+        """
+        Generate several independent responses to one question.
+
+        Providers that support it return all samples from one request (OpenAI
+        ``n``); others make one call per sample, concurrently.
+
+        Args:
+            persona: Consumer persona with demographic attributes
+            concept: Product concept being tested
+            question: Survey question to answer
+            prepared: Concept prepared once per run via prepare_concept()
+            samples: Number of responses
+
+        Returns:
+            Generated text responses
+        """
+        return await self._generate(
+            persona,
+            concept,
+            self._build_question_prompt(question),
+            question.id,
+            prepared,
+            samples=samples,
+        )
+
+    async def generate_persona_responses(
+        self,
+        persona: dict[str, Any],
+        concept: Concept,
+        questions: list[Question],
+        prepared: PreparedConcept | None = None,
+    ) -> dict[str, tuple[str, str]]:
+        """
+        Answer all of a persona's questions in a single generation call.
+
+        The model is asked for a JSON object keyed by question id. Questions
+        missing from the reply, or all of them if it cannot be parsed, are
+        answered with one call each instead.
+
+        Args:
+            persona: Consumer persona with demographic attributes
+            concept: Product concept being tested
+            questions: Survey questions to answer
+            prepared: Concept prepared once per run via prepare_concept()
+
+        Returns:
+            Dict mapping question id to (response text, generation mode), where
+            mode is "multi_question" or "fallback"
+        """
+        answers = await self.generate_persona_response_samples(
+            persona, concept, questions, prepared
+        )
+        return {q_id: (texts[0], mode) for q_id, (texts, mode) in answers.items()}
+
+    async def generate_persona_response_samples(
+        self,
+        persona: dict[str, Any],
+        concept: Concept,
+        questions: list[Question],
+        prepared: PreparedConcept | None = None,
+        samples: int = 1,
+    ) -> dict[str, tuple[list[str], str]]:
+        """
+        Answer all of a persona's questions in one call per sample.
+
+        Like generate_persona_responses, but each of the ``samples`` replies
+        answers every question. Questions with fewer valid answers than
+        samples are topped up with per-question calls.
+
+        Args:
+            persona: Consumer persona with demographic attributes
+            concept: Product concept being tested
+            questions: Survey questions to answer
+            prepared: Concept prepared once per run via prepare_concept()
+            samples: Number of replies
+
+        Returns:
+            Dict mapping question id to (response texts, generation mode), where
+            mode is "fallback" if any of the texts came from a per-question call
+        """
+        raws = await self._generate(
+            persona,
+            concept,
+            self._build_multi_question_prompt(questions),
+            ",".join(q.id for q in questions),
+            prepared,
+            max_tokens=MULTI_QUESTION_TOKENS_PER_ANSWER * len(questions),
+            samples=samples,
+        )
+        parsed = [self._parse_multi_question_response(raw, questions) for raw in raws]
+
+        results: dict[str, tuple[list[str], str]] = {}
+        missing = []
+        for question in questions:
+            texts = [answers[question.id] for answers in parsed if question.id in answers]
+            results[question.id] = (texts, "multi_question")
+            if len(texts) < samples:
+                missing.append(question)
+        if missing:
+            logger.warning(
+                "Multi-question reply for persona %s missing %d/%d answers, "
+                "falling back to per-question calls",
+                persona.get("persona_id", "?"),
+                len(missing),
+                len(questions),
+            )
+            extra = await asyncio.gather(
+                *[
+                    self.generate_response_samples(
+                        persona, concept, q, prepared, samples - len(results[q.id][0])
+                    )
+                    for q in missing
+                ]
+            )
+            for question, texts in zip(missing, extra):
+                results[question.id] = (results[question.id][0] + texts, "fallback")
+
+        return results
+
+    async def _generate(
+        self,
+        persona: dict[str, Any],
+        concept: Concept,
+        question_prompt: str,
+        label: str,
+        prepared: PreparedConcept | None = None,
+        max_tokens: int = 500,
+        samples: int = 1,
+        first_sample: int = 0,
+    ) -> list[str]:
+        """
+        Route generation to the video, vision or text provider.
+
+        Returns ``samples`` responses. Each sample has its own response cache
+        entry (sample indexes first_sample, first_sample + 1, ...), and only
+        the samples not served from the cache are generated.
+        """
         system_prompt = self._build_system_prompt(persona)
-        user_prompt = self._build_user_prompt(concept, question)
+        concept_prompt = self._build_concept_prompt(concept)
+        user_prompt = concept_prompt + question_prompt
+        seed = self._call_seed(persona, label)
+        indexes = range(first_sample, first_sample + samples)
 
         # Check for video content (video takes priority over images)
         videos = [c for c in concept.content if c.type == "video"]
@@ -83,65 +284,578 @@ class LLMService:
                     len(videos),
                 )
             video = videos[0]
-            logger.debug(
-                "Video generation: persona=%s question=%s",
-                persona.get("persona_id", "?"),
-                question.id,
-            )
             video_source = await self.video_downloader.resolve(
                 video.data,
                 s3_bucket_owner=self.options.s3_bucket_owner,
             )
-            # Pegasus uses a single inputPrompt - combine system + user
-            combined_prompt = f"{system_prompt}\n\n{user_prompt}"
-            response = await self.video_provider.generate_with_video(
-                prompt=combined_prompt,
-                video_source=video_source,
-                temperature=self.options.generation_temperature,
-            )
+
+            if self.options.video_analysis_mode == "describe":
+                logger.debug(
+                    "Video description generation: persona=%s question=%s",
+                    persona.get("persona_id", "?"),
+                    label,
+                )
+                description = await self.describe_video(video_source)
+                concept_prompt = self._build_concept_prompt(concept, description)
+                user_prompt = concept_prompt + question_prompt
+                responses = await self._cached_generation(
+                    [
+                        self._generation_key(
+                            "text", system_prompt, user_prompt, max_tokens, i, seed=seed
+                        )
+                        for i in indexes
+                    ],
+                    lambda n: self._timed(
+                        "text",
+                        self._text_samples(
+                            system_prompt, user_prompt, concept_prompt, max_tokens, n, seed
+                        ),
+                    ),
+                )
+            else:
+                logger.debug(
+                    "Video generation: persona=%s question=%s",
+                    persona.get("persona_id", "?"),
+                    label,
+                )
+                # Pegasus uses a single inputPrompt - combine system + user.
+                # It returns one completion per call, so samples are separate calls.
+                combined_prompt = f"{system_prompt}\n\n{user_prompt}"
+                responses = await self._cached_generation(
+                    [
+                        self._generation_key(
+                            "video",
+                            "",
+                            combined_prompt,
+                            max_tokens,
+                            i,
+                            media=video_source.content_hash,
+                        )
+                        for i in indexes
+                    ],
+                    lambda n: asyncio.gather(
+                        *[
+                            self._timed(
+                                "video",
+                                self.video_provider.generate_with_video(
+                                    prompt=combined_prompt,
+                                    video_source=video_source,
+                                    temperature=self.options.generation_temperature,
+                                ),
+                            )
+                            for _ in range(n)
+                        ]
+                    ),
+                )
         else:
-            # Check if concept has images
-            images = [
-                {"data": c.data, "media_type": self._detect_media_type(c.data)}
-                for c in concept.content
-                if c.type == "image"
-            ]
+            if prepared is None:
+                prepared = self.prepare_concept(concept)
+            images = prepared.images_for(self.vision_provider)
 
             if images:
                 logger.debug(
                     "Vision generation: persona=%s question=%s (%d images)",
                     persona.get("persona_id", "?"),
-                    question.id,
+                    label,
                     len(images),
                 )
-                response = await self.vision_provider.generate_with_images(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    images=images,
-                    temperature=self.options.generation_temperature,
+                media = (
+                    prepared.image_fingerprint(self.vision_provider)
+                    if self.response_cache is not None
+                    else None
+                )
+                responses = await self._cached_generation(
+                    [
+                        self._generation_key(
+                            "vision",
+                            system_prompt,
+                            user_prompt,
+                            max_tokens,
+                            i,
+                            media=media,
+                            seed=seed,
+                        )
+                        for i in indexes
+                    ],
+                    lambda n: self._timed(
+                        "vision",
+                        self._vision_samples(
+                            system_prompt,
+                            user_prompt,
+                            concept_prompt,
+                            images,
+                            prepared.image_blocks(self.vision_provider),
+                            max_tokens,
+                            n,
+                            seed,
+                        ),
+                    ),
                 )
             else:
                 logger.debug(
                     "Text generation: persona=%s question=%s",
                     persona.get("persona_id", "?"),
-                    question.id,
+                    label,
+                )
+                responses = await self._cached_generation(
+                    [
+                        self._generation_key(
+                            "text", system_prompt, user_prompt, max_tokens, i, seed=seed
+                        )
+                        for i in indexes
+                    ],
+                    lambda n: self._timed(
+                        "text",
+                        self._text_samples(
+                            system_prompt, user_prompt, concept_prompt, max_tokens, n, seed
+                        ),
+                    ),
+                )
+
+        for response in responses:
+            logger.debug("Response (%d chars): %.80s...", len(response), response)
+        return responses
+
+    async def _text_samples(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        concept_prompt: str,
+        max_tokens: int,
+        n: int,
+        seed: int | None,
+    ) -> list[str]:
+        """Generate n text responses (a plain generate() call for one unseeded sample)."""
+        if n == 1 and seed is None:
+            return [
+                await self.generation_provider.generate(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=self.options.generation_temperature,
+                    cache_prefix=self._cache_prefix(concept_prompt),
+                    max_tokens=max_tokens,
                 )
-                response = await self.generation_provider.generate(
+            ]
+        return await self.generation_provider.generate_samples(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            n=n,
+            temperature=self.options.generation_temperature,
+            cache_prefix=self._cache_prefix(concept_prompt),
+            max_tokens=max_tokens,
+            seed=seed,
+        )
+
+    async def _vision_samples(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        concept_prompt: str,
+        images: list[dict],
+        image_blocks: list[dict],
+        max_tokens: int,
+        n: int,
+        seed: int | None,
+    ) -> list[str]:
+        """Generate n vision responses (a plain call for one unseeded sample)."""
+        if n == 1 and seed is None:
+            return [
+                await self.vision_provider.generate_with_images(
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
+                    images=images,
                     temperature=self.options.generation_temperature,
+                    image_blocks=image_blocks,
+                    cache_prefix=self._cache_prefix(concept_prompt),
+                    max_tokens=max_tokens,
+                )
+            ]
+        return await self.vision_provider.generate_samples_with_images(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            images=images,
+            n=n,
+            temperature=self.options.generation_temperature,
+            image_blocks=image_blocks,
+            cache_prefix=self._cache_prefix(concept_prompt),
+            max_tokens=max_tokens,
+            seed=seed,
+        )
+
+    def _call_seed(self, persona: dict[str, Any], label: str) -> int | None:
+        """
+        Provider seed for one persona/question call, derived from generation_seed.
+
+        Each persona/question gets a different but reproducible seed, so a run
+        repeated with the same generation_seed sends the same seeds.
+        """
+        if self.options.generation_seed is None:
+            return None
+        digest = hashlib.sha256(
+            f"{self.options.generation_seed}:{persona.get('persona_id', '')}:{label}".encode()
+        ).digest()
+        return int.from_bytes(digest[:4], "big") >> 1
+
+    def prepare_concept(self, concept: Concept) -> PreparedConcept:
+        """
+        Decode, validate and index the concept's images once for a run.
+
+        Args:
+            concept: Product concept being tested
+
+        Returns:
+            PreparedConcept to pass to every generate_response() call
+        """
+        image_processor = ImageProcessor() if self.options.image_preprocessing else None
+        prepared = PreparedConcept(concept, image_processor=image_processor)
+        if prepared.images:
+            # Build (and preprocess) the vision blocks up front so bad images fail fast
+            prepared.image_blocks(self.vision_provider)
+        return prepared
+
+    async def describe_video(self, video_source: VideoSource) -> str:
+        """
+        Get a structured description/transcript of a video, running Pegasus once.
+
+        Descriptions are cached by (video content hash, video model), so every
+        persona x question in a run - and later runs on the same video - reuse
+        a single Pegasus call.
+
+        Args:
+            video_source: Resolved video source
+
+        Returns:
+            Description text for use in text-only prompts
+        """
+        key = (video_source.content_hash, self.options.video_model)
+        cache = type(self)._video_descriptions
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        lock = self._description_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Double-check after acquiring lock
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
+            logger.info("Describing video %s with %s", key[0][:12], key[1])
+            description = await self._timed(
+                "video_description",
+                self.video_provider.generate_with_video(
+                    prompt=VIDEO_DESCRIPTION_PROMPT,
+                    video_source=video_source,
+                    temperature=0.2,
+                ),
+            )
+            cache[key] = description
+            if len(cache) > get_settings().video_description_cache_size:
+                cache.popitem(last=False)
+            return description
+
+    def create_batch_backend(
+        self, concept: Concept, prepared: PreparedConcept | None = None
+    ) -> BatchBackend:
+        """
+        Create the batch backend for a concept's generation calls.
+
+        Image concepts run on the vision model with the prepared image blocks
+        attached to every record; text concepts (and videos in describe mode)
+        run on the generation model.
+
+        Args:
+            concept: Product concept being tested
+            prepared: Concept prepared once per run via prepare_concept()
+
+        Returns:
+            BatchBackend configured for the model and images
+
+        Raises:
+            ValidationError: If the concept needs direct video analysis
+        """
+        if any(c.type == "video" for c in concept.content):
+            if self.options.video_analysis_mode != "describe":
+                raise ValidationError(
+                    'Batch execution requires video_analysis_mode="describe" for video concepts'
                 )
+            image_blocks: tuple[dict, ...] = ()
+        else:
+            if prepared is None:
+                prepared = self.prepare_concept(concept)
+            image_blocks = prepared.image_blocks(self.vision_provider) if prepared.images else ()
+
+        if image_blocks:
+            provider, provider_name = self.vision_provider, self.options.vision_provider
+        else:
+            provider, provider_name = self.generation_provider, self.options.generation_provider
+
+        return create_batch_backend(
+            get_settings().batch_backend or provider_name,
+            provider,
+            image_blocks,
+            self.options.generation_temperature,
+            embedding_provider=self.embedding_provider,
+        )
+
+    async def build_batch_records(
+        self,
+        personas: list[dict[str, Any]],
+        concept: Concept,
+        questions: list[Question],
+    ) -> list[BatchRecord]:
+        """
+        Build the generation requests of a run as batch records.
+
+        One record per persona x question, or one per persona in multi_question
+        mode. Prompts are identical to those of the synchronous path. For video
+        concepts the (cached) video description is fetched first.
+
+        Args:
+            personas: Personas to generate responses for
+            concept: Product concept being tested
+            questions: Survey questions
+
+        Returns:
+            Records with custom_id "<persona_id>/<question_id>" ("<persona_id>/*"
+            for multi-question records)
+        """
+        description = None
+        videos = [c for c in concept.content if c.type == "video"]
+        if videos:
+            video_source = await self.video_downloader.resolve(
+                videos[0].data,
+                s3_bucket_owner=self.options.s3_bucket_owner,
+            )
+            description = await self.describe_video(video_source)
+
+        concept_prompt = self._build_concept_prompt(concept, description)
+        cache_prefix = self._cache_prefix(concept_prompt)
+        multi_question = self.options.question_mode == "multi_question" and len(questions) > 1
+
+        records = []
+        for persona in personas:
+            system_prompt = self._build_system_prompt(persona)
+            if multi_question:
+                records.append(
+                    BatchRecord(
+                        custom_id=f"{persona['persona_id']}/*",
+                        system_prompt=system_prompt,
+                        user_prompt=concept_prompt + self._build_multi_question_prompt(questions),
+                        cache_prefix=cache_prefix,
+                        max_tokens=MULTI_QUESTION_TOKENS_PER_ANSWER * len(questions),
+                    )
+                )
+                continue
+            for question in questions:
+                records.append(
+                    BatchRecord(
+                        custom_id=f"{persona['persona_id']}/{question.id}",
+                        system_prompt=system_prompt,
+                        user_prompt=concept_prompt + self._build_question_prompt(question),
+                        cache_prefix=cache_prefix,
+                    )
+                )
+        return records
+
+    async def run_batch(self, backend: BatchBackend, records: list[BatchRecord]) -> BatchResult:
+        """Run a batch job to completion, recording its wall time under the "batch" route."""
+        return await self._timed("batch", backend.run(records))
+
+    async def run_batch_embeddings(
+        self, backend: BatchBackend, texts: dict[str, str]
+    ) -> dict[str, list[float]]:
+        """Embed response texts with the batch backend, recorded under "batch_embedding"."""
+        if not texts or not backend.supports_embeddings():
+            return {}
+        return await self._timed("batch_embedding", backend.embed(texts))
+
+    async def collect_batch_responses(
+        self,
+        persona: dict[str, Any],
+        concept: Concept,
+        questions: list[Question],
+        batch: BatchResult,
+        prepared: PreparedConcept | None = None,
+    ) -> dict[str, tuple[str, str]]:
+        """
+        Get a persona's answers from a finished batch job.
+
+        Answers missing from the job output (failed records, or unparseable
+        multi-question replies) are generated with synchronous calls.
 
-        logger.debug("Response (%d chars): %.80s...", len(response), response)
-        return response
+        Args:
+            persona: Consumer persona with demographic attributes
+            concept: Product concept being tested
+            questions: Survey questions
+            batch: Result of the run's batch job
+            prepared: Concept prepared once per run via prepare_concept()
+
+        Returns:
+            Dict mapping question id to (response text, generation mode), where
+            mode is "batch" or "fallback"
+        """
+        persona_id = persona["persona_id"]
+        multi_output = batch.outputs.get(f"{persona_id}/*")
+        if multi_output is not None:
+            answers = self._parse_multi_question_response(multi_output, questions)
+        else:
+            answers = {
+                q.id: batch.outputs[f"{persona_id}/{q.id}"]
+                for q in questions
+                if f"{persona_id}/{q.id}" in batch.outputs
+            }
+
+        results = {q_id: (text, "batch") for q_id, text in answers.items()}
+        missing = [q for q in questions if q.id not in answers]
+        if missing:
+            logger.warning(
+                "Batch output for persona %s missing %d/%d answers, generating synchronously",
+                persona_id,
+                len(missing),
+                len(questions),
+            )
+            texts = await asyncio.gather(
+                *[self.generate_response(persona, concept, q, prepared) for q in missing]
+            )
+            for question, text in zip(missing, texts):
+                results[question.id] = (text, "fallback")
+
+        return {q.id: results[q.id] for q in questions}
+
+    def get_call_stats(self) -> dict[str, CallStats]:
+        """Get per-route call counts and latency recorded during this run."""
+        return {
+            route: CallStats(
+                calls=count,
+                total_ms=int(self._call_ms[route]),
+                mean_ms=round(self._call_ms[route] / count, 1),
+            )
+            for route, count in self._call_counts.items()
+        }
+
+    def uses_prompt_cache(self, concept: Concept) -> bool:
+        """Whether calls for this concept send a cacheable prefix (not direct video)."""
+        if not self.options.prompt_caching:
+            return False
+        has_video = any(c.type == "video" for c in concept.content)
+        return not has_video or self.options.video_analysis_mode == "describe"
+
+    def _cache_prefix(self, concept_prompt: str) -> str | None:
+        """Return the concept prompt as the cacheable prefix if prompt caching is on."""
+        return concept_prompt if self.options.prompt_caching else None
+
+    def get_cache_info(self) -> ResponseCacheInfo | None:
+        """Get response cache hits and misses for this run (None if the cache is off)."""
+        if self.response_cache is None:
+            return None
+        return ResponseCacheInfo(policy=self.options.cache_policy, **self._cache_counts)
+
+    def _generation_key(
+        self,
+        route: str,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        sample_index: int,
+        media: str | None = None,
+        seed: int | None = None,
+    ) -> str:
+        """Build the response cache key for one generation call ("" if the cache is off)."""
+        if self.response_cache is None:
+            return ""
+        provider, model = {
+            "text": (self.options.generation_provider, self.options.generation_model),
+            "vision": (self.options.vision_provider, self.options.vision_model),
+            "video": (self.options.video_provider, self.options.video_model),
+        }[route]
+        return make_cache_key(
+            "generation",
+            route=route,
+            provider=provider,
+            model=model,
+            system=system_prompt,
+            user=user_prompt,
+            media=media,
+            temperature=self.options.generation_temperature,
+            max_tokens=max_tokens,
+            sample=sample_index,
+            # Only seeded calls carry the seed, so unseeded keys are unchanged
+            **({"seed": seed} if seed is not None else {}),
+        )
+
+    async def _cached_generation(
+        self, keys: list[str], generate: Callable[[int], Awaitable[list[str]]]
+    ) -> list[str]:
+        """
+        Serve generations from the response cache per cache_policy, generating the rest.
+
+        Args:
+            keys: Cache key per sample ("" entries when the cache is off)
+            generate: Generates n responses in one go
+
+        Returns:
+            One response per key
+        """
+        if self.response_cache is None:
+            return list(await generate(len(keys)))
+        responses: list[str | None] = [None] * len(keys)
+        if self.options.cache_policy == "use":
+            for i, key in enumerate(keys):
+                responses[i] = self.response_cache.get(key)
+        missing = [i for i, response in enumerate(responses) if response is None]
+        self._cache_counts["hits"] += len(keys) - len(missing)
+        if missing:
+            self._cache_counts["misses"] += len(missing)
+            for i, response in zip(missing, await generate(len(missing))):
+                responses[i] = response
+                self.response_cache.set(keys[i], response)
+        return responses  # type: ignore[return-value]
+
+    async def _cached_embedding(
+        self, texts: str | list[str], embed: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Serve an embedding (or list of embeddings) from the response cache."""
+        if self.response_cache is None:
+            with stage("embedding"):
+                return await embed()
+        key = make_cache_key(
+            "embedding",
+            provider=self.options.embedding_provider,
+            model=self.options.embedding_model,
+            texts=texts,
+        )
+        if self.options.cache_policy == "use":
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._cache_counts["embedding_hits"] += 1
+                return json.loads(cached)
+        self._cache_counts["embedding_misses"] += 1
+        with stage("embedding"):
+            result = await embed()
+        self.response_cache.set(key, json.dumps(result))
+        return result
+
+    async def _timed(self, route: str, call: Any) -> Any:
+        """Await a provider call, recording its latency under the given route."""
+        start = time.perf_counter()
+        try:
+            with stage(f"llm.{route}"):
+                return await call
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._call_counts[route] = self._call_counts.get(route, 0) + 1
+            self._call_ms[route] = self._call_ms.get(route, 0.0) + elapsed_ms
 
     async def get_embedding(self, text: str) -> list[float]:
         """Get embedding for a single text."""
-        return await self.embedding_provider.embed_single(text)
+        return await self._cached_embedding(
+            text, lambda: self.embedding_provider.embed_single(text)
+        )
 
     async def get_embeddings(self, texts: list[str]) -> list[list[float]]:
         """Get embeddings for multiple texts."""
-        return await self.embedding_provider.embed(texts)
+        return await self._cached_embedding(texts, lambda: self.embedding_provider.embed(texts))
 
     async def get_embeddings_cached(self, texts: list[str]) -> list[list[float]]:
         """Get embeddings with caching (for anchor texts)."""
@@ -165,8 +879,30 @@ Respond naturally and authentically as this person would. Your responses should
                 lines.append(f"- {formatted_key}: {value}")
         return "\n".join(lines)
 
-    def _build_user_prompt(self, concept: Concept, question: Question) -> str:
-        """Build user prompt with concept and question."""
+    def _build_user_prompt(
+        self,
+        concept: Concept,
+        question: Question,
+        video_description: str | None = None,
+    ) -> str:
+        """Build user prompt with concept and question.
+
+        When a video description is given (video_analysis_mode="describe"), it
+        stands in for the attached video so the prompt can run on a text model.
+        """
+        concept_prompt = self._build_concept_prompt(concept, video_description)
+        return concept_prompt + self._build_question_prompt(question)
+
+    def _build_concept_prompt(
+        self,
+        concept: Concept,
+        video_description: str | None = None,
+    ) -> str:
+        """Build the concept part of the user prompt.
+
+        This is the stable prefix shared by every question, so it is what
+        providers mark for prompt caching.
+        """
         text_content = "\n".join([c.data for c in concept.content if c.type == "text"])
         has_video = any(c.type == "video" for c in concept.content)
 
@@ -175,27 +911,61 @@ Respond naturally and authentically as this person would. Your responses should
         if text_content:
             prompt += f"{text_content}\n\n"
 
-        if has_video:
+        if has_video and video_description is not None:
+            prompt += (
+                "The concept is shown in a video. Here is a detailed description "
+                f"of the video:\n\n{video_description}\n\n"
+            )
+        elif has_video:
             prompt += "[A video is attached showing this concept.]\n\n"
 
-        prompt += f"""Please respond to this question in 2-3 sentences, speaking as yourself:
+        return prompt
+
+    def _build_question_prompt(self, question: Question) -> str:
+        """Build the question part of the user prompt."""
+        return f"""Please respond to this question in 2-3 sentences, speaking as yourself:
 
 {question.text}
 
 Give your honest reaction as this consumer would."""
 
-        return prompt
+    def _build_multi_question_prompt(self, questions: list[Question]) -> str:
+        """Build the question part of the user prompt for all questions at once."""
+        listed = "\n".join(f"[{q.id}] {q.text}" for q in questions)
+        example = ", ".join(f'"{q.id}": "..."' for q in questions)
+        return f"""Please respond to each of these questions in 2-3 sentences, speaking as yourself:
+
+{listed}
+
+Give your honest reaction as this consumer would, answering each question on its own.
+Reply with only a JSON object mapping each question id to your answer:
+{{{example}}}"""
+
+    def _parse_multi_question_response(self, raw: str, questions: list[Question]) -> dict[str, str]:
+        """
+        Extract per-question answers from a multi-question reply.
+
+        Args:
+            raw: Model output, expected to contain a JSON object
+            questions: Questions that were asked
+
+        Returns:
+            Dict of question id to answer for every valid, non-empty answer
+            (empty if the reply is not a JSON object)
+        """
+        start, end = raw.find("{"), raw.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            parsed = json.loads(raw[start : end + 1])
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
 
-    def _detect_media_type(self, base64_data: str) -> str:
-        """Detect media type from base64 data."""
-        # Simple detection based on base64 header patterns
-        if base64_data.startswith("/9j/"):
-            return "image/jpeg"
-        elif base64_data.startswith("iVBOR"):
-            return "image/png"
-        elif base64_data.startswith("R0lGO"):
-            return "image/gif"
-        elif base64_data.startswith("UklGR"):
-            return "image/webp"
-        # Default to JPEG
-        return "image/jpeg"
+        answers = {}
+        for question in questions:
+            answer = parsed.get(question.id)
+            if isinstance(answer, str) and answer.strip():
+                answers[question.id] = answer.strip()
+        return answers
@@ -0,0 +1,281 @@
+"""Content-addressed store for uploaded concept media.
+
+Permutation sweeps send the same storyboard images in every request. Media
+uploaded once with ``POST /media`` is stored under its SHA-256 and concept
+content items reference it as ``media://<sha256>``, so request bodies shrink
+to a few KB. Because images are identified by hash, the resized payloads in
+ImageProcessor's cache are reused across requests as well.
+
+Backends:
+- local: bounded directory on disk; least recently used files are evicted
+- s3: objects under an S3 prefix (videos are passed to Pegasus by S3 URI)
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlparse
+
+from ..config import get_settings
+from ..exceptions import ConfigurationError, ValidationError
+from ..models.request import MEDIA_PREFIX, Concept
+
+logger = logging.getLogger(__name__)
+
+
+class MediaStore(ABC):
+    """Abstract base class for media store backends."""
+
+    def __init__(self, memory_items: int = 32):
+        """
+        Initialize media store.
+
+        Args:
+            memory_items: Recently used media kept in memory to skip backend reads
+        """
+        self.memory_items = memory_items
+        self._recent: OrderedDict[str, bytes] = OrderedDict()
+        self._recent_lock = threading.Lock()
+
+    def put(self, raw: bytes) -> str:
+        """
+        Store media (a no-op if it is already stored).
+
+        Args:
+            raw: Media bytes
+
+        Returns:
+            Hex SHA-256 of the media
+        """
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if not self.exists(sha256):
+            self._write(sha256, raw)
+        self._remember(sha256, raw)
+        return sha256
+
+    def get(self, sha256: str) -> bytes | None:
+        """Get media bytes by hash, or None if not stored."""
+        with self._recent_lock:
+            raw = self._recent.get(sha256)
+            if raw is not None:
+                self._recent.move_to_end(sha256)
+                return raw
+        raw = self._read(sha256)
+        if raw is not None:
+            self._remember(sha256, raw)
+        return raw
+
+    def s3_uri(self, sha256: str) -> str | None:
+        """S3 URI of stored media, or None if the backend is not S3."""
+        return None
+
+    @abstractmethod
+    def exists(self, sha256: str) -> bool:
+        """Check whether media is stored."""
+        pass
+
+    @abstractmethod
+    def _write(self, sha256: str, raw: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def _read(self, sha256: str) -> bytes | None:
+        pass
+
+    def _remember(self, sha256: str, raw: bytes) -> None:
+        if self.memory_items <= 0:
+            return
+        with self._recent_lock:
+            self._recent[sha256] = raw
+            self._recent.move_to_end(sha256)
+            while len(self._recent) > self.memory_items:
+                self._recent.popitem(last=False)
+
+
+class LocalMediaStore(MediaStore):
+    """Bounded on-disk store; evicts least recently used media above max_bytes."""
+
+    def __init__(self, directory: str, max_bytes: int, memory_items: int = 32):
+        """
+        Initialize local store, indexing media already on disk.
+
+        The directory is created on the first upload.
+
+        Args:
+            directory: Directory media files are kept in
+            max_bytes: Total size above which the least recently used files are removed
+            memory_items: Recently used media kept in memory
+        """
+        super().__init__(memory_items)
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # Index of stored files in least -> most recently used order
+        files = sorted(
+            (p for p in self.directory.glob("*/*") if p.is_file() and len(p.name) == 64),
+            key=lambda p: p.stat().st_mtime,
+        )
+        self._index: OrderedDict[str, int] = OrderedDict((p.name, p.stat().st_size) for p in files)
+        self._total = sum(self._index.values())
+
+    def exists(self, sha256: str) -> bool:
+        with self._lock:
+            return sha256 in self._index
+
+    def _path(self, sha256: str) -> Path:
+        return self.directory / sha256[:2] / sha256
+
+    def _write(self, sha256: str, raw: bytes) -> None:
+        path = self._path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if sha256 in self._index:  # written concurrently by another upload
+                return
+            self._index[sha256] = len(raw)
+            self._total += len(raw)
+            while self._total > self.max_bytes and len(self._index) > 1:
+                evicted, size = self._index.popitem(last=False)
+                self._total -= size
+                self._path(evicted).unlink(missing_ok=True)
+                logger.info("Media store: evicted %s (%d bytes)", evicted[:12], size)
+
+    def _read(self, sha256: str) -> bytes | None:
+        with self._lock:
+            if sha256 not in self._index:
+                return None
+            self._index.move_to_end(sha256)
+        path = self._path(sha256)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # keep LRU order across restarts
+        return raw
+
+
+class S3MediaStore(MediaStore):
+    """Media objects under an S3 prefix."""
+
+    def __init__(self, uri: str, memory_items: int = 32):
+        """
+        Initialize S3 store.
+
+        Args:
+            uri: s3://bucket/prefix media objects are kept under
+            memory_items: Recently used media kept in memory
+
+        Raises:
+            ConfigurationError: If the URI is not an s3:// URI
+        """
+        super().__init__(memory_items)
+        parsed = urlparse(uri)
+        if parsed.scheme != "s3" or not parsed.netloc:
+            raise ConfigurationError(f"MEDIA_STORE_S3_URI must be s3://bucket/prefix: {uri}")
+        self.bucket = parsed.netloc
+        self.prefix = parsed.path.strip("/")
+
+        import boto3
+
+        settings = get_settings()
+        self.client = boto3.client("s3", region_name=settings.aws_region)
+
+    def _key(self, sha256: str) -> str:
+        return f"{self.prefix}/{sha256}" if self.prefix else sha256
+
+    def s3_uri(self, sha256: str) -> str | None:
+        return f"s3://{self.bucket}/{self._key(sha256)}"
+
+    def exists(self, sha256: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(sha256))
+            return True
+        except ClientError:
+            return False
+
+    def _write(self, sha256: str, raw: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(sha256), Body=raw)
+
+    def _read(self, sha256: str) -> bytes | None:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(sha256))
+        except ClientError:
+            return None
+        return response["Body"].read()
+
+
+@lru_cache
+def get_media_store() -> MediaStore | None:
+    """
+    Get the configured media store (shared across requests).
+
+    Returns:
+        MediaStore, or None if MEDIA_STORE is empty
+
+    Raises:
+        ConfigurationError: If the backend is unknown
+    """
+    settings = get_settings()
+    backend = settings.media_store
+    if not backend:
+        return None
+    if backend == "local":
+        return LocalMediaStore(settings.media_store_dir, settings.media_store_max_bytes)
+    if backend == "s3":
+        return S3MediaStore(settings.media_store_s3_uri)
+    raise ConfigurationError(f"Unknown media store backend: {backend}")
+
+
+async def resolve_media_references(concept: Concept, store: MediaStore | None) -> None:
+    """
+    Replace media://<sha256> references in a concept with the stored media.
+
+    Images are attached as raw bytes (no base64 round trip). Videos become an
+    S3 URI when the store is on S3, otherwise base64.
+
+    Args:
+        concept: Concept whose content items may reference stored media
+        store: Media store, or None if disabled
+
+    Raises:
+        ValidationError: If a reference is malformed, unknown or used for text
+    """
+    for item in concept.content:
+        sha256 = item.media_ref
+        if sha256 is None:
+            continue
+        if item.type == "text":
+            raise ValidationError(f"{MEDIA_PREFIX} references are only allowed for image and video")
+        if store is None:
+            raise ValidationError(f"{MEDIA_PREFIX} references require a media store (MEDIA_STORE)")
+        if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+            raise ValidationError(f"Invalid media reference: {item.data}")
+
+        if item.type == "video" and store.s3_uri(sha256) is not None:
+            if not await asyncio.to_thread(store.exists, sha256):
+                raise ValidationError(f"Unknown media {sha256}; upload it with POST /media")
+            item.data = store.s3_uri(sha256)
+            continue
+
+        raw = await asyncio.to_thread(store.get, sha256)
+        if raw is None:
+            raise ValidationError(f"Unknown media {sha256}; upload it with POST /media")
+        if item.type == "image":
+            item.attach(raw)
+        else:
+            item.data = base64.b64encode(raw).decode("ascii")
@@ -1,11 +1,63 @@
-"""OpenAI provider implementations for generation, embedding, and vision."""
+"""OpenAI provider implementations for generation, embedding, and vision.
 
+OpenAI caches prompt prefixes of 1024+ tokens automatically. Messages are built
+so the system prompt, images and concept text come first and are byte-identical
+across calls; a prompt_cache_key derived from that prefix routes calls sharing
+it to the same cache.
+"""
+
+import hashlib
 from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
 
 from openai import APIError, AsyncOpenAI
 
 from ..exceptions import ProviderError
 from .llm_provider import EmbeddingProvider, GenerationProvider, VisionProvider
+from .usage import record_usage
+
+
+def _cache_kwargs(system_prompt: str, cache_prefix: str | None) -> dict:
+    """Build request kwargs that route calls sharing a prefix to the same cache."""
+    if not cache_prefix:
+        return {}
+    digest = hashlib.sha256(f"{system_prompt}\x00{cache_prefix}".encode("utf-8")).hexdigest()
+    return {"extra_body": {"prompt_cache_key": digest[:32]}}
+
+
+def _record_chat_usage(response: Any) -> None:
+    """Record token usage from a chat completion, splitting out cached tokens."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    record_usage(
+        input_tokens=(usage.prompt_tokens or 0) - cached,
+        output_tokens=usage.completion_tokens or 0,
+        cache_read_input_tokens=cached,
+    )
+
+
+def _record_chat_usage_dict(usage: dict | None) -> None:
+    """Record token usage from a chat completion body (e.g. a Batch API result line)."""
+    if not usage:
+        return
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0) or 0
+    record_usage(
+        input_tokens=(usage.get("prompt_tokens") or 0) - cached,
+        output_tokens=usage.get("completion_tokens") or 0,
+        cache_read_input_tokens=cached,
+    )
+
+
+def _sample_kwargs(n: int, seed: int | None) -> dict:
+    """Build request kwargs for n completions from one request, optionally seeded."""
+    kwargs: dict[str, Any] = {"n": n}
+    if seed is not None:
+        kwargs["seed"] = seed
+    return kwargs
 
 
 class OpenAIGenerationProvider(GenerationProvider):
@@ -26,22 +78,66 @@ class OpenAIGenerationProvider(GenerationProvider):
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> str:
         """Generate text response using OpenAI."""
         try:
             response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=temperature,
-                max_tokens=500,
+                **self._build_request(
+                    system_prompt, user_prompt, temperature, cache_prefix, max_tokens
+                )
             )
+            _record_chat_usage(response)
             return response.choices[0].message.content or ""
         except APIError as e:
             raise ProviderError("openai", str(e)) from e
 
+    async def generate_samples(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        n: int,
+        temperature: float = 0.7,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+        seed: int | None = None,
+    ) -> list[str]:
+        """Generate n responses from one request (``n`` choices), seeded if given."""
+        try:
+            response = await self.client.chat.completions.create(
+                **self._build_request(
+                    system_prompt, user_prompt, temperature, cache_prefix, max_tokens
+                ),
+                **_sample_kwargs(n, seed),
+            )
+            _record_chat_usage(response)
+            return [choice.message.content or "" for choice in response.choices]
+        except APIError as e:
+            raise ProviderError("openai", str(e)) from e
+
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+    ) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **_cache_kwargs(system_prompt, cache_prefix),
+        }
+
+    def _parse_response(self, response_body: dict) -> str:
+        return response_body["choices"][0]["message"]["content"] or ""
+
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
     """OpenAI provider for embeddings."""
@@ -95,6 +191,8 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
 class OpenAIVisionProvider(VisionProvider):
     """OpenAI provider for vision (multimodal) tasks."""
 
+    family = "openai"
+
     def __init__(self, model: str = "gpt-4o"):
         """
         Initialize OpenAI vision provider.
@@ -111,33 +209,84 @@ class OpenAIVisionProvider(VisionProvider):
         user_prompt: str,
         images: list[dict],
         temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
     ) -> str:
         """Generate text response with images using OpenAI."""
-        # Build multimodal content
-        content: list[dict] = []
-
-        # Add images first
-        for img in images:
-            content.append(
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:{img['media_type']};base64,{img['data']}"},
-                }
+        if image_blocks is None:
+            image_blocks = self.format_images(images)
+
+        try:
+            response = await self.client.chat.completions.create(
+                **self._build_request(
+                    system_prompt, user_prompt, image_blocks, temperature, cache_prefix, max_tokens
+                )
             )
+            _record_chat_usage(response)
+            return response.choices[0].message.content or ""
+        except APIError as e:
+            raise ProviderError("openai", str(e)) from e
 
-        # Add text prompt
-        content.append({"type": "text", "text": user_prompt})
+    async def generate_samples_with_images(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[dict],
+        n: int,
+        temperature: float = 0.7,
+        image_blocks: Sequence[dict] | None = None,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+        seed: int | None = None,
+    ) -> list[str]:
+        """Generate n responses with images from one request, seeded if given."""
+        if image_blocks is None:
+            image_blocks = self.format_images(images)
 
         try:
             response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": content},
-                ],
-                temperature=temperature,
-                max_tokens=500,
+                **self._build_request(
+                    system_prompt, user_prompt, image_blocks, temperature, cache_prefix, max_tokens
+                ),
+                **_sample_kwargs(n, seed),
             )
-            return response.choices[0].message.content or ""
+            _record_chat_usage(response)
+            return [choice.message.content or "" for choice in response.choices]
         except APIError as e:
             raise ProviderError("openai", str(e)) from e
+
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        image_blocks: Sequence[dict],
+        temperature: float,
+        cache_prefix: str | None = None,
+        max_tokens: int = 500,
+    ) -> dict:
+        # Images first, then the text prompt
+        content = [*image_blocks, {"type": "text", "text": user_prompt}]
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **_cache_kwargs(system_prompt, cache_prefix),
+        }
+
+    def _parse_response(self, response_body: dict) -> str:
+        return response_body["choices"][0]["message"]["content"] or ""
+
+    def format_images(self, images: list[dict]) -> list[dict]:
+        """Build image_url content blocks with base64 data URIs."""
+        return [
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:{img['media_type']};base64,{img['data']}"},
+            }
+            for img in images
+        ]
@@ -1,22 +1,44 @@
 """Orchestrator that coordinates the entire synthetic consumer testing pipeline."""
 
 import asyncio
+import json
 import logging
+import secrets
 import time
 import uuid
 from typing import Any
 
-from ..config import get_settings
-
-logger = logging.getLogger(__name__)
+import numpy as np
 
-from ..models.request import Concept, Question, TestConceptRequest
-from ..models.response import FullResponse, Meta, MinimalResponse, ProviderInfo
-from .filter_engine import FilterEngine
+from ..config import get_settings
+from ..exceptions import NotFoundError
+from ..models.request import Concept, Question, RescoreRequest, TestConceptRequest
+from ..models.response import (
+    BatchJobInfo,
+    CriteriaBreakdown,
+    FullResponse,
+    Meta,
+    MinimalResponse,
+    ProviderInfo,
+    QuestionMetrics,
+    ResultSummary,
+    StageTiming,
+)
+from ..utils.timing import StageTimer, acquire, run_timing, stage
+from .dataset_export import SAMPLE_WEIGHT_COLUMN, build_dataset_rows, require_pyarrow
+from .filter_engine import FilterEngine, PersonaColumns
 from .llm_service import LLMService
+from .media_store import get_media_store, resolve_media_references
+from .panel_store import Panel, get_panel_store, parse_panel_ref
+from .prepared_concept import PreparedConcept
 from .report_generator import ReportGenerator
+from .result_store import StoredRun, get_result_store
+from .sampler import PersonaSampler
 from .scoring_engine import ScoringEngine
 from .ssr_engine import SSREngine
+from .usage import start_usage_tracking
+
+logger = logging.getLogger(__name__)
 
 
 class Orchestrator:
@@ -24,40 +46,67 @@ class Orchestrator:
 
     def __init__(self):
         """Initialize orchestrator with filter, scoring, and report engines."""
+        self.settings = get_settings()
         self.filter_engine = FilterEngine()
-        self.scoring_engine = ScoringEngine()
+        self.sampler = PersonaSampler()
+        self.scoring_engine = ScoringEngine(
+            resamples=self.settings.bootstrap_resamples,
+            confidence_level=self.settings.confidence_level,
+        )
         self.report_generator = ReportGenerator()
-        self.settings = get_settings()
+        self.result_store = get_result_store()
+        self.media_store = get_media_store()
+        self.panel_store = get_panel_store()
 
     async def process_request(
         self,
         request: TestConceptRequest,
+        client: str | None = None,
     ) -> FullResponse | MinimalResponse:
         """
         Process a concept test request.
 
         Pipeline:
-        1. Create LLM service with specified providers/models
-        2. Generate responses for all personas
-        3. Apply filters to personas
-        4. Calculate metrics for filtered personas
+        1. Apply filters to personas (and sample them if requested)
+        2. Create LLM service with specified providers/models
+        3. Generate responses for the selected personas
+        4. Calculate metrics (weighted by post-stratification weights when sampled)
         5. Calculate composite score
         6. Evaluate against threshold
 
         Args:
-            request: TestConceptRequest with personas, concept, and config
+            request: TestConceptRequest with personas (or a panel_id), concept, and config
+            client: Authenticated client name recorded in meta and the result store
 
         Returns:
             FullResponse if verbose=True, MinimalResponse otherwise
+
+        Raises:
+            NotFoundError: If panel_id is not a stored panel of this client
         """
+        if not self.settings.stage_timings:
+            return await self._process_request(request, client, None)
+        with run_timing() as timer:
+            return await self._process_request(request, client, timer)
+
+    async def _process_request(
+        self,
+        request: TestConceptRequest,
+        client: str | None,
+        timer: StageTimer | None,
+    ) -> FullResponse | MinimalResponse:
+        """Run the pipeline of process_request, reporting the stages recorded in timer."""
         start_time = time.time()
-        request_id = str(uuid.uuid4())[:8]
+        request_id = uuid.uuid4().hex
+        usage = start_usage_tracking()
 
         logger.info(
-            "[%s] Starting concept test: %s (%d personas, %d questions)",
+            "[%s] Starting concept test: %s (%s, %d questions)",
             request_id,
             request.concept.name,
-            len(request.personas),
+            f"panel {request.panel_id}"
+            if request.panel_id
+            else f"{len(request.personas)} personas",
             len(request.survey_config.questions),
         )
 
@@ -66,12 +115,27 @@ class Orchestrator:
         if filter_errors:
             raise ValueError(f"Invalid filters: {'; '.join(filter_errors)}")
 
+        # Columnar datasets are served from the result store, so check before spending
+        if request.output_dataset and request.output_format != "json":
+            require_pyarrow(request.output_format)
+            if self.result_store is None:
+                raise ValueError(
+                    f'output_format "{request.output_format}" requires a result store '
+                    "(RESULT_STORE)"
+                )
+
         # Step 1: Apply filters BEFORE generation (cheap)
-        filtered_personas, match_flags = self.filter_engine.apply_filters(
-            request.personas,
-            request.filters,
-        )
-        personas_matched = sum(match_flags)
+        panel = None
+        if request.panel_id is not None:
+            # Reading, decoding and indexing a large panel must not block the event loop
+            panel = await asyncio.to_thread(self.get_panel, request.panel_id, client)
+            personas, columns = panel.personas, panel.columns
+        else:
+            personas, columns = request.personas, PersonaColumns(request.personas)
+        personas_total = len(personas)
+        with stage("filter"):
+            selected = np.flatnonzero(self.filter_engine.mask(columns, request.filters))
+        personas_matched = len(selected)
 
         if personas_matched == 0:
             raise ValueError("No personas matched the specified filters")
@@ -80,12 +144,53 @@ class Orchestrator:
             logger.info(
                 "[%s] Filtered %d personas to %d",
                 request_id,
-                len(request.personas),
+                personas_total,
                 personas_matched,
             )
 
-        # Create LLM service with specified providers/models
-        llm_service = LLMService(request.options)
+        # Sample the matched personas, weighting them back to the target shares
+        sample_weights = None
+        sampling = None
+        if request.sampling is not None:
+            with stage("sample"):
+                sample = self.sampler.sample(columns, selected, request.sampling)
+            selected = sample.indices
+            sample_weights = sample.weights.tolist() if sample.weights is not None else None
+            sampling = sample.info
+            logger.info(
+                "[%s] Sampled %d of %d personas (%s, seed %d)",
+                request_id,
+                sampling.sampled,
+                personas_matched,
+                sampling.method,
+                sampling.seed,
+            )
+
+        if len(selected) > self.settings.max_personas:
+            raise ValueError(
+                f"{len(selected)} personas selected; at most {self.settings.max_personas} "
+                "can be tested per run (MAX_PERSONAS) - narrow the filters or set sampling.n"
+            )
+        filtered_personas = [personas[i] for i in selected]
+
+        # Load media://<sha256> references on a copy, so stored runs keep the references
+        concept = request.concept
+        if any(item.media_ref for item in concept.content):
+            concept = concept.model_copy(deep=True)
+            with stage("media"):
+                await resolve_media_references(concept, self.media_store)
+
+        # Create LLM service with specified providers/models. Multi-sample runs
+        # always have a generation seed, so they can be reproduced from meta.
+        options = request.options
+        samples = options.samples_per_persona
+        if samples > 1 and options.generation_seed is None:
+            options = options.model_copy(update={"generation_seed": secrets.randbits(31)})
+        llm_service = LLMService(options)
+
+        # Decode and validate concept images once for the whole run
+        with stage("prepare"):
+            prepared = llm_service.prepare_concept(concept)
 
         # Create SSR engine with the LLM service
         ssr_engine = SSREngine(
@@ -94,33 +199,35 @@ class Orchestrator:
         )
 
         # Step 2: Generate responses for ONLY matched personas
-        responses = await self._generate_all_responses(
-            llm_service,
-            ssr_engine,
-            filtered_personas,
-            request.concept,
-            request.survey_config.questions,
-        )
-
-        # Step 3: Calculate metrics (all responses are matched, so all flags True)
-        all_matched = [True] * len(responses)
-        metrics = self.scoring_engine.calculate_metrics(
-            responses,
-            request.survey_config.questions,
-            all_matched,
-        )
-
-        # Step 4: Calculate composite score
-        composite_score, breakdown = self.scoring_engine.calculate_composite_score(
-            metrics,
-            request.survey_config.questions,
-        )
+        batch_job = None
+        with stage("generate"):
+            if request.options.execution_mode == "batch":
+                responses, batch_job = await self._generate_all_responses_batch(
+                    llm_service,
+                    ssr_engine,
+                    filtered_personas,
+                    concept,
+                    request.survey_config.questions,
+                    prepared,
+                )
+            else:
+                responses = await self._generate_all_responses(
+                    llm_service,
+                    ssr_engine,
+                    filtered_personas,
+                    concept,
+                    request.survey_config.questions,
+                    prepared,
+                )
 
-        # Step 5: Evaluate threshold
-        result = self.scoring_engine.evaluate_threshold(
-            composite_score,
-            request.threshold,
-        )
+        # Steps 3-5: Metrics, composite score and threshold (all responses are matched)
+        with stage("score"):
+            metrics, composite_score, breakdown, result = self._score(
+                responses,
+                request.survey_config.questions,
+                request.threshold,
+                sample_weights,
+            )
 
         processing_time = int((time.time() - start_time) * 1000)
 
@@ -131,19 +238,23 @@ class Orchestrator:
             composite_score,
         )
 
-        # Build response based on verbose flag
-        if not request.verbose:
-            return MinimalResponse(
-                passed=result.passed,
-                composite_score=result.composite_score,
-                threshold=result.threshold,
-            )
-
-        # Build full response
-        response = FullResponse(
+        has_video = any(c.type == "video" for c in request.concept.content)
+        multi_question = request.options.question_mode == "multi_question"
+        record_modes = multi_question or batch_job is not None
+        generation_modes: dict[str, int] = {}
+        if record_modes:
+            for persona_response in responses:
+                for q_response in persona_response["responses"].values():
+                    mode = q_response.get("generation_mode", "per_question")
+                    generation_modes[mode] = generation_modes.get(mode, 0) + 1
+        call_stats = llm_service.get_call_stats()
+        vision_stats = call_stats.get("vision")
+
+        # Build full response (parts are already validated, so skip re-validation)
+        response = FullResponse.model_construct(
             result=result,
             filters_applied=request.filters,
-            personas_total=len(request.personas),
+            personas_total=personas_total,
             personas_matched=personas_matched,
             criteria_breakdown=breakdown,
             metrics=metrics,
@@ -151,42 +262,376 @@ class Orchestrator:
                 request_id=request_id,
                 concept_name=request.concept.name,
                 processing_time_ms=processing_time,
+                client=client,
                 providers=ProviderInfo(
                     generation=f"{request.options.generation_provider}/{request.options.generation_model}",
                     embedding=f"{request.options.embedding_provider}/{request.options.embedding_model}",
                     vision=f"{request.options.vision_provider}/{request.options.vision_model}",
                     video=f"{request.options.video_provider}/{request.options.video_model}",
                 ),
+                video_analysis_mode=request.options.video_analysis_mode if has_video else None,
+                question_mode=request.options.question_mode if multi_question else None,
+                generation_modes=generation_modes if record_modes else None,
+                batch_job=batch_job,
+                response_cache=llm_service.get_cache_info(),
+                call_stats=call_stats,
+                token_usage=usage.to_model(),
+                panel=panel.ref if panel is not None else None,
+                sampling=sampling,
+                samples_per_persona=samples if samples > 1 else None,
+                generation_seed=options.generation_seed,
+                image_preprocessing=prepared.preprocessing_info(
+                    vision_stats.calls if vision_stats else 0
+                ),
+                timings=timer.summary() if timer is not None else None,
             ),
         )
 
-        # Add dataset if requested
-        if request.output_dataset:
-            response.dataset = self._build_dataset(
-                filtered_personas,
-                responses,
-                all_matched,
-                request.survey_config.questions,
+        # Keep the run (every run, verbose or not) for re-scoring and lookup
+        if self.result_store is not None:
+            with stage("store"):
+                self.result_store.save(
+                    StoredRun(
+                        concept=request.concept,
+                        questions=request.survey_config.questions,
+                        personas=filtered_personas,
+                        responses=responses,
+                        response=response.model_copy(update={"meta": response.meta.model_copy()}),
+                        weights=sample_weights,
+                    )
+                )
+
+        # Build response based on verbose flag
+        if not request.verbose:
+            if timer is not None:
+                self._log_timings(request_id, timer.summary())
+            return MinimalResponse(
+                passed=result.passed,
+                composite_score=result.composite_score,
+                threshold=result.threshold,
             )
 
+        # Add dataset if requested (columnar formats are fetched from the result store)
+        if request.output_dataset and request.output_format != "json":
+            response.dataset_url = f"/runs/{request_id}/dataset?format={request.output_format}"
+        elif request.output_dataset:
+            with stage("dataset"):
+                response.dataset = self._build_dataset(
+                    filtered_personas,
+                    responses,
+                    [True] * len(responses),
+                    request.survey_config.questions,
+                    include_generation_mode=record_modes,
+                    weights=sample_weights,
+                )
+
         # Generate report if requested
+        if request.include_report:
+            with stage("report"):
+                response.report = self.report_generator.generate_report(
+                    result=result,
+                    concept_name=request.concept.name,
+                    personas_total=personas_total,
+                    personas_matched=personas_matched,
+                    criteria_breakdown=breakdown,
+                    metrics=metrics,
+                    meta=response.meta,
+                    dataset=response.dataset,
+                    filters_applied=request.filters if request.filters else None,
+                    questions=request.survey_config.questions,
+                    concept=request.concept,
+                )
+
+        if timer is not None:
+            response.meta.timings = timer.summary()
+            self._log_timings(request_id, response.meta.timings)
+
+        return response
+
+    @staticmethod
+    def _log_timings(request_id: str, timings: dict[str, StageTiming]) -> None:
+        """Log a run's stage timings as one JSON line (and as extra fields)."""
+        summary = {name: timing.model_dump(exclude_none=True) for name, timing in timings.items()}
+        logger.info(
+            "[%s] Stage timings: %s",
+            request_id,
+            json.dumps(summary, separators=(",", ":")),
+            extra={"request_id": request_id, "timings": summary},
+        )
+
+    async def rescore(self, request: RescoreRequest, client: str | None = None) -> FullResponse:
+        """
+        Re-score a completed run with new weights, threshold or filters.
+
+        Scoring only uses the per-persona response means, so metrics, composite
+        score, threshold result and report are recomputed without provider calls.
+        Filters can only narrow the personas that were generated for the run.
+        The store read and scoring run in a worker thread, off the event loop.
+
+        Args:
+            request: RescoreRequest with a run_id or dataset and the new scoring inputs
+            client: Authenticated client name; runs of other clients are not visible
+
+        Returns:
+            FullResponse for the re-scored run
+
+        Raises:
+            NotFoundError: If run_id is not a stored run of this client
+            ValueError: If the filters, weights or dataset are invalid
+        """
+        return await asyncio.to_thread(self._rescore, request, client)
+
+    def _rescore(self, request: RescoreRequest, client: str | None) -> FullResponse:
+        """Re-score synchronously (see rescore)."""
+        start_time = time.time()
+        request_id = uuid.uuid4().hex
+
+        filter_errors = self.filter_engine.validate_filters(request.filters)
+        if filter_errors:
+            raise ValueError(f"Invalid filters: {'; '.join(filter_errors)}")
+
+        if request.run_id is not None:
+            run = self.get_run(request.run_id, client)
+            personas = run.personas
+            responses = run.responses
+            sample_weights = run.weights
+            questions = self._reweight_questions(run.questions, request.weights)
+            threshold = (
+                request.threshold
+                if request.threshold is not None
+                else run.response.result.threshold
+            )
+            filters_applied = run.response.filters_applied + request.filters
+            personas_total = run.response.personas_total
+            concept_name = run.concept.name
+            concept = run.concept
+            providers = run.response.meta.providers
+            panel = run.response.meta.panel
+        else:
+            personas, responses, questions, sample_weights = self._responses_from_dataset(
+                request.dataset, request.weights
+            )
+            threshold = request.threshold
+            filters_applied = request.filters
+            personas_total = len(personas)
+            concept_name = request.concept_name or "Re-scored dataset"
+            concept = None
+            providers = None
+            panel = None
+
+        _, match_flags = self.filter_engine.apply_filters(personas, request.filters)
+        personas_matched = sum(match_flags)
+        if personas_matched == 0:
+            raise ValueError("No personas matched the specified filters")
+
+        matched_weights = None
+        if sample_weights is not None:
+            matched_weights = [w for w, matched in zip(sample_weights, match_flags) if matched]
+        metrics, composite_score, breakdown, result = self._score(
+            [r for r, matched in zip(responses, match_flags) if matched],
+            questions,
+            threshold,
+            matched_weights,
+        )
+
+        processing_time = int((time.time() - start_time) * 1000)
+        logger.info(
+            "[%s] Re-scored %s in %dms - composite score: %.3f",
+            request_id,
+            request.run_id or "dataset",
+            processing_time,
+            composite_score,
+        )
+
+        response = FullResponse.model_construct(
+            result=result,
+            filters_applied=filters_applied,
+            personas_total=personas_total,
+            personas_matched=personas_matched,
+            criteria_breakdown=breakdown,
+            metrics=metrics,
+            meta=Meta(
+                request_id=request_id,
+                concept_name=concept_name,
+                processing_time_ms=processing_time,
+                providers=providers,
+                client=client,
+                rescored_from=request.run_id,
+                panel=panel,
+            ),
+        )
+
+        if request.output_dataset or request.include_report:
+            dataset = self._build_dataset(
+                personas, responses, match_flags, questions, weights=sample_weights
+            )
+            if request.output_dataset:
+                response.dataset = dataset
+
         if request.include_report:
             response.report = self.report_generator.generate_report(
                 result=result,
-                concept_name=request.concept.name,
-                personas_total=len(request.personas),
+                concept_name=concept_name,
+                personas_total=personas_total,
                 personas_matched=personas_matched,
                 criteria_breakdown=breakdown,
                 metrics=metrics,
                 meta=response.meta,
-                dataset=response.dataset,
-                filters_applied=request.filters if request.filters else None,
-                questions=request.survey_config.questions,
-                concept=request.concept,
+                dataset=[row for row, matched in zip(dataset, match_flags) if matched],
+                filters_applied=filters_applied or None,
+                questions=questions,
+                concept=concept,
             )
 
         return response
 
+    def _score(
+        self,
+        responses: list[dict[str, Any]],
+        questions: list[Question],
+        threshold: float,
+        weights: list[float] | None = None,
+    ) -> tuple[dict[str, QuestionMetrics], float, list[CriteriaBreakdown], ResultSummary]:
+        """
+        Score responses: metrics, composite score, threshold and confidence intervals.
+
+        Args:
+            responses: Response dictionaries of the personas to score
+            questions: Survey questions (weights give the composite)
+            threshold: Pass/fail threshold
+            weights: Optional persona weights aligned with responses
+
+        Returns:
+            metrics, composite_score, criteria breakdown, result summary
+        """
+        means = self.scoring_engine.response_means(responses, questions)
+        pmfs = self.scoring_engine.response_pmfs(responses, questions)
+        persona_weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        metrics = self.scoring_engine.metrics_from_means(means, questions, persona_weights, pmfs)
+        composite_score, breakdown = self.scoring_engine.calculate_composite_score(
+            metrics, questions
+        )
+        result = self.scoring_engine.evaluate_threshold(composite_score, threshold)
+        self.scoring_engine.add_confidence_intervals(
+            means, questions, metrics, result, persona_weights
+        )
+        return metrics, composite_score, breakdown, result
+
+    def get_run(self, run_id: str, client: str | None = None) -> StoredRun:
+        """
+        Get a stored run.
+
+        Args:
+            run_id: request_id of the run
+            client: Authenticated client name; runs of other clients are not visible
+
+        Returns:
+            StoredRun
+
+        Raises:
+            NotFoundError: If the run is not stored or belongs to another client
+        """
+        run = self.result_store.get(run_id) if self.result_store is not None else None
+        if run is None or (client is not None and run.response.meta.client != client):
+            raise NotFoundError(f"Run not found: {run_id}")
+        return run
+
+    def get_panel(self, panel_ref: str, client: str | None = None) -> Panel:
+        """
+        Get a stored persona panel.
+
+        Args:
+            panel_ref: "<panel_id>" (latest version) or "<panel_id>@<version>"
+            client: Authenticated client name; panels of other clients are not visible
+
+        Returns:
+            Panel
+
+        Raises:
+            NotFoundError: If the panel (version) is not stored for this client
+            ValueError: If no panel store is configured
+        """
+        if self.panel_store is None:
+            raise ValueError("panel_id requires a panel store (PANEL_STORE)")
+        panel_id, version = parse_panel_ref(panel_ref)
+        panel = self.panel_store.get(panel_id, version, client)
+        if panel is None:
+            raise NotFoundError(f"Panel not found: {panel_ref}")
+        return panel
+
+    @staticmethod
+    def _reweight_questions(
+        questions: list[Question], weights: dict[str, float] | None
+    ) -> list[Question]:
+        """Apply new weights to a run's questions (weights must cover every question)."""
+        if weights is None:
+            return questions
+        q_ids = {q.id for q in questions}
+        if set(weights) != q_ids:
+            raise ValueError(
+                f"weights must cover exactly the run's questions: {', '.join(sorted(q_ids))}"
+            )
+        return [q.model_copy(update={"weight": weights[q.id]}) for q in questions]
+
+    @staticmethod
+    def _responses_from_dataset(
+        dataset: list[dict[str, Any]], weights: dict[str, float]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[Question], list[float] | None]:
+        """
+        Rebuild personas, responses, questions and sample weights from an output dataset.
+
+        Args:
+            dataset: Rows from a previous run's output_dataset
+            weights: question_id -> weight for the questions to score
+
+        Returns:
+            personas: Persona attributes per row (response columns removed)
+            responses: Response dictionaries aligned with personas
+            questions: Questions carrying only id and weight
+            sample_weights: Post-stratification weights if the run was sampled, else None
+
+        Raises:
+            ValueError: If a row is missing a question's mean or sample weight
+        """
+        response_columns = {
+            f"{q_id}{suffix}"
+            for q_id in weights
+            for suffix in ("_text", "_samples", "_pmf", "_mean", "_generation_mode")
+        }
+        response_columns.update(("matched_filter", SAMPLE_WEIGHT_COLUMN))
+        sampled = any(SAMPLE_WEIGHT_COLUMN in row for row in dataset)
+        sample_weights = [] if sampled else None
+
+        personas = []
+        responses = []
+        for row in dataset:
+            persona_responses = {}
+            for q_id in weights:
+                mean = row.get(f"{q_id}_mean")
+                if not isinstance(mean, (int, float)):
+                    raise ValueError(f"Dataset row {row['persona_id']} has no numeric {q_id}_mean")
+                persona_responses[q_id] = {
+                    "raw_text": row.get(f"{q_id}_text", ""),
+                    "pmf": row.get(f"{q_id}_pmf", []),
+                    "mean": mean,
+                }
+            if sampled:
+                weight = row.get(SAMPLE_WEIGHT_COLUMN)
+                if not isinstance(weight, (int, float)) or weight < 0:
+                    raise ValueError(
+                        f"Dataset row {row['persona_id']} has no valid {SAMPLE_WEIGHT_COLUMN}"
+                    )
+                sample_weights.append(weight)
+            personas.append({k: v for k, v in row.items() if k not in response_columns})
+            responses.append({"persona_id": row["persona_id"], "responses": persona_responses})
+
+        # Reference sets are not needed for scoring, so skip their validation
+        questions = [
+            Question.model_construct(id=q_id, text=q_id, weight=w, ssr_reference_sets=[])
+            for q_id, w in weights.items()
+        ]
+        return personas, responses, questions, sample_weights
+
     async def _generate_all_responses(
         self,
         llm_service: LLMService,
@@ -194,6 +639,7 @@ class Orchestrator:
         personas: list[dict[str, Any]],
         concept: Concept,
         questions: list[Question],
+        prepared: PreparedConcept | None = None,
     ) -> list[dict[str, Any]]:
         """
         Generate responses for all personas and questions.
@@ -206,6 +652,7 @@ class Orchestrator:
             personas: List of persona dictionaries
             concept: Product concept
             questions: Survey questions
+            prepared: Concept content prepared once for the run
 
         Returns:
             List of response dictionaries for each persona
@@ -222,10 +669,11 @@ class Orchestrator:
 
         async def _process_with_limit(persona):
             nonlocal completed
-            async with semaphore:
-                result = await self._process_single_persona(
-                    llm_service, ssr_engine, persona, concept, questions
-                )
+            async with acquire(semaphore, "persona"):
+                with stage("persona"):
+                    result = await self._process_single_persona(
+                        llm_service, ssr_engine, persona, concept, questions, prepared
+                    )
                 completed += 1
                 logger.info(
                     "Persona %s complete (%d/%d)",
@@ -235,12 +683,90 @@ class Orchestrator:
                 )
                 return result
 
-        responses = await asyncio.gather(
-            *[_process_with_limit(p) for p in personas]
-        )
+        responses = await asyncio.gather(*[_process_with_limit(p) for p in personas])
 
         return list(responses)
 
+    async def _generate_all_responses_batch(
+        self,
+        llm_service: LLMService,
+        ssr_engine: SSREngine,
+        personas: list[dict[str, Any]],
+        concept: Concept,
+        questions: list[Question],
+        prepared: PreparedConcept | None = None,
+    ) -> tuple[list[dict[str, Any]], BatchJobInfo]:
+        """
+        Generate responses for all personas through one offline batch job.
+
+        All prompts are submitted together and the job is polled until it
+        finishes; the outputs are then mapped to Likert PMFs with SSR exactly
+        as in sync mode. Backends that support it also embed the responses
+        for SSR in a second batch job.
+
+        Args:
+            llm_service: LLM service for generation
+            ssr_engine: SSR engine for mapping to Likert
+            personas: List of persona dictionaries
+            concept: Product concept
+            questions: Survey questions
+            prepared: Concept content prepared once for the run
+
+        Returns:
+            Tuple of (response dictionaries for each persona, batch job info)
+        """
+        backend = llm_service.create_batch_backend(concept, prepared)
+        records = await llm_service.build_batch_records(personas, concept, questions)
+        batch = await llm_service.run_batch(backend, records)
+
+        semaphore = asyncio.Semaphore(self.settings.concurrency_limit)
+
+        async def _collect(persona):
+            async with acquire(semaphore, "collect"):
+                with stage("collect"):
+                    return await llm_service.collect_batch_responses(
+                        persona, concept, questions, batch, prepared
+                    )
+
+        answers = await asyncio.gather(*[_collect(p) for p in personas])
+
+        # Embed all response texts in one batch too, where the backend supports it
+        texts = {
+            f"{persona['persona_id']}/{q_id}": text
+            for persona, persona_answers in zip(personas, answers)
+            for q_id, (text, _) in persona_answers.items()
+        }
+        embeddings = await llm_service.run_batch_embeddings(backend, texts)
+
+        async def _score_persona(persona, persona_answers):
+            async with acquire(semaphore, "persona"):
+                with stage("persona"):
+                    results = await asyncio.gather(
+                        *[
+                            self._score_response(
+                                ssr_engine,
+                                q,
+                                *persona_answers[q.id],
+                                embeddings.get(f"{persona['persona_id']}/{q.id}"),
+                            )
+                            for q in questions
+                        ]
+                    )
+                    return {
+                        "persona_id": persona["persona_id"],
+                        "responses": {q_id: data for q_id, data in results},
+                    }
+
+        responses = await asyncio.gather(*[_score_persona(p, a) for p, a in zip(personas, answers)])
+
+        job_info = BatchJobInfo(
+            backend=batch.backend,
+            job_id=batch.job_id,
+            records=len(records),
+            failed_records=len(records) - len(batch.outputs),
+        )
+        return list(responses), job_info
+
     async def _process_single_persona(
         self,
         llm_service: LLMService,
@@ -248,12 +774,14 @@ class Orchestrator:
         persona: dict[str, Any],
         concept: Concept,
         questions: list[Question],
+        prepared: PreparedConcept | None = None,
     ) -> dict[str, Any]:
         """
         Process all questions for a single persona.
 
         For each question:
-        1. Generate LLM response (uses vision provider if images present)
+        1. Generate LLM response (uses vision provider if images present).
+           In multi_question mode one call answers every question.
         2. Map response to Likert PMF using SSR
 
         Args:
@@ -262,23 +790,39 @@ class Orchestrator:
             persona: Persona dictionary
             concept: Product concept
             questions: Survey questions
+            prepared: Concept content prepared once for the run
 
         Returns:
             Response dictionary with persona_id and responses
         """
+        samples = llm_service.options.samples_per_persona
+
         async def _process_question(question: Question):
-            raw_text = await llm_service.generate_response(persona, concept, question)
-            pmf, mean = await ssr_engine.map_response_to_likert(
-                raw_text,
-                question.ssr_reference_sets,
+            texts = await llm_service.generate_response_samples(
+                persona, concept, question, prepared, samples
             )
-            return question.id, {
-                "raw_text": raw_text,
-                "pmf": [round(p, 3) for p in pmf],
-                "mean": round(mean, 2),
-            }
+            return await self._score_response(ssr_engine, question, texts, "per_question")
 
-        results = await asyncio.gather(*[_process_question(q) for q in questions])
+        if len(questions) > 1 and llm_service.options.question_mode == "multi_question":
+            answers = await llm_service.generate_persona_response_samples(
+                persona, concept, questions, prepared, samples
+            )
+            results = await asyncio.gather(
+                *[self._score_response(ssr_engine, q, *answers[q.id]) for q in questions]
+            )
+        elif len(questions) > 1 and llm_service.uses_prompt_cache(concept):
+            # A cache entry is only readable once the first call has started
+            # responding, so generate one answer first and the rest against it;
+            # only the generation waits, its SSR runs alongside the others
+            first_texts = await llm_service.generate_response_samples(
+                persona, concept, questions[0], prepared, samples
+            )
+            results = await asyncio.gather(
+                self._score_response(ssr_engine, questions[0], first_texts, "per_question"),
+                *[_process_question(q) for q in questions[1:]],
+            )
+        else:
+            results = await asyncio.gather(*[_process_question(q) for q in questions])
 
         persona_responses: dict[str, Any] = {
             "persona_id": persona["persona_id"],
@@ -287,37 +831,53 @@ class Orchestrator:
 
         return persona_responses
 
+    async def _score_response(
+        self,
+        ssr_engine: SSREngine,
+        question: Question,
+        texts: str | list[str],
+        generation_mode: str,
+        response_embedding: list[float] | None = None,
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        Map a generated answer (or several sampled answers) to a Likert PMF.
+
+        Sampled answers are scored together and their PMFs averaged; the
+        entry then lists them under "samples", with the first as raw_text.
+        The PMF is kept as a float32 array and the mean unrounded; rounding
+        happens only when the dataset is serialized.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        if len(texts) == 1:
+            pmf, mean = await ssr_engine.map_response_to_likert(
+                texts[0],
+                question.ssr_reference_sets,
+                response_embedding,
+            )
+        else:
+            pmf, mean = await ssr_engine.map_samples_to_likert(texts, question.ssr_reference_sets)
+
+        entry = {
+            "raw_text": texts[0],
+            "pmf": np.asarray(pmf, dtype=np.float32),
+            "mean": float(mean),
+            "generation_mode": generation_mode,
+        }
+        if len(texts) > 1:
+            entry["samples"] = texts
+        return question.id, entry
+
     def _build_dataset(
         self,
         personas: list[dict[str, Any]],
         responses: list[dict[str, Any]],
         match_flags: list[bool],
         questions: list[Question],
+        include_generation_mode: bool = False,
+        weights: list[float] | None = None,
     ) -> list[dict[str, Any]]:
-        """
-        Build flat dataset with personas + results.
-
-        Args:
-            personas: List of persona dictionaries
-            responses: List of response dictionaries
-            match_flags: Boolean flags for filter matches
-            questions: Survey questions
-
-        Returns:
-            Flat dataset with persona attributes and response data
-        """
-        dataset = []
-
-        for persona, response, matched in zip(personas, responses, match_flags):
-            row = {**persona, "matched_filter": matched}
-
-            for question in questions:
-                q_id = question.id
-                q_response = response["responses"][q_id]
-                row[f"{q_id}_text"] = q_response["raw_text"]
-                row[f"{q_id}_pmf"] = q_response["pmf"]
-                row[f"{q_id}_mean"] = q_response["mean"]
-
-            dataset.append(row)
-
-        return dataset
+        """Build flat dataset with personas + results (see build_dataset_rows)."""
+        return build_dataset_rows(
+            personas, responses, match_flags, questions, include_generation_mode, weights
+        )
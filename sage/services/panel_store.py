@@ -0,0 +1,459 @@
+"""Registry of persona panels uploaded once and referenced by id.
+
+Instead of sending the full persona list with every request, a panel is
+uploaded with ``POST /panels`` (JSON, CSV or Parquet) and referenced from
+``TestConceptRequest.panel_id`` as ``<panel_id>`` (latest version) or
+``<panel_id>@<version>``. Every upload of an existing panel_id creates a new
+version, so runs stay reproducible.
+
+Panels are stored column-wise (one value list per attribute) and loaded
+panels keep per-attribute column arrays, so filters run against prebuilt
+arrays instead of the persona dictionaries.
+
+Backends:
+- sqlite: on-disk SQLite database; recently used panels are kept in memory
+- memory: in-process only (lost on restart)
+"""
+
+import csv
+import io
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+from ..config import get_settings
+from ..exceptions import ConfigurationError, ValidationError
+from ..models.request import PANEL_REF_PATTERN
+from ..models.response import PanelInfo
+from .dataset_export import require_pyarrow
+from .filter_engine import PersonaColumns
+
+logger = logging.getLogger(__name__)
+
+PANEL_FORMATS = ("json", "csv", "parquet")
+
+
+@dataclass
+class Panel:
+    """One version of a persona panel."""
+
+    panel_id: str
+    version: int
+    personas: list[dict[str, Any]]
+    client: str | None = None
+    created_at: float = field(default_factory=time.time)
+    _columns: PersonaColumns | None = field(default=None, init=False, repr=False)
+
+    @property
+    def ref(self) -> str:
+        return f"{self.panel_id}@{self.version}"
+
+    @property
+    def size(self) -> int:
+        return len(self.personas)
+
+    @property
+    def attributes(self) -> list[str]:
+        """Attribute names in order of first appearance."""
+        names: dict[str, None] = {}
+        for persona in self.personas:
+            names.update(dict.fromkeys(persona))
+        return list(names)
+
+    @property
+    def columns(self) -> PersonaColumns:
+        """Per-attribute column arrays, built once and kept with the panel."""
+        if self._columns is None:
+            self._columns = PersonaColumns(self.personas)
+        return self._columns
+
+    def index(self) -> None:
+        """Build the column arrays of every attribute up front."""
+        self.columns.build(self.attributes)
+
+    def info(self) -> PanelInfo:
+        """Build the public description of this panel version."""
+        return PanelInfo(
+            panel_id=self.panel_id,
+            version=self.version,
+            ref=self.ref,
+            personas=self.size,
+            attributes=self.attributes,
+            client=self.client,
+            created_at=datetime.fromtimestamp(self.created_at, tz=timezone.utc),
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialise personas column-wise to compressed JSON."""
+        columns = {
+            name: [persona.get(name) for persona in self.personas] for name in self.attributes
+        }
+        payload = {"size": self.size, "columns": columns}
+        return zlib.compress(
+            json.dumps(payload, separators=(",", ":"), default=_json_value).encode("utf-8")
+        )
+
+    @staticmethod
+    def personas_from_bytes(data: bytes) -> list[dict[str, Any]]:
+        """Deserialise personas written by to_bytes."""
+        payload = json.loads(zlib.decompress(data))
+        personas: list[dict[str, Any]] = [{} for _ in range(payload["size"])]
+        for name, values in payload["columns"].items():
+            for persona, value in zip(personas, values):
+                if value is not None:
+                    persona[name] = value
+        return personas
+
+
+def parse_panel_ref(ref: str) -> tuple[str, int | None]:
+    """
+    Split a panel reference into panel_id and version.
+
+    Args:
+        ref: "<panel_id>" (latest version) or "<panel_id>@<version>"
+
+    Returns:
+        (panel_id, version or None for the latest)
+
+    Raises:
+        ValidationError: If the reference is malformed
+    """
+    if not re.match(PANEL_REF_PATTERN, ref):
+        raise ValidationError(
+            f"Invalid panel id: {ref!r} (letters, digits, '_', '-' and '.', up to 64 characters)"
+        )
+    panel_id, _, version = ref.partition("@")
+    return panel_id, int(version) if version else None
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a non-JSON value (dates, times, decimals) to a JSON scalar."""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return str(value)
+
+
+def _csv_value(value: str) -> Any:
+    """Convert a CSV cell to int or float where possible."""
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_panel(body: bytes, fmt: str) -> list[dict[str, Any]]:
+    """
+    Parse an uploaded panel.
+
+    Args:
+        body: Uploaded file
+        fmt: "json" (a list of personas, or {"personas": [...]}), "csv" (header row
+            of attribute names) or "parquet" (one row per persona)
+
+    Returns:
+        Persona dictionaries (missing values are left out)
+
+    Raises:
+        ValidationError: If the upload cannot be parsed
+        ConfigurationError: If the format needs pyarrow and it is not installed
+    """
+    if fmt == "json":
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise ValidationError(f"Invalid JSON panel: {e}") from e
+        personas = data.get("personas") if isinstance(data, dict) else data
+        if not isinstance(personas, list) or not all(isinstance(p, dict) for p in personas):
+            raise ValidationError('JSON panels must be a list of personas or {"personas": [...]}')
+        return personas
+
+    if fmt == "csv":
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            return [
+                {
+                    name: value if name == "persona_id" else _csv_value(value)
+                    for name, value in row.items()
+                    if name is not None and value not in (None, "")
+                }
+                for row in reader
+            ]
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValidationError(f"Invalid CSV panel: {e}") from e
+
+    if fmt == "parquet":
+        require_pyarrow(fmt)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            rows = pq.read_table(io.BytesIO(body)).to_pylist()
+        except pa.ArrowException as e:
+            raise ValidationError(f"Invalid Parquet panel: {e}") from e
+        # Dates, timestamps and decimals become ISO strings and numbers, as in JSON panels
+        scalars = (str, int, float, bool, list, dict)
+        return [
+            {
+                k: v if isinstance(v, scalars) else _json_value(v)
+                for k, v in row.items()
+                if v is not None
+            }
+            for row in rows
+        ]
+
+    raise ValidationError(f"Unknown panel format: {fmt} (expected one of {PANEL_FORMATS})")
+
+
+def validate_panel(personas: list[dict[str, Any]], max_personas: int) -> None:
+    """
+    Check that a panel can be stored.
+
+    Args:
+        personas: Parsed personas
+        max_personas: Largest panel allowed
+
+    Raises:
+        ValidationError: If the panel is empty, too large or persona ids are missing or repeated
+    """
+    if not personas:
+        raise ValidationError("At least one persona is required")
+    if len(personas) > max_personas:
+        raise ValidationError(f"Maximum {max_personas} personas allowed per panel")
+    seen: set = set()
+    for persona in personas:
+        persona_id = persona.get("persona_id")
+        if persona_id is None:
+            raise ValidationError("All personas must have a persona_id")
+        if persona_id in seen:
+            raise ValidationError(f"Duplicate persona_id: {persona_id}")
+        seen.add(persona_id)
+
+
+class PanelStore(ABC):
+    """Abstract base class for panel store backends."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def save(
+        self, panel_id: str, personas: list[dict[str, Any]], client: str | None = None
+    ) -> Panel:
+        """
+        Store personas as the next version of a panel.
+
+        Args:
+            panel_id: Panel name
+            personas: Validated personas
+            client: Owning client (panels are only visible to their client)
+
+        Returns:
+            The stored panel version, with its column index built
+        """
+        with self._lock:
+            version = (self._latest_version(panel_id, client) or 0) + 1
+            panel = Panel(panel_id=panel_id, version=version, personas=personas, client=client)
+            self._write(panel)
+        panel.index()
+        return panel
+
+    @abstractmethod
+    def get(
+        self, panel_id: str, version: int | None = None, client: str | None = None
+    ) -> Panel | None:
+        """Get a panel version (latest if version is None), or None if unknown."""
+        pass
+
+    @abstractmethod
+    def list_panels(self, client: str | None = None) -> list[PanelInfo]:
+        """Describe the latest version of every panel of a client."""
+        pass
+
+    @abstractmethod
+    def _latest_version(self, panel_id: str, client: str | None) -> int | None:
+        pass
+
+    @abstractmethod
+    def _write(self, panel: Panel) -> None:
+        pass
+
+
+class MemoryPanelStore(PanelStore):
+    """In-process panel store."""
+
+    def __init__(self):
+        super().__init__()
+        self._panels: dict[tuple[str | None, str], list[Panel]] = {}
+
+    def get(
+        self, panel_id: str, version: int | None = None, client: str | None = None
+    ) -> Panel | None:
+        versions = self._panels.get((client, panel_id), [])
+        if version is None:
+            return versions[-1] if versions else None
+        return versions[version - 1] if 0 < version <= len(versions) else None
+
+    def list_panels(self, client: str | None = None) -> list[PanelInfo]:
+        return [
+            versions[-1].info()
+            for (owner, _), versions in sorted(self._panels.items(), key=lambda kv: kv[0][1])
+            if owner == client
+        ]
+
+    def _latest_version(self, panel_id: str, client: str | None) -> int | None:
+        return len(self._panels.get((client, panel_id), [])) or None
+
+    def _write(self, panel: Panel) -> None:
+        self._panels.setdefault((panel.client, panel.panel_id), []).append(panel)
+
+
+class SQLitePanelStore(PanelStore):
+    """On-disk panel store; recently used panels stay in memory with their index."""
+
+    def __init__(self, path: str, cache_size: int):
+        """
+        Initialize SQLite store, creating the database if needed.
+
+        Args:
+            path: Database file path
+            cache_size: Panels kept loaded (and indexed) in memory
+        """
+        super().__init__()
+        self.path = path
+        self.cache_size = cache_size
+        self._loaded: OrderedDict[tuple[str, str, int], Panel] = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS panels ("
+            "client TEXT NOT NULL, panel_id TEXT NOT NULL, version INTEGER NOT NULL, "
+            "created REAL NOT NULL, personas INTEGER NOT NULL, attributes TEXT NOT NULL, "
+            "payload BLOB NOT NULL, PRIMARY KEY (client, panel_id, version))"
+        )
+
+    def get(
+        self, panel_id: str, version: int | None = None, client: str | None = None
+    ) -> Panel | None:
+        owner = client or ""
+        with self._lock:
+            if version is None:
+                version = self._latest_version(panel_id, client)
+                if version is None:
+                    return None
+            key = (owner, panel_id, version)
+            panel = self._loaded.get(key)
+            if panel is not None:
+                self._loaded.move_to_end(key)
+                return panel
+            row = self._conn.execute(
+                "SELECT created, payload FROM panels "
+                "WHERE client = ? AND panel_id = ? AND version = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+
+        panel = Panel(
+            panel_id=panel_id,
+            version=version,
+            personas=Panel.personas_from_bytes(row[1]),
+            client=client,
+            created_at=row[0],
+        )
+        panel.index()
+        self._remember(panel)
+        return panel
+
+    def list_panels(self, client: str | None = None) -> list[PanelInfo]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT panel_id, MAX(version), created, personas, attributes FROM panels "
+                "WHERE client = ? GROUP BY panel_id ORDER BY panel_id",
+                (client or "",),
+            ).fetchall()
+        return [
+            PanelInfo(
+                panel_id=row[0],
+                version=row[1],
+                ref=f"{row[0]}@{row[1]}",
+                personas=row[3],
+                attributes=json.loads(row[4]),
+                client=client,
+                created_at=datetime.fromtimestamp(row[2], tz=timezone.utc),
+            )
+            for row in rows
+        ]
+
+    def _latest_version(self, panel_id: str, client: str | None) -> int | None:
+        row = self._conn.execute(
+            "SELECT MAX(version) FROM panels WHERE client = ? AND panel_id = ?",
+            (client or "", panel_id),
+        ).fetchone()
+        return row[0]
+
+    def _write(self, panel: Panel) -> None:
+        self._conn.execute(
+            "INSERT INTO panels "
+            "(client, panel_id, version, created, personas, attributes, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                panel.client or "",
+                panel.panel_id,
+                panel.version,
+                panel.created_at,
+                panel.size,
+                json.dumps(panel.attributes),
+                panel.to_bytes(),
+            ),
+        )
+        self._remember(panel)
+
+    def _remember(self, panel: Panel) -> None:
+        if self.cache_size <= 0:
+            return
+        key = (panel.client or "", panel.panel_id, panel.version)
+        with self._lock:
+            self._loaded[key] = panel
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.cache_size:
+                self._loaded.popitem(last=False)
+
+
+@lru_cache
+def get_panel_store() -> PanelStore | None:
+    """
+    Get the configured panel store (shared across requests).
+
+    Returns:
+        PanelStore, or None if PANEL_STORE is empty
+
+    Raises:
+        ConfigurationError: If the backend is unknown
+    """
+    settings = get_settings()
+    backend = settings.panel_store
+    if not backend:
+        return None
+    if backend == "memory":
+        return MemoryPanelStore()
+    if backend == "sqlite":
+        logger.info("Panel store: SQLite at %s", settings.panel_store_path)
+        return SQLitePanelStore(settings.panel_store_path, settings.panel_cache_size)
+    raise ConfigurationError(f"Unknown panel store backend: {backend}")
@@ -0,0 +1,209 @@
+"""Per-run prepared concept with decoded images and reusable provider content blocks.
+
+A concept's images are identical for every persona x question in a run, so they
+are decoded, validated and formatted into provider-specific content blocks once
+and the same block objects are reused for every call.
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from ..exceptions import ValidationError
+from ..models.request import Concept, ContentItem
+from ..models.response import ImagePreprocessingInfo
+from .image_processor import ImageProcessor, ProcessedImage
+
+if TYPE_CHECKING:
+    from .llm_provider import VisionProvider
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of each supported image format
+_IMAGE_SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def detect_image_media_type(raw: bytes) -> str | None:
+    """Detect image media type from decoded bytes, or None if unrecognised."""
+    for signature, media_type in _IMAGE_SIGNATURES:
+        if raw.startswith(signature):
+            return media_type
+    if raw[:4] == b"RIFF" and raw[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """A decoded and validated concept image."""
+
+    data: str  # base64, whitespace stripped
+    media_type: str
+    size_bytes: int
+    sha256: str
+    raw: bytes = field(repr=False, compare=False)
+
+    def as_dict(self) -> dict:
+        """Image dict in the format accepted by VisionProvider.generate_with_images."""
+        return {"data": self.data, "media_type": self.media_type}
+
+
+class PreparedConcept:
+    """Concept content prepared once per run and shared by every generation call."""
+
+    def __init__(self, concept: Concept, image_processor: ImageProcessor | None = None):
+        """
+        Decode and validate the concept's images.
+
+        Args:
+            concept: Product concept being tested
+            image_processor: Optional processor that downscales and recompresses
+                             images to each vision model family's target
+
+        Raises:
+            ValidationError: If an image is not valid base64
+        """
+        self.concept = concept
+        self.has_video = any(c.type == "video" for c in concept.content)
+
+        # Video takes priority over images, so images are not sent in that case
+        images: list[PreparedImage] = []
+        if not self.has_video:
+            for i, item in enumerate(c for c in concept.content if c.type == "image"):
+                images.append(self._prepare_image(i, item))
+        self.images: tuple[PreparedImage, ...] = tuple(images)
+        self.image_dicts: list[dict] = [img.as_dict() for img in self.images]
+        self.image_processor = image_processor
+        self._processed: dict[str, list[ProcessedImage]] = {}
+        self._processed_dicts: dict[str, list[dict]] = {}
+        self._blocks: dict[tuple[str, str], tuple[dict, ...]] = {}
+        self._fingerprints: dict[str, str] = {}
+
+    def images_for(self, provider: "VisionProvider") -> list[dict]:
+        """
+        Get image dicts for a provider, preprocessed for its family if enabled.
+
+        Args:
+            provider: Vision provider the images are for
+
+        Returns:
+            List of image data dicts
+        """
+        if self.image_processor is None or not self.images:
+            return self.image_dicts
+        family = getattr(provider, "family", "")
+        if family not in self._processed:
+            processed = [self.image_processor.process(img, family) for img in self.images]
+            self._processed[family] = processed
+            self._processed_dicts[family] = [p.as_dict() for p in processed]
+        return self._processed_dicts[family]
+
+    def image_blocks(self, provider: "VisionProvider") -> tuple[dict, ...]:
+        """
+        Get the provider's content blocks for this concept's images.
+
+        Blocks are built on first use per provider family and then reused, so
+        the base64 payload is formatted once per run rather than once per call.
+
+        Args:
+            provider: Vision provider the blocks are for
+
+        Returns:
+            Content blocks to place before the text prompt (treat as read-only)
+        """
+        key = (type(provider).__name__, getattr(provider, "family", ""))
+        if key not in self._blocks:
+            self._blocks[key] = tuple(provider.format_images(self.images_for(provider)))
+        return self._blocks[key]
+
+    def image_fingerprint(self, provider: "VisionProvider") -> str:
+        """
+        Hash identifying the image content sent to a provider (for cache keys).
+
+        Args:
+            provider: Vision provider the images are for
+
+        Returns:
+            Hex SHA-256 over the image hashes, provider family and preprocessing target
+        """
+        family = getattr(provider, "family", "")
+        if family not in self._fingerprints:
+            digest = hashlib.sha256(family.encode("utf-8"))
+            if self.image_processor is not None:
+                processor = self.image_processor
+                digest.update(f"|{processor.max_edge}|{processor.quality}".encode("utf-8"))
+            for img in self.images:
+                digest.update(img.sha256.encode("ascii"))
+            self._fingerprints[family] = digest.hexdigest()
+        return self._fingerprints[family]
+
+    def preprocessing_info(self, vision_calls: int) -> ImagePreprocessingInfo | None:
+        """
+        Summarise image preprocessing savings for the run.
+
+        Args:
+            vision_calls: Number of vision calls that sent the images
+
+        Returns:
+            ImagePreprocessingInfo, or None if no images were preprocessed
+        """
+        if not self._processed:
+            return None
+        # A run uses one vision provider, so report its family
+        family, processed = next(iter(self._processed.items()))
+        original = sum(p.original_bytes for p in processed)
+        reduced = sum(p.processed_bytes for p in processed)
+        tokens_original = sum(p.estimated_tokens_original for p in processed)
+        tokens_processed = sum(p.estimated_tokens_processed for p in processed)
+        return ImagePreprocessingInfo(
+            family=family,
+            images=len(processed),
+            original_bytes=original,
+            processed_bytes=reduced,
+            vision_calls=vision_calls,
+            bytes_saved=(original - reduced) * vision_calls,
+            estimated_tokens_original=tokens_original,
+            estimated_tokens_processed=tokens_processed,
+            estimated_tokens_saved=(tokens_original - tokens_processed) * vision_calls,
+        )
+
+    @staticmethod
+    def _prepare_image(index: int, item: ContentItem) -> PreparedImage:
+        if item.raw is not None:
+            # Uploaded as a binary part: no base64 to validate, encode once for providers
+            raw = item.raw
+            cleaned = base64.b64encode(raw).decode("ascii")
+        elif item.part_name is not None:
+            raise ValidationError(
+                f"Image {index} references multipart part '{item.part_name}', "
+                "which was not uploaded"
+            )
+        elif item.media_ref is not None:
+            raise ValidationError(f"Image {index} references media that was not loaded")
+        else:
+            cleaned = "".join(item.data.split())
+            try:
+                raw = base64.b64decode(cleaned, validate=True)
+            except (binascii.Error, ValueError) as e:
+                raise ValidationError(f"Image {index} is not valid base64: {e}") from e
+
+        media_type = detect_image_media_type(raw)
+        if media_type is None:
+            logger.warning("Image %d has an unrecognised format, sending as JPEG", index)
+            media_type = "image/jpeg"
+
+        return PreparedImage(
+            data=cleaned,
+            media_type=media_type,
+            size_bytes=len(raw),
+            sha256=hashlib.sha256(raw).hexdigest(),
+            raw=raw,
+        )
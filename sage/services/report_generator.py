@@ -67,8 +67,24 @@ class ReportGenerator:
             "|-------|-------|",
             f"| **Experiment ID** | `{meta.request_id}` |",
             f"| **Concept Name** | {meta.concept_name} |",
+        ]
+
+        if meta.rescored_from:
+            lines.append(f"| **Re-scored From** | `{meta.rescored_from}` |")
+        if meta.panel:
+            lines.append(f"| **Persona Panel** | `{meta.panel}` |")
+        if meta.sampling:
+            sampling = meta.sampling
+            lines.append(
+                f"| **Sample** | {sampling.sampled} of {sampling.population} matched "
+                f"({sampling.method}, seed {sampling.seed}, "
+                f"effective n {sampling.effective_sample_size:g}) |"
+            )
+
+        lines += [
             f"| **Personas Tested** | {personas_matched} of {personas_total} |",
-            f"| **Processing Time** | {processing_time_sec:.1f}s (~{processing_time_min:.1f} min) |",
+            f"| **Processing Time** | {processing_time_sec:.1f}s "
+            f"(~{processing_time_min:.1f} min) |",
         ]
 
         if meta.providers:
@@ -80,6 +96,54 @@ class ReportGenerator:
             lines.append(f"| **Embedding Model** | `{emb_model}` ({emb_provider}) |")
             lines.append(f"| **Vision Model** | `{vis_model}` ({vis_provider}) |")
 
+        if meta.video_analysis_mode:
+            lines.append(f"| **Video Analysis** | {meta.video_analysis_mode} |")
+
+        if meta.question_mode:
+            modes = ", ".join(
+                f"{mode}: {count}" for mode, count in (meta.generation_modes or {}).items()
+            )
+            lines.append(f"| **Question Mode** | {meta.question_mode} ({modes}) |")
+
+        if meta.batch_job:
+            job = meta.batch_job
+            lines.append(
+                f"| **Batch Job** | `{job.job_id}` ({job.backend}, {job.records} records, "
+                f"{job.failed_records} regenerated) |"
+            )
+
+        if meta.response_cache:
+            rc = meta.response_cache
+            lines.append(
+                f"| **Response Cache** | {rc.policy}: {rc.hits} hits, {rc.misses} misses "
+                f"(embeddings: {rc.embedding_hits} hits, {rc.embedding_misses} misses) |"
+            )
+
+        if meta.call_stats:
+            calls = ", ".join(
+                f"{route}: {stats.calls} (avg {stats.mean_ms / 1000:.1f}s)"
+                for route, stats in meta.call_stats.items()
+            )
+            lines.append(f"| **Model Calls** | {calls} |")
+
+        if meta.token_usage and meta.token_usage.calls:
+            usage = meta.token_usage
+            lines.append(
+                f"| **Tokens** | {usage.input_tokens:,} input, {usage.output_tokens:,} output, "
+                f"{usage.cache_read_input_tokens:,} cache read, "
+                f"{usage.cache_write_input_tokens:,} cache write |"
+            )
+
+        if meta.image_preprocessing:
+            info = meta.image_preprocessing
+            lines.append(
+                f"| **Image Preprocessing** | {info.images} image(s) for {info.family}: "
+                f"{info.original_bytes / 1024:.0f} KB -> {info.processed_bytes / 1024:.0f} KB "
+                f"per call; {info.bytes_saved / 1024 / 1024:.1f} MB and "
+                f"~{info.estimated_tokens_saved:,} input tokens saved over "
+                f"{info.vision_calls} calls |"
+            )
+
         if filters_applied:
             lines.append(f"| **Filters** | {', '.join(filters_applied)} |")
 
@@ -146,8 +210,17 @@ class ReportGenerator:
             f"| **Threshold** | {result.threshold:.2f} |",
             f"| **Margin** | {margin_sign}{result.margin:.3f} |",
             f"| **Verdict** | **{status}** ({verdict_action} by {margin_pct:.1f}%) |",
-            "\n---\n",
         ]
+        if result.composite_ci is not None:
+            level = f"{result.confidence_level * 100:g}%"
+            lines.extend(
+                [
+                    f"| **{level} CI** | {result.composite_ci.lower:.3f} - "
+                    f"{result.composite_ci.upper:.3f} |",
+                    f"| **P(score >= threshold)** | {result.pass_probability * 100:.1f}% |",
+                ]
+            )
+        lines.append("\n---\n")
         return "\n".join(lines)
 
     def _generate_criteria_breakdown(self, breakdown: list[CriteriaBreakdown]) -> str:
@@ -160,7 +233,7 @@ class ReportGenerator:
 
         for c in breakdown:
             lines.append(
-                f"| {c.question_id} | {c.weight*100:.0f}% | {c.raw_mean:.2f} | "
+                f"| {c.question_id} | {c.weight * 100:.0f}% | {c.raw_mean:.2f} | "
                 f"{c.normalized:.3f} | {c.contribution:.3f} |"
             )
 
@@ -187,7 +260,7 @@ class ReportGenerator:
             spread = "tight" if m.std_dev < 0.3 else "moderate" if m.std_dev < 0.6 else "wide"
             lines.append(
                 f"{i}. **{qid}** ({m.mean:.2f}) - "
-                f"Top 2 box: {m.top_2_box*100:.0f}%, "
+                f"Top 2 box: {m.top_2_box * 100:.0f}%, "
                 f"median: {m.median:.2f}, "
                 f"{spread} spread (std: {m.std_dev:.2f})\n"
             )
@@ -198,7 +271,7 @@ class ReportGenerator:
             spread = "tight" if m.std_dev < 0.3 else "moderate" if m.std_dev < 0.6 else "wide"
             lines.append(
                 f"{i}. **{qid}** ({m.mean:.2f}) - "
-                f"Bottom 2 box: {m.bottom_2_box*100:.0f}%, "
+                f"Bottom 2 box: {m.bottom_2_box * 100:.0f}%, "
                 f"median: {m.median:.2f}, "
                 f"{spread} spread (std: {m.std_dev:.2f})\n"
             )
@@ -215,18 +288,27 @@ class ReportGenerator:
         ]
 
         for qid, m in metrics.items():
+            mean = f"{m.mean:.2f}"
+            top_2_box = f"{m.top_2_box * 100:.0f}%"
+            if m.mean_ci is not None:
+                mean += f" ({m.mean_ci.lower:.2f}-{m.mean_ci.upper:.2f})"
+                top_2_box += (
+                    f" ({m.top_2_box_ci.lower * 100:.0f}-{m.top_2_box_ci.upper * 100:.0f}%)"
+                )
             lines.append(
-                f"| {qid} | {m.mean:.2f} | {m.median:.2f} | {m.std_dev:.2f} | "
-                f"{m.top_2_box*100:.0f}% | {m.bottom_2_box*100:.0f}% |"
+                f"| {qid} | {mean} | {m.median:.2f} | {m.std_dev:.2f} | "
+                f"{top_2_box} | {m.bottom_2_box * 100:.0f}% |"
             )
 
+        if any(m.mean_ci is not None for m in metrics.values()):
+            lines.append("\nRanges in parentheses are bootstrap confidence intervals.")
         lines.append("\n---\n")
         return "\n".join(lines)
 
     def _generate_distribution_analysis(self, metrics: dict[str, QuestionMetrics]) -> str:
         """Generate distribution analysis across all questions."""
         # Aggregate distributions across all questions
-        total_dist: dict[str, int] = {}
+        total_dist: dict[str, float] = {}
         for m in metrics.values():
             for rating, count in m.distribution.items():
                 total_dist[rating] = total_dist.get(rating, 0) + count
@@ -243,17 +325,29 @@ class ReportGenerator:
             "5": "Strongly Positive",
         }
 
-        lines = [
-            "### Distribution Analysis (All Questions Combined)\n",
-            "| Rating | Count | Percentage |",
-            "|--------|-------|------------|",
-        ]
+        # Mean response PMF across questions, when the full distributions are known
+        pmfs = [m.aggregate_pmf for m in metrics.values() if m.aggregate_pmf is not None]
+        mass = [sum(p[i] for p in pmfs) / len(pmfs) for i in range(5)] if pmfs else None
+
+        lines = ["### Distribution Analysis (All Questions Combined)\n"]
+        if mass is None:
+            lines.extend(["| Rating | Count | Percentage |", "|--------|-------|------------|"])
+        else:
+            lines.extend(
+                [
+                    "| Rating | Count | Percentage | Probability Mass |",
+                    "|--------|-------|------------|------------------|",
+                ]
+            )
 
-        for rating in ["1", "2", "3", "4", "5"]:
+        for i, rating in enumerate(["1", "2", "3", "4", "5"]):
             count = total_dist.get(rating, 0)
             pct = (count / total_responses * 100) if total_responses > 0 else 0
             label = labels.get(rating, rating)
-            lines.append(f"| {rating} ({label}) | {count} | {pct:.1f}% |")
+            row = f"| {rating} ({label}) | {round(count, 2)} | {pct:.1f}% |"
+            if mass is not None:
+                row += f" {mass[i] * 100:.1f}% |"
+            lines.append(row)
 
         # Interpret the distribution
         positive = total_dist.get("4", 0) + total_dist.get("5", 0)
@@ -277,6 +371,11 @@ class ReportGenerator:
             f"Overall sentiment is {sentiment}, with {pos_pct:.0f}% positive, "
             f"{neu_pct:.0f}% neutral, and {neg_pct:.0f}% negative responses.\n"
         )
+        if mass is not None:
+            lines.append(
+                f"Across the full response distributions, {(mass[3] + mass[4]) * 100:.0f}% "
+                "of the probability mass is on ratings 4-5.\n"
+            )
 
         lines.append("---\n")
         return "\n".join(lines)
@@ -349,12 +448,13 @@ class ReportGenerator:
             "## Conclusions\n",
             f"1. **Overall Result**: The concept {status} with a composite score of "
             f"{result.composite_score:.3f} against a threshold of {result.threshold:.2f} "
-            f"(margin: {margin_pct:.1f}%). The overall mean across all metrics is {overall_mean:.2f}/5.\n",
+            f"(margin: {margin_pct:.1f}%). "
+            f"The overall mean across all metrics is {overall_mean:.2f}/5.\n",
             f"2. **Strongest Metric**: {strongest[0]} scored {strongest[1].mean:.2f} "
-            f"with {strongest[1].top_2_box*100:.0f}% top 2 box and "
+            f"with {strongest[1].top_2_box * 100:.0f}% top 2 box and "
             f"median {strongest[1].median:.2f}.\n",
             f"3. **Weakest Metric**: {weakest[0]} scored {weakest[1].mean:.2f} "
-            f"with {weakest[1].bottom_2_box*100:.0f}% bottom 2 box and "
+            f"with {weakest[1].bottom_2_box * 100:.0f}% bottom 2 box and "
             f"median {weakest[1].median:.2f}.\n",
             f"4. **Response Consistency**: {most_polarised[0]} showed the most variation "
             f"(std dev: {most_polarised[1].std_dev:.2f}), suggesting differing reactions "
@@ -377,7 +477,8 @@ class ReportGenerator:
                 )
             else:
                 lines.append(
-                    "5. **Recommendation**: The concept did not meet the threshold by a significant margin. "
+                    "5. **Recommendation**: The concept did not meet the threshold "
+                    "by a significant margin. "
                     "Focus on improving the weakest metrics and consider concept refinement "
                     "or alternative creative directions.\n"
                 )
@@ -404,8 +505,9 @@ class ReportGenerator:
 
         if dataset and len(dataset) > 0:
             demo_keys = [
-                k for k in dataset[0].keys()
-                if not k.endswith(("_text", "_pmf", "_mean"))
+                k
+                for k in dataset[0].keys()
+                if not k.endswith(("_text", "_samples", "_pmf", "_mean", "_generation_mode"))
                 and k not in ("persona_id", "matched_filter")
             ]
             if demo_keys:
@@ -0,0 +1,184 @@
+"""Cross-request cache for generated responses and response embeddings.
+
+Identical requests (e.g. re-runs that only change threshold, filters or
+include_report) produce identical prompts, so their generations can be served
+from cache. Entries are keyed by a hash of everything that determines the
+model output: system and user prompt, image/video hashes, provider, model,
+temperature, output budget and sample index.
+
+Backends:
+- memory: in-process LRU with TTL (lost on restart)
+- sqlite: on-disk SQLite database with TTL (shared by workers on one host)
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from ..config import get_settings
+from ..exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(kind: str, **parts: Any) -> str:
+    """
+    Build a cache key from the inputs that determine a model output.
+
+    Args:
+        kind: Entry type ("generation" or "embedding")
+        **parts: JSON-serialisable key components
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding
+    """
+    payload = json.dumps({"kind": kind, **parts}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Abstract base class for response cache backends."""
+
+    def __init__(self, ttl: float):
+        """
+        Initialize response cache.
+
+        Args:
+            ttl: Seconds an entry stays valid (0 = never expires)
+        """
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        """Get a cached value, or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a value."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+        pass
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache with TTL."""
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Initialize memory cache.
+
+        Args:
+            max_size: Maximum number of entries (least recently used are evicted)
+            ttl: Seconds an entry stays valid (0 = never expires)
+        """
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if self._expired(created):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteResponseCache(ResponseCache):
+    """On-disk cache in a SQLite database with TTL."""
+
+    # Expired rows are purged once every this many writes
+    _PURGE_EVERY = 1000
+
+    def __init__(self, path: str, ttl: float):
+        """
+        Initialize SQLite cache, creating the database if needed.
+
+        Args:
+            path: Database file path
+            ttl: Seconds an entry stays valid (0 = never expires)
+        """
+        super().__init__(ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._writes += 1
+            if self.ttl > 0 and self._writes % self._PURGE_EVERY == 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache | None:
+    """
+    Get the configured response cache (shared across requests).
+
+    Returns:
+        ResponseCache, or None if RESPONSE_CACHE is not set
+
+    Raises:
+        ConfigurationError: If the backend is unknown
+    """
+    settings = get_settings()
+    backend = settings.response_cache
+    if not backend:
+        return None
+    if backend == "memory":
+        return MemoryResponseCache(settings.response_cache_size, settings.response_cache_ttl)
+    if backend == "sqlite":
+        logger.info("Response cache: SQLite at %s", settings.response_cache_path)
+        return SQLiteResponseCache(settings.response_cache_path, settings.response_cache_ttl)
+    raise ConfigurationError(f"Unknown response cache backend: {backend}")
@@ -0,0 +1,519 @@
+"""Persistent store for completed runs.
+
+Every finished run (personas, raw texts, PMFs, metrics and provider metadata)
+is written here so it can be re-scored, compared across runs or exported later
+without repeating any provider calls. Runs are indexed by request_id, concept
+name, client, generation model and completion time.
+
+Backends:
+- sqlite: on-disk SQLite database; writes go through a background writer
+  thread so serialisation and disk I/O stay off the request path, and the
+  writer deletes runs beyond the configured age and count
+- memory: in-process LRU of recent runs (lost on restart)
+
+Runs can be exported to Parquet in long format (one row per persona x
+question) for columnar analysis; this requires pyarrow (``pip install
+sage[arrow]``).
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from ..config import get_settings
+from ..exceptions import ConfigurationError
+from ..models.request import Concept, Question
+from ..models.response import FullResponse, RunSummary
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredRun:
+    """Everything needed to re-score or export a completed run."""
+
+    concept: Concept
+    questions: list[Question]
+    personas: list[dict[str, Any]]  # personas that were generated (after filtering)
+    responses: list[dict[str, Any]]  # aligned with personas
+    response: FullResponse  # result, metrics and meta (without dataset or report)
+    created_at: float = field(default_factory=time.time)
+    weights: list[float] | None = None  # post-stratification weights of a sampled run
+
+    @property
+    def request_id(self) -> str:
+        return self.response.meta.request_id
+
+    @property
+    def model(self) -> str | None:
+        providers = self.response.meta.providers
+        return providers.generation if providers else None
+
+    def summary(self) -> RunSummary:
+        """Build the indexed summary of this run."""
+        return RunSummary(
+            request_id=self.request_id,
+            concept_name=self.response.meta.concept_name,
+            client=self.response.meta.client,
+            model=self.model,
+            created_at=datetime.fromtimestamp(self.created_at, tz=timezone.utc),
+            passed=self.response.result.passed,
+            composite_score=self.response.result.composite_score,
+            threshold=self.response.result.threshold,
+            personas_total=self.response.personas_total,
+            personas_matched=self.response.personas_matched,
+        )
+
+    def matches(
+        self,
+        concept_name: str | None = None,
+        client: str | None = None,
+        model: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> bool:
+        """Check whether this run matches the given index filters."""
+        return (
+            (concept_name is None or self.response.meta.concept_name == concept_name)
+            and (client is None or self.response.meta.client == client)
+            and (model is None or self.model == model)
+            and (since is None or self.created_at >= since)
+            and (until is None or self.created_at <= until)
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialise to compressed JSON."""
+        payload = {
+            "concept": self.concept.model_dump(),
+            "questions": [q.model_dump() for q in self.questions],
+            "personas": self.personas,
+            "responses": self.responses,
+            "response": self.response.model_dump(mode="json"),
+            "created_at": self.created_at,
+            "weights": self.weights,
+        }
+        return zlib.compress(json.dumps(payload, default=_json_default).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StoredRun":
+        """Deserialise from compressed JSON."""
+        payload = json.loads(zlib.decompress(data))
+        return cls(
+            concept=Concept.model_validate(payload["concept"]),
+            questions=[Question.model_validate(q) for q in payload["questions"]],
+            personas=payload["personas"],
+            responses=payload["responses"],
+            response=FullResponse.model_validate(payload["response"]),
+            created_at=payload["created_at"],
+            weights=payload.get("weights"),
+        )
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode NumPy values (float32 PMF arrays, scalars) and other persona values."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+class ResultStore(ABC):
+    """Abstract base class for result store backends."""
+
+    @abstractmethod
+    def save(self, run: StoredRun) -> None:
+        """Store a completed run (may return before the write is durable)."""
+        pass
+
+    @abstractmethod
+    def get(self, request_id: str) -> StoredRun | None:
+        """Get a stored run, or None if unknown."""
+        pass
+
+    @abstractmethod
+    def list_runs(
+        self,
+        concept_name: str | None = None,
+        client: str | None = None,
+        model: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> list[RunSummary]:
+        """
+        List stored runs, newest first.
+
+        Args:
+            concept_name: Only runs of this concept
+            client: Only runs made by this client
+            model: Only runs with this generation provider/model
+            since: Only runs completed at or after this Unix time
+            until: Only runs completed at or before this Unix time
+            limit: Maximum number of runs returned
+
+        Returns:
+            Run summaries ordered by completion time, newest first
+        """
+        pass
+
+    def flush(self) -> None:
+        """Block until all pending writes are durable."""
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+    def export_parquet(self, path: str, **filters: Any) -> int:
+        """
+        Export matching runs to a Parquet file (one row per persona x question).
+
+        Args:
+            path: Output file path
+            **filters: Index filters accepted by list_runs
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            ConfigurationError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ConfigurationError(
+                "pyarrow is required for Parquet export (pip install sage[arrow])"
+            ) from e
+
+        runs = [self.get(summary.request_id) for summary in self.list_runs(**filters)]
+        table = runs_to_table([run for run in runs if run is not None])
+        pq.write_table(table, path)
+        return table.num_rows
+
+
+def runs_to_table(runs: list[StoredRun]) -> Any:
+    """
+    Flatten runs into an Arrow table with one row per persona x question.
+
+    Args:
+        runs: Stored runs to flatten
+
+    Returns:
+        pyarrow.Table
+    """
+    import pyarrow as pa
+
+    rows: dict[str, list] = {
+        name: []
+        for name in (
+            "request_id",
+            "concept_name",
+            "client",
+            "model",
+            "created_at",
+            "persona_id",
+            "persona",
+            "question_id",
+            "raw_text",
+            "pmf",
+            "mean",
+            "generation_mode",
+            "sample_weight",
+        )
+    }
+    for run in runs:
+        created = datetime.fromtimestamp(run.created_at, tz=timezone.utc)
+        weights = run.weights or [None] * len(run.personas)
+        for persona, response, weight in zip(run.personas, run.responses, weights):
+            persona_json = json.dumps(persona, default=str)
+            for q_id, q_response in response["responses"].items():
+                rows["request_id"].append(run.request_id)
+                rows["concept_name"].append(run.response.meta.concept_name)
+                rows["client"].append(run.response.meta.client)
+                rows["model"].append(run.model)
+                rows["created_at"].append(created)
+                rows["persona_id"].append(str(persona["persona_id"]))
+                rows["persona"].append(persona_json)
+                rows["question_id"].append(q_id)
+                rows["raw_text"].append(q_response.get("raw_text"))
+                rows["pmf"].append(q_response.get("pmf"))
+                rows["mean"].append(q_response.get("mean"))
+                rows["generation_mode"].append(q_response.get("generation_mode"))
+                rows["sample_weight"].append(weight)
+
+    schema = pa.schema(
+        [
+            ("request_id", pa.string()),
+            ("concept_name", pa.string()),
+            ("client", pa.string()),
+            ("model", pa.string()),
+            ("created_at", pa.timestamp("ms", tz="UTC")),
+            ("persona_id", pa.string()),
+            ("persona", pa.string()),  # JSON-encoded persona attributes
+            ("question_id", pa.string()),
+            ("raw_text", pa.string()),
+            ("pmf", pa.list_(pa.float32())),
+            ("mean", pa.float64()),
+            ("generation_mode", pa.string()),
+            ("sample_weight", pa.float64()),  # set for sampled runs
+        ]
+    )
+    return pa.table(rows, schema=schema)
+
+
+class MemoryResultStore(ResultStore):
+    """In-process LRU of recent runs."""
+
+    def __init__(self, max_size: int):
+        """
+        Initialize memory store.
+
+        Args:
+            max_size: Maximum number of runs kept (least recently used are evicted)
+        """
+        self.max_size = max_size
+        self._runs: OrderedDict[str, StoredRun] = OrderedDict()
+
+    def save(self, run: StoredRun) -> None:
+        self._runs[run.request_id] = run
+        self._runs.move_to_end(run.request_id)
+        while len(self._runs) > self.max_size:
+            self._runs.popitem(last=False)
+
+    def get(self, request_id: str) -> StoredRun | None:
+        run = self._runs.get(request_id)
+        if run is not None:
+            self._runs.move_to_end(request_id)
+        return run
+
+    def list_runs(
+        self,
+        concept_name: str | None = None,
+        client: str | None = None,
+        model: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> list[RunSummary]:
+        runs = [
+            run
+            for run in self._runs.values()
+            if run.matches(concept_name, client, model, since, until)
+        ]
+        runs.sort(key=lambda run: run.created_at, reverse=True)
+        return [run.summary() for run in runs[:limit]]
+
+
+class SQLiteResultStore(ResultStore):
+    """On-disk store in a SQLite database with a background writer thread."""
+
+    def __init__(self, path: str, max_age_days: float = 0, max_runs: int = 0):
+        """
+        Initialize SQLite store, creating the database if needed.
+
+        Args:
+            path: Database file path
+            max_age_days: Delete runs older than this many days (0 = keep)
+            max_runs: Keep only this many of the newest runs (0 = no limit)
+        """
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "request_id TEXT PRIMARY KEY, concept_name TEXT NOT NULL, client TEXT, "
+            "model TEXT, created REAL NOT NULL, passed INTEGER NOT NULL, "
+            "composite_score REAL NOT NULL, threshold REAL NOT NULL, "
+            "personas_total INTEGER NOT NULL, personas_matched INTEGER NOT NULL, "
+            "payload BLOB NOT NULL)"
+        )
+        for column in ("concept_name", "client", "model", "created"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_runs_{column} ON runs ({column})")
+
+        # Runs queued for the writer stay readable until they are committed
+        self._pending: dict[str, StoredRun] = {}
+        self._queue: queue.Queue[StoredRun | None] = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="sage-result-writer", daemon=True
+        )
+        self._writer.start()
+
+    def save(self, run: StoredRun) -> None:
+        with self._lock:
+            self._pending[run.request_id] = run
+        self._queue.put(run)
+
+    def get(self, request_id: str) -> StoredRun | None:
+        with self._lock:
+            pending = self._pending.get(request_id)
+            if pending is not None:
+                return pending
+            row = self._conn.execute(
+                "SELECT payload FROM runs WHERE request_id = ?", (request_id,)
+            ).fetchone()
+        return StoredRun.from_bytes(row[0]) if row else None
+
+    def list_runs(
+        self,
+        concept_name: str | None = None,
+        client: str | None = None,
+        model: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> list[RunSummary]:
+        clauses = []
+        params: list[Any] = []
+        for column, value in (("concept_name", concept_name), ("client", client), ("model", model)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created <= ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT request_id, concept_name, client, model, created, passed, "
+                f"composite_score, threshold, personas_total, personas_matched FROM runs{where} "
+                "ORDER BY created DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+            pending = [
+                run.summary()
+                for run in self._pending.values()
+                if run.matches(concept_name, client, model, since, until)
+            ]
+
+        summaries = {summary.request_id: summary for summary in pending}
+        for row in rows:
+            summaries.setdefault(
+                row[0],
+                RunSummary(
+                    request_id=row[0],
+                    concept_name=row[1],
+                    client=row[2],
+                    model=row[3],
+                    created_at=datetime.fromtimestamp(row[4], tz=timezone.utc),
+                    passed=bool(row[5]),
+                    composite_score=row[6],
+                    threshold=row[7],
+                    personas_total=row[8],
+                    personas_matched=row[9],
+                ),
+            )
+        ordered = sorted(summaries.values(), key=lambda s: s.created_at, reverse=True)
+        return ordered[:limit]
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def _write_loop(self) -> None:
+        try:
+            self._prune()
+        except Exception:
+            logger.exception("Failed to prune stored runs")
+        while True:
+            run = self._queue.get()
+            try:
+                if run is None:
+                    return
+                self._write(run)
+                self._prune()
+            except Exception:
+                logger.exception("Failed to store run %s", run.request_id if run else "?")
+            finally:
+                if run is not None:
+                    with self._lock:
+                        if self._pending.get(run.request_id) is run:
+                            del self._pending[run.request_id]
+                self._queue.task_done()
+
+    def _write(self, run: StoredRun) -> None:
+        payload = run.to_bytes()
+        summary = run.summary()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (request_id, concept_name, client, model, created, "
+                "passed, composite_score, threshold, personas_total, personas_matched, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run.request_id,
+                    summary.concept_name,
+                    summary.client,
+                    summary.model,
+                    run.created_at,
+                    int(summary.passed),
+                    summary.composite_score,
+                    summary.threshold,
+                    summary.personas_total,
+                    summary.personas_matched,
+                    payload,
+                ),
+            )
+
+    def _prune(self) -> None:
+        """Delete runs older than max_age_days and beyond the newest max_runs."""
+        with self._lock:
+            if self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._conn.execute("DELETE FROM runs WHERE created < ?", (cutoff,))
+            if self.max_runs > 0:
+                self._conn.execute(
+                    "DELETE FROM runs WHERE request_id IN "
+                    "(SELECT request_id FROM runs ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                    (self.max_runs,),
+                )
+
+
+@lru_cache
+def get_result_store() -> ResultStore | None:
+    """
+    Get the configured result store (shared across requests).
+
+    Returns:
+        ResultStore, or None if RESULT_STORE is empty
+
+    Raises:
+        ConfigurationError: If the backend is unknown
+    """
+    settings = get_settings()
+    backend = settings.result_store
+    if not backend:
+        return None
+    if backend == "memory":
+        return MemoryResultStore(settings.result_store_size)
+    if backend == "sqlite":
+        logger.info("Result store: SQLite at %s", settings.result_store_path)
+        return SQLiteResultStore(
+            settings.result_store_path,
+            max_age_days=settings.result_store_max_age_days,
+            max_runs=settings.result_store_max_runs,
+        )
+    raise ConfigurationError(f"Unknown result store backend: {backend}")
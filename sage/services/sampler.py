@@ -0,0 +1,247 @@
+"""Stratified and quota sampling of personas before generation.
+
+Large panels do not need every persona generated. The sampler draws ``n`` of
+the personas that matched the filters:
+
+- stratified: strata (combinations of the ``strata`` attribute values, with
+  numeric attributes cut into ``bands``) get seats in proportion to their size
+- quota: strata get seats in proportion to target shares; each attribute's
+  ``quotas`` are target shares per value, combined across attributes as a
+  product (attributes without quotas keep their matched-persona shares)
+- random: simple random sample
+
+Seats are allocated by largest remainder, capped at each stratum's size
+(excess seats go to the remaining strata). Sampled personas get
+post-stratification weights ``target share / sample share`` (mean 1), so
+weighted metrics estimate the target population even where rounding or
+small strata keep the sample from matching it exactly.
+"""
+
+import secrets
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..models.request import SamplingConfig
+from ..models.response import SamplingInfo, StratumInfo
+from .filter_engine import PersonaColumns
+
+MISSING_LABEL = "missing"
+
+
+@dataclass
+class Sample:
+    """Personas drawn by the sampler."""
+
+    indices: np.ndarray  # positions in the persona list, ascending
+    weights: np.ndarray | None  # post-stratification weights aligned with indices
+    info: SamplingInfo
+
+
+def band_labels(edges: list[float]) -> list[str]:
+    """Labels of the bands cut by edges: "<e0", "e0-e1", ..., "eK+"."""
+    names = [f"{edge:g}" for edge in edges]
+    return (
+        [f"<{names[0]}"]
+        + [f"{low}-{high}" for low, high in zip(names, names[1:])]
+        + [f"{names[-1]}+"]
+    )
+
+
+class PersonaSampler:
+    """Draw stratified, quota or random persona samples."""
+
+    def sample(
+        self,
+        columns: PersonaColumns,
+        candidates: np.ndarray,
+        config: SamplingConfig,
+    ) -> Sample:
+        """
+        Sample personas.
+
+        Args:
+            columns: Attribute columns of all personas
+            candidates: Positions of the personas to sample from (those matching filters)
+            config: Sample size, method, strata and seed
+
+        Returns:
+            Sample with the chosen positions, weights and a description for meta
+
+        Raises:
+            ValueError: If a quota refers to a value no candidate has
+        """
+        seed = config.seed if config.seed is not None else secrets.randbits(32)
+        rng = np.random.default_rng(seed)
+        population = len(candidates)
+
+        if config.method == "random":
+            size = min(config.n, population)
+            indices = np.sort(rng.choice(candidates, size=size, replace=False))
+            info = SamplingInfo(
+                method="random",
+                seed=seed,
+                population=population,
+                sampled=size,
+                effective_sample_size=float(size),
+            )
+            return Sample(indices=indices, weights=None, info=info)
+
+        stratum_ids, labels = self._strata(columns, candidates, config)
+        sizes = np.bincount(stratum_ids, minlength=len(labels))
+        if config.method == "quota":
+            targets = self._quota_targets(labels, sizes, config)
+        else:
+            targets = sizes / population
+
+        counts = self._allocate(targets, sizes, config.n)
+
+        # Draw within each stratum (candidates grouped by stratum, then a prefix
+        # of a random permutation of each group)
+        order = np.argsort(stratum_ids, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        chosen = []
+        chosen_strata = []
+        for h in np.flatnonzero(counts):
+            members = candidates[order[starts[h] : starts[h] + sizes[h]]]
+            chosen.append(rng.choice(members, size=counts[h], replace=False))
+            chosen_strata.append(np.full(counts[h], h))
+        selected = np.concatenate(chosen)
+        selected_strata = np.concatenate(chosen_strata)
+
+        sampled = int(counts.sum())
+        stratum_weights = np.zeros(len(labels))
+        taken = counts > 0
+        stratum_weights[taken] = targets[taken] / (counts[taken] / sampled)
+        stratum_weights *= sampled / float(stratum_weights[selected_strata].sum())
+
+        position = np.argsort(selected)
+        indices = selected[position]
+        weights = stratum_weights[selected_strata[position]]
+
+        info = SamplingInfo(
+            method=config.method,
+            seed=seed,
+            population=population,
+            sampled=sampled,
+            effective_sample_size=round(float(weights.sum() ** 2 / (weights**2).sum()), 2),
+            strata=[
+                StratumInfo(
+                    label=", ".join(
+                        f"{attribute}={value}" for attribute, value in zip(config.strata, labels[h])
+                    ),
+                    population=int(sizes[h]),
+                    target_share=round(float(targets[h]), 4),
+                    sampled=int(counts[h]),
+                    weight=round(float(stratum_weights[h]), 4) if counts[h] else None,
+                )
+                for h in range(len(labels))
+            ],
+        )
+        return Sample(indices=indices, weights=weights, info=info)
+
+    @staticmethod
+    def _strata(
+        columns: PersonaColumns,
+        candidates: np.ndarray,
+        config: SamplingConfig,
+    ) -> tuple[np.ndarray, list[list[str]]]:
+        """
+        Assign candidates to strata.
+
+        Returns:
+            stratum_ids: Stratum of each candidate (0..H-1)
+            labels: Per stratum, the value label of each strata attribute
+        """
+        codes = []
+        value_labels = []
+        for attribute in config.strata:
+            column = columns.column(attribute)
+            present = column.present[candidates]
+            edges = config.bands.get(attribute)
+            if edges is not None:
+                numbers = column.numbers[candidates]
+                attribute_codes = np.digitize(numbers, edges)
+                names = band_labels(edges)
+                present = present & ~np.isnan(numbers)
+            else:
+                unique, attribute_codes = np.unique(column.strings[candidates], return_inverse=True)
+                names = unique.tolist()
+            attribute_codes = np.where(present, attribute_codes, len(names))
+            codes.append(attribute_codes)
+            value_labels.append([*names, MISSING_LABEL])
+
+        combined, stratum_ids = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+        labels = [
+            [value_labels[a][code] for a, code in enumerate(row)] for row in combined.tolist()
+        ]
+        return stratum_ids.reshape(-1), labels
+
+    @staticmethod
+    def _quota_targets(
+        labels: list[list[str]], sizes: np.ndarray, config: SamplingConfig
+    ) -> np.ndarray:
+        """
+        Target share per stratum from per-attribute quotas.
+
+        A cell (one value of every attribute with quotas) gets the product of
+        its values' shares, split across its strata in proportion to size.
+        """
+        quota_attributes = [a for a, name in enumerate(config.strata) if name in config.quotas]
+        for a in quota_attributes:
+            attribute = config.strata[a]
+            available = {stratum[a] for stratum in labels}
+            unknown = [
+                value
+                for value, share in config.quotas[attribute].items()
+                if share > 0 and value not in available
+            ]
+            if unknown:
+                raise ValueError(
+                    f"Quota values for {attribute} match no personas: {', '.join(sorted(unknown))} "
+                    f"(available: {', '.join(sorted(available))})"
+                )
+
+        cells = [tuple(stratum[a] for a in quota_attributes) for stratum in labels]
+        cell_sizes: dict[tuple[str, ...], int] = {}
+        for cell, size in zip(cells, sizes):
+            cell_sizes[cell] = cell_sizes.get(cell, 0) + int(size)
+
+        targets = np.zeros(len(labels))
+        for h, (cell, size) in enumerate(zip(cells, sizes)):
+            cell_share = 1.0
+            for a, value in zip(quota_attributes, cell):
+                cell_share *= config.quotas[config.strata[a]].get(value, 0.0)
+            targets[h] = cell_share * size / cell_sizes[cell]
+        total = targets.sum()
+        if total <= 0:
+            raise ValueError("Quotas leave no personas to sample")
+        return targets / total
+
+    @staticmethod
+    def _allocate(targets: np.ndarray, sizes: np.ndarray, n: int) -> np.ndarray:
+        """Seats per stratum: proportional to targets, capped by stratum size."""
+        counts = np.zeros(len(sizes), dtype=np.int64)
+        open_ = (targets > 0) & (sizes > 0)
+        seats = min(n, int(sizes[open_].sum()))
+
+        # Strata whose proportional share exceeds their size take all their personas
+        while True:
+            ideal = np.zeros(len(sizes))
+            ideal[open_] = seats * targets[open_] / targets[open_].sum()
+            full = open_ & (ideal >= sizes)
+            if not full.any():
+                break
+            counts[full] = sizes[full]
+            seats -= int(sizes[full].sum())
+            open_ &= ~full
+            if not open_.any():
+                return counts
+
+        base = np.floor(ideal).astype(np.int64)
+        counts[open_] = base[open_]
+        remainder = seats - int(base[open_].sum())
+        if remainder > 0:
+            fractions = np.where(open_, ideal - base, -1.0)
+            counts[np.argsort(-fractions, kind="stable")[:remainder]] += 1
+        return counts
@@ -5,17 +5,36 @@ from typing import Any
 import numpy as np
 
 from ..models.request import Question
-from ..models.response import CriteriaBreakdown, QuestionMetrics, ResultSummary
+from ..models.response import (
+    ConfidenceInterval,
+    CriteriaBreakdown,
+    QuestionMetrics,
+    ResultSummary,
+)
 
 
 class ScoringEngine:
     """Aggregate scores and evaluate against threshold."""
 
+    def __init__(self, resamples: int = 2000, confidence_level: float = 0.95, seed: int = 0):
+        """
+        Initialize scoring engine.
+
+        Args:
+            resamples: Bootstrap resamples for confidence intervals (0 = disabled)
+            confidence_level: Confidence level of the intervals
+            seed: Bootstrap seed, so the same responses always give the same intervals
+        """
+        self.resamples = resamples
+        self.confidence_level = confidence_level
+        self.seed = seed
+
     def calculate_metrics(
         self,
         responses: list[dict[str, Any]],
         questions: list[Question],
         match_flags: list[bool],
+        weights: list[float] | None = None,
     ) -> dict[str, QuestionMetrics]:
         """
         Calculate metrics for each question using only matched personas.
@@ -24,42 +43,162 @@ class ScoringEngine:
             responses: List of response dictionaries from personas
             questions: List of survey questions
             match_flags: Boolean list indicating which personas matched filters
+            weights: Optional persona weights (e.g. post-stratification weights
+                from sampling), aligned with responses
 
         Returns:
             Dictionary mapping question_id to QuestionMetrics
+
+        Raises:
+            ValueError: If no personas matched
         """
-        metrics = {}
+        matched_responses = [r for r, keep in zip(responses, match_flags) if keep]
+        means = self.response_means(matched_responses, questions)
+        pmfs = self.response_pmfs(matched_responses, questions)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[np.asarray(match_flags, dtype=bool)]
+        return self.metrics_from_means(means, questions, weights, pmfs)
 
-        for question in questions:
-            q_id = question.id
+    @staticmethod
+    def response_means(responses: list[dict[str, Any]], questions: list[Question]) -> np.ndarray:
+        """
+        Collect persona response means into a matrix.
+
+        Args:
+            responses: List of response dictionaries from personas
+            questions: List of survey questions
+
+        Returns:
+            (N, Q) float64 array, one row per persona and one column per question
+        """
+        q_ids = [q.id for q in questions]
+        return np.array(
+            [[r["responses"][q_id]["mean"] for q_id in q_ids] for r in responses],
+            dtype=np.float64,
+        ).reshape(len(responses), len(q_ids))
+
+    @staticmethod
+    def response_pmfs(
+        responses: list[dict[str, Any]], questions: list[Question]
+    ) -> np.ndarray | None:
+        """
+        Collect persona response PMFs into one array.
+
+        Args:
+            responses: List of response dictionaries from personas
+            questions: List of survey questions
 
-            # Get means for matched personas only
-            means = [
-                r["responses"][q_id]["mean"]
-                for r, matched in zip(responses, match_flags)
-                if matched
-            ]
-
-            if not means:
-                raise ValueError("No personas matched the filters")
-
-            # Convert means to discrete Likert for distribution
-            discrete = [round(m) for m in means]
-            # Clamp to valid Likert range
-            discrete = [max(1, min(5, d)) for d in discrete]
-
-            metrics[q_id] = QuestionMetrics(
-                n=len(means),
-                mean=round(float(np.mean(means)), 2),
-                median=round(float(np.median(means)), 2),
-                std_dev=round(float(np.std(means)), 2),
-                top_2_box=round(sum(1 for m in means if m >= 4) / len(means), 2),
-                bottom_2_box=round(sum(1 for m in means if m <= 2) / len(means), 2),
-                distribution={str(i): discrete.count(i) for i in range(1, 6)},
+        Returns:
+            (N, Q, 5) float32 array, or None if any response has no 5-point PMF
+            (e.g. a re-scored dataset without {q}_pmf columns)
+        """
+        q_ids = [q.id for q in questions]
+        try:
+            pmfs = np.array(
+                [[r["responses"][q_id].get("pmf") for q_id in q_ids] for r in responses],
+                dtype=np.float32,
             )
+        except (TypeError, ValueError):
+            return None
+        if pmfs.shape != (len(responses), len(q_ids), 5):
+            return None
+        return pmfs
+
+    def metrics_from_means(
+        self,
+        means: np.ndarray,
+        questions: list[Question],
+        weights: np.ndarray | None = None,
+        pmfs: np.ndarray | None = None,
+    ) -> dict[str, QuestionMetrics]:
+        """
+        Calculate metrics for every question in one vectorized pass.
+
+        Without weights (or with unit weights) the results are the plain
+        sample statistics. With weights, mean, median, std_dev, the boxes and
+        the distribution are weighted; the distribution then holds weighted
+        counts (floats) instead of persona counts.
+
+        With PMFs, the metrics also describe the full response distributions:
+        the (weighted) mean PMF, the expected top-2-box (its mass on ratings
+        4 and 5) and the entropy of the mean PMF.
+
+        Args:
+            means: (N, Q) persona response means, columns in question order
+            questions: List of survey questions
+            weights: Optional (N,) non-negative persona weights
+            pmfs: Optional (N, Q, 5) persona response PMFs
 
+        Returns:
+            Dictionary mapping question_id to QuestionMetrics
+
+        Raises:
+            ValueError: If there are no personas
+        """
+        n_personas = means.shape[0]
+        if n_personas == 0:
+            raise ValueError("No personas matched the filters")
+
+        # (Q, N) layout: each reduction runs over a contiguous row, summing in
+        # the same order as the one-dimensional NumPy functions
+        values = np.ascontiguousarray(means.T, dtype=np.float64)
+        w = np.ones(n_personas) if weights is None else np.asarray(weights, dtype=np.float64)
+        total = w.sum()
+
+        mean = (values * w).sum(axis=1) / total
+        std_dev = np.sqrt((((values - mean[:, None]) ** 2) * w).sum(axis=1) / total)
+        median = _weighted_medians(values, w)
+        top_2_box = (w * (values >= 4)).sum(axis=1) / total
+        bottom_2_box = (w * (values <= 2)).sum(axis=1) / total
+
+        # Distribution of means rounded to the Likert scale (round half to
+        # even, as Python's round), counted per question with one bincount
+        n_questions = values.shape[0]
+        discrete = np.clip(np.rint(values), 1, 5).astype(np.int64) - 1
+        bins = (discrete + 5 * np.arange(n_questions)[:, None]).ravel()
+        if weights is None:
+            counts = np.bincount(bins, minlength=5 * n_questions)
+        else:
+            counts = np.bincount(
+                bins, weights=np.broadcast_to(w, values.shape).ravel(), minlength=5 * n_questions
+            ).round(2)
+        counts = counts.reshape(n_questions, 5).tolist()
+
+        metrics = {
+            question.id: QuestionMetrics(
+                n=n_personas,
+                mean=round(float(mean[j]), 2),
+                median=round(float(median[j]), 2),
+                std_dev=round(float(std_dev[j]), 2),
+                top_2_box=round(float(top_2_box[j]), 2),
+                bottom_2_box=round(float(bottom_2_box[j]), 2),
+                distribution={str(i + 1): counts[j][i] for i in range(5)},
+            )
+            for j, question in enumerate(questions)
+        }
+        if pmfs is not None:
+            self._add_pmf_metrics(metrics, questions, pmfs, w)
         return metrics
 
+    @staticmethod
+    def _add_pmf_metrics(
+        metrics: dict[str, QuestionMetrics],
+        questions: list[Question],
+        pmfs: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        """Add aggregate PMF, expected top-2-box and entropy to each question's metrics."""
+        aggregate = np.einsum("n,nqk->qk", weights, pmfs, dtype=np.float64) / weights.sum()
+        expected_top_2_box = aggregate[:, 3:].sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.where(aggregate > 0, aggregate * np.log2(aggregate), 0.0).sum(axis=1)
+
+        for j, question in enumerate(questions):
+            m = metrics[question.id]
+            m.aggregate_pmf = [round(float(p), 3) for p in aggregate[j]]
+            m.expected_top_2_box = round(float(expected_top_2_box[j]), 2)
+            m.entropy = round(max(float(entropy[j]), 0.0), 3)
+
     def calculate_composite_score(
         self,
         metrics: dict[str, QuestionMetrics],
@@ -135,3 +274,96 @@ class ScoringEngine:
             margin=margin,
             reason=reason,
         )
+
+    def add_confidence_intervals(
+        self,
+        means: np.ndarray,
+        questions: list[Question],
+        metrics: dict[str, QuestionMetrics],
+        result: ResultSummary,
+        weights: np.ndarray | None = None,
+    ) -> None:
+        """
+        Add bootstrap confidence intervals to metrics and the result.
+
+        Personas are resampled with replacement ``resamples`` times in one
+        operation: each resample is a row of draw counts per persona, so the
+        resampled (weighted) question means and top-2-box shares of all
+        resamples are two matrix products with the means matrix. Intervals
+        are percentile intervals; ``pass_probability`` is the share of
+        resamples whose composite score meets the threshold. Does nothing if
+        resamples is 0.
+
+        Args:
+            means: (N, Q) persona response means, columns in question order
+            questions: List of survey questions (weights give the composite)
+            metrics: Metrics to add mean_ci and top_2_box_ci to
+            result: Result to add composite_ci and pass_probability to
+            weights: Optional (N,) persona weights
+        """
+        if self.resamples <= 0:
+            return
+
+        rng = np.random.default_rng(self.seed)
+        n_personas = means.shape[0]
+        draws = rng.integers(0, n_personas, size=(self.resamples, n_personas))
+        offsets = n_personas * np.arange(self.resamples)[:, None]
+        resample_weights = (
+            np.bincount((draws + offsets).ravel(), minlength=self.resamples * n_personas)
+            .reshape(self.resamples, n_personas)
+            .astype(np.float64)
+        )
+        if weights is not None:
+            resample_weights *= weights
+        totals = resample_weights.sum(axis=1, keepdims=True)
+        totals[totals == 0] = np.nan  # all drawn personas have zero weight
+
+        boot_means = resample_weights @ means / totals
+        boot_top_2_box = resample_weights @ (means >= 4) / totals
+        question_weights = np.array([q.weight for q in questions])
+        boot_composite = ((boot_means - 1) / 4) @ question_weights
+
+        tail = (1 - self.confidence_level) / 2
+        levels = [tail, 1 - tail]
+        mean_ci = np.nanquantile(boot_means, levels, axis=0)
+        top_2_box_ci = np.nanquantile(boot_top_2_box, levels, axis=0)
+        composite_ci = np.nanquantile(boot_composite, levels)
+
+        for j, question in enumerate(questions):
+            m = metrics[question.id]
+            m.mean_ci = ConfidenceInterval(
+                lower=round(float(mean_ci[0, j]), 2), upper=round(float(mean_ci[1, j]), 2)
+            )
+            m.top_2_box_ci = ConfidenceInterval(
+                lower=round(float(top_2_box_ci[0, j]), 2),
+                upper=round(float(top_2_box_ci[1, j]), 2),
+            )
+        result.confidence_level = self.confidence_level
+        result.composite_ci = ConfidenceInterval(
+            lower=round(float(composite_ci[0]), 3), upper=round(float(composite_ci[1]), 3)
+        )
+        valid = boot_composite[~np.isnan(boot_composite)]
+        result.pass_probability = round(float(np.mean(valid >= result.threshold)), 3)
+
+
+def _weighted_medians(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Weighted median of each row of a (Q, N) array.
+
+    On an exact half split the two middle values are averaged, so equal
+    weights give the same result as np.median.
+    """
+    order = np.argsort(values, axis=1, kind="stable")
+    sorted_values = np.take_along_axis(values, order, axis=1)
+    cumulative = np.cumsum(weights[order], axis=1)
+    half = cumulative[:, -1:] / 2
+    reached = (cumulative >= half) | np.isclose(cumulative, half)
+    k = reached.argmax(axis=1)
+    rows = np.arange(values.shape[0])
+    upper = np.minimum(k + 1, values.shape[1] - 1)
+    split = np.isclose(cumulative[rows, k], half[:, 0]) & (k + 1 < values.shape[1])
+    return np.where(
+        split,
+        (sorted_values[rows, k] + sorted_values[rows, upper]) / 2,
+        sorted_values[rows, k],
+    )
@@ -16,11 +16,12 @@ Where γ = cosine similarity, ℓ = anchor with minimum similarity, ε = 0 (pape
 """
 
 import asyncio
-from collections import OrderedDict
+from collections import Counter, OrderedDict
 
 import numpy as np
 
 from ..utils.embeddings import cosine_similarity
+from ..utils.timing import stage
 from .llm_service import LLMService
 
 MAX_ANCHOR_CACHE_SIZE = 256
@@ -50,6 +51,7 @@ class SSREngine:
         self,
         response_text: str,
         ssr_reference_sets: list[list[str]],
+        response_embedding: list[float] | None = None,
     ) -> tuple[list[float], float]:
         """
         Map a free-text response to a Likert PMF and mean.
@@ -66,17 +68,23 @@ class SSREngine:
         Args:
             response_text: Free-text response from LLM
             ssr_reference_sets: 6 sets of 5 anchor statements each
+            response_embedding: Precomputed embedding of response_text (e.g.
+                                from a batch job). Embedded on demand if omitted.
 
         Returns:
             pmf: [p1, p2, p3, p4, p5] probability distribution
             mean: expected value (1-5)
         """
         # Get response embedding
-        response_embedding = await self.llm_service.get_embedding(response_text)
+        if response_embedding is None:
+            response_embedding = await self.llm_service.get_embedding(response_text)
 
         # Get PMF from each reference set (in parallel)
         pmfs = await asyncio.gather(
-            *[self._compute_pmf_for_set(response_embedding, ref_set) for ref_set in ssr_reference_sets]
+            *[
+                self._compute_pmf_for_set(response_embedding, ref_set)
+                for ref_set in ssr_reference_sets
+            ]
         )
 
         # Average all PMFs
@@ -87,6 +95,46 @@ class SSREngine:
 
         return avg_pmf, mean
 
+    async def map_samples_to_likert(
+        self,
+        response_texts: list[str],
+        ssr_reference_sets: list[list[str]],
+    ) -> tuple[list[float], float]:
+        """
+        Map several sampled responses of one persona to a single Likert PMF.
+
+        Duplicate samples are embedded once: the distinct texts are embedded
+        in one batch, each gets its PMF, and the persona-level PMF is their
+        average weighted by how often each text was sampled.
+
+        Args:
+            response_texts: Sampled free-text responses to the same question
+            ssr_reference_sets: 6 sets of 5 anchor statements each
+
+        Returns:
+            pmf: [p1, p2, p3, p4, p5] averaged over samples
+            mean: expected value (1-5)
+        """
+        counts = Counter(response_texts)
+        if len(counts) == 1:
+            return await self.map_response_to_likert(response_texts[0], ssr_reference_sets)
+
+        texts = list(counts)
+        embeddings = await self.llm_service.get_embeddings(texts)
+        results = await asyncio.gather(
+            *[
+                self.map_response_to_likert(text, ssr_reference_sets, embedding)
+                for text, embedding in zip(texts, embeddings)
+            ]
+        )
+
+        weights = np.array([counts[text] for text in texts], dtype=np.float64)
+        pmfs = np.array([pmf for pmf, _ in results])
+        avg_pmf = (weights @ pmfs / weights.sum()).tolist()
+        mean = sum((i + 1) * p for i, p in enumerate(avg_pmf))
+
+        return avg_pmf, mean
+
     async def _compute_pmf_for_set(
         self,
         response_embedding: list[float],
@@ -119,37 +167,36 @@ class SSREngine:
         if cache_key in self._anchor_cache:
             self._anchor_cache.move_to_end(cache_key)
         else:
-            self._anchor_cache[cache_key] = await self.llm_service.get_embeddings(
-                reference_set
-            )
+            self._anchor_cache[cache_key] = await self.llm_service.get_embeddings(reference_set)
             if len(self._anchor_cache) > MAX_ANCHOR_CACHE_SIZE:
                 self._anchor_cache.popitem(last=False)
 
         anchor_embeddings = self._anchor_cache[cache_key]
 
-        # Compute cosine similarities
-        similarities = [
-            cosine_similarity(response_embedding, anchor_emb)
-            for anchor_emb in anchor_embeddings
-        ]
-
-        # Following paper equation (8): p(r) ∝ γ(σ_r, t) - γ(σ_ℓ, t) + ε·δ_ℓ,r
-        # Where ℓ is the anchor with minimum similarity
-        # Paper uses ε = 0, so we just subtract min and normalize
-        min_sim = min(similarities)
-        adjusted = [s - min_sim for s in similarities]
-
-        # Add small epsilon to avoid division by zero if all similarities equal
-        epsilon = 1e-10
-        adjusted = [a + epsilon for a in adjusted]
-
-        # Optional temperature: p(r,T) ∝ p(r)^(1/T)  [paper uses T=1]
-        if self.temperature != 1.0:
-            adjusted = [a ** (1.0 / self.temperature) for a in adjusted]
-
-        # Normalize to get PMF (NO softmax/exp - just direct normalization)
-        total = sum(adjusted)
-        pmf = [a / total for a in adjusted]
+        with stage("ssr"):
+            # Compute cosine similarities
+            similarities = [
+                cosine_similarity(response_embedding, anchor_emb)
+                for anchor_emb in anchor_embeddings
+            ]
+
+            # Following paper equation (8): p(r) ∝ γ(σ_r, t) - γ(σ_ℓ, t) + ε·δ_ℓ,r
+            # Where ℓ is the anchor with minimum similarity
+            # Paper uses ε = 0, so we just subtract min and normalize
+            min_sim = min(similarities)
+            adjusted = [s - min_sim for s in similarities]
+
+            # Add small epsilon to avoid division by zero if all similarities equal
+            epsilon = 1e-10
+            adjusted = [a + epsilon for a in adjusted]
+
+            # Optional temperature: p(r,T) ∝ p(r)^(1/T)  [paper uses T=1]
+            if self.temperature != 1.0:
+                adjusted = [a ** (1.0 / self.temperature) for a in adjusted]
+
+            # Normalize to get PMF (NO softmax/exp - just direct normalization)
+            total = sum(adjusted)
+            pmf = [a / total for a in adjusted]
 
         return pmf
 
@@ -0,0 +1,60 @@
+"""Per-run token usage accounting for generation calls.
+
+Provider instances are cached and shared across requests, so usage cannot be
+stored on them. Instead the orchestrator starts a UsageStats for each run in a
+context variable; asyncio tasks spawned for the run inherit the context, and
+providers add to it via record_usage().
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from ..models.response import TokenUsage
+
+
+@dataclass
+class UsageStats:
+    """Mutable token counters for one run."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_write_input_tokens: int = 0
+
+    def to_model(self) -> TokenUsage:
+        """Convert to the response model."""
+        return TokenUsage(
+            calls=self.calls,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            cache_read_input_tokens=self.cache_read_input_tokens,
+            cache_write_input_tokens=self.cache_write_input_tokens,
+        )
+
+
+_current_usage: ContextVar[UsageStats | None] = ContextVar("sage_usage", default=None)
+
+
+def start_usage_tracking() -> UsageStats:
+    """Start a new usage accumulator for the current run and return it."""
+    stats = UsageStats()
+    _current_usage.set(stats)
+    return stats
+
+
+def record_usage(
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cache_read_input_tokens: int = 0,
+    cache_write_input_tokens: int = 0,
+) -> None:
+    """Add one generation call's token counts to the current run (no-op outside a run)."""
+    stats = _current_usage.get()
+    if stats is None:
+        return
+    stats.calls += 1
+    stats.input_tokens += input_tokens or 0
+    stats.output_tokens += output_tokens or 0
+    stats.cache_read_input_tokens += cache_read_input_tokens or 0
+    stats.cache_write_input_tokens += cache_write_input_tokens or 0
@@ -6,18 +6,20 @@ a format that the Pegasus API accepts.
 
 import asyncio
 import base64
+import hashlib
 import ipaddress
 import logging
 import re
 import socket
 import tempfile
 from dataclasses import dataclass
-from functools import partial
+from functools import cached_property, partial
 from pathlib import Path
 from urllib.parse import urlparse
 
 import httpx
 
+from ..config import get_settings
 from ..exceptions import ProviderError
 
 logger = logging.getLogger(__name__)
@@ -38,6 +40,20 @@ class VideoSource:
     source_type: str  # "base64" or "s3"
     data: str  # base64 string or S3 URI
     s3_bucket_owner: str | None = None
+    s3_etag: str | None = None  # ETag of the S3 object when it could be read
+
+    @cached_property
+    def content_hash(self) -> str:
+        """
+        SHA-256 identifying the video content.
+
+        Base64 payloads are hashed directly. S3 objects are identified by their
+        ETag, which changes with the object's bytes and is shared by identical
+        uploads, and only by their URI when the ETag could not be read.
+        """
+        if self.source_type == "s3" and self.s3_etag:
+            return hashlib.sha256(f"s3-etag:{self.s3_etag}".encode("utf-8")).hexdigest()
+        return hashlib.sha256(self.data.encode("utf-8")).hexdigest()
 
 
 class VideoDownloader:
@@ -74,6 +90,7 @@ class VideoDownloader:
                     source_type="s3",
                     data=data,
                     s3_bucket_owner=s3_bucket_owner,
+                    s3_etag=await asyncio.to_thread(self._s3_etag, data, s3_bucket_owner),
                 )
             elif self._is_youtube(data):
                 logger.info("Video source: YouTube URL")
@@ -110,6 +127,23 @@ class VideoDownloader:
     def _is_s3(data: str) -> bool:
         return data.startswith("s3://")
 
+    @staticmethod
+    def _s3_etag(uri: str, s3_bucket_owner: str | None = None) -> str | None:
+        """Read the ETag of an S3 object (None if it cannot be read)."""
+        import boto3
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        parsed = urlparse(uri)
+        params = {"Bucket": parsed.netloc, "Key": parsed.path.lstrip("/")}
+        if s3_bucket_owner:
+            params["ExpectedBucketOwner"] = s3_bucket_owner
+        try:
+            client = boto3.client("s3", region_name=get_settings().aws_region)
+            return client.head_object(**params)["ETag"].strip('"')
+        except (BotoCoreError, ClientError) as e:
+            logger.warning("Cannot read ETag of %s, caching by URI: %s", uri, e)
+            return None
+
     @staticmethod
     def _validate_url(url: str) -> None:
         """Validate URL to prevent SSRF attacks."""
@@ -186,7 +220,9 @@ class VideoDownloader:
                 response = await client.get(url)
                 response.raise_for_status()
                 content_type = response.headers.get("content-type", "")
-                if content_type and not content_type.startswith(("video/", "application/octet-stream")):
+                if content_type and not content_type.startswith(
+                    ("video/", "application/octet-stream")
+                ):
                     logger.warning("Unexpected content-type for video URL: %s", content_type)
                 video_bytes = response.content
                 if len(video_bytes) > MAX_BASE64_SIZE:
@@ -197,7 +233,9 @@ class VideoDownloader:
                     )
                 return video_bytes
         except httpx.HTTPStatusError as e:
-            raise ProviderError("video", f"Video download failed (HTTP {e.response.status_code}): {url}") from e
+            raise ProviderError(
+                "video", f"Video download failed (HTTP {e.response.status_code}): {url}"
+            ) from e
         except httpx.RequestError as e:
             raise ProviderError("video", f"Video download failed: {e}") from e
 
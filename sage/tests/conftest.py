@@ -1,11 +1,22 @@
 """Shared pytest fixtures for the test suite."""
 
 import json
+import os
+import tempfile
+import time
+
+# Keep test runs and uploads out of the working directory
+os.environ.setdefault("RESULT_STORE", "memory")
+os.environ.setdefault("PANEL_STORE", "memory")
+os.environ.setdefault("MEDIA_STORE_DIR", tempfile.mkdtemp(prefix="sage-media-"))
 
 import pytest
 from fastapi.testclient import TestClient
 
 from sage.main import app
+from sage.models.request import Concept, ContentItem, Question
+from sage.models.response import FullResponse, Meta, ProviderInfo, ResultSummary
+from sage.services.result_store import StoredRun
 
 
 @pytest.fixture
@@ -88,3 +99,50 @@ def sample_personas():
         {"persona_id": "p4", "age": 55, "gender": "M", "income": "high", "region": "West"},
         {"persona_id": "p5", "age": 30, "gender": "F", "income": "medium", "region": "North"},
     ]
+
+
+def _make_run(request_id, concept="Cola", client="acme", model="gpt-4o", created=None):
+    response = FullResponse(
+        result=ResultSummary(
+            passed=True, composite_score=0.8, threshold=0.7, margin=0.1, reason="PASS"
+        ),
+        filters_applied=[],
+        personas_total=2,
+        personas_matched=1,
+        criteria_breakdown=[],
+        metrics={},
+        meta=Meta(
+            request_id=request_id,
+            concept_name=concept,
+            processing_time_ms=10,
+            client=client,
+            providers=ProviderInfo(
+                generation=f"openai/{model}",
+                embedding="openai/text-embedding-3-small",
+                vision="openai/gpt-4o",
+            ),
+        ),
+    )
+    return StoredRun(
+        concept=Concept(name=concept, content=[ContentItem(type="text", data="A drink.")]),
+        questions=[
+            Question(id="q1", text="Buy?", weight=1.0, ssr_reference_sets=[list("abcde")] * 6)
+        ],
+        personas=[{"persona_id": "p1", "age": 30}],
+        responses=[
+            {
+                "persona_id": "p1",
+                "responses": {
+                    "q1": {"raw_text": "Yes", "pmf": [0.0, 0.1, 0.1, 0.3, 0.5], "mean": 4.2}
+                },
+            }
+        ],
+        response=response,
+        created_at=created if created is not None else time.time(),
+    )
+
+
+@pytest.fixture
+def make_run():
+    """Factory for small stored runs (one persona, one question)."""
+    return _make_run
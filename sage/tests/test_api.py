@@ -1,9 +1,16 @@
 """Tests for the FastAPI application."""
 
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, patch
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
-from sage.main import app
+from sage.main import app, orchestrator
+from sage.models.response import MinimalResponse
 
 
 @pytest.fixture
@@ -345,3 +352,222 @@ class TestErrorHandling:
         )
 
         assert response.status_code == 422
+
+
+class TestRescoreEndpoint:
+    """Test the re-score endpoint."""
+
+    def test_rescore_dataset(self, client):
+        response = client.post(
+            "/rescore",
+            json={
+                "dataset": [
+                    {"persona_id": "p1", "age": 30, "q1_mean": 4.0},
+                    {"persona_id": "p2", "age": 50, "q1_mean": 2.0},
+                ],
+                "weights": {"q1": 1.0},
+                "threshold": 0.5,
+                "filters": ["age>40"],
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["personas_matched"] == 1
+        assert data["result"]["composite_score"] == 0.25
+        assert data["result"]["passed"] is False
+        assert data["meta"]["response_bytes"] > 0
+
+    def test_unknown_run_id(self, client):
+        response = client.post("/rescore", json={"run_id": "missing"})
+        assert response.status_code == 404
+
+    def test_requires_exactly_one_source(self, client):
+        response = client.post("/rescore", json={"threshold": 0.5})
+        assert response.status_code == 422
+
+    def test_dataset_requires_weights(self, client):
+        response = client.post(
+            "/rescore",
+            json={"dataset": [{"persona_id": "p1", "q1_mean": 4.0}], "threshold": 0.5},
+        )
+        assert response.status_code == 422
+
+    def test_get_unknown_run(self, client):
+        assert client.get("/runs/missing").status_code == 404
+
+
+class TestRunDatasetEndpoint:
+    """Test downloading stored run datasets."""
+
+    def test_ndjson_download(self, client, make_run):
+        orchestrator.result_store.save(make_run("dl1", client=None))
+        response = client.get("/runs/dl1/dataset", params={"format": "ndjson"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows[0]["persona_id"] == "p1"
+        assert rows[0]["q1_pmf"] == [0.0, 0.1, 0.1, 0.3, 0.5]
+
+    def test_unknown_format(self, client):
+        assert client.get("/runs/dl1/dataset", params={"format": "csv"}).status_code == 422
+
+    def test_unknown_run(self, client):
+        assert client.get("/runs/missing/dataset").status_code == 404
+
+    def test_invalid_output_format(self, client, valid_test_request):
+        valid_test_request["output_format"] = "xml"
+        assert client.post("/test-concept", json=valid_test_request).status_code == 422
+
+
+class TestRawBodyParsing:
+    """Test validation of the raw JSON body and multipart uploads."""
+
+    def test_invalid_json_body(self, client):
+        response = client.post(
+            "/test-concept", content=b"{not json", headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "json_invalid"
+
+    def test_errors_located_in_body(self, client, valid_test_request):
+        valid_test_request["threshold"] = 2
+        response = client.post("/test-concept", json=valid_test_request)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "threshold"]
+
+    def test_request_schema_documented(self, client):
+        schema = client.get("/openapi.json").json()
+        body = schema["paths"]["/test-concept"]["post"]["requestBody"]
+        assert body["content"]["application/json"]["schema"]["$ref"].endswith("/TestConceptRequest")
+        assert "Concept" in schema["components"]["schemas"]
+
+    def test_multipart_image_part_attached(self, client, valid_test_request):
+        pytest.importorskip("python_multipart")
+        valid_test_request["concept"]["content"] = [{"type": "image", "data": "part:img"}]
+        png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+        with patch.object(orchestrator, "process_request", new_callable=AsyncMock) as run:
+            run.return_value = MinimalResponse(passed=True, composite_score=0.8, threshold=0.7)
+            response = client.post(
+                "/test-concept/multipart",
+                data={"request": json.dumps(valid_test_request)},
+                files={"img": ("board.png", png, "image/png")},
+            )
+
+        assert response.status_code == 200
+        assert run.call_args[0][0].concept.content[0].raw == png
+
+    def test_multipart_missing_part(self, client, valid_test_request):
+        pytest.importorskip("python_multipart")
+        valid_test_request["concept"]["content"] = [{"type": "image", "data": "part:img"}]
+        response = client.post(
+            "/test-concept/multipart",
+            data={"request": json.dumps(valid_test_request)},
+            files={"other": ("x.png", b"x", "image/png")},
+        )
+        assert response.status_code == 400
+
+
+class TestMediaEndpoints:
+    """Test media upload and lookup."""
+
+    PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+    def test_upload_and_lookup(self, client):
+        response = client.post("/media", content=self.PNG, headers={"Content-Type": "image/png"})
+        assert response.status_code == 200
+        info = response.json()
+        assert info["uri"] == f"media://{info['sha256']}"
+        assert info["media_type"] == "image/png"
+
+        lookup = client.get(f"/media/{info['sha256']}")
+        assert lookup.status_code == 200
+        assert lookup.json()["size_bytes"] == len(self.PNG)
+
+    def test_unsupported_media_rejected(self, client):
+        response = client.post(
+            "/media", content=b"plain text", headers={"Content-Type": "text/plain"}
+        )
+        assert response.status_code == 400
+
+    def test_unknown_media(self, client):
+        assert client.get(f"/media/{'0' * 64}").status_code == 404
+
+
+class TestPanelEndpoints:
+    """Test panel upload, lookup and use from /test-concept."""
+
+    def test_upload_json_and_lookup(self, client):
+        personas = [{"persona_id": "p1", "age": 30}, {"persona_id": "p2", "age": 50}]
+        response = client.post("/panels?panel_id=api-json", json=personas)
+        assert response.status_code == 200
+        info = response.json()
+        assert info["personas"] == 2
+        assert info["attributes"] == ["persona_id", "age"]
+
+        lookup = client.get(f"/panels/{info['ref']}")
+        assert lookup.status_code == 200
+        assert lookup.json()["version"] == info["version"]
+        assert info["ref"] in [p["ref"] for p in client.get("/panels").json()]
+
+    def test_upload_csv_creates_new_version(self, client):
+        body = "persona_id,age\np1,30\np2,50\n"
+        headers = {"Content-Type": "text/csv"}
+        first = client.post("/panels?panel_id=api-csv", content=body, headers=headers).json()
+        second = client.post("/panels?panel_id=api-csv", content=body, headers=headers).json()
+
+        assert second["version"] == first["version"] + 1
+        assert client.get("/panels/api-csv").json()["version"] == second["version"]
+
+    def test_invalid_uploads(self, client):
+        assert client.post("/panels?panel_id=bad", json=[{"age": 1}]).status_code == 400
+        assert client.post("/panels?panel_id=bad id", json=[]).status_code == 422
+        response = client.post(
+            "/panels?panel_id=bad", content=b"x", headers={"Content-Type": "text/plain"}
+        )
+        assert response.status_code == 415
+
+    @pytest.mark.asyncio
+    async def test_panel_load_does_not_block_event_loop(self, valid_test_request):
+        orchestrator.panel_store.save("api-slow", valid_test_request["personas"])
+        store_get = orchestrator.panel_store.get
+        loading, release, loaded = threading.Event(), threading.Event(), threading.Event()
+
+        def slow_get(*args, **kwargs):
+            loading.set()
+            release.wait(2)
+            loaded.set()
+            return store_get(*args, **kwargs)
+
+        request = {**valid_test_request, "personas": [], "panel_id": "api-slow"}
+        transport = httpx.ASGITransport(app=app)
+        with (
+            patch.object(orchestrator.panel_store, "get", side_effect=slow_get),
+            patch.object(orchestrator, "_generate_all_responses", new_callable=AsyncMock) as gen,
+        ):
+            gen.return_value = [
+                {
+                    "persona_id": p["persona_id"],
+                    "responses": {"q1": {"raw_text": "ok", "pmf": [0.2] * 5, "mean": 3.0}},
+                }
+                for p in valid_test_request["personas"]
+            ]
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                run = asyncio.create_task(http.post("/test-concept", json=request))
+                await asyncio.to_thread(loading.wait, 2)
+                health = await http.get("/health")
+                health_during_load = not loaded.is_set()
+                release.set()
+                response = await run
+
+        assert health.status_code == 200
+        assert health_during_load
+        assert response.status_code == 200
+
+    def test_unknown_panel(self, client, valid_test_request):
+        assert client.get("/panels/api-missing").status_code == 404
+
+        request = {**valid_test_request, "personas": [], "panel_id": "api-missing"}
+        assert client.post("/test-concept", json=request).status_code == 404
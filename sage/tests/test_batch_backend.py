@@ -0,0 +1,430 @@
+"""Tests for batch execution backends and the orchestrator batch path."""
+
+import io
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from sage.exceptions import ConfigurationError, ProviderError, ValidationError
+from sage.models.request import (
+    Concept,
+    ContentItem,
+    Options,
+    Question,
+    SurveyConfig,
+    TestConceptRequest,
+)
+from sage.services.batch_backend import (
+    BatchRecord,
+    BatchResult,
+    BedrockBatchBackend,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    create_batch_backend,
+)
+from sage.services.bedrock_provider import BedrockGenerationProvider
+from sage.services.llm_service import LLMService
+from sage.services.openai_provider import OpenAIEmbeddingProvider, OpenAIGenerationProvider
+from sage.services.orchestrator import Orchestrator
+from sage.services.ssr_engine import SSREngine
+
+CLAUDE = "eu.anthropic.claude-sonnet-4-5-20250929-v1:0"
+
+
+def _records(n=3):
+    return [
+        BatchRecord(custom_id=f"p{i}/q1", system_prompt="sys", user_prompt=f"prompt {i}")
+        for i in range(n)
+    ]
+
+
+def _options(**overrides):
+    return Options(
+        generation_provider="openai",
+        generation_model="gpt-4o",
+        embedding_provider="openai",
+        embedding_model="text-embedding-3-small",
+        vision_provider="openai",
+        vision_model="gpt-4o",
+        **overrides,
+    )
+
+
+class TestLocalBatchBackend:
+    """Test the filesystem job lifecycle stub."""
+
+    @pytest.mark.asyncio
+    async def test_job_lifecycle_and_outputs(self, tmp_path):
+        provider = AsyncMock()
+        provider.generate.side_effect = lambda **kw: f"answer to {kw['user_prompt']}"
+        backend = LocalBatchBackend(provider, directory=str(tmp_path))
+
+        job_id = await backend.submit(_records())
+        assert (tmp_path / job_id / "input.jsonl").read_text().count("\n") == 3
+        assert await backend.poll(job_id) == "in_progress"
+        provider.generate.assert_not_called()
+        assert await backend.poll(job_id) == "completed"
+
+        result = await backend.fetch_results(job_id, _records())
+        assert result.outputs == {f"p{i}/q1": f"answer to prompt {i}" for i in range(3)}
+        assert result.errors == {}
+
+    @pytest.mark.asyncio
+    async def test_record_errors_reported(self, tmp_path):
+        provider = AsyncMock()
+        provider.generate.side_effect = [
+            "ok",
+            ProviderError("openai", "rate limited"),
+            "ok",
+        ]
+        backend = LocalBatchBackend(provider, directory=str(tmp_path))
+
+        result = await backend.run(_records())
+
+        assert len(result.outputs) == 2
+        assert "rate limited" in result.errors["p1/q1"]
+
+    @pytest.mark.asyncio
+    async def test_images_sent_with_every_record(self, tmp_path):
+        provider = AsyncMock()
+        provider.generate_with_images.return_value = "nice"
+        blocks = [{"type": "image", "data": "abc"}]
+        backend = LocalBatchBackend(provider, blocks, directory=str(tmp_path))
+
+        await backend.run(_records(2))
+
+        for call in provider.generate_with_images.call_args_list:
+            assert call.kwargs["image_blocks"] == tuple(blocks)
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises(self, tmp_path):
+        backend = LocalBatchBackend(AsyncMock(), directory=str(tmp_path), timeout=0)
+        backend.poll = AsyncMock(return_value="in_progress")
+        with pytest.raises(ProviderError, match="did not finish"):
+            await backend.run(_records(1))
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ConfigurationError, match="Unknown batch backend"):
+            create_batch_backend("azure", AsyncMock())
+
+
+class TestBedrockBatchBackend:
+    """Test Bedrock batch job submission and output mapping."""
+
+    @pytest.fixture
+    def backend(self):
+        provider = BedrockGenerationProvider(CLAUDE)
+        with patch("boto3.client"):
+            backend = BedrockBatchBackend(
+                provider, s3_uri="s3://bucket/sweeps", role_arn="arn:aws:iam::1:role/batch"
+            )
+        backend.s3 = MagicMock()
+        backend.bedrock = MagicMock()
+        backend.bedrock.create_model_invocation_job.return_value = {"jobArn": "arn:job/abc"}
+        return backend
+
+    def test_requires_s3_and_role(self):
+        with patch("boto3.client"), pytest.raises(ConfigurationError, match="BATCH_S3_URI"):
+            BedrockBatchBackend(BedrockGenerationProvider(CLAUDE), s3_uri="", role_arn="")
+
+    @pytest.mark.asyncio
+    async def test_submit_writes_native_request_bodies(self, backend):
+        job_id = await backend.submit(_records(2))
+
+        assert job_id == "arn:job/abc"
+        put = backend.s3.put_object.call_args.kwargs
+        assert put["Bucket"] == "bucket"
+        assert put["Key"].startswith("sweeps/sage-") and put["Key"].endswith("/input.jsonl")
+        lines = [json.loads(line) for line in put["Body"].decode().splitlines()]
+        assert lines[0]["recordId"] == "R0000000000"
+        assert lines[0]["modelInput"]["messages"][0]["content"] == "prompt 0"
+        assert lines[0]["modelInput"]["anthropic_version"] == "bedrock-2023-05-31"
+
+        job = backend.bedrock.create_model_invocation_job.call_args.kwargs
+        assert job["modelId"] == CLAUDE
+        assert job["roleArn"] == "arn:aws:iam::1:role/batch"
+
+    @pytest.mark.asyncio
+    async def test_status_mapping(self, backend):
+        for status, expected in [
+            ("InProgress", "in_progress"),
+            ("Submitted", "in_progress"),
+            ("Completed", "completed"),
+            ("Failed", "failed"),
+        ]:
+            backend.bedrock.get_model_invocation_job.return_value = {"status": status}
+            assert await backend.poll("arn:job/abc") == expected
+
+    @pytest.mark.asyncio
+    async def test_outputs_mapped_back_by_record_id(self, backend):
+        await backend.submit(_records(2))
+        output = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "recordId": "R0000000001",
+                        "modelOutput": {
+                            "content": [{"text": "second"}],
+                            "usage": {"input_tokens": 5, "output_tokens": 7},
+                        },
+                    }
+                ),
+                json.dumps(
+                    {
+                        "recordId": "R0000000000",
+                        "error": {"errorCode": 400, "errorMessage": "bad input"},
+                    }
+                ),
+            ]
+        )
+        backend.s3.list_objects_v2.return_value = {
+            "Contents": [{"Key": "sweeps/job/output/abc/input.jsonl.out"}]
+        }
+        backend.s3.get_object.return_value = {"Body": io.BytesIO(output.encode())}
+
+        result = await backend.fetch_results("arn:job/abc", _records(2))
+
+        assert result.outputs == {"p1/q1": "second"}
+        assert result.errors == {"p0/q1": "bad input"}
+
+
+def _openai_client(output_rows, status="completed"):
+    client = MagicMock()
+    client.files.create = AsyncMock(return_value=MagicMock(id="file-in"))
+    client.batches.create = AsyncMock(return_value=MagicMock(id="batch_1"))
+    client.batches.retrieve = AsyncMock(
+        return_value=MagicMock(
+            status=status, output_file_id="file-out", error_file_id=None, errors=None
+        )
+    )
+    client.files.content = AsyncMock(
+        return_value=MagicMock(text="\n".join(json.dumps(r) for r in output_rows))
+    )
+    return client
+
+
+def _chat_row(custom_id, text):
+    return {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {
+                "choices": [{"message": {"content": text}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+            },
+        },
+        "error": None,
+    }
+
+
+class TestOpenAIBatchBackend:
+    """Test OpenAI Batch API submission and output mapping."""
+
+    @pytest.fixture
+    def provider(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test")  # the client is replaced per test
+        return OpenAIGenerationProvider("gpt-4o")
+
+    @pytest.mark.asyncio
+    async def test_submit_writes_chat_completion_requests(self, provider):
+        provider.client = _openai_client([])
+        backend = OpenAIBatchBackend(provider)
+        records = [
+            BatchRecord(
+                custom_id="p1/q1",
+                system_prompt="sys",
+                user_prompt="CONCEPT\nQ",
+                cache_prefix="CONCEPT\n",
+            )
+        ]
+
+        assert await backend.submit(records) == "batch_1"
+
+        upload = provider.client.files.create.call_args.kwargs
+        assert upload["purpose"] == "batch"
+        line = json.loads(upload["file"][1].decode())
+        assert line["custom_id"] == "p1/q1"
+        assert line["url"] == "/v1/chat/completions"
+        assert line["body"]["model"] == "gpt-4o"
+        assert line["body"]["messages"][1]["content"] == "CONCEPT\nQ"
+        assert "prompt_cache_key" in line["body"]
+        assert "extra_body" not in line["body"]
+        assert provider.client.batches.create.call_args.kwargs["endpoint"] == (
+            "/v1/chat/completions"
+        )
+
+    @pytest.mark.asyncio
+    async def test_status_mapping(self, provider):
+        for status, expected in [
+            ("validating", "in_progress"),
+            ("finalizing", "in_progress"),
+            ("completed", "completed"),
+            ("expired", "completed"),
+            ("cancelled", "failed"),
+        ]:
+            provider.client = _openai_client([], status=status)
+            assert await OpenAIBatchBackend(provider).poll("batch_1") == expected
+
+    @pytest.mark.asyncio
+    async def test_outputs_mapped_back_by_custom_id(self, provider):
+        provider.client = _openai_client(
+            [
+                _chat_row("p2/q1", "second"),
+                _chat_row("p1/q1", "first"),
+                {
+                    "custom_id": "p3/q1",
+                    "response": {
+                        "status_code": 429,
+                        "body": {"error": {"message": "rate limited"}},
+                    },
+                    "error": None,
+                },
+            ]
+        )
+
+        result = await OpenAIBatchBackend(provider).fetch_results("batch_1", [])
+
+        assert result.outputs == {"p1/q1": "first", "p2/q1": "second"}
+        assert result.errors == {"p3/q1": "rate limited"}
+
+    @pytest.mark.asyncio
+    async def test_embeddings_batched_when_embedding_model_is_openai(self, provider):
+        embedder = OpenAIEmbeddingProvider("text-embedding-3-small")
+        embedder.client = _openai_client(
+            [
+                {
+                    "custom_id": "p1/q1",
+                    "response": {
+                        "status_code": 200,
+                        "body": {"data": [{"embedding": [0.1, 0.2]}]},
+                    },
+                }
+            ]
+        )
+        backend = OpenAIBatchBackend(provider, embedding_provider=embedder, poll_interval=0)
+
+        embeddings = await backend.embed({"p1/q1": "I would buy it."})
+
+        assert embeddings == {"p1/q1": [0.1, 0.2]}
+        line = json.loads(embedder.client.files.create.call_args.kwargs["file"][1].decode())
+        assert line["url"] == "/v1/embeddings"
+        assert line["body"] == {"model": "text-embedding-3-small", "input": "I would buy it."}
+
+    def test_no_embedding_batch_for_other_providers(self, provider):
+        assert not OpenAIBatchBackend(provider).supports_embeddings()
+
+    def test_requires_openai_model(self):
+        with pytest.raises(ConfigurationError, match="OpenAI model"):
+            OpenAIBatchBackend(BedrockGenerationProvider(CLAUDE))
+
+    @pytest.mark.asyncio
+    async def test_precomputed_embedding_skips_embedding_call(self):
+        llm_service = MagicMock()
+        llm_service.get_embedding = AsyncMock()
+        llm_service.get_embeddings = AsyncMock(
+            return_value=[[1.0, 0.0], [0.8, 0.2], [0.5, 0.5], [0.2, 0.8], [0.0, 1.0]]
+        )
+        ssr = SSREngine(llm_service)
+
+        pmf, mean = await ssr.map_response_to_likert(
+            "text", [["a", "b", "c", "d", "e"]], response_embedding=[0.0, 1.0]
+        )
+
+        llm_service.get_embedding.assert_not_called()
+        assert pmf.index(max(pmf)) == 4
+
+
+class TestBatchExecution:
+    """Test batch records and the orchestrator batch path."""
+
+    @pytest.fixture
+    def questions(self):
+        return [
+            Question(
+                id=q_id,
+                text=f"Question {q_id}?",
+                weight=0.5,
+                ssr_reference_sets=[["a", "b", "c", "d", "e"]] * 6,
+            )
+            for q_id in ("q1", "q2")
+        ]
+
+    def _make_service(self, options, mock_gen):
+        with patch("sage.services.llm_service.ProviderFactory") as factory:
+            factory.create_generation_provider.return_value = mock_gen
+            factory.create_embedding_provider.return_value = AsyncMock()
+            factory.create_vision_provider.return_value = AsyncMock()
+            return LLMService(options)
+
+    @pytest.mark.asyncio
+    async def test_records_match_sync_prompts(self, questions):
+        service = self._make_service(_options(), AsyncMock())
+        concept = Concept(name="Widget", content=[ContentItem(type="text", data="A widget.")])
+        persona = {"persona_id": "p1", "age": 30}
+
+        records = await service.build_batch_records([persona], concept, questions)
+
+        assert [r.custom_id for r in records] == ["p1/q1", "p1/q2"]
+        assert records[0].system_prompt == service._build_system_prompt(persona)
+        assert records[0].user_prompt == service._build_user_prompt(concept, questions[0])
+
+    @pytest.mark.asyncio
+    async def test_direct_video_rejected(self):
+        service = self._make_service(_options(), AsyncMock())
+        concept = Concept(name="Ad", content=[ContentItem(type="video", data="s3://b/v.mp4")])
+        with pytest.raises(ValidationError, match="describe"):
+            service.create_batch_backend(concept)
+
+    @pytest.mark.asyncio
+    async def test_missing_outputs_generated_synchronously(self, questions):
+        mock_gen = AsyncMock()
+        mock_gen.generate.return_value = "sync answer"
+        service = self._make_service(_options(), mock_gen)
+        concept = Concept(name="Widget", content=[ContentItem(type="text", data="A widget.")])
+        batch = BatchResult(backend="local", job_id="j", outputs={"p1/q1": "batch answer"})
+
+        answers = await service.collect_batch_responses(
+            {"persona_id": "p1"}, concept, questions, batch
+        )
+
+        assert answers == {"q1": ("batch answer", "batch"), "q2": ("sync answer", "fallback")}
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_batch_run(self, questions, tmp_path):
+        request = TestConceptRequest(
+            personas=[{"persona_id": "p1", "age": 25}, {"persona_id": "p2", "age": 40}],
+            concept=Concept(name="Widget", content=[ContentItem(type="text", data="A widget.")]),
+            survey_config=SurveyConfig(questions=questions),
+            threshold=0.5,
+            output_dataset=True,
+            options=_options(execution_mode="batch"),
+        )
+        mock_gen = AsyncMock()
+        mock_gen.generate.return_value = "I would buy it."
+        mock_emb = AsyncMock()
+        mock_emb.embed_single.return_value = [1.0, 0.0]
+        mock_emb.embed.return_value = [[1.0, 0.0], [0.8, 0.2], [0.5, 0.5], [0.2, 0.8], [0.0, 1.0]]
+
+        with (
+            patch("sage.services.llm_service.ProviderFactory") as factory,
+            patch("sage.services.llm_service.get_settings") as settings,
+            patch("sage.services.batch_backend.get_settings") as backend_settings,
+        ):
+            factory.create_generation_provider.return_value = mock_gen
+            factory.create_embedding_provider.return_value = mock_emb
+            factory.create_vision_provider.return_value = AsyncMock()
+            settings.return_value.batch_backend = "local"
+            backend_settings.return_value.batch_local_dir = str(tmp_path)
+            backend_settings.return_value.batch_poll_interval = 0
+            backend_settings.return_value.batch_timeout = 60
+
+            result = await Orchestrator().process_request(request)
+
+        assert mock_gen.generate.call_count == 4
+        assert result.meta.batch_job.backend == "local"
+        assert result.meta.batch_job.records == 4
+        assert result.meta.batch_job.failed_records == 0
+        assert result.meta.generation_modes == {"batch": 4}
+        assert result.dataset[0]["q1_generation_mode"] == "batch"
+        assert result.dataset[0]["q1_text"] == "I would buy it."
@@ -0,0 +1,176 @@
+"""Tests for stage timing, the end-to-end benchmark and the micro-benchmarks."""
+
+import asyncio
+import io
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from sage.bench.e2e import FAKE_OPTIONS, load_examples, print_summary, run_benchmark
+from sage.bench.micro import build_cases, main, measure
+from sage.services.bedrock_provider import BedrockGenerationProvider
+from sage.utils.timing import (
+    acquire,
+    current_stage_timer,
+    record_retries,
+    run_timing,
+    stage,
+    start_stage_timing,
+)
+
+
+class TestStageTiming:
+    """Test per-run stage timers."""
+
+    def test_stage_noop_outside_run(self):
+        async def untimed():
+            with stage("score"):
+                pass
+            return current_stage_timer()
+
+        assert asyncio.run(untimed()) is None
+
+    @pytest.mark.asyncio
+    async def test_child_tasks_record_into_run(self):
+        timer = start_stage_timing()
+
+        async def call():
+            with stage("llm.text"):
+                await asyncio.sleep(0)
+
+        with stage("generate"):
+            await asyncio.gather(*[call() for _ in range(3)])
+
+        assert timer.counts() == {"llm.text": 3, "generate": 1}
+        assert timer.totals()["generate"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_run_timing_nested_in_outer_timer(self):
+        outer = start_stage_timing()
+
+        with run_timing() as run:
+            with stage("score"):
+                pass
+            assert current_stage_timer() is run
+
+        with stage("serialize"):
+            pass
+
+        assert run.counts() == {"score": 1}
+        assert outer.counts() == {"score": 1, "serialize": 1}
+
+    @pytest.mark.asyncio
+    async def test_queue_waits_and_retries_in_summary(self):
+        semaphore = asyncio.Semaphore(1)
+
+        async def persona():
+            async with acquire(semaphore, "persona"):
+                with stage("persona"):
+                    with stage("llm.text"):
+                        record_retries(2)
+                    await asyncio.sleep(0.01)
+
+        with run_timing() as timer:
+            await asyncio.gather(*[persona() for _ in range(3)])
+            record_retries(1)
+
+        summary = timer.summary()
+        assert summary["persona"].calls == 3
+        assert summary["persona"].p50_ms <= summary["persona"].p95_ms <= summary["persona"].max_ms
+        assert summary["persona"].queue_wait_ms >= 10  # the third persona waits for two
+        assert summary["persona"].retries is None
+        assert summary["llm.text"].retries == 6
+        assert summary["other"].calls == 0
+        assert summary["other"].retries == 1
+
+    @pytest.mark.asyncio
+    async def test_bedrock_retries_recorded(self):
+        provider = BedrockGenerationProvider("eu.anthropic.claude-sonnet-4-5-20250929-v1:0")
+        body = {"content": [{"type": "text", "text": "ok"}], "usage": {}}
+        provider.client = MagicMock()
+        provider.client.invoke_model.return_value = {
+            "body": io.BytesIO(json.dumps(body).encode()),
+            "ResponseMetadata": {"RetryAttempts": 2},
+        }
+
+        with run_timing() as timer:
+            with stage("llm.text"):
+                assert await provider.generate("sys", "user") == "ok"
+
+        assert timer.retries == {"llm.text": 2}
+
+
+class TestEndToEndBench:
+    """Test replaying examples on the fake providers."""
+
+    @pytest.fixture
+    def examples_dir(self, tmp_path, valid_test_request):
+        (tmp_path / "01_text_input.json").write_text(json.dumps(valid_test_request))
+        video = {
+            **valid_test_request,
+            "concept": {"name": "Ad", "content": [{"type": "video", "data": "https://x/y.mp4"}]},
+        }
+        (tmp_path / "02_video_input.json").write_text(json.dumps(video))
+        return tmp_path
+
+    def test_examples_switched_to_fake_providers(self, examples_dir):
+        examples, skipped = load_examples(examples_dir)
+
+        assert [name for name, _ in examples] == ["01_text"]
+        assert skipped == ["02_video"]
+        assert json.loads(examples[0][1])["options"].items() >= FAKE_OPTIONS.items()
+
+    @pytest.mark.asyncio
+    async def test_run_reports_throughput_latency_and_stages(self, examples_dir, capsys):
+        examples, _ = load_examples(examples_dir)
+
+        results = await run_benchmark(examples, requests=3, concurrency=2, warmup=0)
+
+        assert results["requests"] == 3
+        assert results["errors"] == 0
+        assert results["throughput_rps"] > 0
+        assert results["latency_ms"]["p50"] <= results["latency_ms"]["p99"]
+        assert results["stage_calls_per_request"]["llm.text"] == 2
+        assert {"parse", "generate", "score", "serialize"} <= set(results["stages_ms_per_request"])
+
+        print_summary(results, {"commit": "abc123", "results": results})
+        assert "+0.0% vs abc123" in capsys.readouterr().out
+
+
+class TestMicroBench:
+    """Test the hot path micro-benchmarks."""
+
+    def test_quick_cases_cover_every_hot_path(self):
+        cases = list(build_cases(quick=True))
+
+        assert {case.name for case in cases} == {
+            "cosine_similarity",
+            "ssr.pmf_for_set",
+            "scoring.metrics",
+            "scoring.bootstrap",
+            "filter.apply",
+            "report.generate",
+        }
+        pmf = next(case for case in cases if case.name == "ssr.pmf_for_set").op()
+        assert sum(pmf) == pytest.approx(1.0)
+
+    def test_measure_reports_ops_and_allocations(self):
+        case = next(case for case in build_cases(quick=True) if case.name == "filter.apply")
+
+        row = measure(case, min_time=0.001, repeats=1)
+
+        assert case.key == "filter.apply[personas=90]"
+        assert row["ops_per_sec"] > 0
+        assert row["peak_alloc_kb"] > 0
+
+    def test_output_and_compare(self, tmp_path, capsys):
+        output = tmp_path / "micro.json"
+        args = ["--quick", "--select", "cosine", "--min-time", "0.001", "--repeats", "1"]
+
+        assert main([*args, "--output", str(output)]) == 0
+        assert main([*args, "--compare", str(output)]) == 0
+
+        saved = json.loads(output.read_text())
+        assert [row["case"] for row in saved["results"]] == ["cosine_similarity[dims=1024]"]
+        assert "ops/sec)" in capsys.readouterr().out
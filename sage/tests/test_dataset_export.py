@@ -0,0 +1,99 @@
+"""Tests for dataset rows and columnar encodings."""
+
+import gzip
+import io
+import json
+
+import numpy as np
+import pytest
+
+from sage.models.request import Question
+from sage.services.dataset_export import build_dataset_rows, encode_dataset
+
+QUESTIONS = [
+    Question(id="q1", text="Buy?", weight=0.5, ssr_reference_sets=[list("abcde")] * 6),
+    Question(id="q2", text="Like?", weight=0.5, ssr_reference_sets=[list("abcde")] * 6),
+]
+
+PERSONAS = [
+    {"persona_id": "p1", "age": 30, "region": "N"},
+    {"persona_id": "p2", "age": 45, "region": 7},
+]
+
+
+def _responses():
+    return [
+        {
+            "persona_id": p["persona_id"],
+            "responses": {
+                q.id: {
+                    "raw_text": f"{p['persona_id']} on {q.id}",
+                    "pmf": [0.1, 0.1, 0.2, 0.3, 0.3],
+                    "mean": 3.6,
+                    "generation_mode": "per_question",
+                }
+                for q in QUESTIONS
+            },
+        }
+        for p in PERSONAS
+    ]
+
+
+class TestDatasetRows:
+    """Test the row-oriented dataset."""
+
+    def test_columns_per_question(self):
+        rows = build_dataset_rows(PERSONAS, _responses(), [True, False], QUESTIONS)
+        assert rows[1]["matched_filter"] is False
+        assert rows[0]["q2_text"] == "p1 on q2"
+        assert "q1_generation_mode" not in rows[0]
+
+    def test_rounded_for_json(self):
+        responses = _responses()
+        responses[0]["responses"]["q1"].update(
+            pmf=np.array([0.12345, 0.1, 0.2, 0.3, 0.27655], dtype=np.float32),
+            mean=3.61234,
+        )
+        rows = build_dataset_rows(PERSONAS, responses, [True, True], QUESTIONS)
+
+        assert rows[0]["q1_pmf"] == [0.123, 0.1, 0.2, 0.3, 0.277]
+        assert rows[0]["q1_mean"] == 3.61
+        json.dumps(rows)
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError, match="Unknown dataset format"):
+            encode_dataset(PERSONAS, _responses(), [True, True], QUESTIONS, "csv")
+
+
+class TestNdjson:
+    """Test gzip-compressed NDJSON encoding."""
+
+    def test_round_trip(self):
+        body = encode_dataset(PERSONAS, _responses(), [True, True], QUESTIONS, "ndjson")
+        lines = gzip.decompress(body).decode("utf-8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert rows == build_dataset_rows(PERSONAS, _responses(), [True, True], QUESTIONS)
+
+
+class TestArrow:
+    """Test typed Arrow and Parquet encodings."""
+
+    def test_arrow_schema(self):
+        pa = pytest.importorskip("pyarrow")
+        body = encode_dataset(PERSONAS, _responses(), [True, True], QUESTIONS, "arrow")
+        table = pa.ipc.open_stream(body).read_all()
+
+        assert table.schema.field("q1_pmf").type == pa.list_(pa.float32(), 5)
+        assert table.schema.field("q1_mean").type == pa.float32()
+        assert table.schema.field("age").type == pa.int64()
+        # Mixed-type attributes fall back to strings
+        assert table.column("region").to_pylist() == ["N", "7"]
+
+    def test_parquet_round_trip(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        body = encode_dataset(
+            PERSONAS, _responses(), [True, True], QUESTIONS, "parquet", include_generation_mode=True
+        )
+        table = pq.read_table(io.BytesIO(body))
+        assert table.num_rows == 2
+        assert table.column("q2_generation_mode").to_pylist() == ["per_question"] * 2
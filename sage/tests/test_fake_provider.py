@@ -0,0 +1,173 @@
+"""Tests for the offline fake providers."""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from sage.exceptions import ProviderError
+from sage.models.request import (
+    Concept,
+    ContentItem,
+    Options,
+    Question,
+    SurveyConfig,
+    TestConceptRequest,
+)
+from sage.services.fake_provider import (
+    FakeBehaviour,
+    FakeEmbeddingProvider,
+    FakeGenerationProvider,
+    fake_reply,
+)
+from sage.services.orchestrator import Orchestrator
+from sage.services.usage import start_usage_tracking
+
+
+class TestFakeReplies:
+    """Test deterministic text and embeddings."""
+
+    @pytest.mark.asyncio
+    async def test_reply_deterministic(self):
+        provider = FakeGenerationProvider(behaviour=FakeBehaviour())
+        first = await provider.generate("You are p1.", "Would you buy this?")
+        assert first == await provider.generate("You are p1.", "Would you buy this?")
+        assert first == fake_reply("You are p1.", "Would you buy this?")
+
+    @pytest.mark.asyncio
+    async def test_samples_differ_by_seed_and_index(self):
+        provider = FakeGenerationProvider(behaviour=FakeBehaviour())
+        replies = {
+            tuple(await provider.generate_samples(f"You are p{i}.", "Buy?", n=3, seed=seed))
+            for i in range(5)
+            for seed in (1, 2)
+        }
+        assert len(replies) > 1
+        assert await provider.generate_samples("p", "Buy?", n=3, seed=1) == (
+            await provider.generate_samples("p", "Buy?", n=3, seed=1)
+        )
+
+    def test_multi_question_prompt_gets_json(self):
+        reply = fake_reply("You are p1.", "Concept\n\n[q1] Buy it?\n[q2] Price fair?\n")
+        assert set(json.loads(reply)) == {"q1", "q2"}
+
+    @pytest.mark.asyncio
+    async def test_embeddings_seeded_by_text(self):
+        provider = FakeEmbeddingProvider(behaviour=FakeBehaviour())
+        a, b, a_again = await provider.embed(["I like it", "Too pricey", "I like it"])
+        assert a == a_again
+        assert a != b
+        assert len(a) == provider.dimensions
+        assert np.linalg.norm(a) == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_token_usage_recorded(self):
+        provider = FakeGenerationProvider(behaviour=FakeBehaviour())
+        usage = start_usage_tracking()
+        prefix = "CONCEPT!" * 10
+        text = await provider.generate("s" * 40, prefix + "Q?", cache_prefix=prefix)
+        assert usage.calls == 1
+        assert usage.cache_read_input_tokens == 20
+        assert usage.input_tokens == 10 + 1
+        assert usage.output_tokens == -(-len(text) // 4)
+
+
+class TestFakeBehaviour:
+    """Test latency and failure injection."""
+
+    @pytest.mark.asyncio
+    async def test_latency(self):
+        behaviour = FakeBehaviour(latency_ms=20)
+        start = time.perf_counter()
+        await behaviour.call()
+        assert time.perf_counter() - start >= 0.019
+
+    @pytest.mark.asyncio
+    async def test_injected_failure_rates(self):
+        behaviour = FakeBehaviour(error_rate=0.2, throttle_rate=0.1, seed=0)
+        messages = []
+        for _ in range(2000):
+            try:
+                await behaviour.call()
+            except ProviderError as e:
+                messages.append(str(e))
+        throttles = sum("Throttling" in m for m in messages)
+        assert throttles == pytest.approx(200, abs=50)
+        assert len(messages) - throttles == pytest.approx(400, abs=60)
+
+    @pytest.mark.asyncio
+    async def test_seeded_draws_reproducible(self):
+        async def outcomes(seed):
+            behaviour = FakeBehaviour(error_rate=0.5, seed=seed)
+            results = []
+            for _ in range(20):
+                try:
+                    await behaviour.call()
+                    results.append(True)
+                except ProviderError:
+                    results.append(False)
+            return results
+
+        assert await outcomes(3) == await outcomes(3)
+
+
+class TestFakePipeline:
+    """Test a full run on fake providers (no mocks)."""
+
+    @pytest.mark.asyncio
+    async def test_process_request_offline(self):
+        request = TestConceptRequest(
+            personas=[{"persona_id": f"p{i}", "age": 20 + i} for i in range(8)],
+            concept=Concept(name="Widget", content=[ContentItem(type="text", data="A widget.")]),
+            survey_config=SurveyConfig(
+                questions=[
+                    Question(
+                        id="q1",
+                        text="Would you buy this?",
+                        weight=1.0,
+                        ssr_reference_sets=[
+                            [
+                                "I would definitely not buy it",
+                                "I probably would not buy it",
+                                "I might buy it",
+                                "I would probably buy it",
+                                "I would definitely buy it",
+                            ]
+                        ]
+                        * 6,
+                    )
+                ]
+            ),
+            threshold=0.5,
+            output_dataset=True,
+            options=Options(
+                generation_provider="fake",
+                generation_model="fake-chat",
+                embedding_provider="fake",
+                embedding_model="fake-embedding",
+                vision_provider="fake",
+                vision_model="fake-vision",
+                video_provider="fake",
+                video_model="fake-video",
+            ),
+        )
+
+        first = await Orchestrator().process_request(request)
+        second = await Orchestrator().process_request(request)
+
+        assert first.personas_matched == 8
+        assert first.meta.providers.generation == "fake/fake-chat"
+        assert first.meta.token_usage.calls == 8
+        timings = first.meta.timings
+        assert timings["persona"].calls == 8
+        assert timings["persona"].queue_wait_ms is not None
+        assert timings["llm.text"].calls == 8
+        assert timings["ssr"].calls == 48
+        assert {"filter", "prepare", "generate", "embedding", "score", "dataset"} <= set(timings)
+        assert first.result.composite_score == second.result.composite_score
+        assert [r["q1_text"] for r in first.dataset] == [r["q1_text"] for r in second.dataset]
+
+    def test_fake_models_validated(self):
+        with pytest.raises(ValueError, match="not supported"):
+            Options(generation_provider="fake", generation_model="gpt-4o")
@@ -2,7 +2,8 @@
 
 import pytest
 
-from sage.services.filter_engine import FilterEngine
+from sage.exceptions import FilterSyntaxError
+from sage.services.filter_engine import FilterEngine, compile_filter
 
 
 @pytest.fixture
@@ -33,27 +34,21 @@ class TestFilterEngine:
 
     def test_equality_filter_string(self, filter_engine, sample_personas):
         """Test equality filter with string value."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["gender=F"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["gender=F"])
 
         assert len(filtered) == 3
         assert match_flags == [True, False, True, False, True]
 
     def test_equality_filter_numeric(self, filter_engine, sample_personas):
         """Test equality filter with numeric value."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["age=35"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["age=35"])
 
         assert len(filtered) == 1
         assert filtered[0]["persona_id"] == "p2"
 
     def test_greater_than_filter(self, filter_engine, sample_personas):
         """Test greater than filter."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["age>40"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["age>40"])
 
         assert len(filtered) == 2
         persona_ids = [p["persona_id"] for p in filtered]
@@ -62,34 +57,26 @@ class TestFilterEngine:
 
     def test_greater_than_or_equal_filter(self, filter_engine, sample_personas):
         """Test greater than or equal filter."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["age>=45"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["age>=45"])
 
         assert len(filtered) == 2
 
     def test_less_than_filter(self, filter_engine, sample_personas):
         """Test less than filter."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["age<30"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["age<30"])
 
         assert len(filtered) == 1
         assert filtered[0]["persona_id"] == "p1"
 
     def test_less_than_or_equal_filter(self, filter_engine, sample_personas):
         """Test less than or equal filter."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["age<=30"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["age<=30"])
 
         assert len(filtered) == 2
 
     def test_not_equal_filter(self, filter_engine, sample_personas):
         """Test not equal filter."""
-        filtered, match_flags = filter_engine.apply_filters(
-            sample_personas, ["gender!=M"]
-        )
+        filtered, match_flags = filter_engine.apply_filters(sample_personas, ["gender!=M"])
 
         assert len(filtered) == 3
 
@@ -139,3 +126,139 @@ class TestFilterEngine:
         filters = ["invalid", "age>=", "=value"]
         errors = filter_engine.validate_filters(filters)
         assert len(errors) == 3
+
+
+class TestCompiledFilters:
+    """Test boolean logic, ranges and compile-time errors."""
+
+    def test_and_or(self, filter_engine, sample_personas):
+        """Test AND binds tighter than OR."""
+        _, match_flags = filter_engine.apply_filters(
+            sample_personas, ["gender=M and age>50 or region=North"]
+        )
+
+        assert match_flags == [True, False, False, True, True]
+
+    def test_parentheses_and_not(self, filter_engine, sample_personas):
+        """Test grouping and negation."""
+        _, match_flags = filter_engine.apply_filters(
+            sample_personas, ["NOT (gender=F AND (age<30 OR income=low))"]
+        )
+
+        assert match_flags == [False, True, False, True, True]
+
+    def test_between_is_inclusive(self, filter_engine, sample_personas):
+        """Test BETWEEN range includes both bounds."""
+        filtered, _ = filter_engine.apply_filters(sample_personas, ["age between 30 and 45"])
+
+        assert [p["persona_id"] for p in filtered] == ["p2", "p3", "p5"]
+
+    def test_not_in(self, filter_engine, sample_personas):
+        """Test 'not in' membership filter."""
+        filtered, _ = filter_engine.apply_filters(sample_personas, ["region not in [North, South]"])
+
+        assert [p["persona_id"] for p in filtered] == ["p3", "p4"]
+
+    def test_values_with_spaces_and_quotes(self, filter_engine):
+        """Test bare values keep inner spaces and quoted values may contain commas."""
+        personas = [
+            {"persona_id": "p1", "country": "United Kingdom", "job": "Sales, EMEA"},
+            {"persona_id": "p2", "country": "Greece", "job": "Engineering"},
+        ]
+
+        _, flags = filter_engine.apply_filters(personas, ["country=United Kingdom"])
+        assert flags == [True, False]
+        _, flags = filter_engine.apply_filters(personas, ['job in ["Sales, EMEA", Legal]'])
+        assert flags == [True, False]
+
+    @pytest.mark.parametrize(
+        "expression,field,value",
+        [
+            ("country=Trinidad and Tobago", "country", "Trinidad and Tobago"),
+            ("job=Engineer (Software)", "job", "Engineer (Software)"),
+            ("income-band=high", "income-band", "high"),
+            ("segment=Rock and Roll fans", "segment", "Rock and Roll fans"),
+            ("user.segment=Rock or Pop", "user.segment", "Rock or Pop"),
+            ("household type = Single parent", "household type", "Single parent"),
+        ],
+    )
+    def test_legacy_single_conditions_still_accepted(self, filter_engine, expression, field, value):
+        """Test single conditions accepted before boolean logic keep their meaning."""
+        personas = [{field: value}, {field: "other"}]
+        _, flags = filter_engine.apply_filters(personas, [expression])
+
+        assert flags == [True, False]
+
+    def test_legacy_field_name_with_space(self, filter_engine):
+        """Test numeric comparison on an attribute whose name contains a space."""
+        personas = [{"household size": 3}, {"household size": 1}, {}]
+        _, flags = filter_engine.apply_filters(personas, ["household size>=2"])
+
+        assert flags == [True, False, False]
+
+    def test_legacy_membership_values_with_and(self, filter_engine):
+        """Test list values containing AND are read as one legacy condition."""
+        personas = [{"country": "Trinidad and Tobago"}, {"country": "Peru"}, {"country": "Chile"}]
+        _, flags = filter_engine.apply_filters(personas, ["country in [Trinidad and Tobago, Peru]"])
+
+        assert flags == [True, True, False]
+
+    def test_hyphenated_field_in_boolean_expression(self, filter_engine):
+        """Test field names with - and . work inside the grammar."""
+        personas = [{"income-band": "high", "geo.region": "North"}, {"income-band": "low"}]
+        _, flags = filter_engine.apply_filters(
+            personas, ["income-band=high and geo.region in [North]"]
+        )
+
+        assert flags == [True, False]
+
+    def test_numeric_strings_compare_numerically(self, filter_engine):
+        """Test numeric comparison when persona values are numeric strings."""
+        personas = [{"age": "9"}, {"age": "10"}, {"age": None}, {}]
+        _, flags = filter_engine.apply_filters(personas, ["age>=10"])
+
+        assert flags == [False, True, False, False]
+
+    def test_large_panel(self, filter_engine):
+        """Test masks over a large panel match a per-persona evaluation."""
+        personas = [
+            {"persona_id": f"p{i}", "age": 18 + i % 60, "gender": "MF"[i % 2]} for i in range(20000)
+        ]
+        _, flags = filter_engine.apply_filters(personas, ["gender=F and age between 20 and 29"])
+
+        expected = [p["gender"] == "F" and 20 <= p["age"] <= 29 for p in personas]
+        assert flags == expected
+
+    def test_mask(self, filter_engine, sample_personas):
+        """Test mask returns a NumPy boolean array."""
+        mask = filter_engine.mask(sample_personas, ["gender=F", "age>=30"])
+
+        assert mask.dtype == bool
+        assert mask.tolist() == [False, False, True, False, True]
+
+    @pytest.mark.parametrize(
+        "expression,position",
+        [
+            ("age>=", 5),
+            ("(gender=F", 0),
+            ("gender=F)", 8),
+            ("region in [North", 16),
+            ("age between 30 or 40", 15),
+            ("gender not F", 11),
+        ],
+    )
+    def test_syntax_error_position(self, expression, position):
+        """Test invalid expressions report the error position."""
+        with pytest.raises(FilterSyntaxError) as exc_info:
+            compile_filter(expression)
+
+        assert exc_info.value.position == position
+        assert exc_info.value.expression == expression
+
+    def test_validate_filters_reports_position(self, filter_engine):
+        """Test validation errors include the position."""
+        errors = filter_engine.validate_filters(["gender=F", "age>="])
+
+        assert errors == [
+            "Filter 1: Invalid filter expression 'age>=': expected a value at position 5"
+        ]
@@ -0,0 +1,156 @@
+"""Tests for image downscaling/recompression and token estimates."""
+
+import base64
+import io
+
+import pytest
+
+from sage.exceptions import ValidationError
+from sage.models.request import Concept, ContentItem
+from sage.services.image_processor import (
+    ImageProcessor,
+    ImageTarget,
+    estimate_image_tokens,
+    fit_dimensions,
+)
+from sage.services.prepared_concept import PreparedConcept
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _image_b64(size: tuple[int, int], fmt: str = "PNG", mode: str = "RGB", **save_args) -> str:
+    img = Image.new(mode, size, color=(200, 30, 30) if mode == "RGB" else (200, 30, 30, 128))
+    # Add some detail so compression has work to do
+    for x in range(0, size[0], 7):
+        img.putpixel((x, x % size[1]), (0, 0, 0) if mode == "RGB" else (0, 0, 0, 255))
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **save_args)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _concept(data: str) -> Concept:
+    return Concept(name="Storyboard", content=[ContentItem(type="image", data=data)])
+
+
+class _Provider:
+    """Minimal stand-in for a vision provider of a given family."""
+
+    def __init__(self, family: str):
+        self.family = family
+
+    def format_images(self, images):
+        return [{"image": img["data"], "media_type": img["media_type"]} for img in images]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ImageProcessor._cache.clear()
+    yield
+    ImageProcessor._cache.clear()
+
+
+class TestFitDimensions:
+    """Test resize target arithmetic."""
+
+    def test_small_image_unchanged(self):
+        assert fit_dimensions(800, 600, ImageTarget(max_long_edge=1568)) == (800, 600)
+
+    def test_long_edge_cap(self):
+        assert fit_dimensions(4000, 2000, ImageTarget(max_long_edge=2000)) == (2000, 1000)
+
+    def test_short_edge_cap(self):
+        w, h = fit_dimensions(2048, 2048, ImageTarget(max_long_edge=2048, max_short_edge=768))
+        assert (w, h) == (768, 768)
+
+    def test_pixel_cap(self):
+        w, h = fit_dimensions(3000, 3000, ImageTarget(max_long_edge=5000, max_pixels=1_000_000))
+        assert w * h <= 1_000_000
+
+
+class TestTokenEstimates:
+    """Test per-family token estimates."""
+
+    def test_openai_tiles(self):
+        # 1024x1024 -> 768x768 -> 2x2 tiles
+        assert estimate_image_tokens(1024, 1024, "openai") == 85 + 170 * 4
+
+    def test_anthropic_pixels(self):
+        assert estimate_image_tokens(750, 100, "anthropic") == 100
+
+    def test_estimate_applies_provider_downscale(self):
+        assert estimate_image_tokens(8000, 8000, "anthropic") == estimate_image_tokens(
+            4000, 4000, "anthropic"
+        )
+
+
+class TestImageProcessor:
+    """Test image preprocessing and caching."""
+
+    def test_large_image_downscaled_to_family_target(self):
+        prepared = PreparedConcept(_concept(_image_b64((3000, 2000))), ImageProcessor())
+        images = prepared.images_for(_Provider("anthropic"))
+
+        raw = base64.b64decode(images[0]["data"])
+        with Image.open(io.BytesIO(raw)) as out:
+            assert max(out.size) <= 1568
+            assert out.size[0] * out.size[1] <= 1_150_000
+        assert images[0]["media_type"] == "image/jpeg"
+
+    def test_configured_max_edge_reduces_tokens(self):
+        prepared = PreparedConcept(_concept(_image_b64((1500, 1000))), ImageProcessor(max_edge=512))
+        prepared.images_for(_Provider("anthropic"))
+        info = prepared.preprocessing_info(vision_calls=10)
+
+        assert info.family == "anthropic"
+        assert info.estimated_tokens_processed < info.estimated_tokens_original
+        assert (
+            info.estimated_tokens_saved
+            == (info.estimated_tokens_original - info.estimated_tokens_processed) * 10
+        )
+        assert info.bytes_saved == (info.original_bytes - info.processed_bytes) * 10
+
+    def test_sizes_are_base64_as_sent(self):
+        data = _image_b64((1500, 1000))
+        prepared = PreparedConcept(_concept(data), ImageProcessor(max_edge=512))
+        images = prepared.images_for(_Provider("anthropic"))
+        info = prepared.preprocessing_info(vision_calls=1)
+
+        assert info.original_bytes == len(data)
+        assert info.processed_bytes == len(images[0]["data"])
+
+    def test_decompression_bomb_rejected(self, monkeypatch):
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+        prepared = PreparedConcept(_concept(_image_b64((100, 100))), ImageProcessor())
+
+        with pytest.raises(ValidationError, match="too large"):
+            prepared.images_for(_Provider("openai"))
+
+    def test_small_image_kept_when_not_smaller(self):
+        data = _image_b64((64, 64), fmt="JPEG", quality=20, optimize=True)
+        prepared = PreparedConcept(_concept(data), ImageProcessor())
+        images = prepared.images_for(_Provider("openai"))
+        assert images[0]["data"] == data
+
+    def test_alpha_preserved_as_png(self):
+        prepared = PreparedConcept(
+            _concept(_image_b64((3000, 1000), mode="RGBA")), ImageProcessor()
+        )
+        images = prepared.images_for(_Provider("openai"))
+        assert images[0]["media_type"] == "image/png"
+
+    def test_cached_by_hash_and_target(self):
+        data = _image_b64((2000, 2000))
+        first = PreparedConcept(_concept(data), ImageProcessor())
+        second = PreparedConcept(_concept(data), ImageProcessor())
+
+        first.images_for(_Provider("openai"))
+        second.images_for(_Provider("openai"))
+        assert len(ImageProcessor._cache) == 1
+
+        second.images_for(_Provider("anthropic"))
+        assert len(ImageProcessor._cache) == 2
+
+    def test_no_info_without_preprocessing(self):
+        prepared = PreparedConcept(_concept(_image_b64((100, 100))))
+        prepared.image_blocks(_Provider("openai"))
+        assert prepared.preprocessing_info(vision_calls=5) is None
@@ -1,10 +1,15 @@
 """Tests for LLMService - prompt building, media detection, and routing."""
 
-import pytest
+import asyncio
 from unittest.mock import AsyncMock, patch
 
+import pytest
+
+from sage.exceptions import ValidationError
 from sage.models.request import Concept, ContentItem, Options, Question
 from sage.services.llm_service import LLMService
+from sage.services.openai_provider import OpenAIVisionProvider
+from sage.services.prepared_concept import detect_image_media_type
 from sage.services.video_downloader import VideoSource
 
 
@@ -35,7 +40,7 @@ def image_concept():
         name="Visual Product",
         content=[
             ContentItem(type="text", data="A shiny product."),
-            ContentItem(type="image", data="/9j/fakebase64data"),
+            ContentItem(type="image", data="/9j/4GZha2VqcGVnZGF0YQ=="),
         ],
     )
 
@@ -76,32 +81,22 @@ class TestPromptBuilding:
 
 
 class TestMediaTypeDetection:
-    """Test image media type detection from base64 headers."""
+    """Test image media type detection from decoded bytes."""
 
-    def test_jpeg_detection(self, options):
-        with patch("sage.services.llm_service.ProviderFactory"):
-            service = LLMService(options)
-        assert service._detect_media_type("/9j/abc") == "image/jpeg"
+    def test_jpeg_detection(self):
+        assert detect_image_media_type(b"\xff\xd8\xff\xe0abc") == "image/jpeg"
 
-    def test_png_detection(self, options):
-        with patch("sage.services.llm_service.ProviderFactory"):
-            service = LLMService(options)
-        assert service._detect_media_type("iVBORxyz") == "image/png"
+    def test_png_detection(self):
+        assert detect_image_media_type(b"\x89PNG\r\n\x1a\nxyz") == "image/png"
 
-    def test_gif_detection(self, options):
-        with patch("sage.services.llm_service.ProviderFactory"):
-            service = LLMService(options)
-        assert service._detect_media_type("R0lGOxyz") == "image/gif"
+    def test_gif_detection(self):
+        assert detect_image_media_type(b"GIF89axyz") == "image/gif"
 
-    def test_webp_detection(self, options):
-        with patch("sage.services.llm_service.ProviderFactory"):
-            service = LLMService(options)
-        assert service._detect_media_type("UklGRxyz") == "image/webp"
+    def test_webp_detection(self):
+        assert detect_image_media_type(b"RIFF\x00\x00\x00\x00WEBPxyz") == "image/webp"
 
-    def test_unknown_defaults_to_jpeg(self, options):
-        with patch("sage.services.llm_service.ProviderFactory"):
-            service = LLMService(options)
-        assert service._detect_media_type("unknowndata") == "image/jpeg"
+    def test_unknown_not_detected(self):
+        assert detect_image_media_type(b"unknowndata") is None
 
 
 class TestResponseRouting:
@@ -125,10 +120,8 @@ class TestResponseRouting:
         mock_gen.generate.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_images_use_vision_provider(
-        self, options, persona, image_concept, question
-    ):
-        mock_vision = AsyncMock()
+    async def test_images_use_vision_provider(self, options, persona, image_concept, question):
+        mock_vision = AsyncMock(spec=OpenAIVisionProvider)
         mock_vision.generate_with_images.return_value = "Looks great, I'd buy it."
 
         with patch("sage.services.llm_service.ProviderFactory") as factory:
@@ -209,6 +202,77 @@ class TestResponseRouting:
         mock_vision.generate_with_images.assert_not_called()
 
 
+class TestPreparedConcept:
+    """Test that concept images are decoded and formatted once per run."""
+
+    def test_media_type_detected_from_decoded_bytes(self, options, image_concept):
+        with patch("sage.services.llm_service.ProviderFactory"):
+            service = LLMService(options)
+        prepared = service.prepare_concept(image_concept)
+        assert len(prepared.images) == 1
+        assert prepared.images[0].media_type == "image/jpeg"
+        assert prepared.images[0].size_bytes == 16
+
+    def test_invalid_base64_rejected(self, options):
+        concept = Concept(
+            name="Broken",
+            content=[ContentItem(type="image", data="not base64!")],
+        )
+        with patch("sage.services.llm_service.ProviderFactory"):
+            service = LLMService(options)
+        with pytest.raises(ValidationError, match="not valid base64"):
+            service.prepare_concept(concept)
+
+    def test_attached_part_used_without_base64(self):
+        from sage.services.prepared_concept import PreparedConcept
+
+        item = ContentItem(type="image", data="part:storyboard")
+        item.attach(b"\x89PNG\r\n\x1a\n" + b"\x00" * 8)
+        prepared = PreparedConcept(Concept(name="Upload", content=[item]))
+
+        assert prepared.images[0].media_type == "image/png"
+        assert prepared.images[0].size_bytes == 16
+        assert prepared.images[0].data.startswith("iVBORw0KGgo")
+
+    def test_missing_part_rejected(self):
+        from sage.services.prepared_concept import PreparedConcept
+
+        concept = Concept(name="Upload", content=[ContentItem(type="image", data="part:x")])
+        with pytest.raises(ValidationError, match="was not uploaded"):
+            PreparedConcept(concept)
+
+    def test_image_blocks_built_once_per_provider(self, image_concept):
+        from sage.services.prepared_concept import PreparedConcept
+
+        provider = OpenAIVisionProvider.__new__(OpenAIVisionProvider)
+        prepared = PreparedConcept(image_concept)
+        first = prepared.image_blocks(provider)
+        second = prepared.image_blocks(provider)
+        assert first is second
+        assert first[0]["image_url"]["url"].startswith("data:image/jpeg;base64,/9j/")
+
+    @pytest.mark.asyncio
+    async def test_prepared_blocks_reused_across_calls(
+        self, options, persona, image_concept, question
+    ):
+        mock_vision = AsyncMock(spec=OpenAIVisionProvider)
+        mock_vision.format_images.return_value = [{"type": "image_url"}]
+
+        with patch("sage.services.llm_service.ProviderFactory") as factory:
+            factory.create_generation_provider.return_value = AsyncMock()
+            factory.create_embedding_provider.return_value = AsyncMock()
+            factory.create_vision_provider.return_value = mock_vision
+            service = LLMService(options)
+
+        prepared = service.prepare_concept(image_concept)
+        for _ in range(3):
+            await service.generate_response(persona, image_concept, question, prepared)
+
+        mock_vision.format_images.assert_called_once()
+        blocks = [c.kwargs["image_blocks"] for c in mock_vision.generate_with_images.call_args_list]
+        assert blocks[0] is blocks[1] is blocks[2]
+
+
 class TestVideoPromptBuilding:
     """Test that video-related prompts include video indicator."""
 
@@ -234,3 +298,270 @@ class TestVideoPromptBuilding:
             service = LLMService(options)
         prompt = service._build_user_prompt(text_concept, question)
         assert "video" not in prompt.lower()
+
+
+class TestVideoDescribeMode:
+    """Test two-stage video analysis: one Pegasus description, text prompts after."""
+
+    @pytest.fixture(autouse=True)
+    def clear_description_cache(self):
+        LLMService._video_descriptions.clear()
+        yield
+        LLMService._video_descriptions.clear()
+
+    @pytest.fixture
+    def video_concept(self):
+        return Concept(
+            name="Video Product",
+            content=[
+                ContentItem(type="text", data="A product demo."),
+                ContentItem(type="video", data="s3://bucket/demo.mp4"),
+            ],
+        )
+
+    def _make_service(self, options, mock_gen, mock_video):
+        mock_downloader = AsyncMock()
+        mock_downloader.resolve.return_value = VideoSource(
+            source_type="s3", data="s3://bucket/demo.mp4"
+        )
+        with patch("sage.services.llm_service.ProviderFactory") as factory:
+            factory.create_generation_provider.return_value = mock_gen
+            factory.create_embedding_provider.return_value = AsyncMock()
+            factory.create_vision_provider.return_value = mock_video
+            service = LLMService(options.model_copy(update={"video_analysis_mode": "describe"}))
+        service.video_downloader = mock_downloader
+        return service
+
+    @pytest.mark.asyncio
+    async def test_describe_mode_uses_text_provider_with_description(
+        self, options, persona, question, video_concept
+    ):
+        mock_gen = AsyncMock()
+        mock_gen.generate.return_value = "Looks fun."
+        mock_video = AsyncMock()
+        mock_video.generate_with_video.return_value = "A dog runs across a beach."
+        service = self._make_service(options, mock_gen, mock_video)
+
+        result = await service.generate_response(persona, video_concept, question)
+
+        assert result == "Looks fun."
+        user_prompt = mock_gen.generate.call_args.kwargs["user_prompt"]
+        assert "A dog runs across a beach." in user_prompt
+        assert "[A video is attached" not in user_prompt
+
+    @pytest.mark.asyncio
+    async def test_describe_mode_calls_pegasus_once(
+        self, options, persona, question, video_concept
+    ):
+        mock_gen = AsyncMock()
+        mock_gen.generate.return_value = "Looks fun."
+        mock_video = AsyncMock()
+        mock_video.generate_with_video.return_value = "A dog runs across a beach."
+        service = self._make_service(options, mock_gen, mock_video)
+
+        personas = [{"persona_id": f"p{i}", "age": 20 + i} for i in range(5)]
+        await asyncio.gather(
+            *[service.generate_response(p, video_concept, question) for p in personas]
+        )
+
+        mock_video.generate_with_video.assert_called_once()
+        assert mock_gen.generate.call_count == 5
+        stats = service.get_call_stats()
+        assert stats["video_description"].calls == 1
+        assert stats["text"].calls == 5
+        assert "video" not in stats
+
+    @pytest.mark.asyncio
+    async def test_description_cache_shared_across_services(
+        self, options, persona, question, video_concept
+    ):
+        mock_video = AsyncMock()
+        mock_video.generate_with_video.return_value = "A dog runs across a beach."
+        first = self._make_service(options, AsyncMock(), mock_video)
+        second = self._make_service(options, AsyncMock(), mock_video)
+
+        await first.generate_response(persona, video_concept, question)
+        await second.generate_response(persona, video_concept, question)
+
+        mock_video.generate_with_video.assert_called_once()
+
+
+class TestMultiQuestionMode:
+    """Test answering all of a persona's questions in one call."""
+
+    @pytest.fixture
+    def questions(self):
+        return [
+            Question(
+                id=q_id,
+                text=f"Question {q_id}?",
+                weight=0.5,
+                ssr_reference_sets=[["a", "b", "c", "d", "e"]] * 6,
+            )
+            for q_id in ("q1", "q2")
+        ]
+
+    def _make_service(self, options, replies):
+        mock_gen = AsyncMock()
+        mock_gen.generate.side_effect = replies
+        with patch("sage.services.llm_service.ProviderFactory") as factory:
+            factory.create_generation_provider.return_value = mock_gen
+            factory.create_embedding_provider.return_value = AsyncMock()
+            factory.create_vision_provider.return_value = AsyncMock()
+            service = LLMService(options.model_copy(update={"question_mode": "multi_question"}))
+        return service, mock_gen
+
+    @pytest.mark.asyncio
+    async def test_single_call_split_by_question_id(
+        self, options, persona, text_concept, questions
+    ):
+        reply = '```json\n{"q1": "I like it.", "q2": "Too pricey."}\n```'
+        service, mock_gen = self._make_service(options, [reply])
+
+        answers = await service.generate_persona_responses(persona, text_concept, questions)
+
+        assert answers == {
+            "q1": ("I like it.", "multi_question"),
+            "q2": ("Too pricey.", "multi_question"),
+        }
+        mock_gen.generate.assert_called_once()
+        kwargs = mock_gen.generate.call_args.kwargs
+        assert "[q1] Question q1?" in kwargs["user_prompt"]
+        assert "[q2] Question q2?" in kwargs["user_prompt"]
+        assert kwargs["max_tokens"] > 500
+
+    @pytest.mark.asyncio
+    async def test_missing_answer_falls_back(self, options, persona, text_concept, questions):
+        service, mock_gen = self._make_service(
+            options, ['{"q1": "I like it.", "q2": ""}', "Too pricey."]
+        )
+
+        answers = await service.generate_persona_responses(persona, text_concept, questions)
+
+        assert answers["q1"] == ("I like it.", "multi_question")
+        assert answers["q2"] == ("Too pricey.", "fallback")
+        assert mock_gen.generate.call_count == 2
+        assert "Question q2?" in mock_gen.generate.call_args.kwargs["user_prompt"]
+
+    @pytest.mark.asyncio
+    async def test_unparseable_reply_falls_back_for_all(
+        self, options, persona, text_concept, questions
+    ):
+        service, mock_gen = self._make_service(
+            options, ["I like it and it is too pricey.", "Answer 1", "Answer 2"]
+        )
+
+        answers = await service.generate_persona_responses(persona, text_concept, questions)
+
+        assert {mode for _, mode in answers.values()} == {"fallback"}
+        assert mock_gen.generate.call_count == 3
+
+    def test_invalid_question_mode_rejected(self, options):
+        with pytest.raises(ValueError, match="question_mode"):
+            Options(**{**options.model_dump(), "question_mode": "batched"})
+
+
+class TestMultipleSamples:
+    """Test drawing several responses per persona and question."""
+
+    def _make_service(self, options, cache=None, **overrides):
+        mock_gen = AsyncMock()
+        mock_gen.generate.side_effect = ["plain"]
+        mock_gen.generate_samples.side_effect = lambda **kwargs: [
+            f"sample {i}" for i in range(kwargs["n"])
+        ]
+        with (
+            patch("sage.services.llm_service.ProviderFactory") as factory,
+            patch("sage.services.llm_service.get_response_cache", return_value=cache),
+        ):
+            factory.create_generation_provider.return_value = mock_gen
+            factory.create_embedding_provider.return_value = AsyncMock()
+            factory.create_vision_provider.return_value = AsyncMock()
+            service = LLMService(options.model_copy(update=overrides))
+        return service, mock_gen
+
+    @pytest.mark.asyncio
+    async def test_samples_from_one_provider_call(self, options, persona, text_concept, question):
+        service, mock_gen = self._make_service(options, generation_seed=7)
+
+        texts = await service.generate_response_samples(persona, text_concept, question, samples=3)
+
+        assert texts == ["sample 0", "sample 1", "sample 2"]
+        mock_gen.generate.assert_not_called()
+        kwargs = mock_gen.generate_samples.call_args.kwargs
+        assert kwargs["n"] == 3
+        assert kwargs["seed"] == service._call_seed(persona, question.id)
+
+    def test_call_seed_reproducible_per_persona_and_question(self, options):
+        service, _ = self._make_service(options, generation_seed=7)
+        seed = service._call_seed({"persona_id": "p1"}, "q1")
+        assert seed == service._call_seed({"persona_id": "p1"}, "q1")
+        assert seed != service._call_seed({"persona_id": "p2"}, "q1")
+        assert seed != service._call_seed({"persona_id": "p1"}, "q2")
+        assert 0 <= seed < 2**31
+
+        unseeded, _ = self._make_service(options)
+        assert unseeded._call_seed({"persona_id": "p1"}, "q1") is None
+
+    @pytest.mark.asyncio
+    async def test_only_uncached_samples_generated(self, options, persona, text_concept, question):
+        from sage.services.response_cache import MemoryResponseCache
+
+        cache = MemoryResponseCache(max_size=10, ttl=0)
+        service, _ = self._make_service(options, cache, generation_seed=7)
+        await service.generate_response_samples(persona, text_concept, question, samples=2)
+
+        service, mock_gen = self._make_service(options, cache, generation_seed=7)
+        texts = await service.generate_response_samples(persona, text_concept, question, samples=3)
+
+        assert texts == ["sample 0", "sample 1", "sample 0"]
+        assert mock_gen.generate_samples.call_args.kwargs["n"] == 1
+        info = service.get_cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_multi_question_samples_topped_up(self, options, persona, text_concept):
+        questions = [
+            Question(
+                id=q_id,
+                text=f"Question {q_id}?",
+                weight=0.5,
+                ssr_reference_sets=[["a", "b", "c", "d", "e"]] * 6,
+            )
+            for q_id in ("q1", "q2")
+        ]
+        service, mock_gen = self._make_service(options, question_mode="multi_question")
+        mock_gen.generate_samples.side_effect = [
+            ['{"q1": "Yes.", "q2": "Pricey."}', '{"q1": "Sure."}'],
+        ]
+        mock_gen.generate.side_effect = ["Too expensive."]
+
+        answers = await service.generate_persona_response_samples(
+            persona, text_concept, questions, samples=2
+        )
+
+        assert answers["q1"] == (["Yes.", "Sure."], "multi_question")
+        assert answers["q2"] == (["Pricey.", "Too expensive."], "fallback")
+        assert "Question q2?" in mock_gen.generate.call_args.kwargs["user_prompt"]
+
+    @pytest.mark.asyncio
+    async def test_openai_requests_n_choices_with_seed(self, monkeypatch):
+        from unittest.mock import MagicMock
+
+        from sage.services.openai_provider import OpenAIGenerationProvider
+
+        monkeypatch.setenv("OPENAI_API_KEY", "test")  # the client is replaced below
+        provider = OpenAIGenerationProvider("gpt-4o")
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content=t)) for t in ("a", "b")]
+        response.usage = None
+        provider.client = MagicMock()
+        provider.client.chat.completions.create = AsyncMock(return_value=response)
+
+        assert await provider.generate_samples("sys", "user", n=2, seed=11) == ["a", "b"]
+        kwargs = provider.client.chat.completions.create.call_args.kwargs
+        assert (kwargs["n"], kwargs["seed"]) == (2, 11)
+
+    def test_batch_mode_rejects_multiple_samples(self, options):
+        with pytest.raises(ValueError, match="samples_per_persona"):
+            Options(**{**options.model_dump(), "samples_per_persona": 2, "execution_mode": "batch"})
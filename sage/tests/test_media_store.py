@@ -0,0 +1,104 @@
+"""Tests for the content-addressed media store."""
+
+import base64
+import hashlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from sage.exceptions import ValidationError
+from sage.models.request import Concept, ContentItem
+from sage.services.media_store import LocalMediaStore, S3MediaStore, resolve_media_references
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+
+def _concept(*items: ContentItem) -> Concept:
+    return Concept(name="Sweep", content=list(items))
+
+
+class TestLocalMediaStore:
+    """Test the bounded on-disk store."""
+
+    def test_put_is_content_addressed(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=1024)
+        sha256 = store.put(PNG)
+        assert sha256 == hashlib.sha256(PNG).hexdigest()
+        assert store.put(PNG) == sha256
+        assert store._total == len(PNG)
+        assert store.get(sha256) == PNG
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=250, memory_items=0)
+        first = store.put(b"a" * 100)
+        second = store.put(b"b" * 100)
+        store.get(first)
+        store.put(b"c" * 100)
+
+        assert store.get(second) is None
+        assert store.get(first) == b"a" * 100
+
+    def test_reindexes_existing_files(self, tmp_path):
+        sha256 = LocalMediaStore(str(tmp_path), max_bytes=1024).put(PNG)
+        reopened = LocalMediaStore(str(tmp_path), max_bytes=1024, memory_items=0)
+        assert reopened.exists(sha256)
+        assert reopened.get(sha256) == PNG
+
+    def test_directory_created_lazily(self, tmp_path):
+        LocalMediaStore(str(tmp_path / "media"), max_bytes=1024)
+        assert not (tmp_path / "media").exists()
+
+
+class TestResolveMediaReferences:
+    """Test replacing media:// references in concepts."""
+
+    @pytest.mark.asyncio
+    async def test_image_attached_as_raw_bytes(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=1024)
+        sha256 = store.put(PNG)
+        item = ContentItem(type="image", data=f"media://{sha256}")
+
+        await resolve_media_references(_concept(item), store)
+        assert item.raw == PNG
+        assert item.data == f"media://{sha256}"
+
+    @pytest.mark.asyncio
+    async def test_video_becomes_base64(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=1024)
+        sha256 = store.put(b"video-bytes")
+        item = ContentItem(type="video", data=f"media://{sha256}")
+
+        await resolve_media_references(_concept(item), store)
+        assert base64.b64decode(item.data) == b"video-bytes"
+
+    @pytest.mark.asyncio
+    async def test_video_passed_by_s3_uri(self):
+        with patch("boto3.client", return_value=MagicMock()):
+            store = S3MediaStore("s3://bucket/media")
+        sha256 = "a" * 64
+        item = ContentItem(type="video", data=f"media://{sha256}")
+
+        await resolve_media_references(_concept(item), store)
+        assert item.data == f"s3://bucket/media/{sha256}"
+        store.client.get_object.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_media_rejected(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=1024)
+        item = ContentItem(type="image", data=f"media://{'0' * 64}")
+        with pytest.raises(ValidationError, match="POST /media"):
+            await resolve_media_references(_concept(item), store)
+
+    @pytest.mark.asyncio
+    async def test_malformed_reference_rejected(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=1024)
+        item = ContentItem(type="image", data="media://../../etc/passwd")
+        with pytest.raises(ValidationError, match="Invalid media reference"):
+            await resolve_media_references(_concept(item), store)
+
+    @pytest.mark.asyncio
+    async def test_text_reference_rejected(self, tmp_path):
+        store = LocalMediaStore(str(tmp_path), max_bytes=1024)
+        item = ContentItem(type="text", data=f"media://{'0' * 64}")
+        with pytest.raises(ValidationError, match="image and video"):
+            await resolve_media_references(_concept(item), store)
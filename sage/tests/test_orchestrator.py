@@ -1,23 +1,29 @@
 """Tests for the Orchestrator - filter-before-generate behavior."""
 
-import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
+from sage.exceptions import NotFoundError
 from sage.models.request import (
     Concept,
     ContentItem,
     Options,
     Question,
+    RescoreRequest,
+    SamplingConfig,
     SurveyConfig,
     TestConceptRequest,
 )
 from sage.services.orchestrator import Orchestrator
 
 
-def _make_request(personas, filters=None):
-    """Build a TestConceptRequest with given personas and filters."""
+def _make_request(personas, filters=None, panel_id=None, sampling=None):
+    """Build a TestConceptRequest with given personas (or panel) and filters."""
     return TestConceptRequest(
         personas=personas,
+        panel_id=panel_id,
+        sampling=sampling,
         concept=Concept(
             name="Test",
             content=[ContentItem(type="text", data="A product.")],
@@ -74,7 +80,7 @@ class TestFilterBeforeGenerate:
         ) as mock_gen:
             mock_gen.return_value = [_mock_response("p1"), _mock_response("p3")]
 
-            result = await orchestrator.process_request(request)
+            await orchestrator.process_request(request)
 
             # Should only pass 2 matched personas to generation, not all 3
             call_args = mock_gen.call_args
@@ -97,7 +103,7 @@ class TestFilterBeforeGenerate:
         ) as mock_gen:
             mock_gen.return_value = [_mock_response("p1"), _mock_response("p2")]
 
-            result = await orchestrator.process_request(request)
+            await orchestrator.process_request(request)
 
             call_args = mock_gen.call_args
             generated_personas = call_args[0][2]
@@ -136,3 +142,411 @@ class TestFilterBeforeGenerate:
 
             assert result.personas_total == 3
             assert result.personas_matched == 2
+
+
+class TestPanels:
+    """Test requests that reference a stored persona panel."""
+
+    PERSONAS = [
+        {"persona_id": "p1", "age": 25, "gender": "F"},
+        {"persona_id": "p2", "age": 45, "gender": "M"},
+        {"persona_id": "p3", "age": 35, "gender": "F"},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_panel_filtered_before_generation(self):
+        orchestrator = Orchestrator()
+        orchestrator.panel_store.save("orch-panel", self.PERSONAS)
+        panel = orchestrator.panel_store.save("orch-panel", self.PERSONAS)
+        request = _make_request([], filters=["gender=F"], panel_id="orch-panel")
+
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [_mock_response("p1"), _mock_response("p3")]
+            result = await orchestrator.process_request(request)
+
+        generated = mock_gen.call_args[0][2]
+        assert [p["persona_id"] for p in generated] == ["p1", "p3"]
+        assert result.personas_total == 3
+        assert result.personas_matched == 2
+        assert result.meta.panel == panel.ref
+
+    @pytest.mark.asyncio
+    async def test_pinned_version(self):
+        orchestrator = Orchestrator()
+        orchestrator.panel_store.save("orch-pinned", self.PERSONAS[:1])
+        orchestrator.panel_store.save("orch-pinned", self.PERSONAS)
+        request = _make_request([], panel_id="orch-pinned@1")
+
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [_mock_response("p1")]
+            result = await orchestrator.process_request(request)
+
+        assert result.personas_total == 1
+        assert result.meta.panel == "orch-pinned@1"
+
+    @pytest.mark.asyncio
+    async def test_unknown_panel(self):
+        request = _make_request([], panel_id="no-such-panel")
+
+        with pytest.raises(NotFoundError, match="no-such-panel"):
+            await Orchestrator().process_request(request)
+
+    @pytest.mark.asyncio
+    async def test_too_many_matched_personas(self):
+        orchestrator = Orchestrator()
+        orchestrator.panel_store.save("orch-large", self.PERSONAS)
+        orchestrator.settings = orchestrator.settings.model_copy(update={"max_personas": 2})
+        request = _make_request([], panel_id="orch-large")
+
+        with pytest.raises(ValueError, match="at most 2"):
+            await orchestrator.process_request(request)
+
+    @pytest.mark.asyncio
+    async def test_sampled_personas_generated_with_weights(self):
+        orchestrator = Orchestrator()
+        personas = [{"persona_id": f"p{i}", "gender": "F" if i < 10 else "M"} for i in range(40)]
+        orchestrator.panel_store.save("orch-sampled", personas)
+        orchestrator.settings = orchestrator.settings.model_copy(update={"max_personas": 10})
+        sampling = SamplingConfig(
+            n=10,
+            method="quota",
+            strata=["gender"],
+            quotas={"gender": {"F": 0.5, "M": 0.5}},
+            seed=3,
+        )
+        request = _make_request([], panel_id="orch-sampled", sampling=sampling)
+
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.side_effect = lambda _llm, _ssr, sampled, *_: [
+                _mock_response(p["persona_id"]) for p in sampled
+            ]
+            result = await orchestrator.process_request(request)
+
+        generated = mock_gen.call_args[0][2]
+        assert len(generated) == 10
+        assert sum(p["gender"] == "F" for p in generated) == 5
+        assert result.personas_matched == 40
+        assert result.meta.sampling.seed == 3
+        assert result.meta.sampling.sampled == 10
+        assert result.result.pass_probability is not None
+        assert result.metrics["q1"].mean_ci is not None
+
+        stored = orchestrator.result_store.get(result.meta.request_id)
+        assert len(stored.weights) == 10
+        assert sum(stored.weights) == pytest.approx(10)
+
+    def test_request_needs_one_persona_source(self):
+        with pytest.raises(ValueError, match="not both"):
+            _make_request(self.PERSONAS, panel_id="uk")
+        with pytest.raises(ValueError, match="At least one persona"):
+            _make_request([])
+
+
+class TestMultiQuestionMode:
+    """Test per-answer generation mode in the response."""
+
+    @pytest.mark.asyncio
+    async def test_generation_mode_recorded_in_dataset_and_meta(self):
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.options.question_mode = "multi_question"
+        request.output_dataset = True
+
+        response = _mock_response("p1")
+        response["responses"]["q1"]["generation_mode"] = "fallback"
+
+        orchestrator = Orchestrator()
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [response]
+            result = await orchestrator.process_request(request)
+
+        assert result.dataset[0]["q1_generation_mode"] == "fallback"
+        assert result.meta.question_mode == "multi_question"
+        assert result.meta.generation_modes == {"fallback": 1}
+
+    @pytest.mark.asyncio
+    async def test_no_generation_mode_column_by_default(self):
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.output_dataset = True
+
+        orchestrator = Orchestrator()
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [_mock_response("p1")]
+            result = await orchestrator.process_request(request)
+
+        assert "q1_generation_mode" not in result.dataset[0]
+        assert result.meta.question_mode is None
+
+
+class TestMultipleSamples:
+    """Test several sampled answers per persona and question."""
+
+    @pytest.mark.asyncio
+    async def test_samples_in_dataset_and_seed_in_meta(self):
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.options.samples_per_persona = 3
+        request.output_dataset = True
+
+        response = _mock_response("p1")
+        response["responses"]["q1"]["samples"] = ["Great product", "Nice", "Great product"]
+
+        orchestrator = Orchestrator()
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [response]
+            result = await orchestrator.process_request(request)
+
+        llm_service = mock_gen.call_args[0][0]
+        assert result.meta.samples_per_persona == 3
+        assert result.meta.generation_seed is not None
+        assert llm_service.options.generation_seed == result.meta.generation_seed
+        assert result.dataset[0]["q1_samples"] == ["Great product", "Nice", "Great product"]
+
+    @pytest.mark.asyncio
+    async def test_single_sample_meta_unset(self):
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        orchestrator = Orchestrator()
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [_mock_response("p1")]
+            result = await orchestrator.process_request(request)
+
+        assert result.meta.samples_per_persona is None
+        assert result.meta.generation_seed is None
+
+    @pytest.mark.asyncio
+    async def test_sampled_texts_scored_together(self):
+        question = _make_request([{"persona_id": "p1"}]).survey_config.questions[0]
+        ssr_engine = MagicMock()
+        ssr_engine.map_samples_to_likert = AsyncMock(return_value=([0.0, 0.0, 0.5, 0.5, 0.0], 3.5))
+
+        q_id, entry = await Orchestrator()._score_response(
+            ssr_engine, question, ["Nice", "Great"], "per_question"
+        )
+
+        ssr_engine.map_samples_to_likert.assert_awaited_once_with(
+            ["Nice", "Great"], question.ssr_reference_sets
+        )
+        assert q_id == "q1"
+        assert entry["raw_text"] == "Nice"
+        assert entry["samples"] == ["Nice", "Great"]
+        assert entry["mean"] == 3.5
+
+
+class TestStageTimings:
+    """Test per-stage timing in meta."""
+
+    @pytest.mark.asyncio
+    async def test_timings_in_meta(self):
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.include_report = True
+        orchestrator = Orchestrator()
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [_mock_response("p1")]
+            result = await orchestrator.process_request(request)
+
+        timings = result.meta.timings
+        assert {"filter", "prepare", "generate", "score", "report"} <= set(timings)
+        assert timings["generate"].calls == 1
+        assert timings["generate"].total_ms == timings["generate"].p95_ms
+
+    @pytest.mark.asyncio
+    async def test_timings_disabled(self, monkeypatch):
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        orchestrator = Orchestrator()
+        monkeypatch.setattr(orchestrator.settings, "stage_timings", False)
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [_mock_response("p1")]
+            result = await orchestrator.process_request(request)
+
+        assert result.meta.timings is None
+
+
+class TestRescore:
+    """Test re-scoring stored runs and datasets without provider calls."""
+
+    @staticmethod
+    def _response(persona_id, mean):
+        return {
+            "persona_id": persona_id,
+            "responses": {"q1": {"raw_text": "ok", "pmf": [0.2] * 5, "mean": mean}},
+        }
+
+    async def _stored_run(self, orchestrator):
+        personas = [
+            {"persona_id": "p1", "age": 25, "gender": "F"},
+            {"persona_id": "p2", "age": 45, "gender": "M"},
+        ]
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [self._response("p1", 5.0), self._response("p2", 3.0)]
+            return await orchestrator.process_request(_make_request(personas))
+
+    @pytest.mark.asyncio
+    async def test_rescore_run_with_new_threshold_and_filters(self):
+        orchestrator = Orchestrator()
+        original = await self._stored_run(orchestrator)
+        assert original.result.composite_score == 0.75
+
+        with patch("sage.services.orchestrator.LLMService", side_effect=AssertionError("no calls")):
+            result = await orchestrator.rescore(
+                RescoreRequest(
+                    run_id=original.meta.request_id,
+                    threshold=0.9,
+                    filters=["gender=F"],
+                    output_dataset=True,
+                    include_report=True,
+                )
+            )
+
+        assert result.personas_matched == 1
+        assert result.result.composite_score == 1.0
+        assert result.result.threshold == 0.9
+        assert result.meta.rescored_from == original.meta.request_id
+        assert [row["matched_filter"] for row in result.dataset] == [True, False]
+        assert "Re-scored From" in result.report
+
+    @pytest.mark.asyncio
+    async def test_rescore_weights_must_cover_run_questions(self):
+        orchestrator = Orchestrator()
+        original = await self._stored_run(orchestrator)
+
+        with pytest.raises(ValueError, match="weights must cover"):
+            await orchestrator.rescore(
+                RescoreRequest(run_id=original.meta.request_id, weights={"q2": 1.0})
+            )
+
+    @pytest.mark.asyncio
+    async def test_unknown_run_raises_not_found(self):
+        with pytest.raises(NotFoundError):
+            await Orchestrator().rescore(RescoreRequest(run_id="missing"))
+
+    @pytest.mark.asyncio
+    async def test_rescore_dataset_with_new_weights(self):
+        dataset = [
+            {
+                "persona_id": "p1",
+                "region": "N",
+                "matched_filter": True,
+                "q1_mean": 5.0,
+                "q2_mean": 1.0,
+            },
+            {
+                "persona_id": "p2",
+                "region": "S",
+                "matched_filter": True,
+                "q1_mean": 3.0,
+                "q2_mean": 3.0,
+            },
+        ]
+        result = await Orchestrator().rescore(
+            RescoreRequest(dataset=dataset, weights={"q1": 0.5, "q2": 0.5}, threshold=0.5)
+        )
+
+        assert result.metrics["q1"].mean == 4.0
+        assert result.metrics["q2"].mean == 2.0
+        assert result.result.composite_score == 0.5
+        assert result.result.passed
+
+    @pytest.mark.asyncio
+    async def test_rescore_weighted_dataset_with_filter_and_dataset_output(self):
+        dataset = [
+            {"persona_id": "p1", "gender": "female", "sample_weight": 3.0, "q1_mean": 5.0},
+            {"persona_id": "p2", "gender": "male", "sample_weight": 1.0, "q1_mean": 1.0},
+            {"persona_id": "p3", "gender": "female", "sample_weight": 1.0, "q1_mean": 1.0},
+        ]
+        result = await Orchestrator().rescore(
+            RescoreRequest(
+                dataset=dataset,
+                weights={"q1": 1.0},
+                threshold=0.5,
+                filters=["gender=female"],
+                output_dataset=True,
+                include_report=True,
+            )
+        )
+
+        assert result.personas_matched == 2
+        assert result.metrics["q1"].mean == 4.0
+        assert [row["matched_filter"] for row in result.dataset] == [True, False, True]
+        assert [row["sample_weight"] for row in result.dataset] == [3.0, 1.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_dataset_missing_mean_rejected(self):
+        with pytest.raises(ValueError, match="q2_mean"):
+            await Orchestrator().rescore(
+                RescoreRequest(
+                    dataset=[{"persona_id": "p1", "q1_mean": 4.0}],
+                    weights={"q1": 0.5, "q2": 0.5},
+                    threshold=0.5,
+                )
+            )
+
+    @pytest.mark.asyncio
+    async def test_non_verbose_run_is_stored(self):
+        orchestrator = Orchestrator()
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.verbose = False
+
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [self._response("p1", 4.0)]
+            await orchestrator.process_request(request, client="acme")
+
+        summaries = orchestrator.result_store.list_runs(client="acme", limit=1)
+        assert len(summaries[0].request_id) == 32  # full uuid4, the store's primary key
+        run = orchestrator.get_run(summaries[0].request_id, client="acme")
+        assert run.response.result.composite_score == 0.75
+        with pytest.raises(NotFoundError):
+            orchestrator.get_run(summaries[0].request_id, client="other")
+
+    @pytest.mark.asyncio
+    async def test_columnar_output_format_returns_dataset_url(self):
+        orchestrator = Orchestrator()
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.output_dataset = True
+        request.output_format = "ndjson"
+
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [self._response("p1", 4.0)]
+            result = await orchestrator.process_request(request)
+
+        assert result.dataset is None
+        assert result.dataset_url == f"/runs/{result.meta.request_id}/dataset?format=ndjson"
+
+    @pytest.mark.asyncio
+    async def test_media_reference_resolved_and_kept_in_stored_run(self):
+        orchestrator = Orchestrator()
+        sha256 = orchestrator.media_store.put(b"\x89PNG\r\n\x1a\n" + b"\x00" * 8)
+        request = _make_request([{"persona_id": "p1", "age": 25}])
+        request.concept.content.append(ContentItem(type="image", data=f"media://{sha256}"))
+
+        with patch.object(
+            orchestrator, "_generate_all_responses", new_callable=AsyncMock
+        ) as mock_gen:
+            mock_gen.return_value = [self._response("p1", 4.0)]
+            result = await orchestrator.process_request(request)
+
+        prepared = mock_gen.call_args[0][5]
+        assert prepared.images[0].media_type == "image/png"
+        stored = orchestrator.get_run(result.meta.request_id)
+        assert stored.concept.content[-1].data == f"media://{sha256}"
@@ -0,0 +1,170 @@
+"""Tests for the persona panel store."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from sage.exceptions import ValidationError
+from sage.services.panel_store import (
+    MemoryPanelStore,
+    Panel,
+    SQLitePanelStore,
+    parse_panel,
+    parse_panel_ref,
+    validate_panel,
+)
+
+PERSONAS = [
+    {"persona_id": "p1", "age": 25, "gender": "F"},
+    {"persona_id": "p2", "age": 45, "gender": "M", "income": "high"},
+]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryPanelStore()
+    return SQLitePanelStore(str(tmp_path / "panels.sqlite3"), cache_size=2)
+
+
+class TestPanelStore:
+    """Test versioning and client scoping for both backends."""
+
+    def test_save_creates_versions(self, store):
+        first = store.save("uk", PERSONAS)
+        second = store.save("uk", PERSONAS[:1])
+
+        assert (first.version, second.version) == (1, 2)
+        assert store.get("uk").ref == "uk@2"
+        assert store.get("uk", 1).size == 2
+        assert store.get("uk", 3) is None
+        assert store.get("missing") is None
+
+    def test_panels_are_scoped_to_client(self, store):
+        store.save("uk", PERSONAS, client="acme")
+
+        assert store.get("uk") is None
+        assert store.get("uk", client="other") is None
+        assert store.get("uk", client="acme").client == "acme"
+        assert [p.ref for p in store.list_panels("acme")] == ["uk@1"]
+        assert store.list_panels() == []
+
+    def test_list_panels_latest_versions(self, store):
+        store.save("uk", PERSONAS)
+        store.save("uk", PERSONAS)
+        store.save("gr", PERSONAS[:1])
+
+        infos = store.list_panels()
+        assert [(i.panel_id, i.version, i.personas) for i in infos] == [("gr", 1, 1), ("uk", 2, 2)]
+        assert infos[1].attributes == ["persona_id", "age", "gender", "income"]
+
+    def test_sqlite_reload_from_disk(self, tmp_path):
+        path = str(tmp_path / "panels.sqlite3")
+        SQLitePanelStore(path, cache_size=2).save("uk", PERSONAS)
+
+        panel = SQLitePanelStore(path, cache_size=2).get("uk")
+        assert panel.personas == PERSONAS
+
+
+class TestPanel:
+    """Test columnar serialisation and filtering."""
+
+    def test_round_trip_keeps_missing_attributes_missing(self):
+        panel = Panel(panel_id="uk", version=1, personas=PERSONAS)
+
+        assert Panel.personas_from_bytes(panel.to_bytes()) == PERSONAS
+
+    def test_non_json_values_serialised(self):
+        personas = [{"persona_id": "p1", "joined": date(2024, 5, 1), "spend": Decimal("9.5")}]
+        panel = Panel(panel_id="uk", version=1, personas=personas)
+
+        assert Panel.personas_from_bytes(panel.to_bytes()) == [
+            {"persona_id": "p1", "joined": "2024-05-01", "spend": 9.5}
+        ]
+
+    def test_filter_with_prebuilt_columns(self):
+        from sage.services.filter_engine import FilterEngine
+
+        panel = Panel(panel_id="uk", version=1, personas=PERSONAS)
+        panel.index()
+        mask = FilterEngine().mask(panel.columns, ["age>30"])
+
+        assert mask.tolist() == [False, True]
+
+
+class TestParsePanel:
+    """Test panel upload parsing and validation."""
+
+    def test_json_list_and_object(self):
+        assert parse_panel(b'[{"persona_id": "p1"}]', "json") == [{"persona_id": "p1"}]
+        assert parse_panel(b'{"personas": [{"persona_id": "p1"}]}', "json") == [
+            {"persona_id": "p1"}
+        ]
+
+    def test_csv_converts_numbers_and_drops_empty_cells(self):
+        body = b"persona_id,age,income,score\n001,25,high,1.5\n002,40,,2\n"
+
+        assert parse_panel(body, "csv") == [
+            {"persona_id": "001", "age": 25, "income": "high", "score": 1.5},
+            {"persona_id": "002", "age": 40, "score": 2},
+        ]
+
+    def test_invalid_json(self):
+        with pytest.raises(ValidationError, match="Invalid JSON panel"):
+            parse_panel(b"{", "json")
+        with pytest.raises(ValidationError, match="list of personas"):
+            parse_panel(b'{"rows": []}', "json")
+
+    def test_parquet(self):
+        pa = pytest.importorskip("pyarrow")
+        import io
+
+        import pyarrow.parquet as pq
+
+        sink = io.BytesIO()
+        pq.write_table(pa.Table.from_pylist(PERSONAS), sink)
+        assert parse_panel(sink.getvalue(), "parquet") == PERSONAS
+
+    def test_parquet_dates_and_decimals_become_json_scalars(self):
+        pa = pytest.importorskip("pyarrow")
+        import io
+
+        import pyarrow.parquet as pq
+
+        table = pa.table(
+            {
+                "persona_id": ["p1"],
+                "born": pa.array([date(1990, 2, 3)], pa.date32()),
+                "seen": pa.array([datetime(2024, 5, 1, 12, 30)], pa.timestamp("s")),
+                "income": pa.array([Decimal("1200.50")], pa.decimal128(8, 2)),
+            }
+        )
+        sink = io.BytesIO()
+        pq.write_table(table, sink)
+        personas = parse_panel(sink.getvalue(), "parquet")
+
+        assert personas == [
+            {
+                "persona_id": "p1",
+                "born": "1990-02-03",
+                "seen": "2024-05-01T12:30:00",
+                "income": 1200.5,
+            }
+        ]
+        Panel(panel_id="uk", version=1, personas=personas).to_bytes()
+
+    def test_validate_panel(self):
+        validate_panel(PERSONAS, max_personas=2)
+        with pytest.raises(ValidationError, match="Maximum 1"):
+            validate_panel(PERSONAS, max_personas=1)
+        with pytest.raises(ValidationError, match="Duplicate persona_id"):
+            validate_panel([PERSONAS[0], PERSONAS[0]], max_personas=10)
+        with pytest.raises(ValidationError, match="persona_id"):
+            validate_panel([{"age": 1}], max_personas=10)
+
+    def test_parse_panel_ref(self):
+        assert parse_panel_ref("uk-adults") == ("uk-adults", None)
+        assert parse_panel_ref("uk-adults@3") == ("uk-adults", 3)
+        with pytest.raises(ValidationError):
+            parse_panel_ref("uk adults")
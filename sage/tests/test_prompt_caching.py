@@ -0,0 +1,199 @@
+"""Tests for prompt-prefix caching and per-run token usage accounting."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from sage.models.request import Concept, ContentItem, Options, Question
+from sage.services.bedrock_provider import (
+    BedrockGenerationProvider,
+    BedrockVisionProvider,
+    _record_response_usage,
+)
+from sage.services.llm_service import LLMService
+from sage.services.openai_provider import OpenAIGenerationProvider
+from sage.services.orchestrator import Orchestrator
+from sage.services.usage import record_usage, start_usage_tracking
+
+CLAUDE = "eu.anthropic.claude-sonnet-4-5-20250929-v1:0"
+
+
+@pytest.fixture
+def concept():
+    return Concept(
+        name="Test Product",
+        content=[ContentItem(type="text", data="A new widget.")],
+    )
+
+
+@pytest.fixture
+def question():
+    return Question(
+        id="q1",
+        text="Would you buy this?",
+        weight=1.0,
+        ssr_reference_sets=[["a", "b", "c", "d", "e"]] * 6,
+    )
+
+
+def _options(prompt_caching: bool) -> Options:
+    return Options(
+        generation_provider="openai",
+        generation_model="gpt-4o",
+        embedding_provider="openai",
+        embedding_model="text-embedding-3-small",
+        vision_provider="openai",
+        vision_model="gpt-4o",
+        prompt_caching=prompt_caching,
+    )
+
+
+class TestCachePrefix:
+    """Test the stable concept prefix passed to providers."""
+
+    def test_user_prompt_starts_with_concept_prefix(self, concept, question):
+        with patch("sage.services.llm_service.ProviderFactory"):
+            service = LLMService(_options(True))
+        prefix = service._build_concept_prompt(concept)
+        assert service._build_user_prompt(concept, question).startswith(prefix)
+        assert "Would you buy this?" not in prefix
+
+    @pytest.mark.asyncio
+    async def test_prefix_passed_only_when_enabled(self, concept, question):
+        for enabled in (True, False):
+            with patch("sage.services.llm_service.ProviderFactory") as factory:
+                mock_gen = AsyncMock()
+                mock_gen.generate.return_value = "ok"
+                factory.create_generation_provider.return_value = mock_gen
+                service = LLMService(_options(enabled))
+            await service.generate_response({"age": 30}, concept, question)
+
+            prefix = mock_gen.generate.call_args.kwargs["cache_prefix"]
+            if enabled:
+                assert prefix == service._build_concept_prompt(concept)
+            else:
+                assert prefix is None
+
+    @pytest.mark.asyncio
+    async def test_first_generation_precedes_rest_but_not_its_scoring(self, concept):
+        questions = [
+            Question(id=f"q{i}", text=f"Q{i}?", weight=0.5, ssr_reference_sets=[["a"] * 5] * 6)
+            for i in (1, 2)
+        ]
+        events = []
+        second_started = asyncio.Event()
+
+        async def generate(persona, concept, question, prepared, samples):
+            events.append(f"generate {question.id}")
+            if question.id == "q2":
+                second_started.set()
+            return [question.id]
+
+        async def map_response(text, reference_sets, embedding=None):
+            if text == "q1":
+                # Times out if q1's scoring has to finish before q2 starts
+                await asyncio.wait_for(second_started.wait(), 1)
+            return [0.2] * 5, 3.0
+
+        llm_service = MagicMock(options=_options(True))
+        llm_service.uses_prompt_cache.return_value = True
+        llm_service.generate_response_samples = generate
+        ssr_engine = MagicMock(map_response_to_likert=map_response)
+
+        result = await Orchestrator()._process_single_persona(
+            llm_service, ssr_engine, {"persona_id": "p1"}, concept, questions
+        )
+
+        assert events == ["generate q1", "generate q2"]
+        assert set(result["responses"]) == {"q1", "q2"}
+
+
+class TestBedrockCacheControl:
+    """Test Anthropic cache_control breakpoints on Bedrock."""
+
+    def test_generation_marks_concept_prefix(self):
+        provider = BedrockGenerationProvider(CLAUDE)
+        body = provider._build_request("sys", "CONCEPT\nQUESTION", 0.7, cache_prefix="CONCEPT\n")
+        content = body["messages"][0]["content"]
+        assert content[0] == {
+            "type": "text",
+            "text": "CONCEPT\n",
+            "cache_control": {"type": "ephemeral"},
+        }
+        assert content[1] == {"type": "text", "text": "QUESTION"}
+
+    def test_generation_unchanged_without_prefix(self):
+        provider = BedrockGenerationProvider(CLAUDE)
+        body = provider._build_request("sys", "CONCEPT\nQUESTION", 0.7)
+        assert body["messages"][0]["content"] == "CONCEPT\nQUESTION"
+
+    def test_vision_images_precede_cached_text(self):
+        provider = BedrockVisionProvider(CLAUDE)
+        blocks = provider.format_images([{"data": "abc", "media_type": "image/png"}])
+        body = provider._build_request("sys", "CONCEPT\nQ", blocks, 0.7, cache_prefix="CONCEPT\n")
+        content = body["messages"][0]["content"]
+        assert content[0]["type"] == "image"
+        assert content[1]["cache_control"] == {"type": "ephemeral"}
+        assert content[2]["text"] == "Q"
+
+
+class TestUsageTracking:
+    """Test per-run token usage accumulation."""
+
+    def test_record_outside_run_is_noop(self):
+        async def _run():
+            record_usage(input_tokens=10)
+
+        asyncio.run(_run())
+
+    @pytest.mark.asyncio
+    async def test_usage_from_child_tasks_accumulates(self):
+        usage = start_usage_tracking()
+        body = {
+            "usage": {
+                "input_tokens": 20,
+                "output_tokens": 50,
+                "cache_read_input_tokens": 1200,
+                "cache_creation_input_tokens": 0,
+            }
+        }
+
+        async def _call():
+            _record_response_usage("anthropic", body)
+
+        await asyncio.gather(*[_call() for _ in range(3)])
+        result = usage.to_model()
+        assert result.calls == 3
+        assert result.input_tokens == 60
+        assert result.output_tokens == 150
+        assert result.cache_read_input_tokens == 3600
+        assert result.cache_write_input_tokens == 0
+
+    @pytest.mark.asyncio
+    async def test_openai_cache_key_and_cached_tokens(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test")  # the client is replaced below
+        provider = OpenAIGenerationProvider("gpt-4o")
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="ok"))]
+        response.usage = SimpleNamespace(
+            prompt_tokens=1500,
+            completion_tokens=40,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1280),
+        )
+        provider.client = MagicMock()
+        provider.client.chat.completions.create = AsyncMock(return_value=response)
+
+        usage = start_usage_tracking()
+        await provider.generate("sys", "CONCEPT\nQ", cache_prefix="CONCEPT\n")
+        await provider.generate("sys", "CONCEPT\nQ2", cache_prefix="CONCEPT\n")
+
+        keys = [
+            c.kwargs["extra_body"]["prompt_cache_key"]
+            for c in provider.client.chat.completions.create.call_args_list
+        ]
+        assert keys[0] == keys[1]
+        assert usage.calls == 2
+        assert usage.input_tokens == 2 * 220
+        assert usage.cache_read_input_tokens == 2 * 1280
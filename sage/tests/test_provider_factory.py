@@ -49,6 +49,24 @@ class TestProviderFactory:
         )
         assert isinstance(provider, BedrockVisionProvider)
 
+    def test_create_fake_providers(self):
+        from sage.services.fake_provider import (
+            FakeEmbeddingProvider,
+            FakeGenerationProvider,
+            FakeVisionProvider,
+        )
+
+        assert isinstance(
+            ProviderFactory.create_generation_provider("fake", "fake-chat"), FakeGenerationProvider
+        )
+        assert isinstance(
+            ProviderFactory.create_embedding_provider("fake", "fake-embedding"),
+            FakeEmbeddingProvider,
+        )
+        assert isinstance(
+            ProviderFactory.create_vision_provider("fake", "fake-vision"), FakeVisionProvider
+        )
+
     def test_unknown_generation_provider_raises(self):
         with pytest.raises(ValueError, match="Unknown generation provider"):
             ProviderFactory.create_generation_provider("azure", "gpt-4o")
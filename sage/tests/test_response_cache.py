@@ -0,0 +1,162 @@
+"""Tests for the cross-request response cache."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from sage.models.request import Concept, ContentItem, Options, Question
+from sage.services.llm_service import LLMService
+from sage.services.response_cache import (
+    MemoryResponseCache,
+    SQLiteResponseCache,
+    make_cache_key,
+)
+
+
+@pytest.fixture
+def concept():
+    return Concept(name="Widget", content=[ContentItem(type="text", data="A widget.")])
+
+
+@pytest.fixture
+def question():
+    return Question(
+        id="q1",
+        text="Would you buy this?",
+        weight=1.0,
+        ssr_reference_sets=[["a", "b", "c", "d", "e"]] * 6,
+    )
+
+
+def _options(**overrides):
+    return Options(
+        generation_provider="openai",
+        generation_model="gpt-4o",
+        embedding_provider="openai",
+        embedding_model="text-embedding-3-small",
+        vision_provider="openai",
+        vision_model="gpt-4o",
+        **overrides,
+    )
+
+
+class TestCacheBackends:
+    """Test memory and SQLite backends."""
+
+    def test_memory_lru_eviction(self):
+        cache = MemoryResponseCache(max_size=2, ttl=0)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_memory_ttl_expiry(self):
+        cache = MemoryResponseCache(max_size=10, ttl=60)
+        with patch("sage.services.response_cache.time.time", return_value=1000.0):
+            cache.set("a", "1")
+        with patch("sage.services.response_cache.time.time", return_value=1059.0):
+            assert cache.get("a") == "1"
+        with patch("sage.services.response_cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+
+    def test_sqlite_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        SQLiteResponseCache(path, ttl=0).set("a", "hello")
+        assert SQLiteResponseCache(path, ttl=0).get("a") == "hello"
+
+    def test_sqlite_ttl_expiry(self, tmp_path):
+        cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        with patch("sage.services.response_cache.time.time", return_value=1000.0):
+            cache.set("a", "1")
+        with patch("sage.services.response_cache.time.time", return_value=1100.0):
+            assert cache.get("a") is None
+
+    def test_key_depends_on_every_part(self):
+        base = {"model": "gpt-4o", "user": "prompt", "temperature": 0.7, "sample": 0}
+        key = make_cache_key("generation", **base)
+        assert key == make_cache_key("generation", **dict(reversed(base.items())))
+        for part, value in [("model", "gpt-4o-mini"), ("temperature", 0.8), ("sample", 1)]:
+            assert make_cache_key("generation", **{**base, part: value}) != key
+
+
+class TestLLMServiceCaching:
+    """Test cache policies in LLMService."""
+
+    def _make_service(self, cache, **overrides):
+        mock_gen = AsyncMock()
+        mock_gen.generate.side_effect = ["first", "second", "third"]
+        mock_emb = AsyncMock()
+        mock_emb.embed_single.return_value = [0.1, 0.2]
+        with (
+            patch("sage.services.llm_service.ProviderFactory") as factory,
+            patch("sage.services.llm_service.get_response_cache", return_value=cache),
+        ):
+            factory.create_generation_provider.return_value = mock_gen
+            factory.create_embedding_provider.return_value = mock_emb
+            factory.create_vision_provider.return_value = AsyncMock()
+            service = LLMService(_options(**overrides))
+        return service, mock_gen, mock_emb
+
+    @pytest.mark.asyncio
+    async def test_use_policy_serves_repeat_from_cache(self, concept, question):
+        cache = MemoryResponseCache(max_size=10, ttl=0)
+        persona = {"persona_id": "p1", "age": 30}
+        service, mock_gen, _ = self._make_service(cache)
+        assert await service.generate_response(persona, concept, question) == "first"
+
+        # A new request (new service) with the same prompts hits the cache
+        service, mock_gen, _ = self._make_service(cache)
+        assert await service.generate_response(persona, concept, question) == "first"
+        mock_gen.generate.assert_not_called()
+        info = service.get_cache_info()
+        assert (info.hits, info.misses) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_sample_index_and_persona_in_key(self, concept, question):
+        cache = MemoryResponseCache(max_size=10, ttl=0)
+        service, mock_gen, _ = self._make_service(cache)
+        await service.generate_response({"persona_id": "p1", "age": 30}, concept, question)
+        await service.generate_response(
+            {"persona_id": "p1", "age": 30}, concept, question, sample_index=1
+        )
+        await service.generate_response({"persona_id": "p2", "age": 50}, concept, question)
+        assert mock_gen.generate.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_refresh_policy_regenerates_and_overwrites(self, concept, question):
+        cache = MemoryResponseCache(max_size=10, ttl=0)
+        persona = {"persona_id": "p1", "age": 30}
+        service, _, _ = self._make_service(cache)
+        await service.generate_response(persona, concept, question)
+
+        service, mock_gen, _ = self._make_service(cache, cache_policy="refresh")
+        mock_gen.generate.side_effect = ["refreshed"]
+        assert await service.generate_response(persona, concept, question) == "refreshed"
+
+        service, _, _ = self._make_service(cache)
+        assert await service.generate_response(persona, concept, question) == "refreshed"
+
+    @pytest.mark.asyncio
+    async def test_bypass_policy_skips_cache(self, concept, question):
+        cache = MemoryResponseCache(max_size=10, ttl=0)
+        service, mock_gen, _ = self._make_service(cache, cache_policy="bypass")
+        await service.generate_response({"persona_id": "p1"}, concept, question)
+        assert len(cache._entries) == 0
+        assert service.get_cache_info() is None
+
+    @pytest.mark.asyncio
+    async def test_embeddings_cached(self):
+        cache = MemoryResponseCache(max_size=10, ttl=0)
+        service, _, mock_emb = self._make_service(cache)
+        await service.get_embedding("I like it")
+        service, _, mock_emb = self._make_service(cache)
+        assert await service.get_embedding("I like it") == [0.1, 0.2]
+        mock_emb.embed_single.assert_not_called()
+        assert service.get_cache_info().embedding_hits == 1
+
+    def test_invalid_policy_rejected(self):
+        with pytest.raises(ValueError, match="cache_policy"):
+            _options(cache_policy="sometimes")
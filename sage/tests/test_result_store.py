@@ -0,0 +1,151 @@
+"""Tests for the result store backends."""
+
+import time
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from sage.services.result_store import MemoryResultStore, SQLiteResultStore
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.sqlite3"))
+    yield store
+    store.close()
+
+
+class TestMemoryResultStore:
+    """Test the in-process store."""
+
+    def test_evicts_least_recently_used(self, make_run):
+        store = MemoryResultStore(max_size=2)
+        store.save(make_run("a"))
+        store.save(make_run("b"))
+        store.get("a")
+        store.save(make_run("c"))
+        assert store.get("b") is None
+        assert store.get("a") is not None
+
+    def test_list_filters_and_orders_newest_first(self, make_run):
+        store = MemoryResultStore(max_size=10)
+        store.save(make_run("a", created=100))
+        store.save(make_run("b", concept="Juice", created=200))
+        store.save(make_run("c", created=300))
+
+        assert [s.request_id for s in store.list_runs(concept_name="Cola")] == ["c", "a"]
+        assert [s.request_id for s in store.list_runs(since=150)] == ["c", "b"]
+
+
+class TestSQLiteResultStore:
+    """Test the on-disk store and its background writer."""
+
+    def test_pending_run_readable_before_write(self, sqlite_store, make_run):
+        run = make_run("a")
+        sqlite_store.save(run)
+        assert sqlite_store.get("a") is not None
+        assert [s.request_id for s in sqlite_store.list_runs()] == ["a"]
+
+    def test_round_trip_after_flush(self, sqlite_store, make_run):
+        sqlite_store.save(make_run("a"))
+        sqlite_store.flush()
+        assert sqlite_store._pending == {}
+
+        run = sqlite_store.get("a")
+        assert run.response.meta.client == "acme"
+        assert run.questions[0].id == "q1"
+        assert run.responses[0]["responses"]["q1"]["mean"] == 4.2
+
+    def test_float32_pmfs_stored(self, sqlite_store, make_run):
+        run = make_run("a")
+        run.responses[0]["responses"]["q1"]["pmf"] = np.array([0.1, 0.2, 0.3, 0.2, 0.2], np.float32)
+        sqlite_store.save(run)
+        sqlite_store.flush()
+
+        stored = sqlite_store.get("a").responses[0]["responses"]["q1"]["pmf"]
+        assert stored == pytest.approx([0.1, 0.2, 0.3, 0.2, 0.2])
+
+    def test_non_numeric_persona_values_stored(self, sqlite_store, make_run):
+        run = make_run("a")
+        run.personas[0].update(
+            joined=date(2024, 5, 1), income=Decimal("1200.50"), children=np.int64(2)
+        )
+        sqlite_store.save(run)
+        sqlite_store.flush()
+
+        stored = sqlite_store.get("a").personas[0]
+        assert stored["joined"] == "2024-05-01"
+        assert stored["income"] == "1200.50"
+        assert stored["children"] == 2
+
+    def test_indexed_lookup(self, sqlite_store, make_run):
+        sqlite_store.save(make_run("a", client="acme", created=100))
+        sqlite_store.save(make_run("b", client="other", created=200))
+        sqlite_store.save(make_run("c", client="acme", model="gpt-4o-mini", created=300))
+        sqlite_store.flush()
+
+        assert [s.request_id for s in sqlite_store.list_runs(client="acme")] == ["c", "a"]
+        assert [s.request_id for s in sqlite_store.list_runs(model="openai/gpt-4o")] == [
+            "b",
+            "a",
+        ]
+        assert [s.request_id for s in sqlite_store.list_runs(until=150)] == ["a"]
+        assert len(sqlite_store.list_runs(limit=1)) == 1
+
+    def test_duplicate_request_id_does_not_overwrite(self, sqlite_store, make_run):
+        sqlite_store.save(make_run("a", client="acme"))
+        sqlite_store.flush()
+        sqlite_store.save(make_run("a", client="other"))
+        sqlite_store.flush()
+
+        assert sqlite_store.get("a").response.meta.client == "acme"
+
+    def test_writer_enforces_max_runs(self, tmp_path, make_run):
+        store = SQLiteResultStore(str(tmp_path / "results.sqlite3"), max_runs=2)
+        try:
+            for i, request_id in enumerate("abc"):
+                store.save(make_run(request_id, created=time.time() + i))
+            store.flush()
+
+            assert [s.request_id for s in store.list_runs()] == ["c", "b"]
+            assert store.get("a") is None
+        finally:
+            store.close()
+
+    def test_old_runs_pruned_on_startup_and_write(self, tmp_path, make_run):
+        path = str(tmp_path / "results.sqlite3")
+        store = SQLiteResultStore(path)
+        store.save(make_run("old", created=time.time() - 10 * 86400))
+        store.close()
+
+        store = SQLiteResultStore(path, max_age_days=7)
+        try:
+            store.flush()
+            store.save(make_run("new"))
+            store.flush()
+            assert [s.request_id for s in store.list_runs()] == ["new"]
+        finally:
+            store.close()
+
+    def test_persists_across_instances(self, tmp_path, make_run):
+        path = str(tmp_path / "results.sqlite3")
+        store = SQLiteResultStore(path)
+        store.save(make_run("a"))
+        store.close()
+
+        reopened = SQLiteResultStore(path)
+        try:
+            assert reopened.get("a").response.result.composite_score == 0.8
+        finally:
+            reopened.close()
+
+    def test_export_parquet(self, sqlite_store, tmp_path, make_run):
+        pq = pytest.importorskip("pyarrow.parquet")
+        sqlite_store.save(make_run("a"))
+        path = str(tmp_path / "runs.parquet")
+
+        assert sqlite_store.export_parquet(path, concept_name="Cola") == 1
+        table = pq.read_table(path)
+        assert table.column("question_id").to_pylist() == ["q1"]
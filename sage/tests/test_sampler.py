@@ -0,0 +1,147 @@
+"""Tests for stratified and quota persona sampling."""
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from sage.models.request import SamplingConfig
+from sage.services.filter_engine import PersonaColumns
+from sage.services.sampler import PersonaSampler, band_labels
+
+
+@pytest.fixture
+def panel():
+    """600 personas: 3:1 male, ages 20-79, two countries."""
+    return [
+        {
+            "persona_id": f"p{i}",
+            "gender": "F" if i % 4 == 0 else "M",
+            "age": 20 + i % 60,
+            "country": "UK" if i % 3 else "GR",
+        }
+        for i in range(600)
+    ]
+
+
+def _sample(panel, candidates=None, **config):
+    columns = PersonaColumns(panel)
+    if candidates is None:
+        candidates = np.arange(len(panel))
+    return PersonaSampler().sample(columns, candidates, SamplingConfig(**config))
+
+
+class TestStratifiedSampling:
+    """Test proportional allocation and weights."""
+
+    def test_proportional_allocation(self, panel):
+        sample = _sample(panel, n=100, strata=["gender"], seed=1)
+        genders = [panel[i]["gender"] for i in sample.indices]
+
+        assert len(sample.indices) == 100
+        assert genders.count("F") == 25
+        assert np.allclose(sample.weights, 1.0)
+        assert sample.info.effective_sample_size == pytest.approx(100)
+
+    def test_seed_is_reproducible(self, panel):
+        first = _sample(panel, n=50, strata=["gender", "country"], seed=7)
+        second = _sample(panel, n=50, strata=["gender", "country"], seed=7)
+        other = _sample(panel, n=50, strata=["gender", "country"], seed=8)
+
+        assert first.indices.tolist() == second.indices.tolist()
+        assert first.indices.tolist() != other.indices.tolist()
+        assert np.all(np.diff(first.indices) > 0)
+
+    def test_seed_recorded_when_omitted(self, panel):
+        sample = _sample(panel, n=10, method="random")
+        replay = _sample(panel, n=10, method="random", seed=sample.info.seed)
+
+        assert sample.indices.tolist() == replay.indices.tolist()
+        assert sample.weights is None
+
+    def test_bands_and_labels(self, panel):
+        sample = _sample(panel, n=60, strata=["age"], bands={"age": [30, 50]}, seed=1)
+        labels = {s.label: s.population for s in sample.info.strata}
+
+        assert band_labels([30, 50]) == ["<30", "30-50", "50+"]
+        assert labels == {"age=<30": 100, "age=30-50": 200, "age=50+": 300}
+        assert sum(s.sampled for s in sample.info.strata) == 60
+
+    def test_only_candidates_sampled(self, panel):
+        candidates = np.arange(0, 600, 2)
+        sample = _sample(panel, candidates=candidates, n=40, strata=["gender"], seed=1)
+
+        assert set(sample.indices.tolist()) <= set(candidates.tolist())
+        assert sample.info.population == 300
+
+    def test_n_larger_than_population(self, panel):
+        sample = _sample(panel[:30], n=100, strata=["gender"], seed=1)
+
+        assert len(sample.indices) == 30
+
+
+class TestQuotaSampling:
+    """Test quota targets and post-stratification weights."""
+
+    def test_quota_allocation(self, panel):
+        sample = _sample(
+            panel,
+            n=100,
+            method="quota",
+            strata=["gender", "country"],
+            quotas={"gender": {"F": 0.5, "M": 0.5}},
+            seed=1,
+        )
+        genders = [panel[i]["gender"] for i in sample.indices]
+
+        assert genders.count("F") == 50
+        assert np.isclose(sample.weights.mean(), 1.0)
+
+    def test_capped_stratum_is_weighted_up(self, panel):
+        # Only 15 women available for a 50% quota of 60 seats
+        candidates = np.array([i for i in range(600) if panel[i]["gender"] == "M" or i < 60])
+        sample = _sample(
+            panel,
+            candidates=candidates,
+            n=60,
+            method="quota",
+            strata=["gender"],
+            quotas={"gender": {"F": 0.5, "M": 0.5}},
+            seed=1,
+        )
+        by_label = {s.label: s for s in sample.info.strata}
+
+        assert by_label["gender=F"].sampled == 15
+        assert by_label["gender=M"].sampled == 45
+        weights = dict(zip((panel[i]["gender"] for i in sample.indices), sample.weights))
+        # Weighted, women count for half the sample again
+        assert weights["F"] * 15 == pytest.approx(weights["M"] * 45)
+
+    def test_unknown_quota_value(self, panel):
+        with pytest.raises(ValueError, match="match no personas"):
+            _sample(
+                panel,
+                n=10,
+                method="quota",
+                strata=["gender"],
+                quotas={"gender": {"F": 0.5, "X": 0.5}},
+            )
+
+
+class TestSamplingConfig:
+    """Test sampling request validation."""
+
+    def test_strata_required(self):
+        with pytest.raises(ValidationError, match="requires strata"):
+            SamplingConfig(n=10)
+
+    def test_quotas_must_sum_to_one(self):
+        with pytest.raises(ValidationError, match="sum to 1.0"):
+            SamplingConfig(n=10, method="quota", strata=["g"], quotas={"g": {"F": 0.4}})
+
+    def test_bands_must_be_increasing(self):
+        with pytest.raises(ValidationError, match="strictly increasing"):
+            SamplingConfig(n=10, strata=["age"], bands={"age": [50, 30]})
+
+    def test_band_attribute_must_be_a_stratum(self):
+        with pytest.raises(ValidationError, match="not one of the strata"):
+            SamplingConfig(n=10, strata=["gender"], bands={"age": [30]})
@@ -1,5 +1,6 @@
 """Tests for the scoring engine."""
 
+import numpy as np
 import pytest
 
 from sage.models.request import Question
@@ -70,14 +71,10 @@ def sample_responses():
 class TestScoringEngine:
     """Test cases for ScoringEngine."""
 
-    def test_calculate_metrics_basic(
-        self, scoring_engine, sample_responses, sample_questions
-    ):
+    def test_calculate_metrics_basic(self, scoring_engine, sample_responses, sample_questions):
         """Test basic metrics calculation."""
         match_flags = [True, True, True]
-        metrics = scoring_engine.calculate_metrics(
-            sample_responses, sample_questions, match_flags
-        )
+        metrics = scoring_engine.calculate_metrics(sample_responses, sample_questions, match_flags)
 
         assert "q1" in metrics
         assert "q2" in metrics
@@ -94,32 +91,24 @@ class TestScoringEngine:
         """Test metrics calculation with filtering."""
         # Only include first two personas
         match_flags = [True, True, False]
-        metrics = scoring_engine.calculate_metrics(
-            sample_responses, sample_questions, match_flags
-        )
+        metrics = scoring_engine.calculate_metrics(sample_responses, sample_questions, match_flags)
 
         # Check that only 2 personas are counted
         assert metrics["q1"].n == 2
 
-    def test_calculate_metrics_no_matches(
-        self, scoring_engine, sample_responses, sample_questions
-    ):
+    def test_calculate_metrics_no_matches(self, scoring_engine, sample_responses, sample_questions):
         """Test that no matches raises error."""
         match_flags = [False, False, False]
 
         with pytest.raises(ValueError, match="No personas matched"):
-            scoring_engine.calculate_metrics(
-                sample_responses, sample_questions, match_flags
-            )
+            scoring_engine.calculate_metrics(sample_responses, sample_questions, match_flags)
 
     def test_calculate_metrics_distribution(
         self, scoring_engine, sample_responses, sample_questions
     ):
         """Test that distribution is calculated correctly."""
         match_flags = [True, True, True]
-        metrics = scoring_engine.calculate_metrics(
-            sample_responses, sample_questions, match_flags
-        )
+        metrics = scoring_engine.calculate_metrics(sample_responses, sample_questions, match_flags)
 
         # Distribution should have keys 1-5
         for q_id in ["q1", "q2", "q3"]:
@@ -131,9 +120,7 @@ class TestScoringEngine:
     ):
         """Test top 2 box and bottom 2 box calculations."""
         match_flags = [True, True, True]
-        metrics = scoring_engine.calculate_metrics(
-            sample_responses, sample_questions, match_flags
-        )
+        metrics = scoring_engine.calculate_metrics(sample_responses, sample_questions, match_flags)
 
         # top_2_box should be between 0 and 1
         # bottom_2_box should be between 0 and 1
@@ -141,18 +128,12 @@ class TestScoringEngine:
             assert 0 <= metrics[q_id].top_2_box <= 1
             assert 0 <= metrics[q_id].bottom_2_box <= 1
 
-    def test_calculate_composite_score(
-        self, scoring_engine, sample_responses, sample_questions
-    ):
+    def test_calculate_composite_score(self, scoring_engine, sample_responses, sample_questions):
         """Test composite score calculation."""
         match_flags = [True, True, True]
-        metrics = scoring_engine.calculate_metrics(
-            sample_responses, sample_questions, match_flags
-        )
+        metrics = scoring_engine.calculate_metrics(sample_responses, sample_questions, match_flags)
 
-        composite, breakdown = scoring_engine.calculate_composite_score(
-            metrics, sample_questions
-        )
+        composite, breakdown = scoring_engine.calculate_composite_score(metrics, sample_questions)
 
         # Composite should be between 0 and 1
         assert 0 <= composite <= 1
@@ -204,3 +185,206 @@ class TestScoringEngine:
 
         assert result.passed is True
         assert result.margin == pytest.approx(0.0, abs=0.001)
+
+
+class TestWeightedMetrics:
+    """Test persona weights (post-stratification) in metrics."""
+
+    def test_unit_weights_match_unweighted(
+        self, scoring_engine, sample_responses, sample_questions
+    ):
+        flags = [True, True, True]
+        unweighted = scoring_engine.calculate_metrics(sample_responses, sample_questions, flags)
+        weighted = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, flags, [1.0, 1.0, 1.0]
+        )
+
+        assert weighted == unweighted
+
+    def test_weights_shift_mean_and_boxes(self, scoring_engine, sample_responses, sample_questions):
+        metrics = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [True, True, True], [2.0, 1.0, 1.0]
+        )
+
+        assert metrics["q1"].mean == pytest.approx((2 * 4.0 + 3.5 + 4.2) / 4, abs=0.01)
+        assert metrics["q1"].median == 4.0
+        assert metrics["q1"].top_2_box == 0.75  # p1 (weight 2) and p3 of total weight 4
+        assert metrics["q1"].n == 3
+
+    def test_weights_follow_match_flags(self, scoring_engine, sample_responses, sample_questions):
+        metrics = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [False, True, True], [5.0, 1.0, 3.0]
+        )
+
+        assert metrics["q1"].mean == pytest.approx((3.5 + 3 * 4.2) / 4, abs=0.01)
+
+    def test_weighted_distribution(self, scoring_engine, sample_responses, sample_questions):
+        metrics = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [True, True, True], [1.5, 0.5, 1.0]
+        )
+
+        # q1 means 4.0, 3.5 (rounds half to even: 4) and 4.2
+        assert metrics["q1"].distribution == {"1": 0.0, "2": 0.0, "3": 0.0, "4": 3.0, "5": 0.0}
+
+    def test_weighted_median_split(self, scoring_engine):
+        questions = [Question(id="q1", text="Q?", weight=1.0, ssr_reference_sets=[["a"] * 5] * 6)]
+        means = np.array([[1.0], [2.0], [3.0], [4.0]])
+
+        unweighted = scoring_engine.metrics_from_means(means, questions)
+        weighted = scoring_engine.metrics_from_means(means, questions, np.array([3.0, 1, 1, 1]))
+
+        assert unweighted["q1"].median == 2.5
+        assert weighted["q1"].median == 1.5
+
+
+class TestMetricsFromMeans:
+    """Test the vectorized (N, Q) metrics path."""
+
+    def test_matches_response_dicts(self, scoring_engine, sample_responses, sample_questions):
+        means = scoring_engine.response_means(sample_responses, sample_questions)
+        pmfs = scoring_engine.response_pmfs(sample_responses, sample_questions)
+
+        assert means.shape == (3, 3)
+        assert pmfs.shape == (3, 3, 5) and pmfs.dtype == np.float32
+        assert scoring_engine.metrics_from_means(
+            means, sample_questions, pmfs=pmfs
+        ) == scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [True, True, True]
+        )
+
+    def test_matches_numpy_statistics(self, scoring_engine):
+        rng = np.random.default_rng(0)
+        means = rng.uniform(1, 5, size=(501, 4))
+        questions = [
+            Question(id=f"q{j}", text="Q?", weight=0.25, ssr_reference_sets=[["a"] * 5] * 6)
+            for j in range(4)
+        ]
+
+        metrics = scoring_engine.metrics_from_means(means, questions)
+
+        for j, question in enumerate(questions):
+            column = means[:, j]
+            m = metrics[question.id]
+            assert m.mean == round(float(np.mean(column)), 2)
+            assert m.median == round(float(np.median(column)), 2)
+            assert m.std_dev == round(float(np.std(column)), 2)
+            assert sum(m.distribution.values()) == 501
+            assert all(isinstance(c, int) for c in m.distribution.values())
+
+    def test_no_personas(self, scoring_engine, sample_questions):
+        with pytest.raises(ValueError, match="No personas matched"):
+            scoring_engine.metrics_from_means(np.empty((0, 3)), sample_questions)
+
+
+class TestConfidenceIntervals:
+    """Test bootstrap confidence intervals and pass probability."""
+
+    @pytest.fixture
+    def questions(self):
+        return [
+            Question(id=f"q{j}", text="Q?", weight=0.5, ssr_reference_sets=[["a"] * 5] * 6)
+            for j in range(2)
+        ]
+
+    def _score(self, engine, means, questions, threshold, weights=None):
+        metrics = engine.metrics_from_means(means, questions, weights)
+        composite, _ = engine.calculate_composite_score(metrics, questions)
+        result = engine.evaluate_threshold(composite, threshold)
+        engine.add_confidence_intervals(means, questions, metrics, result, weights)
+        return metrics, result
+
+    def test_intervals_bracket_estimates(self, questions):
+        means = np.random.default_rng(1).uniform(2, 5, size=(500, 2))
+        metrics, result = self._score(ScoringEngine(), means, questions, 0.6)
+
+        for m in metrics.values():
+            assert m.mean_ci.lower <= m.mean <= m.mean_ci.upper
+            assert m.mean_ci.upper - m.mean_ci.lower < 0.3
+            assert m.top_2_box_ci.lower <= m.top_2_box <= m.top_2_box_ci.upper
+        assert result.composite_ci.lower <= result.composite_score <= result.composite_ci.upper
+        assert result.confidence_level == 0.95
+
+    def test_reproducible(self, questions):
+        means = np.random.default_rng(2).uniform(1, 5, size=(50, 2))
+
+        _, first = self._score(ScoringEngine(), means, questions, 0.5)
+        _, second = self._score(ScoringEngine(), means, questions, 0.5)
+
+        assert first.composite_ci == second.composite_ci
+        assert first.pass_probability == second.pass_probability
+
+    def test_pass_probability(self, questions):
+        means = np.random.default_rng(3).uniform(3.5, 4.5, size=(200, 2))
+
+        _, clear = self._score(ScoringEngine(), means, questions, 0.5)
+        _, marginal = self._score(ScoringEngine(), means, questions, (means.mean() - 1) / 4)
+        _, failing = self._score(ScoringEngine(), means, questions, 0.9)
+
+        assert clear.pass_probability == 1.0
+        assert 0.3 < marginal.pass_probability < 0.7
+        assert failing.pass_probability == 0.0
+
+    def test_constant_responses(self, questions):
+        metrics, result = self._score(ScoringEngine(), np.full((20, 2), 4.0), questions, 0.7)
+
+        assert metrics["q0"].mean_ci.lower == metrics["q0"].mean_ci.upper == 4.0
+        assert result.composite_ci.lower == result.composite_ci.upper == 0.75
+
+    def test_weighted(self, questions):
+        means = np.array([[1.0, 1.0]] * 10 + [[5.0, 5.0]] * 10)
+        weights = np.array([0.2] * 10 + [1.8] * 10)
+
+        metrics, _ = self._score(ScoringEngine(), means, questions, 0.5, weights)
+
+        assert metrics["q0"].mean == 4.6
+        assert metrics["q0"].mean_ci.lower > 4.0
+
+    def test_disabled(self, questions):
+        metrics, result = self._score(
+            ScoringEngine(resamples=0), np.full((5, 2), 3.0), questions, 0.5
+        )
+
+        assert metrics["q0"].mean_ci is None
+        assert result.composite_ci is None
+        assert result.pass_probability is None
+
+
+class TestPMFMetrics:
+    """Test metrics computed from the personas' full response distributions."""
+
+    def test_aggregate_pmf(self, scoring_engine, sample_responses, sample_questions):
+        metrics = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [True, True, True]
+        )
+        pmfs = np.array([r["responses"]["q1"]["pmf"] for r in sample_responses])
+
+        assert metrics["q1"].aggregate_pmf == pytest.approx(pmfs.mean(axis=0).tolist(), abs=1e-3)
+        assert metrics["q1"].expected_top_2_box == round(pmfs[:, 3:].sum(axis=1).mean(), 2)
+
+    def test_weighted_aggregate_pmf(self, scoring_engine, sample_responses, sample_questions):
+        metrics = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [True, True, False], [1.0, 3.0, 1.0]
+        )
+
+        # q1 PMFs of p1 and p2 weighted 1:3
+        assert metrics["q1"].aggregate_pmf == pytest.approx(
+            [0.0625, 0.125, 0.3, 0.3375, 0.175], abs=1e-3
+        )
+
+    def test_entropy(self, scoring_engine, sample_questions):
+        questions = sample_questions[:2]
+        pmfs = np.array([[[0, 0, 0, 1, 0], [0.2] * 5]], dtype=np.float32)
+
+        metrics = scoring_engine.metrics_from_means(np.array([[4.0, 3.0]]), questions, pmfs=pmfs)
+
+        assert metrics["q1"].entropy == 0.0
+        assert metrics["q2"].entropy == pytest.approx(np.log2(5), abs=1e-3)
+
+    def test_missing_pmfs(self, scoring_engine, sample_responses, sample_questions):
+        sample_responses[0]["responses"]["q2"]["pmf"] = []
+
+        assert scoring_engine.response_pmfs(sample_responses, sample_questions) is None
+        metrics = scoring_engine.calculate_metrics(
+            sample_responses, sample_questions, [True, True, True]
+        )
+        assert metrics["q1"].aggregate_pmf is None
@@ -0,0 +1,86 @@
+"""Tests for response serialization and compression."""
+
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from sage.models.response import FullResponse, Meta, MinimalResponse, ResultSummary
+from sage.utils import serialization
+from sage.utils.serialization import compress, dumps, serialize_response
+
+
+def _full_response(rows: int = 3) -> FullResponse:
+    return FullResponse(
+        result=ResultSummary(
+            passed=True, composite_score=0.8, threshold=0.7, margin=0.1, reason="PASS"
+        ),
+        filters_applied=[],
+        personas_total=rows,
+        personas_matched=rows,
+        criteria_breakdown=[],
+        metrics={},
+        dataset=[
+            {"persona_id": f"p{i}", "q1_mean": np.float64(3.5), "q1_text": "ok " * 50}
+            for i in range(rows)
+        ],
+        meta=Meta(request_id="abc", concept_name="Cola", processing_time_ms=5),
+    )
+
+
+class TestDumps:
+    """Test the JSON encoder."""
+
+    def test_numpy_values(self):
+        assert json.loads(dumps({"a": np.float64(1.5), "b": np.arange(2)})) == {
+            "a": 1.5,
+            "b": [0, 1],
+        }
+
+    def test_stdlib_fallback(self, monkeypatch):
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert json.loads(dumps({"a": np.float32(0.5)})) == {"a": 0.5}
+
+
+class TestSerializeResponse:
+    """Test the pre-validated response fast path."""
+
+    @pytest.mark.parametrize("rows", [0, 3, 40, 400])
+    def test_response_bytes_is_exact(self, rows):
+        body = serialize_response(_full_response(rows))
+        data = json.loads(body)
+        assert data["meta"]["response_bytes"] == len(body)
+        assert data["meta"]["serialization_ms"] >= 0
+
+    def test_round_trips_to_model(self):
+        response = _full_response()
+        parsed = FullResponse.model_validate_json(serialize_response(response))
+        assert parsed.dataset[0]["q1_mean"] == 3.5
+        assert parsed.meta.request_id == "abc"
+
+    def test_minimal_response(self):
+        body = serialize_response(MinimalResponse(passed=True, composite_score=0.8, threshold=0.7))
+        assert json.loads(body) == {"passed": True, "composite_score": 0.8, "threshold": 0.7}
+
+
+class TestCompress:
+    """Test content negotiation for compression."""
+
+    def test_gzip_when_accepted(self):
+        body = b"x" * 5000
+        compressed, encoding = compress(body, "gzip, deflate", min_bytes=1024)
+        assert encoding == "gzip"
+        assert gzip.decompress(compressed) == body
+
+    def test_small_body_uncompressed(self):
+        assert compress(b"{}", "gzip", min_bytes=1024) == (b"{}", None)
+
+    def test_not_accepted(self):
+        assert compress(b"x" * 5000, "identity", min_bytes=1024)[1] is None
+
+    def test_brotli_preferred(self):
+        brotli = pytest.importorskip("brotli")
+        compressed, encoding = compress(b"x" * 5000, "gzip, br", min_bytes=1024)
+        assert encoding == "br"
+        assert brotli.decompress(compressed) == b"x" * 5000
@@ -1,7 +1,10 @@
 """Tests for the SSR engine and embedding utilities."""
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
+from sage.services.ssr_engine import SSREngine
 from sage.utils.embeddings import cosine_similarity, softmax
 
 
@@ -82,6 +85,7 @@ class TestEmbeddingUtilities:
         assert max(sharp) > max(smooth)
         # The variance should be higher with low temperature
         import numpy as np
+
         assert np.var(sharp) > np.var(smooth)
 
     def test_softmax_preserves_order(self):
@@ -139,7 +143,7 @@ class TestSSRMapping:
         pmf = normalize_pmf(adjusted)
 
         # Total is 15, so probabilities should be 1/15, 2/15, 3/15, 4/15, 5/15
-        expected = [1/15, 2/15, 3/15, 4/15, 5/15]
+        expected = [1 / 15, 2 / 15, 3 / 15, 4 / 15, 5 / 15]
         for actual, exp in zip(pmf, expected):
             assert actual == pytest.approx(exp, rel=1e-6)
 
@@ -158,6 +162,7 @@ class TestSSRMapping:
 
         # The variance should be higher with low temperature
         import numpy as np
+
         assert np.var(pmf_sharp) > np.var(pmf_t1)
 
     def test_expected_value_calculation(self):
@@ -203,3 +208,46 @@ class TestSSRMapping:
 
         # Should be closer to 1 than to 3
         assert mean < 2.5, f"Mean {mean} should be < 2.5 when similarities favor 1"
+
+
+class TestSampleAveraging:
+    """Test mapping several sampled responses to one PMF."""
+
+    VECTORS = {
+        "a": [1.0, 0.0],
+        "b": [0.8, 0.2],
+        "c": [0.5, 0.5],
+        "d": [0.2, 0.8],
+        "e": [0.0, 1.0],
+        "love it": [0.1, 0.9],
+        "hate it": [0.9, 0.1],
+    }
+
+    @pytest.fixture
+    def engine(self):
+        llm_service = MagicMock()
+        llm_service.get_embedding = AsyncMock(side_effect=lambda text: self.VECTORS[text])
+        llm_service.get_embeddings = AsyncMock(
+            side_effect=lambda texts: [self.VECTORS[t] for t in texts]
+        )
+        return SSREngine(llm_service)
+
+    @pytest.mark.asyncio
+    async def test_average_weighted_by_duplicates(self, engine):
+        anchors = [["a", "b", "c", "d", "e"]]
+        love, _ = await engine.map_response_to_likert("love it", anchors)
+        hate, _ = await engine.map_response_to_likert("hate it", anchors)
+
+        pmf, mean = await engine.map_samples_to_likert(["love it", "hate it", "love it"], anchors)
+
+        expected = [(2 * p + q) / 3 for p, q in zip(love, hate)]
+        assert pmf == pytest.approx(expected)
+        assert mean == pytest.approx(sum((i + 1) * p for i, p in enumerate(expected)))
+        # Distinct samples embedded once, in one batch
+        engine.llm_service.get_embeddings.assert_any_call(["love it", "hate it"])
+
+    @pytest.mark.asyncio
+    async def test_identical_samples_match_single_response(self, engine):
+        anchors = [["a", "b", "c", "d", "e"]]
+        single = await engine.map_response_to_likert("love it", anchors)
+        assert await engine.map_samples_to_likert(["love it"] * 3, anchors) == single
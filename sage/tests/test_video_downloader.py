@@ -2,16 +2,18 @@
 
 import asyncio
 import base64
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
 
-from sage.services.video_downloader import VideoDownloader
+from sage.services.video_downloader import VideoDownloader, VideoSource
 
 
 @pytest.fixture
 def downloader():
-    return VideoDownloader()
+    downloader = VideoDownloader()
+    downloader._s3_etag = MagicMock(return_value=None)  # no AWS calls
+    return downloader
 
 
 class TestSourceTypeDetection:
@@ -55,6 +57,28 @@ class TestResolveS3:
         assert result.data == "s3://bucket/video.mp4"
         assert result.s3_bucket_owner is None
 
+    @pytest.mark.asyncio
+    async def test_s3_content_hash_follows_etag(self, downloader):
+        downloader._s3_etag.return_value = "abc123"
+        result = await downloader.resolve("s3://bucket/video.mp4", s3_bucket_owner="123456789")
+
+        downloader._s3_etag.assert_called_once_with("s3://bucket/video.mp4", "123456789")
+        assert result.s3_etag == "abc123"
+        # Same bytes at another URI share the hash, new bytes at the same URI do not
+        moved = VideoSource(source_type="s3", data="s3://other/copy.mp4", s3_etag="abc123")
+        replaced = VideoSource(source_type="s3", data="s3://bucket/video.mp4", s3_etag="def456")
+        assert result.content_hash == moved.content_hash
+        assert result.content_hash != replaced.content_hash
+
+    def test_s3_etag_unreadable_falls_back_to_uri(self):
+        from botocore.exceptions import NoCredentialsError
+
+        client = MagicMock()
+        client.head_object.side_effect = NoCredentialsError()
+        with patch("boto3.client", return_value=client):
+            assert VideoDownloader._s3_etag("s3://bucket/video.mp4") is None
+        client.head_object.assert_called_once_with(Bucket="bucket", Key="video.mp4")
+
     @pytest.mark.asyncio
     async def test_s3_with_bucket_owner(self, downloader):
         result = await downloader.resolve("s3://bucket/video.mp4", s3_bucket_owner="123456789")
@@ -146,7 +170,6 @@ class TestCaching:
 
         assert first is second
 
-
     @pytest.mark.asyncio
     async def test_concurrent_resolves_download_once(self, downloader):
         """Many concurrent resolves of the same URL should only download once."""
@@ -0,0 +1,109 @@
+"""Fast JSON encoding and compression for API responses.
+
+Large verbose responses (dataset rows and reports for hundreds of personas)
+are encoded with orjson when it is installed (``pip install sage[fast]``),
+falling back to the standard library encoder otherwise, and compressed with
+brotli or gzip when the client accepts it.
+"""
+
+import gzip
+import json
+import time
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+
+from ..models.response import FullResponse, MinimalResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on installed extras
+    brotli = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode an object as compact UTF-8 JSON.
+
+    Args:
+        obj: JSON-compatible data (NumPy scalars/arrays and datetimes allowed)
+
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_response(response: FullResponse | MinimalResponse) -> bytes:
+    """
+    Serialize an API response without re-validating it.
+
+    For a FullResponse, ``meta.serialization_ms`` is set to the encoding time
+    and ``meta.response_bytes`` to the exact size of the returned body. The
+    body is encoded without meta first, then the small meta object is encoded
+    and appended, so the large dataset and report are encoded only once.
+
+    Args:
+        response: Response model built by the orchestrator
+
+    Returns:
+        UTF-8 JSON body (uncompressed)
+    """
+    if not isinstance(response, FullResponse):
+        return dumps(response.model_dump())
+
+    start = time.perf_counter()
+    body = dumps(response.model_dump(exclude={"meta"}))
+    meta = response.meta
+    meta.serialization_ms = round((time.perf_counter() - start) * 1000, 3)
+    meta.response_bytes = None
+
+    # Final body is body[:-1] + ',"meta":' + meta_json + '}'. Replacing
+    # "response_bytes":null with the size changes the length by its digit count.
+    base = len(body) + len(b',"meta":') + len(dumps(meta.model_dump())) - len(b"null")
+    size = base + len(str(base))
+    if len(str(size)) != len(str(base)):
+        size = base + len(str(size))
+    meta.response_bytes = size
+
+    return body[:-1] + b',"meta":' + dumps(meta.model_dump()) + b"}"
+
+
+def compress(body: bytes, accept_encoding: str, min_bytes: int) -> tuple[bytes, str | None]:
+    """
+    Compress a body with the best encoding the client accepts.
+
+    Args:
+        body: Uncompressed body
+        accept_encoding: Value of the request's Accept-Encoding header
+        min_bytes: Bodies smaller than this are returned uncompressed
+
+    Returns:
+        (body, content encoding or None if uncompressed)
+    """
+    if len(body) < min_bytes:
+        return body, None
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body, quality=4), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
@@ -0,0 +1,171 @@
+"""Per-run stage timing.
+
+Like token usage (services/usage.py), stage times cannot live on shared
+objects, so a StageTimer is started for each run in a context variable.
+asyncio tasks spawned for the run inherit it, and code anywhere in the
+pipeline records into it with ``with stage("name"):`` (a no-op outside a
+timed run).
+
+Stages that run concurrently (provider calls, embeddings, SSR) record one
+duration per call, so their totals are busy time summed over calls and can
+exceed the run's wall-clock time.
+
+Besides durations, a timer records queue waits (time spent waiting for a
+concurrency slot, see ``acquire``) and provider-side retries, both under the
+stage they happened in. ``run_timing()`` scopes a timer to one run and nests
+it in any timer already active (e.g. the benchmark's), which receives
+everything recorded in the run as well.
+"""
+
+import time
+from array import array
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import numpy as np
+
+from ..models.response import StageTiming
+
+
+class StageTimer:
+    """Durations, queue waits and retries recorded per stage for one run."""
+
+    def __init__(self, parent: "StageTimer | None" = None):
+        """
+        Initialize an empty timer.
+
+        Args:
+            parent: Enclosing timer that also receives everything recorded here
+        """
+        self.parent = parent
+        self.durations: dict[str, array] = {}  # stage -> durations in ms
+        self.waits: dict[str, array] = {}  # stage -> queue waits in ms
+        self.retries: dict[str, int] = {}  # stage -> provider retries
+
+    def add(self, name: str, ms: float) -> None:
+        """Record one duration of a stage."""
+        values = self.durations.get(name)
+        if values is None:
+            values = self.durations[name] = array("d")
+        values.append(ms)
+        if self.parent is not None:
+            self.parent.add(name, ms)
+
+    def add_wait(self, name: str, ms: float) -> None:
+        """Record one queue wait before a stage."""
+        values = self.waits.get(name)
+        if values is None:
+            values = self.waits[name] = array("d")
+        values.append(ms)
+        if self.parent is not None:
+            self.parent.add_wait(name, ms)
+
+    def add_retries(self, name: str, count: int) -> None:
+        """Record provider retries of a stage."""
+        self.retries[name] = self.retries.get(name, 0) + count
+        if self.parent is not None:
+            self.parent.add_retries(name, count)
+
+    def totals(self) -> dict[str, float]:
+        """Total milliseconds per stage, in first-recorded order."""
+        return {name: sum(values) for name, values in self.durations.items()}
+
+    def counts(self) -> dict[str, int]:
+        """Recorded durations per stage."""
+        return {name: len(values) for name, values in self.durations.items()}
+
+    def summary(self) -> dict[str, StageTiming]:
+        """
+        Aggregate the run per stage.
+
+        Returns:
+            StageTiming per stage (stages with only waits or retries have 0 calls)
+        """
+        names = dict.fromkeys([*self.durations, *self.waits, *self.retries])
+        summary = {}
+        for name in names:
+            stats: dict[str, Any] = dict.fromkeys(("total_ms", "p50_ms", "p95_ms", "max_ms"), 0.0)
+            stats["calls"] = 0
+            values = self.durations.get(name)
+            if values:
+                durations = np.frombuffer(values, dtype=np.float64)
+                p50, p95 = np.percentile(durations, [50, 95])
+                stats = {
+                    "calls": durations.size,
+                    "total_ms": round(float(durations.sum()), 2),
+                    "p50_ms": round(float(p50), 2),
+                    "p95_ms": round(float(p95), 2),
+                    "max_ms": round(float(durations.max()), 2),
+                }
+            waits = self.waits.get(name)
+            if waits:
+                wait_ms = np.frombuffer(waits, dtype=np.float64)
+                stats["queue_wait_ms"] = round(float(wait_ms.sum()), 2)
+                stats["queue_wait_p95_ms"] = round(float(np.percentile(wait_ms, 95)), 2)
+            if name in self.retries:
+                stats["retries"] = self.retries[name]
+            summary[name] = StageTiming(**stats)
+        return summary
+
+
+_current_timer: ContextVar[StageTimer | None] = ContextVar("sage_stage_timer", default=None)
+_current_stage: ContextVar[str | None] = ContextVar("sage_stage", default=None)
+
+
+def start_stage_timing() -> StageTimer:
+    """Start a new stage timer for the current run and return it."""
+    timer = StageTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def current_stage_timer() -> StageTimer | None:
+    """Stage timer of the current run, or None outside a timed run."""
+    return _current_timer.get()
+
+
+@contextmanager
+def run_timing() -> Iterator[StageTimer]:
+    """Time the enclosed run with its own timer, nested in the current one."""
+    timer = StageTimer(parent=_current_timer.get())
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as one duration of a stage."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    token = _current_stage.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, (time.perf_counter() - start) * 1000)
+        _current_stage.reset(token)
+
+
+@asynccontextmanager
+async def acquire(semaphore: Any, name: str) -> AsyncIterator[None]:
+    """Hold a semaphore, recording the wait for it as a queue wait of a stage."""
+    timer = _current_timer.get()
+    start = time.perf_counter()
+    async with semaphore:
+        if timer is not None:
+            timer.add_wait(name, (time.perf_counter() - start) * 1000)
+        yield
+
+
+def record_retries(count: int) -> None:
+    """Add provider retries to the innermost stage of the current run (no-op outside one)."""
+    timer = _current_timer.get()
+    if timer is not None and count > 0:
+        timer.add_retries(_current_stage.get() or "other", count)